@@ -0,0 +1,89 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Exops, peak temporary memory and step time of mini_resnet on the CPU transformer,
+with and without the bias, residual add and relu fused into the convolutions.
+
+Run it using
+
+python examples/benchmarks/conv_fusion.py -z 16 -t 6 --bprop
+"""
+from __future__ import division
+from __future__ import print_function
+from contextlib import closing
+import time
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import GradientDescentMomentum, NgraphArgparser, ax
+from ngraph.transformers.passes.convfusion import ConvolutionFusion
+from mini_resnet import get_fake_data, get_mini_resnet
+
+
+def build(data_set, batch_size, num_iterations, bprop):
+    inputs, data, train_set = get_fake_data(data_set, batch_size, num_iterations)
+    model_out = get_mini_resnet(inputs, data_set, None)
+    if bprop:
+        optimizer = GradientDescentMomentum(0.01, 0.9)
+        train_loss = ng.cross_entropy_multi(model_out, ng.one_hot(inputs['label'], axis=ax.Y))
+        computation_op = ng.computation(
+            ng.sequential([optimizer(train_loss), ng.mean(train_loss, out_axes=())]), "all")
+    else:
+        computation_op = ng.computation(model_out, "all")
+    batch = next(iter(train_set))
+    return computation_op, {inputs[k]: batch[k] for k in inputs.keys()}
+
+
+def run(computation_op, feed_dict, num_iterations, n_skip, fuse):
+    """
+    Returns the number of exops, the peak temporary memory and the step time.
+    """
+    with closing(ngt.make_transformer_factory('cpu')()) as transformer:
+        if not fuse:
+            transformer.graph_passes = [graph_pass for graph_pass in transformer.graph_passes
+                                        if not isinstance(graph_pass, ConvolutionFusion)]
+        computation = transformer.add_computation(computation_op)
+        for _ in range(n_skip):
+            computation(feed_dict=feed_dict)
+        start = time.time()
+        for _ in range(n_skip, num_iterations):
+            computation(feed_dict=feed_dict)
+        step_time = (time.time() - start) / (num_iterations - n_skip)
+
+        exops = len(list(computation.computation_decl.exop_block))
+        footprint = transformer.temporary_arena_size
+    return exops, footprint, step_time
+
+
+if __name__ == "__main__":
+    parser = NgraphArgparser(description=__doc__)
+    parser.add_argument('-data', '--data_set', default='cifar10',
+                        choices=['cifar10', 'i1k'], help="data set name")
+    parser.add_argument('-s', '--skip_iter', type=int, default=1,
+                        help="number of iterations to skip")
+    parser.add_argument('--bprop', action="store_true", help="enable back propagation")
+    parser.set_defaults(batch_size=16, num_iterations=6)
+    args = parser.parse_args()
+
+    print('{:>10} {:>10} {:>14} {:>14}'.format('convs', 'exops', 'peak MiB', 'step ms'))
+    for fuse in (False, True):
+        # each transformer gets a graph of its own
+        computation_op, feed_dict = build(args.data_set, args.batch_size, args.num_iterations,
+                                          args.bprop)
+        exops, footprint, step_time = run(computation_op, feed_dict, args.num_iterations,
+                                          args.skip_iter, fuse)
+        print('{:>10} {:>10} {:>14.2f} {:>14.2f}'.format(
+            'fused' if fuse else 'unfused', exops, footprint / float(1 << 20),
+            1000 * step_time))
@@ -0,0 +1,90 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Training step time on the CPU transformer for a deep, narrow MLP with many small
+parameters, updating variable by variable and with flat parameters. The optimizer time
+is the step time less the step time of computing and storing the gradients alone, shown
+as no update.
+
+Run it using
+
+python examples/benchmarks/flat_optimizer.py -z 16 -t 60 --layers 100 --optimizer adam
+"""
+from __future__ import division
+from __future__ import print_function
+from contextlib import closing
+import time
+
+import numpy as np
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import Adam, Affine, GaussianInit, GradientDescentMomentum, \
+    NgraphArgparser, Rectlin, RMSProp, Sequential
+
+optimizers = {
+    'sgd': lambda flat: GradientDescentMomentum(0.01, 0.9, wdecay=0.0005,
+                                                flat_parameters=flat),
+    'rmsprop': lambda flat: RMSProp(flat_parameters=flat),
+    'adam': lambda flat: Adam(flat_parameters=flat),
+}
+
+
+def build(num_layers, width, batch_size, optimizer):
+    F = ng.make_axis(length=width, name='F')
+    N = ng.make_axis(length=batch_size, name='N')
+    x = ng.placeholder([F, N])
+    layers = [Affine(nout=width, weight_init=GaussianInit(var=0.01), bias_init=GaussianInit(),
+                     activation=Rectlin()) for _ in range(num_layers)]
+    cost = ng.sum(ng.square(Sequential(layers)(x)), out_axes=())
+    if optimizer is None:
+        # the gradients are written somewhere, so they are computed
+        grads = [ng.assign(ng.persistent_tensor(axes=variable.axes), ng.deriv(cost, variable))
+                 for variable in cost.variables()]
+        return x, ng.computation([cost, ng.sequential([ng.doall(grads), 0])], x)
+    return x, ng.computation([cost, optimizer(cost)], x)
+
+
+def step_time(computation_op, x, num_iterations, n_skip):
+    x_value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    with closing(ngt.make_transformer()) as transformer:
+        computation = transformer.add_computation(computation_op)
+        for _ in range(n_skip):
+            computation(x_value)
+        times = []
+        for _ in range(n_skip, num_iterations):
+            start = time.time()
+            computation(x_value)
+            times.append(time.time() - start)
+        exops = len(list(computation.computation_decl.exop_block))
+    return exops, np.median(times)
+
+
+if __name__ == "__main__":
+    parser = NgraphArgparser(description=__doc__)
+    parser.add_argument('--layers', type=int, default=100, help="number of layers")
+    parser.add_argument('--width', type=int, default=32, help="width of the layers")
+    parser.add_argument('--optimizer', default='sgd', choices=sorted(optimizers.keys()))
+    parser.add_argument('-s', '--skip_iter', type=int, default=2,
+                        help="number of iterations to skip")
+    parser.set_defaults(batch_size=16, num_iterations=20)
+    args = parser.parse_args()
+
+    print('{:>10} {:>10} {:>10}'.format('update', 'exops', 'step ms'))
+    for update in (None, False, True):
+        optimizer = None if update is None else optimizers[args.optimizer](update)
+        x, computation_op = build(args.layers, args.width, args.batch_size, optimizer)
+        exops, train_time = step_time(computation_op, x, args.num_iterations, args.skip_iter)
+        print('{:>10} {:>10} {:>10.2f}'.format(
+            {None: 'none', False: 'variable', True: 'flat'}[update], exops, 1000 * train_time))
@@ -0,0 +1,77 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Peak temporary memory and time per batch on the CPU transformer for an MLP trained on
+a batch, in one call or accumulating the gradients of micro-batches over several calls.
+
+Run it using
+
+python examples/benchmarks/gradient_accumulation.py -z 4096 --micro_batches 1 4 16
+"""
+from __future__ import division
+from __future__ import print_function
+from contextlib import closing
+import time
+
+import numpy as np
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import Affine, GaussianInit, GradientDescentMomentum, \
+    NgraphArgparser, Rectlin, Sequential
+
+
+def build(num_layers, width, batch_size, micro_batches):
+    F = ng.make_axis(length=width, name='F')
+    N = ng.make_axis(length=batch_size // micro_batches, name='N')
+    x = ng.placeholder([F, N])
+    layers = [Affine(nout=width, weight_init=GaussianInit(var=0.01), bias_init=GaussianInit(),
+                     activation=Rectlin()) for _ in range(num_layers)]
+    cost = ng.sum(ng.square(Sequential(layers)(x)), out_axes=())
+    optimizer = GradientDescentMomentum(0.01, 0.9, accumulation_steps=micro_batches)
+    return x, ng.computation([cost, optimizer(cost)], x)
+
+
+def run(computation_op, x, num_iterations, micro_batches):
+    """
+    Returns the peak temporary memory and the time per batch.
+    """
+    x_value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    with closing(ngt.make_transformer()) as transformer:
+        computation = transformer.add_computation(computation_op)
+        for _ in range(micro_batches):
+            computation(x_value)
+        start = time.time()
+        for _ in range(num_iterations * micro_batches):
+            computation(x_value)
+        batch_time = (time.time() - start) / num_iterations
+        footprint = transformer.temporary_arena_size
+    return footprint, batch_time
+
+
+if __name__ == "__main__":
+    parser = NgraphArgparser(description=__doc__)
+    parser.add_argument('--layers', type=int, default=8, help="number of layers")
+    parser.add_argument('--width', type=int, default=256, help="width of the layers")
+    parser.add_argument('--micro_batches', type=int, nargs='+', default=[1, 4, 16],
+                        help="numbers of micro-batches per batch")
+    parser.set_defaults(batch_size=4096, num_iterations=5)
+    args = parser.parse_args()
+
+    print('{:>14} {:>14} {:>14}'.format('micro-batches', 'peak MiB', 'batch ms'))
+    for micro_batches in args.micro_batches:
+        x, computation_op = build(args.layers, args.width, args.batch_size, micro_batches)
+        footprint, batch_time = run(computation_op, x, args.num_iterations, micro_batches)
+        print('{:>14} {:>14.2f} {:>14.2f}'.format(
+            micro_batches, footprint / float(1 << 20), 1000 * batch_time))
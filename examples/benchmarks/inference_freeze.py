@@ -0,0 +1,108 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Inference step time of the convnet-benchmarks VGG-A model with batch norm after every
+layer, on the CPU transformer as trained and with the variables frozen.
+
+Run it using
+
+python examples/benchmarks/inference_freeze.py -z 16 -t 10 --image_size 64
+"""
+from __future__ import division
+from __future__ import print_function
+from contextlib import closing
+import time
+
+import numpy as np
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import Affine, Convolution, GaussianInit, Layer, NgraphArgparser, \
+    Pool2D, Rectlin, Sequential, Softmax, ax
+
+
+def vgg_a(image_size):
+    layers = []
+    for nfm, n_convs in [(64, 1), (128, 1), (256, 2), (512, 2), (512, 2)]:
+        for _ in range(n_convs):
+            layers.append(Convolution((3, 3, nfm), filter_init=GaussianInit(var=0.01),
+                                      activation=Rectlin(), padding=1, batch_norm=True))
+        layers.append(Pool2D(2, strides=2))
+    nout = 4096 if image_size >= 224 else 512
+    for _ in range(2):
+        layers.append(Affine(nout=nout, weight_init=GaussianInit(var=0.01),
+                             activation=Rectlin(), batch_norm=True))
+    layers.append(Affine(axes=ax.Y, weight_init=GaussianInit(var=0.01), activation=Softmax()))
+    return Sequential(layers)
+
+
+def trained_values(ops):
+    """
+    Stands in for trained values, with batch norm statistics away from 0 and 1.
+    """
+    values = dict()
+    for op in ng.Op.ordered_ops(ops):
+        tensor = op.tensor
+        if tensor.is_persistent and not tensor.is_constant and not tensor.is_placeholder \
+                and tensor not in values:
+            value = np.random.uniform(0.5, 1.5, tensor.axes.lengths)
+            if tensor.is_trainable:
+                value *= np.random.choice([-0.01, 0.01], tensor.axes.lengths)
+            values[tensor] = value.astype(np.float32)
+    return values
+
+
+def run(factory, output, image, image_value, num_iterations, n_skip):
+    with closing(factory()) as transformer:
+        computation = transformer.computation(output, image)
+        for _ in range(n_skip):
+            computation(image_value)
+        start = time.time()
+        for _ in range(n_skip, num_iterations):
+            result = computation(image_value)
+        step_time = (time.time() - start) / (num_iterations - n_skip)
+    return result, step_time
+
+
+if __name__ == "__main__":
+    parser = NgraphArgparser(description=__doc__)
+    parser.add_argument('--image_size', type=int, default=64, help="height and width of images")
+    parser.add_argument('-s', '--skip_iter', type=int, default=1,
+                        help="number of iterations to skip")
+    parser.set_defaults(batch_size=16, num_iterations=10)
+    args = parser.parse_args()
+
+    ax.Y.length = 1000
+    image = ng.placeholder([ng.make_axis(3, name='C'), ng.make_axis(1, name='D'),
+                            ng.make_axis(args.image_size, name='H'),
+                            ng.make_axis(args.image_size, name='W'),
+                            ng.make_axis(args.batch_size, name='N')])
+    with Layer.inference_mode_on():
+        output = vgg_a(args.image_size)(image)
+
+    values = trained_values([output])
+    for tensor, value in values.items():
+        tensor.initial_value = value
+    image_value = np.random.uniform(-1, 1, image.axes.lengths).astype(np.float32)
+
+    expected, trained_time = run(ngt.make_transformer_factory('cpu'), output, image,
+                                 image_value, args.num_iterations, args.skip_iter)
+    result, frozen_time = run(ngt.make_transformer_factory('cpu', frozen_values=values),
+                              output, image, image_value, args.num_iterations, args.skip_iter)
+
+    print('{:>10} {:>10}'.format('graph', 'step ms'))
+    print('{:>10} {:>10.1f}'.format('trained', 1000 * trained_time))
+    print('{:>10} {:>10.1f}'.format('frozen', 1000 * frozen_time))
+    print('max abs difference {:.3g}, max abs output {:.3g}'.format(
+        np.abs(result - expected).max(), np.abs(expected).max()))
@@ -0,0 +1,99 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Step time of the numpy convolution and pooling kernels of the CPU transformer, used where
+there is no MKL-DNN kernel, split over several threads. The model is the convolution and
+pooling layers of the convnet-benchmarks AlexNet, on smaller images by default, and the
+step computes the gradients of all the weights. Results are checked to match one thread.
+
+Run it using
+
+python examples/benchmarks/kernel_threads.py --threads 1 2 4 --image_size 64
+"""
+from __future__ import division
+from __future__ import print_function
+from contextlib import closing
+import multiprocessing
+import time
+
+import numpy as np
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import Convolution, GaussianInit, NgraphArgparser, Pool2D, \
+    Rectlin, Sequential, UniformInit
+
+
+def alexnet_features(image_size, batch_size):
+    x = ng.placeholder([ng.make_axis(length=3, name='C'), ng.make_axis(length=1, name='D'),
+                        ng.make_axis(length=image_size, name='H'),
+                        ng.make_axis(length=image_size, name='W'),
+                        ng.make_axis(length=batch_size, name='N')])
+    init = UniformInit(low=-0.08, high=0.08)
+    layers = Sequential([Convolution((11, 11, 64), filter_init=GaussianInit(var=0.01),
+                                     bias_init=init, activation=Rectlin(), padding=3,
+                                     strides=4),
+                         Pool2D(3, strides=2),
+                         Convolution((5, 5, 192), filter_init=GaussianInit(var=0.01),
+                                     bias_init=init, activation=Rectlin(), padding=2),
+                         Pool2D(3, strides=2),
+                         Convolution((3, 3, 384), filter_init=GaussianInit(var=0.03),
+                                     bias_init=init, activation=Rectlin(), padding=1),
+                         Convolution((3, 3, 256), filter_init=GaussianInit(var=0.03),
+                                     bias_init=init, activation=Rectlin(), padding=1),
+                         Convolution((3, 3, 256), filter_init=GaussianInit(var=0.03),
+                                     bias_init=init, activation=Rectlin(), padding=1),
+                         Pool2D(3, strides=2)])
+    output = layers(x)
+    loss = ng.sum(output * output, out_axes=())
+    variables = sorted(loss.variables(), key=lambda variable: variable.name)
+    return x, [loss] + [ng.deriv(loss, variable) for variable in variables]
+
+
+def run(x, outputs, num_iterations, kernel_threads):
+    """
+    Returns the results and the time per step.
+    """
+    x_value = np.random.RandomState(0).uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    factory = ngt.make_transformer_factory('cpu', kernel_threads=kernel_threads)
+    with closing(factory()) as transformer:
+        computation = transformer.computation(outputs, x)
+        results = [np.copy(value) for value in computation(x_value)]
+        start = time.time()
+        for _ in range(num_iterations):
+            computation(x_value)
+        return results, (time.time() - start) / num_iterations
+
+
+if __name__ == "__main__":
+    parser = NgraphArgparser(description=__doc__)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4],
+                        help="numbers of kernel threads")
+    parser.add_argument('--image_size', type=int, default=64,
+                        help="height and width of the images, 224 in AlexNet")
+    parser.set_defaults(batch_size=32, num_iterations=3)
+    args = parser.parse_args()
+
+    x, outputs = alexnet_features(args.image_size, args.batch_size)
+    print('{} cores'.format(multiprocessing.cpu_count()))
+    print('{:>8} {:>12} {:>10}'.format('threads', 'step ms', 'speedup'))
+    expected, base_time = None, None
+    for threads in args.threads:
+        results, step_time = run(x, outputs, args.num_iterations, threads)
+        expected = expected or results
+        base_time = base_time or step_time
+        for result, value in zip(results, expected):
+            np.testing.assert_allclose(result, value, rtol=1e-5, atol=1e-6)
+        print('{:>8} {:>12.2f} {:>10.2f}'.format(threads, 1000 * step_time,
+                                                 base_time / step_time))
@@ -0,0 +1,97 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+MKL-DNN reorders and step time of mini_resnet on the CPU transformer, with and
+without MKL-DNN layouts passed through elementwise ops such as the residual adds.
+Needs the MKL-DNN engine.
+
+Run it using
+
+python examples/benchmarks/mkl_layouts.py -z 64 -t 20 --bprop
+"""
+from __future__ import division
+from __future__ import print_function
+from contextlib import closing
+import time
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import GradientDescentMomentum, NgraphArgparser, ax
+from ngraph.transformers.passes.mkldnnpasses import MklAddLayoutConversions, \
+    MklCreateOpDescriptors
+from mini_resnet import get_fake_data, get_mini_resnet
+
+
+def build(data_set, batch_size, num_iterations, bprop, batch_norm):
+    inputs, data, train_set = get_fake_data(data_set, batch_size, num_iterations)
+    model_out = get_mini_resnet(inputs, data_set, None, batch_norm=batch_norm)
+    if bprop:
+        optimizer = GradientDescentMomentum(0.01, 0.9)
+        train_loss = ng.cross_entropy_multi(model_out, ng.one_hot(inputs['label'], axis=ax.Y))
+        computation_op = ng.computation(
+            ng.sequential([optimizer(train_loss), ng.mean(train_loss, out_axes=())]), "all")
+    else:
+        computation_op = ng.computation(model_out, "all")
+    batch = next(iter(train_set))
+    return computation_op, {inputs[k]: batch[k] for k in inputs.keys()}
+
+
+def run(computation_op, feed_dict, num_iterations, n_skip, propagate_layouts):
+    """
+    Returns the number of reorders, the bytes they convert and the step time.
+    """
+    with closing(ngt.make_transformer_factory('cpu')()) as transformer:
+        if not transformer.mkldnn.enabled:
+            raise SystemExit("The MKL-DNN engine is not available")
+        for graph_pass in transformer.graph_passes:
+            if isinstance(graph_pass, MklCreateOpDescriptors):
+                graph_pass.propagate_layouts = propagate_layouts
+            elif isinstance(graph_pass, MklAddLayoutConversions):
+                conversions = graph_pass
+
+        computation = transformer.add_computation(computation_op)
+        for _ in range(n_skip):
+            computation(feed_dict=feed_dict)
+        start = time.time()
+        for _ in range(n_skip, num_iterations):
+            computation(feed_dict=feed_dict)
+        step_time = (time.time() - start) / (num_iterations - n_skip)
+
+        reorders = list(conversions.reorder_ops.values())
+        reorder_bytes = sum(op.tensor_description().tensor_size for op in reorders)
+    return len(reorders), reorder_bytes, step_time
+
+
+if __name__ == "__main__":
+    parser = NgraphArgparser(description=__doc__)
+    parser.add_argument('-data', '--data_set', default='cifar10',
+                        choices=['cifar10', 'i1k'], help="data set name")
+    parser.add_argument('-s', '--skip_iter', type=int, default=2,
+                        help="number of iterations to skip")
+    parser.add_argument('--bprop', action="store_true", help="enable back propagation")
+    parser.add_argument('--use_batch_norm', action='store_true',
+                        help='whether to use batch normalization')
+    args = parser.parse_args()
+
+    print('{:>12} {:>10} {:>14} {:>14}'.format('layouts', 'reorders', 'reorder MiB', 'step ms'))
+    for propagate_layouts in (False, True):
+        # each transformer gets a graph of its own
+        computation_op, feed_dict = build(args.data_set, args.batch_size, args.num_iterations,
+                                          args.bprop, args.use_batch_norm)
+        count, reorder_bytes, step_time = run(computation_op, feed_dict, args.num_iterations,
+                                              args.skip_iter, propagate_layouts)
+        print('{:>12} {:>10} {:>14.2f} {:>14.2f}'.format(
+            'propagated' if propagate_layouts else 'peephole', count,
+            reorder_bytes / float(1 << 20), 1000 * step_time))
@@ -0,0 +1,89 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Rate at which ops are created while building graphs, for chains of elementwise ops,
+chains of ops that broadcast, ops built inside ng.metadata, and an unrolled LSTM.
+
+Run it using
+
+python examples/benchmarks/op_creation.py --ops 100000
+"""
+from __future__ import division
+from __future__ import print_function
+import argparse
+import time
+
+import ngraph as ng
+from ngraph.frontends import neon
+
+
+def elementwise_chain(count):
+    F = ng.make_axis(length=32, name='F')
+    N = ng.make_axis(length=8, name='N')
+    x = ng.placeholder([F, N])
+    y = x
+    for _ in range(count):
+        y = y * x + x
+    return y
+
+
+def broadcast_chain(count):
+    F = ng.make_axis(length=32, name='F')
+    N = ng.make_axis(length=8, name='N')
+    x = ng.placeholder([F, N])
+    b = ng.placeholder([F])
+    y = x
+    for _ in range(count):
+        y = y + b
+    return y
+
+
+def metadata_chain(count):
+    with ng.metadata(device='cpu'):
+        return elementwise_chain(count)
+
+
+def unrolled_lstm(count):
+    # each time step of the forward and backward graph adds about 250 ops
+    steps = max(1, count // 250)
+    F = ng.make_axis(length=32, name='F')
+    REC = ng.make_axis(length=steps, name='REC')
+    N = ng.make_axis(length=8, name='N')
+    x = ng.placeholder([F, REC, N])
+    lstm = neon.LSTM(64, neon.GlorotInit(), activation=neon.Tanh(),
+                     gate_activation=neon.Logistic(), return_sequence=False)
+    cost = ng.sum(lstm(x), out_axes=())
+    return neon.GradientDescentMomentum(0.01)(cost)
+
+
+def benchmark(name, build, count):
+    with ng.Op.all_ops(isolate=True) as ops:
+        start = time.time()
+        build(count)
+        elapsed = time.time() - start
+    print('{:>16} {:>10} {:>12.0f}'.format(name, len(ops), len(ops) / elapsed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ops', type=int, default=100000,
+                        help="about how many ops to build for each graph")
+    args = parser.parse_args()
+
+    print('{:>16} {:>10} {:>12}'.format('graph', 'ops', 'ops/s'))
+    benchmark('elementwise', elementwise_chain, args.ops // 2)
+    benchmark('broadcast', broadcast_chain, args.ops // 3)
+    benchmark('metadata', metadata_chain, args.ops // 2)
+    benchmark('unrolled lstm', unrolled_lstm, args.ops)
@@ -0,0 +1,121 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Step time and temporary memory on the CPU transformer running independent exops on several
+threads, for the gradients of a stack of GoogLeNet inception modules and of a
+bidirectional RNN. The branches of the inception modules are summed instead of
+concatenated, which keeps their axes the same. Results are checked to match one thread.
+
+Run it using
+
+python examples/benchmarks/parallel_exops.py --threads 1 2 4
+"""
+from __future__ import division
+from __future__ import print_function
+from contextlib import closing
+import time
+
+import numpy as np
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import BiRNN, ConstantInit, Convolution, GaussianInit, \
+    NgraphArgparser, Pool2D, Rectlin, Tanh, XavierInit
+
+
+def inception(num_modules, channels, size, batch_size):
+    x = ng.placeholder([ng.make_axis(length=channels, name='C'),
+                        ng.make_axis(length=1, name='D'),
+                        ng.make_axis(length=size, name='H'),
+                        ng.make_axis(length=size, name='W'),
+                        ng.make_axis(length=batch_size, name='N')])
+
+    def conv(filter_size, nout, output):
+        return Convolution((filter_size, filter_size, nout), XavierInit(),
+                           bias_init=ConstantInit(0.1), padding=filter_size // 2,
+                           activation=Rectlin())(output)
+
+    output = x
+    for _ in range(num_modules):
+        pooled = Pool2D(3, strides=1, padding=1)(output)
+        output = conv(1, channels, output) + \
+            conv(3, channels, conv(1, channels // 2, output)) + \
+            conv(5, channels, conv(1, channels // 4, output)) + \
+            conv(1, channels, pooled)
+    return x, output
+
+
+def birnn(hidden, features, steps, batch_size):
+    x = ng.placeholder([ng.make_axis(length=features, name='F'),
+                        ng.make_axis(length=steps, name='REC'),
+                        ng.make_axis(length=batch_size, name='N')])
+    output = BiRNN(hidden, init=GaussianInit(var=0.01), activation=Tanh(),
+                   return_sequence=True, sum_out=True)(x)
+    return x, output
+
+
+def gradients(output):
+    loss = ng.sum(output * output, out_axes=())
+    variables = sorted(loss.variables(), key=lambda variable: variable.name)
+    return [loss] + [ng.deriv(loss, variable) for variable in variables]
+
+
+def run(x, outputs, num_iterations, exop_threads):
+    """
+    Returns the results, the time per step, the temporary memory and the number of streams.
+    """
+    x_value = np.random.RandomState(0).uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    factory = ngt.make_transformer_factory('cpu', exop_threads=exop_threads)
+    with closing(factory()) as transformer:
+        computation = transformer.add_computation(ng.computation(outputs, x))
+        results = [np.copy(value) for value in computation(x_value)]
+        start = time.time()
+        for _ in range(num_iterations):
+            computation(x_value)
+        step_time = (time.time() - start) / num_iterations
+        schedule = transformer.device_computations[computation.computation_op]\
+            .computation_decl.stream_schedule
+        num_streams = 1 if schedule is None else len(schedule.streams)
+        return results, step_time, transformer.temporary_arena_size, num_streams
+
+
+if __name__ == "__main__":
+    parser = NgraphArgparser(description=__doc__)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4],
+                        help="numbers of threads to run exops on")
+    parser.add_argument('--modules', type=int, default=3, help="number of inception modules")
+    parser.add_argument('--channels', type=int, default=32,
+                        help="channels of the inception modules")
+    parser.add_argument('--size', type=int, default=28, help="height and width of the images")
+    parser.add_argument('--hidden', type=int, default=512, help="hidden units of the BiRNN")
+    parser.add_argument('--steps', type=int, default=32, help="time steps of the BiRNN")
+    parser.set_defaults(batch_size=32, num_iterations=5)
+    args = parser.parse_args()
+
+    models = [('inception', inception(args.modules, args.channels, args.size,
+                                      args.batch_size)),
+              ('birnn', birnn(args.hidden, args.hidden, args.steps, args.batch_size))]
+    print('{:>10} {:>8} {:>8} {:>12} {:>12}'.format(
+        'model', 'threads', 'streams', 'temp MiB', 'step ms'))
+    for name, (x, output) in models:
+        outputs = gradients(output)
+        expected = None
+        for threads in args.threads:
+            results, step_time, footprint, num_streams = run(x, outputs,
+                                                             args.num_iterations, threads)
+            expected = expected or results
+            for result, value in zip(results, expected):
+                np.testing.assert_array_equal(result, value)
+            print('{:>10} {:>8} {:>8} {:>12.2f} {:>12.2f}'.format(
+                name, threads, num_streams, footprint / float(1 << 20), 1000 * step_time))
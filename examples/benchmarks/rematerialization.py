@@ -0,0 +1,94 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Peak temporary memory, step time and recomputed flops on the CPU transformer for a
+training step of a deep MLP, keeping all activations, recomputing them from checkpoints
+every few layers, and recomputing them under memory budgets given as fractions of the
+peak.
+
+Run it using
+
+python examples/benchmarks/rematerialization.py --layers 32 --budgets 0.75 0.5 0
+"""
+from __future__ import division
+from __future__ import print_function
+from contextlib import closing
+import time
+
+import numpy as np
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import Affine, GaussianInit, GradientDescentMomentum, \
+    NgraphArgparser, Rectlin
+from ngraph.transformers.passes.rematerialization import Rematerialization
+
+
+def build(num_layers, width, batch_size, checkpoint_every):
+    F = ng.make_axis(length=width, name='F')
+    N = ng.make_axis(length=batch_size, name='N')
+    x = ng.placeholder([F, N])
+    h = x
+    for layer in range(num_layers):
+        h = Affine(nout=width, weight_init=GaussianInit(var=0.01), bias_init=GaussianInit(),
+                   activation=Rectlin())(h)
+        if checkpoint_every and layer % checkpoint_every == checkpoint_every - 1:
+            h = ng.checkpoint(h)
+    cost = ng.sum(ng.square(h), out_axes=())
+    return x, ng.computation([cost, GradientDescentMomentum(0.01, 0.9)(cost)], x)
+
+
+def run(computation_op, x, num_iterations, memory_budget=None):
+    """
+    Returns the peak temporary memory, the time per step and the Rematerialization pass.
+    """
+    x_value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    factory = ngt.make_transformer_factory('cpu', memory_budget=memory_budget)
+    with closing(factory()) as transformer:
+        remat, = [graph_pass for graph_pass in transformer.graph_passes
+                  if isinstance(graph_pass, Rematerialization)]
+        computation = transformer.add_computation(computation_op)
+        computation(x_value)
+        start = time.time()
+        for _ in range(num_iterations):
+            computation(x_value)
+        step_time = (time.time() - start) / num_iterations
+        footprint = transformer.temporary_arena_size
+    return footprint, step_time, remat
+
+
+if __name__ == "__main__":
+    parser = NgraphArgparser(description=__doc__)
+    parser.add_argument('--layers', type=int, default=32, help="number of layers")
+    parser.add_argument('--width', type=int, default=256, help="width of the layers")
+    parser.add_argument('--checkpoint_every', type=int, default=6,
+                        help="number of layers between checkpoints")
+    parser.add_argument('--budgets', type=float, nargs='+', default=[0.75, 0.5, 0],
+                        help="memory budgets, as fractions of the peak")
+    parser.set_defaults(batch_size=512, num_iterations=5)
+    args = parser.parse_args()
+
+    print('{:>12} {:>12} {:>12} {:>12}'.format('budget', 'peak MiB', 'step ms', 'flops +%'))
+    settings = [('none', None, None), ('checkpoints', args.checkpoint_every, None)]
+    settings += [(str(budget), None, budget) for budget in args.budgets]
+    peak = None
+    for name, checkpoint_every, budget in settings:
+        x, computation_op = build(args.layers, args.width, args.batch_size, checkpoint_every)
+        memory_budget = None if budget is None else int(budget * peak)
+        footprint, step_time, remat = run(computation_op, x, args.num_iterations,
+                                          memory_budget)
+        peak = peak or footprint
+        print('{:>12} {:>12.2f} {:>12.2f} {:>12.1f}'.format(
+            name, footprint / float(1 << 20), 1000 * step_time,
+            100.0 * remat.recompute_flops / max(remat.flops, 1)))
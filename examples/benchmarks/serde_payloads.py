@@ -0,0 +1,116 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Time and peak resident memory to save and load a graph of large constants, as a serialized
+protobuf graph with the tensors embedded, and as a graph archive with the tensors as
+memory-mapped payloads. Reading touches all the loaded constants once. Each step runs in
+its own process. Protobuf messages are limited to 2 GiB, and the constants are embedded twice,
+as the constant and the initial value, so protobuf graphs cannot hold 1 GiB of constants.
+
+Run it using
+
+python examples/benchmarks/serde_payloads.py --mib 512
+python examples/benchmarks/serde_payloads.py --mib 1024 --formats archive
+"""
+from __future__ import division
+from __future__ import print_function
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import ngraph as ng
+from ngraph.op_graph.op_graph import Op
+from ngraph.op_graph.serde.serde import serialize_graph, deserialize_graph, \
+    serialize_graph_to_file, deserialize_graph_from_file
+
+
+def peak_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+
+def build(total_mib, num_constants):
+    C = ng.make_axis(length=(total_mib << 20) // (4 * num_constants), name='C')
+    return [ng.constant(np.full(C.length, i + 1, dtype=np.float32), [C])
+            for i in range(num_constants)]
+
+
+def save(archive, fname, total_mib, num_constants):
+    constants = build(total_mib, num_constants)
+    start = time.time()
+    if archive:
+        serialize_graph_to_file(constants, fname)
+    else:
+        with open(fname, 'wb') as f:
+            f.write(serialize_graph(constants))
+    print('{:.2f} {:.1f}'.format(time.time() - start, peak_mib()))
+
+
+def load(archive, fname):
+    start = time.time()
+    if archive:
+        ops = deserialize_graph_from_file(fname)
+    else:
+        with open(fname, 'rb') as f:
+            ops = deserialize_graph(f.read())
+    load_time, load_peak = time.time() - start, peak_mib()
+    start = time.time()
+    total = sum(float(op.const.sum()) for op in Op.all_op_references(ops) if op.is_constant)
+    assert total > 0
+    read_time = time.time() - start
+    print('{:.2f} {:.1f} {:.2f} {:.1f}'.format(load_time, load_peak, read_time, peak_mib()))
+
+
+def run_step(*args):
+    output = subprocess.check_output([sys.executable, __file__, '--step'] +
+                                     [str(arg) for arg in args])
+    return [float(value) for value in output.split()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mib', type=int, default=1024, help="total size of the constants")
+    parser.add_argument('--constants', type=int, default=16, help="number of constants")
+    parser.add_argument('--formats', nargs='+', choices=['protobuf', 'archive'],
+                        default=['protobuf', 'archive'], help="formats to save and load")
+    parser.add_argument('--step', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.step:
+        step, archive, fname = args.step[0], args.step[1] == 'True', args.step[2]
+        if step == 'save':
+            save(archive, fname, int(args.step[3]), int(args.step[4]))
+        else:
+            load(archive, fname)
+        sys.exit()
+
+    print('{:>10} {:>10} {:>14} {:>10} {:>14} {:>10} {:>14}'.format(
+        'format', 'save s', 'save peak MiB', 'load s', 'load peak MiB', 'read s',
+        'read peak MiB'))
+    for archive in (fmt == 'archive' for fmt in args.formats):
+        fd, fname = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            save_time, save_peak = run_step('save', archive, fname, args.mib, args.constants)
+            load_time, load_peak, read_time, read_peak = run_step('load', archive, fname)
+        finally:
+            os.unlink(fname)
+        print('{:>10} {:>10.2f} {:>14.1f} {:>10.2f} {:>14.1f} {:>10.2f} {:>14.1f}'.format(
+            'archive' if archive else 'protobuf', save_time, save_peak, load_time, load_peak,
+            read_time, read_peak))
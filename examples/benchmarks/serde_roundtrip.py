@@ -0,0 +1,56 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Time to serialize a graph to protobuf and to deserialize it back, for a chain of
+elementwise ops and for the training graph of an unrolled LSTM.
+
+Run it using
+
+python examples/benchmarks/serde_roundtrip.py --ops 20000
+"""
+from __future__ import division
+from __future__ import print_function
+import argparse
+import time
+
+import ngraph as ng
+from ngraph.op_graph.serde.serde import serialize_graph, deserialize_graph
+
+from op_creation import elementwise_chain, unrolled_lstm
+
+
+def benchmark(name, build, count):
+    with ng.Op.all_ops(isolate=True) as ops:
+        build(count)
+    start = time.time()
+    graph = serialize_graph(ops)
+    serialize_time = time.time() - start
+    start = time.time()
+    deserialize_graph(graph)
+    deserialize_time = time.time() - start
+    print('{:>16} {:>10} {:>10.2f} {:>14.2f} {:>16.2f}'.format(
+        name, len(ops), len(graph) / float(1 << 20), serialize_time, deserialize_time))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ops', type=int, default=20000,
+                        help="about how many ops to build for each graph")
+    args = parser.parse_args()
+
+    print('{:>16} {:>10} {:>10} {:>14} {:>16}'.format(
+        'graph', 'ops', 'MiB', 'serialize s', 'deserialize s'))
+    benchmark('elementwise', elementwise_chain, args.ops // 2)
+    benchmark('unrolled lstm', unrolled_lstm, args.ops)
@@ -0,0 +1,118 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+"""
+Throughput and latency of serving single MNIST images with the LeNet model, with each
+request run on its own and with requests batched by RequestBatcher.
+
+Run it using
+
+python examples/benchmarks/serving_lenet.py -z 32 --concurrency 1 4 16 64
+"""
+from __future__ import division
+from __future__ import print_function
+from contextlib import closing
+import threading
+
+import numpy as np
+from monotonic import monotonic
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import Affine, Preprocess, Convolution, Pool2D, Sequential
+from ngraph.frontends.neon import XavierInit, Rectlin, Softmax
+from ngraph.frontends.neon import Layer, NgraphArgparser
+
+
+def lenet_inference(batch_size):
+    image = ng.placeholder([ng.make_axis(length=1, name='C'),
+                            ng.make_axis(length=1, name='D'),
+                            ng.make_axis(length=28, name='H'),
+                            ng.make_axis(length=28, name='W'),
+                            ng.make_axis(length=batch_size, name='N')])
+    Y = ng.make_axis(length=10, name='Y')
+
+    init_xav = XavierInit()
+    model = Sequential([Preprocess(functor=lambda x: x / 255.),
+                        Convolution((5, 5, 16), filter_init=init_xav, activation=Rectlin()),
+                        Pool2D(2, strides=2),
+                        Convolution((5, 5, 32), filter_init=init_xav, activation=Rectlin()),
+                        Pool2D(2, strides=2),
+                        Affine(nout=500, weight_init=init_xav, activation=Rectlin()),
+                        Affine(axes=Y, weight_init=init_xav, activation=Softmax())])
+    with Layer.inference_mode_on():
+        prob = model(image)
+    return ng.computation(prob, image)
+
+
+def serve(predict, images, concurrency, duration):
+    """
+    Send requests from concurrency threads for duration seconds.
+
+    Returns:
+        (requests per second, latencies in seconds)
+    """
+    latencies = [[] for _ in range(concurrency)]
+    stop = monotonic() + duration
+
+    def client(index):
+        image = images[index % len(images)]
+        while monotonic() < stop:
+            start = monotonic()
+            predict(image)
+            latencies[index].append(monotonic() - start)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    start = monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = monotonic() - start
+    latencies = np.concatenate([np.array(thread_latencies) for thread_latencies in latencies])
+    return len(latencies) / elapsed, latencies
+
+
+def run_serving_benchmark(batch_size, concurrency_levels, duration, max_latency):
+    images = np.random.uniform(0, 255, (16, 1, 1, 28, 28)).astype(np.float32)
+    with closing(ngt.make_transformer()) as transformer:
+        computation = transformer.add_computation(lenet_inference(batch_size))
+        lock = threading.Lock()
+
+        def unbatched(image):
+            with lock:
+                return np.copy(computation(image[..., np.newaxis]))
+
+        batcher = ngt.RequestBatcher(computation, max_latency=max_latency)
+        print('{:>12} {:>12} {:>10} {:>10} {:>10}'.format(
+            'mode', 'concurrency', 'req/s', 'p50 ms', 'p99 ms'))
+        for concurrency in concurrency_levels:
+            for mode, predict in (('unbatched', unbatched), ('batched', batcher)):
+                rate, latencies = serve(predict, images, concurrency, duration)
+                print('{:>12} {:>12} {:>10.1f} {:>10.2f} {:>10.2f}'.format(
+                    mode, concurrency, rate,
+                    np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000))
+        batcher.close()
+
+
+if __name__ == "__main__":
+    parser = NgraphArgparser(description='Serve LeNet requests with and without batching')
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 4, 16, 64],
+                        help="numbers of concurrent clients")
+    parser.add_argument('--duration', type=float, default=5,
+                        help="seconds to send requests at each concurrency")
+    parser.add_argument('--max_latency', type=float, default=0.002,
+                        help="seconds a request waits for others to batch with")
+    args = parser.parse_args()
+    run_serving_benchmark(args.batch_size, args.concurrency, args.duration, args.max_latency)
@@ -1,6 +1,4 @@
 from __future__ import division
-import random
-from collections import deque
 
 import ngraph as ng
 import numpy as np
@@ -58,11 +56,9 @@ class ModelWrapper(object):
         self.axes.state = make_axes(state_axes, name='state')
         self.axes.action = ng.make_axis(name='action', length=action_size)
         self.axes.n = ng.make_axis(name='N', length=batch_size)
-        self.axes.n1 = ng.make_axis(name='N', length=1)
 
         # placeholders
         self.state = ng.placeholder(self.axes.state + [self.axes.n])
-        self.state_single = ng.placeholder(self.axes.state + [self.axes.n1])
         self.target = ng.placeholder([self.axes.action, self.axes.n])
 
         # these q functions have the same structure but different variables
@@ -81,13 +77,6 @@ class ModelWrapper(object):
             inference_target, self.state
         )
 
-        # construct inference computation for evaluating a single observation
-        with neon.Layer.inference_mode_on():
-            inference_single = self.q_function(self.state_single)
-        inference_computation_single = ng.computation(
-            inference_single, self.state_single
-        )
-
         # update q function target weights with values from q function
         # assumes that the variables in each are in the same order
         update_computation = ng.computation(
@@ -127,9 +116,6 @@ class ModelWrapper(object):
         self.inference_target_function = self.transformer.add_computation(
             inference_target_computation
         )
-        self.inference_function_single = self.transformer.add_computation(
-            inference_computation_single
-        )
         self.train_function = self.transformer.add_computation(
             train_computation
         )
@@ -148,17 +134,19 @@ class ModelWrapper(object):
         The output axes will be (action).
         """
         state = np.asarray(state, dtype=np.float32)
+        single_shape = self.axes.state.lengths + (1,)
 
         # add a batch axis of 1 if it doesn't already exist
-        if state.shape == self.state_single.axes.lengths[:-1]:
-            state = state.reshape(self.state_single.axes.lengths)
+        if state.shape == self.axes.state.lengths:
+            state = state.reshape(single_shape)
 
-        if state.shape != self.state_single.axes.lengths:
+        if state.shape != single_shape:
             raise ValueError((
                 'predict received state with wrong shape. found {}, expected {} '
-            ).format(state.shape, self.state_single.axes.lengths))
+            ).format(state.shape, single_shape))
 
-        return self.inference_function_single(state)
+        # the batch inference computation runs on a batch of one
+        return self.inference_function(state)
 
     def predict(self, state):
         """
@@ -370,40 +358,274 @@ class Agent(object):
         if len(self.memory) <= self.batch_size + 1:
             return
 
-        states = []
-        targets = []
-        samples = self.memory.sample(self.batch_size)
+        batch = self.memory.sample(self.batch_size)
 
         # batch axis is the last axis
-        states = np.stack([sample['state'] for sample in samples], axis=-1)
-        next_states = np.stack([sample['next_state'] for sample in samples],
-                               axis=-1)
+        states = np.moveaxis(batch['state'], 0, -1)
+        next_states = np.moveaxis(batch['next_state'], 0, -1)
 
-        targets = self.model_wrapper.predict(states)
+        targets = np.copy(self.model_wrapper.predict(states))
         next_values = self.model_wrapper.predict_target(next_states)
 
-        for i, sample in enumerate(samples):
-            target = sample['reward']
-
-            if not sample['done']:
-                target += self.gamma * np.amax(next_values[:, i])
+        target = batch['reward'] + self.gamma * np.logical_not(batch['done']) * \
+            np.amax(next_values, axis=0)
+        samples = np.arange(self.batch_size)
+        errors = target - targets[batch['action'], samples]
+        self.memory.update_priorities(batch['index'], errors)
 
-            targets[sample['action'], i] = target
+        # importance weights scale the gradient of the squared error
+        if 'weight' in batch:
+            errors *= batch['weight']
+        targets[batch['action'], samples] += errors
 
         self.model_wrapper.train(states, targets)
 
 
-class Memory(deque):
+class Memory(object):
     """
     Memory is used to keep track of what is happened in the past so that
     we can sample from it and learn.
 
+    Transitions are kept in preallocated numpy arrays used as a ring buffer,
+    and batches are gathered with fancy indexing. States are stored as
+    frames: a state equal to the previous next_state reuses its frames, and
+    with stacked_frames a next_state that shifts the stack of its state only
+    stores its newest frame.
+
+    Arguments:
+        maxlen (integer): the maximum number of memories to record.
+        stacked_frames (bool): states are stacks of frames along their first
+            axis, oldest first.
+    """
+
+    def __init__(self, maxlen, stacked_frames=False):
+        super(Memory, self).__init__()
+        self.maxlen = maxlen
+        self.stacked_frames = stacked_frames
+        self.start = 0
+        self.length = 0
+        self.frames = None
+        self.frame_count = 0
+        self.last_next_state = None
+        self.last_done = True
+
+    def __len__(self):
+        return self.length
+
+    def allocate(self, state):
+        self.state_shape = state.shape
+        if self.stacked_frames:
+            self.history_length = state.shape[0]
+            frame_shape = state.shape[1:]
+        else:
+            self.history_length = 1
+            frame_shape = state.shape
+        # enough when consecutive states share all but one frame
+        self.frame_capacity = self.maxlen + 2 * self.history_length
+        self.frames = np.empty((self.frame_capacity,) + frame_shape, dtype=state.dtype)
+        self.state_frames = np.empty((self.maxlen, self.history_length), dtype=np.int64)
+        self.next_state_frames = np.empty((self.maxlen, self.history_length), dtype=np.int64)
+        self.actions = np.empty(self.maxlen, dtype=np.int64)
+        self.rewards = np.empty(self.maxlen, dtype=np.float32)
+        self.dones = np.empty(self.maxlen, dtype=bool)
+
+    def evict_oldest(self):
+        self.start = (self.start + 1) % self.maxlen
+        self.length -= 1
+
+    def push_frames(self, frames):
+        """
+        store frames, growing the frame buffer when memories still use the
+        frames they would replace.  returns the frame numbers of the stored
+        frames.
+        """
+        numbers = np.arange(self.frame_count, self.frame_count + len(frames))
+        if self.length > 0:
+            # the oldest memory uses the oldest frame still needed
+            oldest = self.state_frames[self.start, 0]
+            needed = numbers[-1] + 1 - oldest
+            if needed > self.frame_capacity:
+                self.grow_frames(oldest, max(needed, self.frame_capacity * 3 // 2))
+        self.frames[numbers % self.frame_capacity] = frames
+        self.frame_count += len(frames)
+        return numbers
+
+    def grow_frames(self, oldest, frame_capacity):
+        numbers = np.arange(oldest, self.frame_count)
+        frames = np.empty((frame_capacity,) + self.frames.shape[1:], dtype=self.frames.dtype)
+        frames[numbers % frame_capacity] = self.frames[numbers % self.frame_capacity]
+        self.frames = frames
+        self.frame_capacity = frame_capacity
+
+    def append(self, memory):
+        """
+        record a transition, a dict with state, action, reward, next_state
+        and done.  returns the slot it is stored in.
+        """
+        state = np.asarray(memory['state'])
+        next_state = np.asarray(memory['next_state'])
+        if self.frames is None:
+            self.allocate(state)
+        state_stack = state.reshape((self.history_length,) + self.frames.shape[1:])
+        next_stack = next_state.reshape(state_stack.shape)
+
+        last_slot = (self.start + self.length - 1) % self.maxlen
+        if self.length > 0 and not self.last_done and \
+                np.array_equal(state, self.last_next_state):
+            state_frames = self.next_state_frames[last_slot].copy()
+        else:
+            state_frames = self.push_frames(state_stack)
+        if self.history_length > 1 and np.array_equal(next_stack[:-1], state_stack[1:]):
+            next_state_frames = np.concatenate(
+                [state_frames[1:], self.push_frames(next_stack[-1:])]
+            )
+        else:
+            next_state_frames = self.push_frames(next_stack)
+
+        if self.length == self.maxlen:
+            self.evict_oldest()
+        slot = (self.start + self.length) % self.maxlen
+        self.state_frames[slot] = state_frames
+        self.next_state_frames[slot] = next_state_frames
+        self.actions[slot] = memory['action']
+        self.rewards[slot] = memory['reward']
+        self.dones[slot] = memory['done']
+        self.length += 1
+
+        self.last_next_state = np.array(next_state)
+        self.last_done = memory['done']
+        return slot
+
+    def gather(self, slots):
+        """
+        return a batch of the memories in slots as a dict of arrays with the
+        batch axis first.
+        """
+        batch_shape = (len(slots),) + self.state_shape
+        return {
+            'state': self.frames[self.state_frames[slots] % self.frame_capacity]
+            .reshape(batch_shape),
+            'action': self.actions[slots],
+            'reward': self.rewards[slots],
+            'next_state': self.frames[self.next_state_frames[slots] % self.frame_capacity]
+            .reshape(batch_shape),
+            'done': self.dones[slots],
+            'index': slots,
+        }
+
+    def sample(self, batch_size):
+        """
+        sample batch_size memories uniformly, with replacement.
+        """
+        positions = np.random.randint(self.length, size=batch_size)
+        return self.gather((self.start + positions) % self.maxlen)
+
+    def update_priorities(self, indices, errors):
+        """
+        uniform sampling ignores the errors of sampled memories.
+        """
+        pass
+
+
+class SumTree(object):
+    """
+    A binary tree over an array of priorities where each node holds the sum
+    of its children, so that sampling proportionally to priority and
+    updating a priority both take O(log n).  operations are vectorized over
+    arrays of leaves.
+
+    Arguments:
+        capacity (integer): the number of leaves.
+    """
+
+    def __init__(self, capacity):
+        self.leaf_start = 1
+        while self.leaf_start < capacity:
+            self.leaf_start *= 2
+        self.nodes = np.zeros(2 * self.leaf_start, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.nodes[1]
+
+    def __getitem__(self, leaves):
+        return self.nodes[self.leaf_start + leaves]
+
+    def update(self, leaves, priorities):
+        if len(leaves) == 1:
+            node = self.leaf_start + leaves[0]
+            self.nodes[node] = priorities
+            node //= 2
+            while node > 0:
+                self.nodes[node] = self.nodes[2 * node] + self.nodes[2 * node + 1]
+                node //= 2
+            return
+        nodes = self.leaf_start + np.asarray(leaves)
+        self.nodes[nodes] = priorities
+        nodes = np.unique(nodes // 2)
+        while nodes[0] > 0:
+            self.nodes[nodes] = self.nodes[2 * nodes] + self.nodes[2 * nodes + 1]
+            nodes = np.unique(nodes // 2)
+
+    def find(self, values):
+        """
+        return the leaves where the running sum of priorities passes values.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        while nodes[0] < self.leaf_start:
+            left = self.nodes[2 * nodes]
+            right = self.nodes[2 * nodes + 1]
+            go_right = ((values >= left) & (right > 0)) | (left <= 0)
+            values -= np.where(go_right, left, 0)
+            nodes = 2 * nodes + go_right
+        return nodes - self.leaf_start
+
+
+class PrioritizedMemory(Memory):
+    """
+    Memory which samples memories in proportion to their last error, and
+    gives each sample an importance weight correcting for the bias this
+    introduces.
+
     Arguments:
         maxlen (integer): the maximum number of memories to record.
+        stacked_frames (bool): states are stacks of frames along their first
+            axis, oldest first.
+        alpha (float): how strongly errors shape sampling; 0 is uniform.
+        beta (float): how strongly importance weights correct for it.
+        epsilon (float): added to errors so that every memory can be sampled.
     """
 
-    def __init__(self, **kwargs):
-        super(Memory, self).__init__(**kwargs)
+    def __init__(self, maxlen, stacked_frames=False, alpha=0.6, beta=0.4, epsilon=1e-6):
+        super(PrioritizedMemory, self).__init__(maxlen, stacked_frames=stacked_frames)
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.tree = SumTree(maxlen)
+        self.max_priority = 1.0
+
+    def evict_oldest(self):
+        self.tree.update([self.start], 0)
+        super(PrioritizedMemory, self).evict_oldest()
+
+    def append(self, memory):
+        slot = super(PrioritizedMemory, self).append(memory)
+        # new memories are sampled at least once before their error is known
+        self.tree.update([slot], self.max_priority)
+        return slot
 
     def sample(self, batch_size):
-        return random.sample(self, batch_size)
+        total = self.tree.total
+        values = (np.arange(batch_size) + np.random.uniform(size=batch_size)) * \
+            (total / batch_size)
+        slots = self.tree.find(values)
+        batch = self.gather(slots)
+        weights = (self.length * self.tree[slots] / total) ** -self.beta
+        batch['weight'] = weights / weights.max()
+        return batch
+
+    def update_priorities(self, indices, errors):
+        priorities = (np.abs(errors) + self.epsilon) ** self.alpha
+        self.tree.update(indices, priorities)
+        self.max_priority = max(self.max_priority, priorities.max())
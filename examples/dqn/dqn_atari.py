@@ -77,7 +77,7 @@ def main():
         epsilon=dqn.linear_generator(start=1.0, end=0.1, steps=1000000),
         gamma=0.99,
         learning_rate=0.00025,
-        memory=dqn.Memory(maxlen=1000000),
+        memory=dqn.Memory(maxlen=1000000, stacked_frames=True),
         target_network_update_frequency=1000,
         learning_starts=10000,
     )
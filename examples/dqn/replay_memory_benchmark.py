@@ -0,0 +1,109 @@
+"""
+Samples per second and memory footprint of the replay memories on Atari
+sized transitions, against a deque of transitions sampled with
+random.sample.
+
+Run it using
+
+python replay_memory_benchmark.py --transitions 50000
+"""
+from __future__ import division
+from __future__ import print_function
+import argparse
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+import dqn
+
+
+class DequeMemory(deque):
+    """
+    The replay memory dqn.Memory replaced: a deque of transitions.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(DequeMemory, self).__init__(*args, **kwargs)
+
+    def sample(self, batch_size):
+        samples = random.sample(self, batch_size)
+        return {
+            'state': np.stack([sample['state'] for sample in samples]),
+            'next_state': np.stack([sample['next_state'] for sample in samples]),
+            'action': np.array([sample['action'] for sample in samples]),
+            'reward': np.array([sample['reward'] for sample in samples]),
+            'done': np.array([sample['done'] for sample in samples]),
+        }
+
+
+def transitions(count, frame_shape, history_length=4, episode_length=500):
+    """
+    Yields count transitions of episodes of stacked uint8 frames.
+    """
+    frame = np.random.randint(0, 256, frame_shape).astype(np.uint8)
+    for step in range(count):
+        if step % episode_length == 0:
+            frames = deque([frame] * history_length, maxlen=history_length)
+        state = np.stack(frames)
+        frames.append(np.roll(frame, step, axis=0))
+        yield {
+            'state': state,
+            'action': step % 4,
+            'reward': 1.0,
+            'next_state': np.stack(frames),
+            'done': (step + 1) % episode_length == 0,
+        }
+
+
+def footprint(memory):
+    """
+    Bytes held by the transitions in memory.
+    """
+    if isinstance(memory, DequeMemory):
+        return sum(transition['state'].nbytes + transition['next_state'].nbytes
+                   for transition in memory)
+    arrays = [memory.frames, memory.state_frames, memory.next_state_frames,
+              memory.actions, memory.rewards, memory.dones]
+    if isinstance(memory, dqn.PrioritizedMemory):
+        arrays.append(memory.tree.nodes)
+    return sum(array.nbytes for array in arrays)
+
+
+def benchmark(name, memory, count, frame_size, batch_size, batches):
+    start = time.time()
+    for transition in transitions(count, (frame_size, frame_size)):
+        memory.append(transition)
+    append_rate = count / (time.time() - start)
+
+    start = time.time()
+    for _ in range(batches):
+        batch = memory.sample(batch_size)
+        if 'index' in batch:
+            memory.update_priorities(batch['index'], np.random.uniform(size=batch_size))
+    sample_rate = batches * batch_size / (time.time() - start)
+    print('{:>12} {:>14.0f} {:>14.0f} {:>14.1f}'.format(
+        name, append_rate, sample_rate, footprint(memory) / count / 1024))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--transitions', type=int, default=50000,
+                        help="transitions appended to each memory")
+    parser.add_argument('--frame_size', type=int, default=84,
+                        help="height and width of the frames")
+    parser.add_argument('--batch_size', type=int, default=32)
+    parser.add_argument('--batches', type=int, default=1000)
+    args = parser.parse_args()
+
+    print('{:>12} {:>14} {:>14} {:>14}'.format(
+        'memory', 'appends/s', 'samples/s', 'KiB/transition'))
+    memories = [
+        ('deque', DequeMemory(maxlen=args.transitions)),
+        ('uniform', dqn.Memory(maxlen=args.transitions, stacked_frames=True)),
+        ('prioritized', dqn.PrioritizedMemory(maxlen=args.transitions, stacked_frames=True)),
+    ]
+    for name, memory in memories:
+        benchmark(name, memory, args.transitions, args.frame_size, args.batch_size,
+                  args.batches)
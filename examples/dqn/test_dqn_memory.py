@@ -0,0 +1,64 @@
+from ngraph.examples.dqn import dqn
+import pytest
+import numpy as np
+
+
+def episodes(count, length=6, history_length=4, frame_shape=(2, 3)):
+    """yields transitions of stacked frames, numbered by their reward"""
+    reward = 0
+    for episode in range(count):
+        frames = [np.full(frame_shape, 100 * episode + i) for i in range(history_length)]
+        for step in range(length):
+            state = np.stack(frames[-history_length:])
+            frames.append(np.full(frame_shape, 100 * episode + history_length + step))
+            yield {
+                'state': state,
+                'action': step % 2,
+                'reward': reward,
+                'next_state': np.stack(frames[-history_length:]),
+                'done': step == length - 1,
+            }
+            reward += 1
+
+
+@pytest.mark.parametrize('memory_class', [dqn.Memory, dqn.PrioritizedMemory])
+@pytest.mark.parametrize('stacked_frames', [True, False])
+def test_memory_samples_recent_transitions(memory_class, stacked_frames):
+    memory = memory_class(maxlen=10, stacked_frames=stacked_frames)
+    recent = []
+    for transition in episodes(5):
+        memory.append(transition)
+        recent = (recent + [transition])[-10:]
+        assert len(memory) == len(recent)
+
+        batch = memory.sample(8)
+        by_reward = {sample['reward']: sample for sample in recent}
+        for i, reward in enumerate(batch['reward']):
+            sample = by_reward[reward]
+            np.testing.assert_array_equal(batch['state'][i], sample['state'])
+            np.testing.assert_array_equal(batch['next_state'][i], sample['next_state'])
+            assert batch['action'][i] == sample['action']
+            assert batch['done'][i] == sample['done']
+
+
+def test_memory_stores_stacked_frames_once():
+    memory = dqn.Memory(maxlen=100, stacked_frames=True)
+    for transition in episodes(3):
+        memory.append(transition)
+
+    # the first state of each episode, then one new frame per transition
+    assert memory.frame_count == 3 * 4 + 3 * 6
+
+
+def test_prioritized_memory_samples_by_error():
+    memory = dqn.PrioritizedMemory(maxlen=10, alpha=1.0, beta=1.0)
+    for transition in episodes(2):
+        memory.append(transition)
+    memory.update_priorities(np.arange(10), np.full(10, 1.0))
+    memory.update_priorities([3], np.array([9.0]))
+
+    batch = memory.sample(1000)
+    share = np.mean(batch['index'] == 3)
+    assert 0.4 < share < 0.6
+    # the memory sampled most has the smallest importance weight
+    assert batch['weight'][batch['index'] == 3].max() == batch['weight'].min()
@@ -27,12 +27,13 @@ from ngraph.op_graph.convolution import convolution, deconvolution
 from ngraph.op_graph.pooling import pooling
 from ngraph.op_graph.lookuptable import lookuptable
 from ngraph.op_graph.ctc import ctc
+from ngraph.op_graph.scan import scan
 from ngraph.op_graph.debug import PrintOp
 from ngraph.op_graph.op_graph import *
 from ngraph.op_graph.op_graph import axes_with_order, \
-    broadcast, cast_axes, \
+    broadcast, cast_axes, checkpoint, \
     persistent_tensor, placeholder, \
-    slice_along_axis, temporary, \
+    slice_along_axis, temporary, flat_storage, \
     add, as_op, as_ops, constant, variable, persistent_tensor, placeholder, \
     temporary, variance, squared_L2, \
     negative, absolute, sin, cos, tanh, exp, log, reciprocal, safelog, sign, \
@@ -49,6 +50,7 @@ __all__ = [
     'batch_size',
     'broadcast',
     'cast_axes',
+    'checkpoint',
     'computation',
     'constant',
     'convolution',
@@ -56,6 +58,7 @@ __all__ = [
     'deconvolution',
     'exp',
     'fill',
+    'flat_storage',
     'log',
     'lookuptable',
     'ctc',
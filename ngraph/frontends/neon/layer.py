@@ -798,6 +798,10 @@ class Recurrent(Layer):
                             set to False to be stateful.
         return_sequence (bool): default to be True to return the whole sequence output.
         backward (bool): default to be False to process the sequence left to right
+        unroll (bool): default to be True to unroll the recurrence into the graph.  When
+                       False, a single step is compiled and run along the recurrent axis
+                       with ng.scan, so graph size and compile time do not grow with the
+                       sequence length.  Only supported by the CPU transformer.
         name (str, optional): name to refer to this layer as.
 
     Attributes:
@@ -808,7 +812,8 @@ class Recurrent(Layer):
         b (Tensor): Biases on output units (output_size, 1)
     """
     def __init__(self, nout, init, init_inner=None, activation=None, batch_norm=False,
-                 reset_cells=True, return_sequence=True, backward=False, **kwargs):
+                 reset_cells=True, return_sequence=True, backward=False, unroll=True,
+                 **kwargs):
         super(Recurrent, self).__init__(**kwargs)
 
         self.nout = nout
@@ -818,6 +823,7 @@ class Recurrent(Layer):
         self.reset_cells = reset_cells
         self.return_sequence = return_sequence
         self.backward = backward
+        self.unroll = unroll
         self.batch_norm = BatchNorm() if batch_norm is True else None
         self.w_in_axes = None
 
@@ -861,6 +867,14 @@ class Recurrent(Layer):
         h_rec = ng.cast_role(ng.dot(self.W_recur, states), self.out_axes)
         return self.activation(h_rec + h_ff + self.b)
 
+    def _scan_step(self, h_ff, states):
+        h = self._step(h_ff[0], states[0])
+        return h, [h]
+
+    def _last_step(self, rnn_out):
+        step = 0 if self.backward else self.recurrent_axis.length - 1
+        return ng.slice_along_axis(rnn_out, self.recurrent_axis, step)
+
     @SubGraph.scope_op_creation
     def __call__(self, in_obj, init_state=None):
         """
@@ -916,19 +930,27 @@ class Recurrent(Layer):
         if self.batch_norm is not None:
             h_ff = self.batch_norm(h_ff)
 
-        # slice the weighted inputs into time slices
-        in_s = get_steps(h_ff, self.recurrent_axis, self.backward)
+        if not self.unroll:
+            h_stack = ng.scan(self._scan_step, [h_ff], [h], self.recurrent_axis,
+                              backward=self.backward, pos=self.recurrent_axis_idx)
+            h_list = [self._last_step(h_stack)]
+        else:
+            # slice the weighted inputs into time slices
+            in_s = get_steps(h_ff, self.recurrent_axis, self.backward)
 
-        # unrolling computations
-        for i in range(self.recurrent_axis.length):
-            with ng.metadata(recurrent_step=str(i)):
-                h = self._step(in_s[i], h)
-                h_list.append(h)
+            # unrolling computations
+            for i in range(self.recurrent_axis.length):
+                with ng.metadata(recurrent_step=str(i)):
+                    h = self._step(in_s[i], h)
+                    h_list.append(h)
 
         if self.return_sequence is True:
-            # only when returning a sequence, need to reverse the output
-            h_list = h_list[::-1] if self.backward else h_list
-            rnn_out = ng.stack(h_list, self.recurrent_axis, pos=self.recurrent_axis_idx)
+            if not self.unroll:
+                rnn_out = h_stack
+            else:
+                # only when returning a sequence, need to reverse the output
+                h_list = h_list[::-1] if self.backward else h_list
+                rnn_out = ng.stack(h_list, self.recurrent_axis, pos=self.recurrent_axis_idx)
         else:
             rnn_out = h_list[-1]
 
@@ -964,11 +986,13 @@ class BiRNN(Layer):
         concat_out (bool): default to False. When True, concatenate the outputs from both
                            directions. If concat_out and sum_out are both False, output will be a
                            list.
+        unroll (bool): default to be True to unroll both directions into the graph.  When
+                       False, each direction runs its step with ng.scan.
         name (str, optional): name to refer to this layer as.
     """
     def __init__(self, nout, init, init_inner=None, activation=None, batch_norm=False,
                  reset_cells=False, return_sequence=True, sum_out=False,
-                 concat_out=False, **kwargs):
+                 concat_out=False, unroll=True, **kwargs):
         if sum_out and concat_out:
             raise ValueError("sum_out and concat_out cannot both be True")
 
@@ -978,10 +1002,11 @@ class BiRNN(Layer):
         self.nout = nout
         self.fwd_rnn = Recurrent(nout, init, init_inner, activation=activation,
                                  batch_norm=batch_norm, reset_cells=reset_cells,
-                                 return_sequence=return_sequence)
+                                 return_sequence=return_sequence, unroll=unroll)
         self.bwd_rnn = Recurrent(nout, init, init_inner, activation=activation,
                                  batch_norm=batch_norm, reset_cells=reset_cells,
-                                 return_sequence=return_sequence, backward=True)
+                                 return_sequence=return_sequence, backward=True,
+                                 unroll=unroll)
 
     @SubGraph.scope_op_creation
     def __call__(self, in_obj, init_state=None):
@@ -1063,6 +1088,9 @@ class LSTM(Recurrent):
                             set to False to be stateful.
         return_sequence (bool): default to be True to return the whole sequence output.
         backward (bool): default to be False to process the sequence left to right
+        unroll (bool): default to be True to unroll the recurrence into the graph.  When
+                       False, a single step is run along the recurrent axis with ng.scan;
+                       this requires reset_cells and does not support return_cell_state.
         name (str, optional): name to refer to this layer as.
     Attributes:
         W_input (Tensor): weights from inputs to output units
@@ -1077,10 +1105,13 @@ class LSTM(Recurrent):
 
     def __init__(self, nout, init, init_inner=None, activation=None, gate_activation=None,
                  batch_norm=False, reset_cells=True, return_sequence=True, backward=False,
-                 **kwargs):
+                 unroll=True, **kwargs):
+        if not unroll and not reset_cells:
+            raise ValueError("LSTM with unroll=False does not keep the cell state, "
+                             "reset_cells must be True")
         super(LSTM, self).__init__(nout, init, init_inner=init_inner, activation=activation,
                                    reset_cells=reset_cells, return_sequence=return_sequence,
-                                   backward=backward, **kwargs)
+                                   backward=backward, unroll=unroll, **kwargs)
 
         if batch_norm is True:
             self.batch_norm = {k: BatchNorm() for k in self.metadata["gates"]}
@@ -1106,6 +1137,10 @@ class LSTM(Recurrent):
         h = ng.cast_role(h, self.out_axes)
         return [h, c]
 
+    def _scan_step(self, h_ff, states):
+        h, c = self._step(dict(zip(self.metadata['gates'], h_ff)), states)
+        return h, [h, c]
+
     @SubGraph.scope_op_creation
     def __call__(self, in_obj, init_state=None, return_cell_state=False):
         """
@@ -1123,6 +1158,9 @@ class LSTM(Recurrent):
 
         """
 
+        if return_cell_state and not self.unroll:
+            raise ValueError("return_cell_state is not supported with unroll=False")
+
         # for seq2seq, recurrent axis and init_state change
         # between training and inference
         self.recurrent_axis = in_obj.axes.recurrent_axis()
@@ -1183,7 +1221,15 @@ class LSTM(Recurrent):
             if self.batch_norm is not None:
                 h_ff[k] = self.batch_norm[k](h_ff[k])
 
-            # slice the weighted inputs into time slices
+        if not self.unroll:
+            h_stack = ng.scan(self._scan_step, [h_ff[k] for k in self.metadata['gates']],
+                              [h, c], self.recurrent_axis, backward=self.backward,
+                              pos=self.recurrent_axis_idx)
+            if self.return_sequence is True:
+                return h_stack
+            return self._last_step(h_stack)
+
+        # slice the weighted inputs into time slices
         h_ff = get_steps(h_ff, self.recurrent_axis, self.backward)
 
         # recurrent computation
@@ -1274,12 +1320,21 @@ def unroll(cell, num_steps, inputs, init_states=None, reset_cells=True,
     else:
         states = init_states
 
-    stepped_inputs = get_steps(inputs, recurrent_axis, backward=reverse_mode)
-    stepped_outputs = []
+    # Transform all steps with one large product when the cell allows it
+    projected = cell.input_projection(inputs)
+    if projected is not None:
+        if states is None:
+            states = cell.initialize_states(batch_axis)
+        stepped_inputs = get_steps(projected, recurrent_axis, backward=reverse_mode)
+        step = cell.recurrent_step
+    else:
+        stepped_inputs = get_steps(inputs, recurrent_axis, backward=reverse_mode)
+        step = cell
 
+    stepped_outputs = []
     for t in range(num_steps):
         with ng.metadata(step=str(t)):
-            output, states = cell(stepped_inputs[t], states)
+            output, states = step(stepped_inputs[t], states)
             stepped_outputs.append(output)
 
     if reverse_mode:
@@ -1358,6 +1413,31 @@ class BaseRNNCell(Layer):
         """name(s) of gates"""
         return ()
 
+    def input_projection(self, inputs):
+        """
+        Apply the input-to-hidden transform to a whole sequence at once.
+
+        unroll uses this to replace one small product per step with a single large
+        one, and then passes the slices of the result to recurrent_step.
+
+        Arguments:
+        ----------
+        inputs (Tensor): The input sequence.
+
+        Returns
+        -------
+        The transformed sequence, or None if the cell must transform each step
+        in __call__.
+        """
+        return None
+
+    def recurrent_step(self, projected_inputs, states):
+        """
+        Update the RNN cell for one time step, given one step of the result of
+        input_projection.
+        """
+        raise NotImplementedError()
+
     @SubGraph.scope_op_creation
     def initialize_states(self, batch_axis, reset_cells=True):
         """
@@ -1443,6 +1523,16 @@ class RNNCell(BaseRNNCell):
             batch_axis = inputs.axes.batch_axis()
             states = self.initialize_states(batch_axis,
                                             reset_cells=reset_cells)
-        feed_fwd = ng.cast_role(self.i2h(inputs), states['h'].axes)
+        return self.recurrent_step(self.i2h(inputs), states)
+
+    def input_projection(self, inputs):
+        if self.batch_norm:
+            # batch statistics are computed separately for each step
+            return None
+        return self.i2h(inputs)
+
+    @SubGraph.scope_op_creation
+    def recurrent_step(self, projected_inputs, states):
+        feed_fwd = ng.cast_role(projected_inputs, states['h'].axes)
         states['h'] = self.activation(feed_fwd + self.h2h(states['h']))
         return states['h'], states
@@ -99,6 +99,48 @@ def clip_gradient_value(grad, clip_value=None):
         return ng.minimum(ng.maximum(grad, -abs(clip_value)), abs(clip_value))
 
 
+def flat_gradients(variables, grads):
+    """
+    Lays variables and their gradients out in flat tensors.
+
+    Arguments:
+        variables (list): The variables.
+        grads (list): The gradient of each variable.
+
+    Returns:
+        The flat variable and the flat gradient, as lists, for updating in place of the
+        variables and gradients.
+    """
+    parameters = ng.flat_storage(variables)
+    sections = [ng.temporary(axes=variable.axes, dtype=variable.dtype) for variable in variables]
+    grad = ng.flat_storage(sections, axis=parameters.axes[0])
+    grad = ng.sequential([
+        ng.doall([ng.assign(section, g) for section, g in zip(sections, grads)]),
+        grad
+    ])
+    return [parameters], [grad]
+
+
+def accumulate_gradients(grads, update_mask):
+    """
+    Accumulates gradients over micro-batches in persistent tensors.
+
+    Arguments:
+        grads (list): The gradients of a micro-batch.
+        update_mask (Op): 1 on the micro-batch that updates the variables, else 0.
+
+    Returns:
+        The sums of the gradients over the micro-batches so far, and the op that restarts
+        the sums after an update.
+    """
+    totals = [ng.persistent_tensor(axes=grad.axes, dtype=grad.dtype, initial_value=0.)
+              for grad in grads]
+    sums = [ng.sequential([ng.assign(total, total + grad), total])
+            for total, grad in zip(totals, grads)]
+    restart = ng.doall([ng.assign(total, total * (1 - update_mask)) for total in totals])
+    return sums, restart
+
+
 class Optimizer(SubGraph):
     """TODO."""
     metadata = {'layer_type': 'optimizer'}
@@ -111,10 +153,56 @@ class Optimizer(SubGraph):
 
 
 class LearningRateOptimizer(Optimizer):
+    """
+    Arguments:
+        learning_rate (float or dict): The learning rate, or its policy.
+        iteration (int): The iteration to start the learning rate policy from.
+        flat_parameters (bool): If True, the variables, their gradients and the optimizer
+            state are laid out in flat tensors, which are updated all at once instead of
+            variable by variable. The variables become sections of the flat tensor, keeping
+            their initial values, so they can only be optimized by one such optimizer.
+        accumulation_steps (int): The number of micro-batches, each a call of the
+            computation, whose gradients are summed before the variables are updated with
+            their average. The update is equivalent to one on a batch that many times larger.
+
+    Attributes:
+        update_mask (Op): While the updates are created, 1 on the calls that update the
+            variables and 0 on the others, or None if every call does.
+    """
 
-    def __init__(self, learning_rate, iteration=0, **kwargs):
+    def __init__(self, learning_rate, iteration=0, flat_parameters=False,
+                 accumulation_steps=1, **kwargs):
         super(LearningRateOptimizer, self).__init__(**kwargs)
+        if accumulation_steps < 1:
+            raise ValueError("accumulation_steps must be at least 1, not {}".format(
+                accumulation_steps))
         self.lrate = get_learning_rate_policy_callback(learning_rate)(iteration)
+        self.flat_parameters = flat_parameters
+        self.accumulation_steps = accumulation_steps
+        self.micro_batch = None
+        self.update_mask = None
+
+    def assign(self, tensor, value):
+        """
+        Assigns to state of the update, which only changes on the calls that update the
+        variables. variable_update uses it for the variables and the optimizer state.
+
+        Arguments:
+            tensor (AssignableTensorOp): The state.
+            value (Op): The new value of the state.
+
+        Returns:
+            The assignment.
+        """
+        if self.update_mask is None:
+            return ng.assign(tensor, value)
+        return ng.assign(tensor, self.update_mask * value + (1 - self.update_mask) * tensor)
+
+    def prepare_update(self):
+        """
+        Creates the ops that the variable updates of a step share.
+        """
+        pass
 
     @SubGraph.scope_op_creation
     def __call__(self, cost_func, variables=None, subgraph=None, warning=False):
@@ -134,6 +222,16 @@ class LearningRateOptimizer(Optimizer):
         """
 
         all_updates = []
+        if self.accumulation_steps > 1:
+            if self.micro_batch is None:
+                self.micro_batch = ng.persistent_tensor(axes=(), initial_value=0)
+            # The micro-batch count restarts at 0 with the call that updates the variables
+            self.update_mask = ng.sequential([
+                ng.assign(self.micro_batch, ng.mod(self.micro_batch + 1,
+                                                   self.accumulation_steps)),
+                ng.equal(self.micro_batch, 0)
+            ])
+        self.prepare_update()
         batch_cost = ng.sum(cost_func, out_axes=())
         if cost_func.axes.batch_axis() is None:
             batch_size = 1
@@ -155,7 +253,13 @@ class LearningRateOptimizer(Optimizer):
                 logger.warn("not all selected variables participate in cost computation")
 
         # gradients
-        grads = [ng.deriv(batch_cost, v) / batch_size for v in variables]
+        grads = [ng.deriv(batch_cost, v) for v in variables]
+        if self.flat_parameters:
+            variables, grads = flat_gradients(variables, grads)
+        restart = None
+        if self.update_mask is not None:
+            grads, restart = accumulate_gradients(grads, self.update_mask)
+        grads = [grad / (batch_size * self.accumulation_steps) for grad in grads]
         scale_factor = clip_gradient_norm(grads, self.gradient_clip_norm)
 
         # updates
@@ -164,7 +268,10 @@ class LearningRateOptimizer(Optimizer):
             all_updates.append(updates)
         updates = ng.doall(all_updates)
         grads = ng.doall(grads)
-        return ng.sequential([grads, updates, 0])
+        self.update_mask = None
+        if restart is None:
+            return ng.sequential([grads, updates, 0])
+        return ng.sequential([grads, updates, restart, 0])
 
 
 class GradientDescentMomentum(LearningRateOptimizer):
@@ -233,12 +340,12 @@ class GradientDescentMomentum(LearningRateOptimizer):
         grad.metadata['reduce_func'] = 'sum'
         clip_grad = clip_gradient_value(grad, self.gradient_clip_value)
         lr = - self.lrate * (scale_factor * clip_grad + self.wdecay * variable)
-        updates.append(ng.assign(velocity, velocity * self.momentum_coef + lr))
+        updates.append(self.assign(velocity, velocity * self.momentum_coef + lr))
         if self.nesterov:
             delta = (self.momentum_coef * velocity + lr)
         else:
             delta = velocity
-        updates.append(ng.assign(variable, variable + delta))
+        updates.append(self.assign(variable, variable + delta))
         return ng.sequential(updates)
 
 
@@ -294,9 +401,9 @@ class RMSProp(LearningRateOptimizer):
         grad = clip_gradient_value(grad, self.gradient_clip_value)
         state = ng.persistent_tensor(axes=variable.axes, initial_value=0.)
         updates = ng.sequential([
-            ng.assign(state, decay * state + (1.0 - decay) * ng.square(grad)),
-            ng.assign(variable, variable - ((scale_factor * grad * self.lrate)
-                                            / (ng.sqrt(state + epsilon) + epsilon)))
+            self.assign(state, decay * state + (1.0 - decay) * ng.square(grad)),
+            self.assign(variable, variable - ((scale_factor * grad * self.lrate)
+                                              / (ng.sqrt(state + epsilon) + epsilon)))
         ])
         return updates
 
@@ -339,27 +446,27 @@ class Adam(LearningRateOptimizer):
         self.epsilon = epsilon
         self.gradient_clip_norm = gradient_clip_norm
         self.gradient_clip_value = gradient_clip_value
+        self.t = None
 
-    @SubGraph.scope_op_creation
-    def __call__(self, *args, **kwargs):
-
-        if len(self.ops) == 0:
+    def prepare_update(self):
+        if self.t is None:
             self.beta_1 = ng.constant(self.beta_1, dtype=np.float32)
             self.beta_2 = ng.constant(self.beta_2, dtype=np.float32)
             self.t = ng.persistent_tensor(axes=(), initial_value=0)
 
-        self.t = ng.sequential([ng.assign(self.t, self.t + 1), self.t])
-        self.ell = self.lrate * ng.sqrt(1 - self.beta_2 ** self.t) / (1 - self.beta_1 ** self.t)
-
-        return super(Adam, self).__call__(*args, **kwargs)
+        self.t = ng.sequential([self.assign(self.t, self.t + 1), self.t])
+        # Before the first update of accumulated gradients t is 0, and the update that is
+        # not applied must still be finite
+        t = self.t if self.accumulation_steps == 1 else ng.maximum(self.t, 1)
+        self.ell = self.lrate * ng.sqrt(1 - self.beta_2 ** t) / (1 - self.beta_1 ** t)
 
     def variable_update(self, variable, grad, scale_factor):
         m = ng.persistent_tensor(axes=grad.axes, initial_value=0.)
         v = ng.persistent_tensor(axes=grad.axes, initial_value=0.)
         updates = ng.sequential([
-            ng.assign(m, m * self.beta_1 + (1 - self.beta_1) * grad),
-            ng.assign(v, v * self.beta_2 + (1 - self.beta_2) * grad * grad),
-            ng.assign(variable,
-                      variable - (scale_factor * self.ell * m) / (ng.sqrt(v) + self.epsilon))
+            self.assign(m, m * self.beta_1 + (1 - self.beta_1) * grad),
+            self.assign(v, v * self.beta_2 + (1 - self.beta_2) * grad * grad),
+            self.assign(variable,
+                        variable - (scale_factor * self.ell * m) / (ng.sqrt(v) + self.epsilon))
         ])
         return updates
@@ -362,6 +362,66 @@ def test_learning_policy_schedule(drop_factor):
             ng.testing.assert_allclose(baseline_value, reference_value, rtol=1e-5)
 
 
+def train_variables(optimizer, micro_batches=1, **kwargs):
+    """
+    Trains for 5 steps of batch 32, each step over micro_batches calls.
+
+    Returns:
+        The costs of the calls and the trained variables.
+    """
+    C = ng.make_axis(20)
+    D = ng.make_axis(3)
+    N = ng.make_axis(32 // micro_batches, name='N')
+
+    data = ng.placeholder([C, N])
+    target = ng.placeholder([D, N])
+
+    np.random.seed(0)
+    W = ng.variable([D, C], initial_value=np.random.rand(D.length, C.length))
+    b = ng.variable([D], initial_value=np.random.rand(D.length))
+
+    cost = ng.sum(ng.square(target - ng.dot(W, data) - b), out_axes=())
+    updates = optimizer(**kwargs)(cost)
+
+    batches = zip(np.random.rand(5, C.length, 32), np.random.rand(5, D.length, 32))
+    with ExecutorFactory() as ex:
+        train = ex.transformer.computation([cost, updates], data, target)
+        costs = [train(x, y)[0] for batch_x, batch_y in batches
+                 for x, y in zip(np.split(batch_x, micro_batches, axis=1),
+                                 np.split(batch_y, micro_batches, axis=1))]
+        return costs, ex.transformer.computation([W, b])()
+
+
+optimizers = [
+    lambda **kwargs: GradientDescentMomentum(0.01, 0.9, wdecay=0.001, gradient_clip_norm=1.0,
+                                             **kwargs),
+    lambda **kwargs: RMSProp(gradient_clip_value=0.5, **kwargs),
+    lambda **kwargs: Adam(**kwargs)
+]
+
+
+@pytest.mark.parametrize("optimizer", optimizers, ids=['gdm', 'rmsprop', 'adam'])
+def test_flat_parameters(optimizer):
+    costs, variables = train_variables(optimizer, flat_parameters=False)
+    flat_costs, flat_variables = train_variables(optimizer, flat_parameters=True)
+
+    ng.testing.assert_allclose(flat_costs, costs, rtol=rtol, atol=atol)
+    for flat_value, value in zip(flat_variables, variables):
+        ng.testing.assert_allclose(flat_value, value, rtol=rtol, atol=atol)
+
+
+@pytest.mark.parametrize("flat_parameters", [False, True])
+@pytest.mark.parametrize("optimizer", optimizers, ids=['gdm', 'rmsprop', 'adam'])
+def test_gradient_accumulation(optimizer, flat_parameters):
+    _, variables = train_variables(optimizer, flat_parameters=flat_parameters)
+    _, accumulated_variables = train_variables(optimizer, micro_batches=4,
+                                               accumulation_steps=4,
+                                               flat_parameters=flat_parameters)
+
+    for accumulated_value, value in zip(accumulated_variables, variables):
+        ng.testing.assert_allclose(accumulated_value, value, rtol=rtol, atol=atol)
+
+
 if __name__ == '__main__':
     test_rmsprop(0.1, 0.95, 1e-6)
     test_gdm(0.1, 0.1, 0.1, False)
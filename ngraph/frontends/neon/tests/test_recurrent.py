@@ -649,3 +649,43 @@ def test_change_recurrent_axis_length(recurrent_layer_cls, batch_size, sequence_
 
         ng.testing.assert_allclose(y1_n_comp(xn_val), y2_n_comp(xn_val))
         ng.testing.assert_allclose(y1_1_comp(x1_val), y3_1_comp(x1_val))
+
+
+@pytest.config.cpu_enabled_only
+@pytest.mark.transformer_dependent
+@pytest.mark.parametrize("recurrent_layer_cls", [Recurrent, LSTM])
+@pytest.mark.parametrize("return_sequence", [True, False])
+@pytest.mark.parametrize("backward", [True, False])
+@pytest.mark.parametrize("init_state", [True, False])
+def test_scan_matches_unrolled(recurrent_layer_cls, return_sequence, backward, init_state,
+                               weight_initializer, bias_initializer):
+    input_size, sequence_length, batch_size, hidden_size = 5, 4, 2, 6
+    input_placeholder, input_value = make_placeholder(input_size, sequence_length, batch_size)
+    W_in, W_rec, b, state, state_value = make_weights(input_placeholder, hidden_size,
+                                                      weight_initializer, bias_initializer,
+                                                      init_state)
+    parameters = [input_placeholder]
+    values = [input_value]
+    if state is not None:
+        parameters.append(state)
+        values.append(state_value)
+        if recurrent_layer_cls is LSTM:
+            state = [state, state]
+
+    layers = [recurrent_layer_cls(hidden_size, init=W_in, init_inner=W_rec,
+                                  activation=Tanh(), return_sequence=return_sequence,
+                                  backward=backward, unroll=unroll)
+              for unroll in (True, False)]
+    outputs = [layer(input_placeholder, init_state=state) for layer in layers]
+    costs = [ng.sum(output * output, out_axes=()) for output in outputs]
+
+    results = []
+    for layer, output, cost in zip(layers, outputs, costs):
+        weights = layer.W_recur if recurrent_layer_cls is Recurrent else layer.W_recur['f']
+        results.append([output, ng.deriv(cost, input_placeholder), ng.deriv(cost, weights)])
+
+    with ExecutorFactory() as ex:
+        unrolled, scanned = (ex.executor(result, *parameters)(*values) for result in results)
+    for unrolled_value, scanned_value in zip(unrolled, scanned):
+        ng.testing.assert_allclose(scanned_value, unrolled_value,
+                                   rtol=bprop_rtol, atol=bprop_atol)
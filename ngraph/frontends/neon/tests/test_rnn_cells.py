@@ -304,3 +304,17 @@ def test_rnn_deriv_numerical(sequence_length, input_size, hidden_size, batch_siz
                 ng.testing.assert_allclose(deriv_s(val, input_value),
                                            deriv_n(val, input_value),
                                            rtol=num_rtol, atol=num_atol)
+
+
+@pytest.mark.parametrize("batch_norm", [False, True])
+def test_rnn_cell_input_projection(batch_norm, weight_initializer):
+    input_placeholder, _ = make_placeholder(5, 4, 2)
+    rnn_ng = RNNCell(6, init=weight_initializer, activation=Tanh(), batch_norm=batch_norm)
+    out_ng = unroll(rnn_ng, 4, input_placeholder)
+
+    W_in = rnn_ng.i2h.linear.W
+    input_dots = [op for op in ng.Op.ordered_ops([out_ng])
+                  if isinstance(op, ng.DotOp) and W_in in [arg.tensor for arg in op.args]]
+    # The input projection is computed once for all steps unless batch norm needs
+    # per-step statistics
+    assert len(input_dots) == (4 if batch_norm else 1)
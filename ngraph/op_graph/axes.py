@@ -126,8 +126,20 @@ class Axis(object):
         if length is not None and length < 0:
             raise ValueError("Axis length {} must be >= 0".format(length))
         self.__length = length
+        self.__uuid = None
 
-        self.uuid = uuid.uuid4()
+    @property
+    def uuid(self):
+        """
+        A uuid for the axis, generated the first time it is needed.
+        """
+        if self.__uuid is None:
+            self.__uuid = uuid.uuid4()
+        return self.__uuid
+
+    @uuid.setter
+    def uuid(self, value):
+        self.__uuid = value
 
     def named(self, name):
         self.name = name
@@ -313,6 +325,11 @@ class Axes(object):
     """
 
     def __init__(self, axes=None):
+        self._uuid = None
+        if isinstance(axes, Axes):
+            # already checked
+            self._axes = axes._axes
+            return
         if axes is None:
             axes = []
         elif isinstance(axes, Axis):
@@ -335,7 +352,7 @@ class Axes(object):
             """
             elems = []
             for x in seq:
-                if isinstance(x, collections.Iterable):
+                if not isinstance(x, Axis) and isinstance(x, collections.Iterable):
                     x = Axes(convert(x)).flatten(force=True)
                 elems.append(x)
             return elems
@@ -352,13 +369,25 @@ class Axes(object):
                     found_type=type(x),
                 ))
 
-        if duplicates(axes):
+        if len(set(x.name for x in axes)) != len(axes):
             raise ValueError(
                 'The axes labels of a tensor cannot contain duplicates.  Found: {}'
                 .format(str(duplicates(axes)))
             )
         self._axes = tuple(axes)
-        self.uuid = uuid.uuid4()
+
+    @property
+    def uuid(self):
+        """
+        A uuid for the axes, generated the first time it is needed.
+        """
+        if self._uuid is None:
+            self._uuid = uuid.uuid4()
+        return self._uuid
+
+    @uuid.setter
+    def uuid(self, value):
+        self._uuid = value
 
     @property
     def full_lengths(self):
@@ -33,18 +33,24 @@ def convolution(conv_params, inputs, filters, axes, docstring=None):
 
 class ConvolutionOp(TensorOp):
     """
+    A convolution, optionally followed by post-ops that transformers fuse into it:
+    output = relu(conv(inputs, filters) + bias + residual).
+
     Arguments:
         inputs  : input tensor.
         filters : filter/kernel tensor.
+        bias : optional bias along the first axis of the output.
+        residual : optional tensor with the axes of the output, added to it.
+        relu_slope : If not None, the output goes through a relu with this slope
+            for negative values.
 
     Return:
     """
 
-    def __init__(self, conv_params, inputs, filters, bias=None, **kwargs):
-        if bias is None:
-            super(ConvolutionOp, self).__init__(args=(inputs, filters), **kwargs)
-        else:
-            super(ConvolutionOp, self).__init__(args=(inputs, filters, bias), **kwargs)
+    def __init__(self, conv_params, inputs, filters, bias=None, residual=None, relu_slope=None,
+                 **kwargs):
+        args = (inputs, filters) + tuple(arg for arg in (bias, residual) if arg is not None)
+        super(ConvolutionOp, self).__init__(args=args, **kwargs)
 
         if len(inputs.shape) != 5:
             raise ValueError((
@@ -72,12 +78,32 @@ class ConvolutionOp(TensorOp):
                 ).format(key=k))
 
         self.conv_params = conv_params
+        self.has_bias = bias is not None
+        self.has_residual = residual is not None
+        self.relu_slope = relu_slope
         self.__has_side_effects = False
 
+    def post_op_args(self, args):
+        """
+        Splits the arguments of the op that follow inputs and filters.
+
+        Arguments:
+            args: The arguments after inputs and filters, as ops or as tensors.
+
+        Returns:
+            The bias and the residual, None for those the op does not have.
+        """
+        args = list(args)
+        bias = args.pop(0) if self.has_bias else None
+        residual = args.pop(0) if self.has_residual else None
+        return bias, residual
+
     def copy_with_new_args(self, args):
-        return type(self)(self.conv_params, *args, axes=self.axes)
+        bias, residual = self.post_op_args(args[2:])
+        return type(self)(self.conv_params, args[0], args[1], bias, residual,
+                          self.relu_slope, axes=self.axes)
 
-    def generate_adjoints(self, adjoints, delta, inputs, filters, bias=None):
+    def generate_adjoints(self, adjoints, delta, inputs, filters, *post_op_args):
         """
         TODO
         """
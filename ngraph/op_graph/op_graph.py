@@ -326,22 +326,38 @@ class Op(ScopedNameableValue):
         self._control_deps = OrderedSet()
         self._deriv_handler = None
         self._const = const
-        self.uuid = uuid.uuid4()
+        self._uuid = None
         self._is_constant = constant
         self._is_persistent = persistent
         self._is_trainable = trainable
 
         # Add this op to the all op accounting lists
-        ops = Op._get_thread_ops()[-1]
+        thread_state = get_thread_state()
+        try:
+            ops, all_ops = thread_state.ops[-1], thread_state.all_ops[-1]
+        except AttributeError:
+            ops, all_ops = Op._get_thread_ops()[-1], Op.get_all_ops()[-1]
         if ops is not None:
             ops.append(self)
-        all_ops = Op.get_all_ops()[-1]
         if all_ops is not None:
             all_ops.append(self)
 
         self.style = {}
         self._forward = None
 
+    @property
+    def uuid(self):
+        """
+        A uuid for the op, generated the first time it is needed.
+        """
+        if self._uuid is None:
+            self._uuid = uuid.uuid4()
+        return self._uuid
+
+    @uuid.setter
+    def uuid(self, value):
+        self._uuid = value
+
     def copy_with_new_args(self, args):
         """
         This method creates a new op given an original op and new args. The purpose here
@@ -1606,7 +1622,11 @@ class TensorValueOp(ValueOp):
 
     @property
     def states_read(self):
-        return OrderedSet([self.tensor])
+        # A section of a flat tensor is ordered with all other uses of the flat tensor
+        tensor = self.tensor
+        if tensor.storage is not None:
+            return OrderedSet([tensor.storage])
+        return OrderedSet([tensor])
 
     @property
     def effective_tensor_op(self):
@@ -1820,6 +1840,9 @@ class MapRolesOp(AxesCastOp):
 
         super(MapRolesOp, self).__init__(x, axes=self.axes_map.map_axes(x.axes), **kwargs)
 
+    def copy_with_new_args(self, args):
+        return type(self)(args[0], self.axes_map)
+
     def generate_adjoints(self, adjoints, delta, x):
         x.generate_add_delta(adjoints, MapRolesOp(delta, self.axes_map.invert()))
 
@@ -1944,6 +1967,9 @@ class BroadcastOp(IndexOp):
             x, axes=axes, **kwargs
         )
 
+    def copy_with_new_args(self, args):
+        return type(self)(args[0], axes=self.axes)
+
     def transform_tensor_description(self, tensor_description):
         return tensor_description.broadcast(self.axes)
 
@@ -2242,6 +2268,9 @@ class Unflatten(IndexOp):
         Axes.assert_valid_unflatten(x.axes, axes)
         super(Unflatten, self).__init__(x, axes=axes, **kwargs)
 
+    def copy_with_new_args(self, args):
+        return type(self)(args[0], axes=self.axes)
+
     def transform_tensor_description(self, tensor_description):
         return tensor_description.unflatten(self.axes).named(self.name)
 
@@ -2279,6 +2308,8 @@ class AssignableTensorOp(TensorOp):
 
     Attributes:
         input (bool): The storage is used as an input.
+        storage (AssignableTensorOp): If not None, the tensor is a section of this flat
+            tensor. See flat_storage.
     """
 
     def __init__(
@@ -2298,6 +2329,8 @@ class AssignableTensorOp(TensorOp):
         self._is_constant = is_constant
         self._is_placeholder = is_placeholder
         self._const = const
+        self._storage = None
+        self._storage_offset = 0
         self.initial_value = None
 
         if initial_value is not None:
@@ -2344,6 +2377,21 @@ class AssignableTensorOp(TensorOp):
     def is_placeholder(self):
         return self._is_placeholder
 
+    @property
+    def storage(self):
+        return self._storage
+
+    @tdcache()
+    def tensor_description(self):
+        if self._storage is None:
+            return super(AssignableTensorOp, self).tensor_description()
+        return TensorDescription(self.axes,
+                                 base=self._storage.tensor_description(),
+                                 offset=self._storage_offset * self.dtype.itemsize,
+                                 op=self,
+                                 dtype=self.dtype,
+                                 name=self.safe_name)
+
     @property
     def defs(self):
         """
@@ -2533,6 +2581,59 @@ def variable(axes, dtype=None, initial_value=None, **kwargs):
                               **kwargs)
 
 
+def flat_storage(tensors, axis=None):
+    """
+    Lays tensors out one after another in a flat tensor. Each tensor becomes a view of its
+    section of the flat tensor, so an elementwise op on the flat tensor is an elementwise
+    op on all of them, while they can still be used on their own.
+
+    The initial value of the flat tensor is made from the initial values the tensors have
+    now.
+
+    Args:
+        tensors: Persistent or temporary tensors with the same dtype, such as variables.
+        axis (Axis, optional): The axis of the flat tensor.
+
+    Returns:
+        AssignableTensorOp: The flat tensor, persistent if the tensors are.
+    """
+    tensors = list(tensors)
+    dtype = tensors[0].dtype
+    is_persistent = tensors[0].is_persistent
+    for tensor in tensors:
+        if not isinstance(tensor, AssignableTensorOp) or tensor.is_constant or \
+                tensor.is_placeholder or tensor.storage is not None:
+            raise ValueError("{} cannot be laid out in a flat tensor".format(tensor))
+        if tensor.dtype != dtype or tensor.is_persistent != is_persistent:
+            raise ValueError("Tensors laid out in a flat tensor must all have the same dtype "
+                             "and all be persistent or all be temporary")
+
+    size = int(np.sum([tensor.axes.size for tensor in tensors]))
+    if axis is None:
+        axis = make_axis(length=size, name='flat')
+    elif axis.length != size:
+        raise ValueError("Axis {} must have the total size {} of the tensors".format(axis, size))
+
+    if is_persistent:
+        initial_value = None
+        if any(tensor.initial_value is not None for tensor in tensors):
+            initial_value = np.concatenate([
+                np.zeros(tensor.axes.size, dtype=dtype) if tensor.initial_value is None
+                else np.broadcast_to(tensor.initial_value, tensor.axes.lengths).ravel()
+                for tensor in tensors])
+        storage = persistent_tensor(axes=[axis], dtype=dtype, initial_value=initial_value)
+    else:
+        storage = temporary(axes=[axis], dtype=dtype)
+
+    offset = 0
+    for tensor in tensors:
+        tensor._storage = storage
+        tensor._storage_offset = offset
+        offset += tensor.axes.size
+    tdcache.tensor_description_cache.clear()
+    return storage
+
+
 class StackOp(SequentialOp):
     """
     Joins a list of identically-axed tensors along a new axis.
@@ -2829,6 +2930,22 @@ def stop_gradient(x):
     return StopGradient(x)
 
 
+def checkpoint(x):
+    """
+    Marks the value of x as a checkpoint for rematerialization. The value is kept until its
+    last use, and values computed from it can be dropped and recomputed from it. See
+    Rematerialization.
+
+    Arguments:
+        x (TensorOp): The value.
+
+    Returns:
+        x.
+    """
+    as_op(x).tensor.metadata['checkpoint'] = True
+    return x
+
+
 class NegativeOp(UnaryElementWiseOp):
     """
     Negative of a tensor.
@@ -3091,16 +3208,20 @@ class BinaryElementWiseOp(ElementWiseOp):
         self.kwargs = kwargs
         x, y = as_ops((x, y))
 
-        x_axes_bcast = x.axes + (y.axes - x.axes)
-        y_axes_bcast = y.axes + (x.axes - y.axes)
-
-        if y_axes_bcast == y.axes:
-            axes = y_axes_bcast
+        if x.axes == y.axes:
+            # nothing to broadcast
+            axes = y.axes
         else:
-            axes = x_axes_bcast
+            x_axes_bcast = x.axes + (y.axes - x.axes)
+            y_axes_bcast = y.axes + (x.axes - y.axes)
+
+            if y_axes_bcast == y.axes:
+                axes = y_axes_bcast
+            else:
+                axes = x_axes_bcast
 
-        x = axes_with_order(broadcast(x, x_axes_bcast), axes)
-        y = axes_with_order(broadcast(y, y_axes_bcast), axes)
+            x = axes_with_order(broadcast(x, x_axes_bcast), axes)
+            y = axes_with_order(broadcast(y, y_axes_bcast), axes)
 
         super(BinaryElementWiseOp, self).__init__(
             args=(x, y),
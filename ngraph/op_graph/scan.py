@@ -0,0 +1,187 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from __future__ import division
+
+from ngraph.op_graph.axes import make_axes
+from ngraph.op_graph.op_graph import Op, TensorOp, axes_with_order, broadcast, constant, \
+    placeholder, sum
+
+
+def scan(step, sequences, init_states, recurrent_axis, backward=False, pos=0):
+    """
+    Apply step along recurrent_axis without unrolling it into the graph.
+
+    step is traced once on placeholders for one slice of each sequence and for the
+    states, giving a body that the transformer compiles once and runs for every step.
+    The body may read variables and constants; they become arguments of the scan so
+    they receive gradients.
+
+    Args:
+        step: A function step(xs, states) returning (output, new_states), where xs are
+            the slices of sequences for one step and states are the current states.
+        sequences (list of TensorOp): Tensors with recurrent_axis.
+        init_states (list of TensorOp): Initial values of the states.
+        recurrent_axis (Axis): The axis to iterate over.
+        backward (bool): Iterate from the last step to the first.
+        pos (int): Position of recurrent_axis in the result.
+
+    Returns:
+        TensorOp: The outputs of all steps, stacked along recurrent_axis.
+    """
+    sequences = list(sequences)
+    init_states = list(init_states)
+    sequence_placeholders = [placeholder(sequence.axes - recurrent_axis, dtype=sequence.dtype)
+                             for sequence in sequences]
+    state_placeholders = [placeholder(state.axes, dtype=state.dtype)
+                          for state in init_states]
+    output, new_states = step(sequence_placeholders, state_placeholders)
+    new_states = list(new_states)
+    if len(new_states) != len(init_states):
+        raise ValueError("step returned {} states, expected {}".format(
+            len(new_states), len(init_states)))
+    new_states = [axes_with_order(new_state, state.axes)
+                  for new_state, state in zip(new_states, state_placeholders)]
+
+    body_placeholders = set(op.tensor for op in sequence_placeholders + state_placeholders)
+    params = []
+    for op in Op.ordered_ops([output] + new_states):
+        tensor = op.tensor
+        if tensor.is_placeholder:
+            if tensor not in body_placeholders:
+                raise ValueError("step may not use placeholder {}; pass it in sequences "
+                                 "or init_states".format(tensor))
+        elif tensor.is_persistent and not tensor.is_constant and tensor not in params:
+            params.append(tensor)
+
+    return ScanOp(sequences, init_states, params, recurrent_axis,
+                  sequence_placeholders, state_placeholders, output, new_states,
+                  backward=backward, pos=pos)
+
+
+class ScanOp(TensorOp):
+    """
+    Runs a compiled step body once per position of recurrent_axis.
+
+    Arguments:
+        sequences: Tensors sliced along recurrent_axis.
+        init_states: Initial states.
+        params: Variables read by the body.
+        recurrent_axis: The axis to iterate over.
+        sequence_placeholders: Body inputs for one slice of each sequence.
+        state_placeholders: Body inputs for the states.
+        output: Body output for one step.
+        new_states: Body results for the next states, in the axes order of the
+            state placeholders.
+        backward: Iterate from the last step to the first.
+        pos: Position of recurrent_axis in the result.
+    """
+
+    def __init__(self, sequences, init_states, params, recurrent_axis,
+                 sequence_placeholders, state_placeholders, output, new_states,
+                 backward=False, pos=0, **kwargs):
+        if recurrent_axis in output.axes:
+            raise ValueError("Step output must not have the recurrent axis {}".format(
+                recurrent_axis))
+        out_axes = list(output.axes)
+        axes = make_axes(out_axes[:pos] + [recurrent_axis] + out_axes[pos:])
+        super(ScanOp, self).__init__(args=tuple(sequences) + tuple(init_states) + tuple(params),
+                                     axes=axes, **kwargs)
+        self.recurrent_axis = recurrent_axis
+        self.sequence_placeholders = sequence_placeholders
+        self.state_placeholders = state_placeholders
+        self.output = output
+        self.new_states = new_states
+        self.backward = backward
+        self.pos = pos
+        self.n_sequences = len(sequences)
+        self.n_states = len(init_states)
+        self.sequence_positions = [sequence.axes.index(recurrent_axis) for sequence in sequences]
+
+    @property
+    def body_parameters(self):
+        return self.sequence_placeholders + self.state_placeholders
+
+    @property
+    def body_returns(self):
+        return [self.output] + self.new_states
+
+    @property
+    def params(self):
+        return self.args[self.n_sequences + self.n_states:]
+
+    def generate_adjoints(self, adjoints, delta, *args):
+        bprop = ScanBpropOp(self, delta)
+        for index, arg in enumerate(args):
+            arg.generate_add_delta(adjoints, ScanGradOp(bprop, index, arg.axes))
+
+
+class ScanBpropOp(TensorOp):
+    """
+    Runs the backward body of a scan from the last step to the first.
+
+    The gradients for all arguments of the scan are kept by the transformer and read
+    with ScanGradOp; this op's own value is unused.
+
+    Arguments:
+        scan: The ScanOp.
+        delta: Adjoint of the scan result.
+    """
+
+    def __init__(self, scan, delta, **kwargs):
+        sequences = scan.args[:scan.n_sequences]
+        super(ScanBpropOp, self).__init__(args=(axes_with_order(delta, scan.axes), scan) +
+                                          tuple(sequences),
+                                          axes=(), **kwargs)
+        self.scan = scan
+
+        self.output_delta = placeholder(scan.output.axes, dtype=scan.output.dtype)
+        self.state_deltas = [placeholder(state.axes, dtype=state.dtype)
+                             for state in scan.state_placeholders]
+        total = sum(scan.output * self.output_delta, out_axes=())
+        for new_state, state_delta in zip(scan.new_states, self.state_deltas):
+            total = total + sum(new_state * state_delta, out_axes=())
+
+        step_adjoints = total.forwarded.adjoints(total.one)
+        self.gradients = []
+        for independent in scan.body_parameters + list(scan.params):
+            adjoint = step_adjoints.get(independent.forwarded.tensor)
+            if adjoint is None:
+                gradient = constant(0, independent.axes, dtype=independent.dtype)
+            else:
+                gradient = broadcast(adjoint.forwarded, independent.axes)
+            self.gradients.append(axes_with_order(gradient, independent.axes))
+
+    @property
+    def body_parameters(self):
+        return self.scan.body_parameters + [self.output_delta] + self.state_deltas
+
+    @property
+    def body_returns(self):
+        return self.gradients
+
+
+class ScanGradOp(TensorOp):
+    """
+    The gradient of one argument of a scan, computed by a ScanBpropOp.
+
+    Arguments:
+        bprop: The ScanBpropOp.
+        index: Position of the argument in the scan's args.
+        axes: Axes of the argument.
+    """
+
+    def __init__(self, bprop, index, axes, **kwargs):
+        super(ScanGradOp, self).__init__(args=(bprop,), axes=axes, **kwargs)
+        self.index = index
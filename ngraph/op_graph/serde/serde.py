@@ -33,6 +33,8 @@ between them.
 Currently only python public (aka non underscore prefixed) attributes are referenced with the
 exception of those in EXCEPTION_ATTRIBUTES and starting with `_is_`.
 """
+import collections
+import struct
 import uuid
 import weakref
 import pkgutil
@@ -53,11 +55,25 @@ import ngraph.op_graph.serde.ops_pb2 as ops_pb
 
 
 # Attributes of an Op that are private but we want to serialize
-EXCEPTION_ATTRIBUTES = {'_axes', '_tensor', '_const', '_deriv_handler'}
+EXCEPTION_ATTRIBUTES = {'_axes', '_tensor', '_const', '_deriv_handler', '_storage',
+                        '_storage_offset'}
+
+# Attributes of a serialized Op that protobuf_to_op restores separately or not at all
+IGNORED_ATTRIBUTES = {'valfun_value', 'dtype', 'metadata'}
 
 # Dict of Axis and Axes UUID to Axis to enable matching of deserialized axis
 GLOBAL_AXIS_REGISTRY = weakref.WeakValueDictionary()
 
+# Dict of op class names to op classes, see get_op_classes
+OP_CLASSES = None
+
+# Graph archives start with this, followed by the size of the serialized GraphDef
+ARCHIVE_MAGIC = b'NGRAPHA1'
+ARCHIVE_HEADER = struct.Struct('<8sQ')
+
+# Alignment in bytes of the tensor payloads of graph archives
+PAYLOAD_ALIGNMENT = 64
+
 
 ##################
 # SERIALIZATION
@@ -99,12 +115,64 @@ def axes_to_protobuf(axes):
     return pb_axes
 
 
-def tensor_to_protobuf(tensor):
+def align_payload(offset):
+    """ Rounds offset up to the alignment of tensor payloads. """
+    return -(-offset // PAYLOAD_ALIGNMENT) * PAYLOAD_ALIGNMENT
+
+
+class TensorPayloads(object):
+    """
+    The tensors written after the serialized graph in a graph archive rather than in it, at
+    aligned offsets. A tensor referenced by several attributes is written once.
+
+    Arguments:
+        threshold (int): Tensors of at least this many bytes are payloads.
+    """
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.tensors = []
+        self.offsets = dict()
+        self.size = 0
+
+    def add(self, tensor):
+        """
+        Returns the offset of tensor in the payloads, adding it if it is not there yet.
+        """
+        # The tensors are kept, so their ids are not reused
+        if id(tensor) not in self.offsets:
+            offset = align_payload(self.size)
+            self.offsets[id(tensor)] = offset
+            self.tensors.append(tensor)
+            self.size = offset + tensor.nbytes
+        return self.offsets[id(tensor)]
+
+    def write(self, f):
+        """
+        Writes the payloads to the binary file object f, which must be at an aligned position.
+        """
+        position = 0
+        for tensor in self.tensors:
+            offset = self.offsets[id(tensor)]
+            f.write(b'\0' * (offset - position))
+            f.write(np.ascontiguousarray(tensor).data)
+            position = offset + tensor.nbytes
+
+
+def tensor_to_protobuf(tensor, payloads=None):
+    """
+    Args:
+        tensor: The numpy tensor to convert.
+        payloads <TensorPayloads>: If given, tensors at least as large as its threshold are
+            added to it and only their offset is stored.
+    """
     pb_tensor = ops_pb.Tensor()
     pb_tensor.info.dtype = dtype_to_protobuf(tensor.dtype)
     pb_tensor.info.shape.extend(tensor.shape)
     if isinstance(tensor, (np.ndarray, np.generic)):
-        pb_tensor.data = tensor.tobytes()
+        if payloads is not None and tensor.nbytes >= payloads.threshold:
+            pb_tensor.offset = payloads.add(tensor)
+        else:
+            pb_tensor.data = tensor.tobytes()
     else:
         raise ValueError("Unknown tensor value of {}".format(tensor))
     return pb_tensor
@@ -159,7 +227,7 @@ def assign_scalar(message, value):
         raise unhandled_scalar_value(value)
 
 
-def assign_op_attr(message, value):
+def assign_op_attr(message, value, payloads=None):
     """
     Assigns a python object in value to the protobuf object `message` after conversion to
     the equivalent protobuf object.
@@ -168,13 +236,14 @@ def assign_op_attr(message, value):
         message <protobuf OpAttr>: protobuf object to have value assigned to after conversion
             to protobuf.
         value <python object>: The python object to be converted and assigned.
+        payloads <TensorPayloads>: Where to put large tensors, see tensor_to_protobuf.
     """
     if is_scalar_type(value):
         assign_scalar(message.scalar, value)
     elif isinstance(value, Axes):
         message.axes.CopyFrom(axes_to_protobuf(value))
     elif isinstance(value, np.ndarray):
-        message.tensor.CopyFrom(tensor_to_protobuf(value))
+        message.tensor.CopyFrom(tensor_to_protobuf(value, payloads))
     elif isinstance(value, Iterable):
         if len(value) > 0:
             for item in value:
@@ -190,11 +259,11 @@ def assign_op_attr(message, value):
         raise unhandled_scalar_value(value)
 
 
-def op_to_protobuf(op):
+def op_to_protobuf(op, payloads=None):
     """
     Converts all attributes of an op into protobuf values and returns it. Skips over the
     properties of `args`, `ops`, `control_deps`, and `forward` since those are added as
-    edges separately.
+    edges separately. Large tensors are put in `payloads` if given, see tensor_to_protobuf.
     """
     pb_op = ops_pb.Op(name=op.name, op_type=op.__class__.__name__)
     if hasattr(op, 'dtype'):
@@ -206,7 +275,7 @@ def op_to_protobuf(op):
         # hetr only
         if key in ('hetr_replaced_by', 'replaces_op', 'layout', 'clones'):
             continue
-        assign_op_attr(pb_op.attrs['_ngraph_metadata_' + key], op.metadata[key])
+        assign_op_attr(pb_op.attrs['_ngraph_metadata_' + key], op.metadata[key], payloads)
 
     if hasattr(op, '_ngraph_ser_handle'):
         pb_op.attrs['_ngraph_ser_handle'].scalar.bool_val = True
@@ -218,7 +287,7 @@ def op_to_protobuf(op):
     # issus tracker for gory details)
     if hasattr(op, 'valfun'):
         pb_op.attrs['valfun_value'].tensor.CopyFrom(
-            tensor_to_protobuf(op.valfun(op.tensor_description())))
+            tensor_to_protobuf(op.valfun(op.tensor_description()), payloads))
 
     # These are handled above
     ignored_keys = {'valfun', 'uuid', 'dtype', 'metadata', 'layout_view', 'in_view', 'out_view',
@@ -235,7 +304,7 @@ def op_to_protobuf(op):
              all(map(lambda x: isinstance(x, Op), val))):
             # These will be handled in `add_edges`
             continue
-        assign_op_attr(pb_op.attrs[key], getattr(op, key))
+        assign_op_attr(pb_op.attrs[key], getattr(op, key), payloads)
     return pb_op
 
 
@@ -282,17 +351,18 @@ def add_edges(pb_edges, pb_ops, op):
             # TODO(jknight): assert that ALL values of this list are op references
 
 
-def _serialize_graph(ops):
+def _serialize_graph(ops, payloads=None):
     """
     Serializes a graph and returns the actual protobuf python object (rather than serialized
-    byte string as done by `serialize_graph`).
+    byte string as done by `serialize_graph`). Large tensors are put in `payloads` if given,
+    see tensor_to_protobuf.
     """
     assert isinstance(ops, Iterable), "Ops passed into `serialize_graph` must be an iterable"
     ops = Op.all_op_references(ops)
     pb_ops = []
     pb_edges = []
     for op in ops:
-        pb_ops.append(op_to_protobuf(op))
+        pb_ops.append(op_to_protobuf(op, payloads))
         add_edges(pb_edges, pb_ops, op)
 
     graph_def = ops_pb.GraphDef()
@@ -317,7 +387,42 @@ def serialize_graph(ops, only_return_handle_ops=False):
     if only_return_handle_ops:
         for op in ops:
             op._ngraph_ser_handle = True
-    return _serialize_graph(ops).SerializeToString()
+    graph_def = _serialize_graph(ops)
+    graph = graph_def.SerializeToString()
+    # Messages larger than protobuf allows serialize to nothing
+    if len(graph) == 0 and len(graph_def.ops) > 0:
+        raise ValueError("Serialized graph is larger than protobuf allows, use "
+                         "serialize_graph_to_file to store the large tensors out of it")
+    return graph
+
+
+def serialize_graph_to_file(ops, f, only_return_handle_ops=False, payload_threshold=1 << 16):
+    """
+    Writes ngraph graph to a graph archive: the serialized protobuf graph followed by the data
+    of its large tensors as aligned payloads, which deserialize_graph_from_file memory-maps
+    rather than copies. The tensors are written straight from their arrays.
+
+    Params:
+      f <string or file-like>: The file name or binary file object to write the archive to.
+      only_return_handle_ops <bool>: See serialize_graph.
+      payload_threshold <int>: Tensors of at least this many bytes are written as payloads,
+          smaller ones are embedded in the graph.
+    """
+    if isinstance(f, six.string_types):
+        with open(f, 'wb') as archive_file:
+            return serialize_graph_to_file(ops, archive_file, only_return_handle_ops,
+                                           payload_threshold)
+
+    if only_return_handle_ops:
+        for op in ops:
+            op._ngraph_ser_handle = True
+    payloads = TensorPayloads(payload_threshold)
+    graph = _serialize_graph(ops, payloads).SerializeToString()
+    f.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, len(graph)))
+    f.write(graph)
+    header_size = ARCHIVE_HEADER.size + len(graph)
+    f.write(b'\0' * (align_payload(header_size) - header_size))
+    payloads.write(f)
 
 
 ##################
@@ -344,8 +449,25 @@ def data_to_tensor(data, info):
         return data_array.reshape(info.shape)
 
 
-def pb_to_tensor(pb_tensor):
-    return data_to_tensor(pb_tensor.data, pb_tensor.info)
+def pb_to_tensor(pb_tensor, payloads=None):
+    """
+    Args:
+        pb_tensor <protobuf Tensor>: The tensor to convert.
+        payloads <np.ndarray>: The bytes of the payloads of the graph archive pb_tensor was
+            read from, which tensors stored as payloads are views of.
+    """
+    if pb_tensor.WhichOneof('payload') != 'offset':
+        return data_to_tensor(pb_tensor.data, pb_tensor.info)
+    if payloads is None:
+        raise ValueError("Tensor data is stored in a graph archive, which must be read with "
+                         "deserialize_graph_from_file")
+    np_dtype = pb_to_dtype(pb_tensor.info.dtype)
+    size = int(np.prod(pb_tensor.info.shape)) * np_dtype.itemsize
+    data_array = payloads[pb_tensor.offset:pb_tensor.offset + size].view(np_dtype)
+    if len(pb_tensor.info.shape) == 0:
+        return data_array[0]
+    else:
+        return data_array.reshape(pb_tensor.info.shape)
 
 
 def protobuf_scalar_to_python(val):
@@ -379,12 +501,12 @@ def protobuf_to_axes(msg):
     return axes
 
 
-def protobuf_attr_to_python(val):
+def protobuf_attr_to_python(val, payloads=None):
     if val.HasField('scalar'):
         return protobuf_scalar_to_python(val.scalar)
 
     if val.HasField('tensor'):
-        return pb_to_tensor(val.tensor)
+        return pb_to_tensor(val.tensor, payloads)
     elif val.HasField('repeated_scalar'):
         if len(val.repeated_scalar.val) == 1 and \
                 val.repeated_scalar.val[0].string_val == '_ngraph_iter_sentinel_':
@@ -413,22 +535,56 @@ def pb_to_axis(msg):
     return axis
 
 
+def _register_op_classes(classes, cls):
+    """ Add cls and its subclasses to the registry `classes` under their class names. """
+    classes.setdefault(cls.__name__, cls)
+    for subclass in cls.__subclasses__():
+        _register_op_classes(classes, subclass)
+
+
+def get_op_classes():
+    """
+    Returns the registry of op classes by name, built the first time it is needed by walking
+    over the python modules in ngraph.op_graph (subpackages such as serde hold no ops and
+    may need optional dependencies). Classes found in an earlier module take priority over
+    classes of the same name in later modules.
+    """
+    global OP_CLASSES
+    if OP_CLASSES is None:
+        classes = dict()
+        for importer, modname, ispkg in pkgutil.iter_modules(ngraph.op_graph.__path__):
+            if ispkg:
+                continue
+            imported_mod = importlib.import_module('ngraph.op_graph.' + modname)
+            for name, value in vars(imported_mod).items():
+                if isinstance(value, type) and issubclass(value, Op):
+                    classes.setdefault(name, value)
+        OP_CLASSES = classes
+    return OP_CLASSES
+
+
 def get_ngraph_op_cls(op_type):
-    """ Walk over python modules in ngraph.op_graph and look for op_type class. """
-    for importer, modname, ispkg in pkgutil.iter_modules(ngraph.op_graph.__path__):
-        imported_mod = importlib.import_module('ngraph.op_graph.' + modname)
-        if hasattr(imported_mod, op_type):
-            return getattr(imported_mod, op_type)
-    raise ValueError("Cannot find op_type of {} in any ngraph.op_graph modules.".format(op_type))
+    """
+    Look up the op_type class in the registry of ngraph.op_graph ops, and failing that among
+    the subclasses of Op defined elsewhere.
+    """
+    classes = get_op_classes()
+    if op_type not in classes:
+        _register_op_classes(classes, Op)
+        if op_type not in classes:
+            raise ValueError("Cannot find op_type of {} in any ngraph.op_graph modules "
+                             "or subclasses of Op.".format(op_type))
+    return classes[op_type]
 
 
-def protobuf_to_op(pb_op):
+def protobuf_to_op(pb_op, payloads=None):
     """
     This will convert a protobuf Op object into its corresponding Python object. But this cannot
     setup links to other ops (such as args, control_deps) since those ops may not
     exist yet.
     We have to wait until all ops are created before connecting them back up together in a second
     pass, so args, etc will be uninitialized.
+    Tensors stored as payloads of a graph archive are views of `payloads`, see pb_to_tensor.
     """
     cls = get_ngraph_op_cls(pb_op.op_type)
 
@@ -439,47 +595,45 @@ def protobuf_to_op(pb_op):
     py_op.name = pb_op.name
 
     if 'valfun_value' in pb_op.attrs:
-        valfun_value = pb_to_tensor(pb_op.attrs['valfun_value'].tensor)
+        valfun_value = pb_to_tensor(pb_op.attrs['valfun_value'].tensor, payloads)
         py_op.valfun = lambda x: valfun_value
 
     # op.uuid
     py_op.uuid = uuid.UUID(bytes=pb_op.uuid.uuid)
 
     # op.metadata and remaining keys
-    ignored_keys = {'valfun_value', 'dtype', 'metadata'}
-    remaining_keys = set(pb_op.attrs.keys()).difference(ignored_keys)
-    for key in remaining_keys:
-        if key == '_ngraph_ser_handle':
-            py_op._ngraph_ser_handle = True
-        if key.startswith('_ngraph_metadata_'):
-            value = pb_op.attrs[key]
-            py_op.metadata[key[17:]] = protobuf_attr_to_python(value)
-        elif not key.startswith('_is_') and key not in EXCEPTION_ATTRIBUTES and \
-                key.startswith('_'):
+    for key, value in pb_op.attrs.items():
+        if key in IGNORED_ATTRIBUTES:
             continue
-        else:
-            value = pb_op.attrs[key]
-            setattr(py_op, key, protobuf_attr_to_python(value))
+        elif key == '_ngraph_ser_handle':
+            py_op._ngraph_ser_handle = True
+        elif key.startswith('_ngraph_metadata_'):
+            py_op.metadata[key[17:]] = protobuf_attr_to_python(value, payloads)
+        elif not key.startswith('_') or key.startswith('_is_') or key in EXCEPTION_ATTRIBUTES:
+            setattr(py_op, key, protobuf_attr_to_python(value, payloads))
     return py_op
 
 
-def _deserialize_graph(graph_pb):
+def _deserialize_graph(graph_pb, payloads=None):
     """
     Will deserialize a graph and return the list of all ops in that graph. Does not bother
     filtering down to only the original set of ops the user passed in for serialization
     (if that's what the user desired upon serializing with the serialization
-    only_return_handle_ops parameter).
+    only_return_handle_ops parameter). Tensors stored as payloads of a graph archive are views
+    of `payloads`, see pb_to_tensor.
     """
     # For safety we clear this registry
     GLOBAL_AXIS_REGISTRY.clear()
 
-    ops = list(map(protobuf_to_op, graph_pb.ops))
+    ops = [protobuf_to_op(pb_op, payloads) for pb_op in graph_pb.ops]
     uuid_lookup = {op.uuid.bytes: op for op in ops}
+    # Collect args in lists rather than growing tuples, which is quadratic in the number of args
+    args = collections.defaultdict(list)
     for edge in graph_pb.edges:
         head_op = uuid_lookup[edge.from_uuid.uuid]
         tail_op = uuid_lookup[edge.to_uuid.uuid]
         if edge.edge_type == ops_pb.Edge.DATA:  # args
-            tail_op._args = tail_op._args + (head_op,)
+            args[tail_op].append(head_op)
         elif edge.edge_type == ops_pb.Edge.CONTROL:  # control_deps
             head_op._control_deps.add(tail_op)
         elif edge.edge_type == ops_pb.Edge.CONTAINER:
@@ -500,6 +654,8 @@ def _deserialize_graph(graph_pb):
                     setattr(head_op, key, OrderedSet([tail_op]))
         else:
             raise ValueError("Edge not mapped to op: {}".format(edge))
+    for tail_op, tail_args in args.items():
+        tail_op._args = tuple(tail_args)
 
     # This must come after tensor has been set which occurs after edges
     # op.dtype
@@ -529,3 +685,21 @@ def deserialize_graph(graph_msg):
     the Ops of the graph.
     """
     return _deserialize_graph(ops_pb.GraphDef.FromString(graph_msg))
+
+
+def deserialize_graph_from_file(f):
+    """
+    Reads a graph archive written by serialize_graph_to_file and returns the Ops of the graph.
+    The tensors stored as payloads are read-only arrays memory-mapped from the archive.
+
+    Params:
+      f <string or file-like>: The file name or binary file object of the archive, which must
+          start at the beginning of the file.
+    """
+    archive = np.memmap(f, dtype=np.uint8, mode='r')
+    magic, graph_size = ARCHIVE_HEADER.unpack(archive[:ARCHIVE_HEADER.size].tobytes())
+    if magic != ARCHIVE_MAGIC:
+        raise ValueError("Not a graph archive: {}".format(f))
+    header_size = ARCHIVE_HEADER.size + graph_size
+    graph_pb = ops_pb.GraphDef.FromString(archive[ARCHIVE_HEADER.size:header_size].tobytes())
+    return _deserialize_graph(graph_pb, archive[align_payload(header_size):].view(np.ndarray))
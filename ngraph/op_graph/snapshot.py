@@ -0,0 +1,259 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from __future__ import division
+
+import itertools
+
+import numpy as np
+from orderedset import OrderedSet
+
+from ngraph.op_graph.op_graph import Op
+
+
+def op_deps(op):
+    """
+    Returns: The forwarded dependencies of op, without duplicates.
+    """
+    return OrderedSet(dep.forwarded for dep in op.all_deps)
+
+
+class GraphSnapshot(object):
+    """
+    The ops reachable from some roots, with dense integer ids and a cached
+    topological order, for passes that walk the whole graph many times.
+
+    An op's id is its position in Op.ordered_ops when the snapshot is built.
+    The dependencies of the ops are kept as CSR arrays over ids, and the users
+    of each op as the transposed arrays.
+
+    replace() updates the snapshot in place after an op has been replaced:
+    - Ops new to the graph get the next ids and are placed after their
+      dependencies and before the first user of the replaced op.
+    - Users are moved to the replacement.
+    - Ops left without users are dropped.
+    Changes made to the graph in any other way are not seen until refresh().
+
+    Arguments:
+        roots: The ops the graph is reachable from.
+    """
+
+    def __init__(self, roots):
+        self.roots = [root.forwarded for root in roots]
+        self.build()
+
+    def build(self):
+        ops = Op.ordered_ops(self.roots)
+        self.stale = False
+        self.ops = list(ops)
+        self.ids = {op: op_id for op_id, op in enumerate(ops)}
+        deps = [[self.ids[dep] for dep in op_deps(op)] for op in ops]
+
+        n_ops = len(ops)
+        dep_counts = np.fromiter(map(len, deps), dtype=np.int64, count=n_ops)
+        self.dep_offsets = np.zeros(n_ops + 1, dtype=np.int64)
+        np.cumsum(dep_counts, out=self.dep_offsets[1:])
+        self.dep_ids = np.fromiter(itertools.chain.from_iterable(deps), dtype=np.int64,
+                                   count=self.dep_offsets[-1])
+
+        user_counts = np.bincount(self.dep_ids, minlength=n_ops)
+        self.user_offsets = np.zeros(n_ops + 1, dtype=np.int64)
+        np.cumsum(user_counts, out=self.user_offsets[1:])
+        self.user_ids = np.repeat(np.arange(n_ops), dep_counts)[
+            np.argsort(self.dep_ids, kind='mergesort')]
+
+        # Changes since the CSR arrays were built
+        self.changed_deps = dict()
+        self.added_users = dict()
+        self.user_counts = user_counts.tolist()
+        self.positions = list(range(n_ops))
+        self.live = [True] * n_ops
+        self.ordered = self.ops
+
+    def refresh(self):
+        """
+        Rebuild the snapshot if the graph was changed other than through replace().
+        """
+        if self.stale:
+            self.roots = [root.forwarded for root in self.roots]
+            self.build()
+
+    def deps(self, op_id):
+        """
+        Returns: The ids of the dependencies of the op with id op_id.
+        """
+        deps = self.changed_deps.get(op_id)
+        if deps is None:
+            deps = self.dep_ids[self.dep_offsets[op_id]:self.dep_offsets[op_id + 1]].tolist()
+        return deps
+
+    def users(self, op_id):
+        """
+        Returns: The ids of the live ops depending on the op with id op_id.
+        """
+        users = []
+        if op_id < len(self.user_offsets) - 1:
+            users.extend(self.user_ids[self.user_offsets[op_id]:
+                                       self.user_offsets[op_id + 1]].tolist())
+        users.extend(self.added_users.get(op_id, ()))
+        return [user for user in OrderedSet(users)
+                if self.live[user] and op_id in self.deps(user)]
+
+    def ordered_ops(self):
+        """
+        Returns: The ops of the graph in an execution order.
+        """
+        self.refresh()
+        if self.ordered is None:
+            ordered_ids = sorted((op_id for op_id, live in enumerate(self.live) if live),
+                                 key=self.positions.__getitem__)
+            self.ordered = [self.ops[op_id] for op_id in ordered_ids]
+        return self.ordered
+
+    def add_ops(self, op, added):
+        """
+        Give ids to op and the ops it depends on that are not in the graph, appending
+        their ids to added in an execution order.
+
+        Returns:
+            False if the ops form a cycle.
+        """
+        visiting = set()
+        pending = [(op, False)]
+        while pending:
+            op, deps_added = pending.pop()
+            op_id = self.ids.get(op)
+            if op_id is not None and (self.live[op_id] or op_id in added):
+                continue
+            if not deps_added:
+                if op in visiting:
+                    return False
+                visiting.add(op)
+                pending.append((op, True))
+                pending.extend((dep, False) for dep in reversed(op_deps(op)))
+                continue
+            if op_id is None:
+                op_id = len(self.ops)
+                self.ops.append(op)
+                self.ids[op] = op_id
+                self.user_counts.append(0)
+                self.positions.append(None)
+                self.live.append(False)
+            self.set_deps(op_id, [self.ids[dep] for dep in op_deps(op)])
+            added.append(op_id)
+        return True
+
+    def set_deps(self, op_id, deps):
+        """
+        Make the ids deps the dependencies of the op with id op_id.
+
+        Returns:
+            The ids of the ops op_id no longer depends on.
+        """
+        old_deps = self.deps(op_id) if op_id < len(self.dep_offsets) - 1 \
+            or op_id in self.changed_deps else []
+        self.changed_deps[op_id] = deps
+        for dep in deps:
+            if dep not in old_deps:
+                self.added_users.setdefault(dep, []).append(op_id)
+                self.user_counts[dep] += 1
+        removed = [dep for dep in old_deps if dep not in deps]
+        for dep in removed:
+            self.user_counts[dep] -= 1
+        return removed
+
+    def place_ops(self, added, users):
+        """
+        Place the ops with ids added, in order, after their dependencies and before
+        the ops with ids users.
+
+        Returns:
+            False if their dependencies are not all before those users.
+        """
+        before = min([self.positions[user] for user in users] or [float('inf')])
+        lower = max([self.positions[dep] for op_id in added for dep in self.deps(op_id)
+                     if dep not in added] or [-1])
+        if lower >= before:
+            return False
+        if before == float('inf'):
+            before = lower + len(added) + 1
+        step = (before - lower) / (len(added) + 1)
+        if step < 1e-6:
+            # positions have been split too finely, so renumber them
+            self.ordered = None
+            for position, op in enumerate(self.ordered_ops()):
+                self.positions[self.ids[op]] = position
+            self.ordered = None
+            return self.place_ops(added, users)
+        for index, op_id in enumerate(added):
+            self.positions[op_id] = lower + (index + 1) * step
+            self.live[op_id] = True
+        return True
+
+    def replace(self, op, replacement):
+        """
+        Update the snapshot after op was replaced by replacement.
+        """
+        op_id = self.ids.get(op)
+        if self.stale or op_id is None or not self.live[op_id]:
+            return
+        self.ordered = None
+        self.stale = not self.rewire(op_id, self.users(op_id))
+        if self.stale:
+            return
+
+        # the users may depend on the replacement through new ops, such as a
+        # TensorValueOp, so only roots are replaced directly
+        self.roots = [root.forwarded for root in self.roots]
+        added = []
+        for root in self.roots:
+            if not self.add_ops(root, added):
+                self.stale = True
+                return
+        if added and not self.place_ops(added, []):
+            self.stale = True
+            return
+
+        # drop ops that are no longer used
+        roots = set(self.ids[root] for root in self.roots)
+        unused = [op_id]
+        while unused:
+            op_id = unused.pop()
+            if op_id in roots or not self.live[op_id] or self.user_counts[op_id] > 0:
+                continue
+            self.live[op_id] = False
+            for dep in self.set_deps(op_id, []):
+                if self.user_counts[dep] == 0:
+                    unused.append(dep)
+
+    def rewire(self, op_id, users):
+        """
+        Update the dependencies of users, which depended on the op with id op_id.
+
+        Returns:
+            False if the users now depend on ops that can not be placed before them.
+        """
+        added = []
+        for user in users:
+            for dep in op_deps(self.ops[user]):
+                if not self.add_ops(dep, added):
+                    return False
+        if added and not self.place_ops(added, users):
+            return False
+        for user in users:
+            deps = [self.ids[dep] for dep in op_deps(self.ops[user])]
+            if any(self.positions[dep] >= self.positions[user] for dep in deps):
+                return False
+            self.set_deps(user, deps)
+        return True
@@ -18,11 +18,13 @@ from ngraph.transformers.base import make_transformer, set_transformer_factory,
     transformer_choices,  \
     allocate_transformer, make_transformer_factory, Transformer, \
     UnsupportedTransformerException
+from ngraph.transformers.batching import RequestBatcher
 
 __all__ = [
     'allocate_transformer',
     'make_transformer',
     'make_transformer_factory',
+    'RequestBatcher',
     'set_transformer_factory',
     'transformer_choices',
     'Transformer'
@@ -23,11 +23,10 @@ from builtins import object
 from future.utils import with_metaclass
 
 from ngraph.op_graph.op_graph import Op, computation
+from ngraph.op_graph.snapshot import GraphSnapshot
 from ngraph.util.names import NameableValue
 from orderedset import OrderedSet
 
-from ngraph.util.trace_events import is_tracing_enabled
-
 PYCUDA_LOGIC_ERROR_CODE = 4
 
 logger = logging.getLogger(__name__)
@@ -103,11 +102,6 @@ class Computation(NameableValue):
 
         self.executor()
 
-        # Generate a timeline for the computation
-        if is_tracing_enabled():
-            self.generate_profile(self.executor.__profiler_start__,
-                                  self.executor.__profiler_stop__)
-
         # TODO Should copy this out of the device to a destination when it is not scalar
         def value(op):
             """
@@ -133,7 +127,39 @@ class Computation(NameableValue):
         else:
             return None
 
-    def generate_profile(self, profiler_start, profiler_stop):
+    @property
+    def profiler(self):
+        """
+
+        Returns: The ExOpProfiler recording this computation, or None if it was compiled
+            without tracing.
+
+        """
+        return getattr(self.executor, 'profiler', None)
+
+    def profile_summary(self):
+        """
+        Per op type execution time statistics collected while tracing is enabled.
+
+        Returns:
+            OrderedDict from op type name to a dict with count, total, mean, p50 and p99
+            execution times in seconds.
+        """
+        if self.profiler is None:
+            raise ValueError((
+                'Computation {} was not compiled with profiling; set TRACING=1 or call '
+                'ngraph.util.trace_events.set_tracing_enabled(True) before creating it.'
+            ).format(self.name))
+        return self.profiler.summary()
+
+    def generate_profile(self, filename=None):
+        """
+        Write the recorded timings as a Chrome trace.
+
+        Arguments:
+            filename: Name of the trace, without the .json suffix. Defaults to the name
+                of the computation op.
+        """
         pass
 
 
@@ -489,8 +515,9 @@ class ComputationGraphTransformer(Transformer):
         self.initialized = False
 
     def run_registered_graph_passes(self, ops, **kwargs):
+        graph = GraphSnapshot(ops)
         for graph_pass in self.graph_passes:
-            graph_pass.wrapped_do_pass(ops=ops, **kwargs)
+            graph_pass.wrapped_do_pass(ops=ops, graph=graph, **kwargs)
         return ops
 
     def initialize_allocations(self):
@@ -0,0 +1,191 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from __future__ import division
+
+import collections
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+from monotonic import monotonic
+from orderedset import OrderedSet
+from six.moves import queue
+
+from ngraph.op_graph.op_graph import Op
+
+
+class RequestBatcher(object):
+    """
+    Serves single-sample calls of a computation by running them in batches.
+
+    Calls from any number of threads are queued. A worker thread takes the oldest
+    request, waits up to max_latency seconds for more, and runs up to max_batch_size
+    of them as one call of the computation, which must accept batches smaller than
+    the one it was compiled for. Each caller gets its own sample of every result.
+
+    Every parameter of the computation must have the batch axis; samples are passed
+    without it. Results without the batch axis are given whole to every caller. The
+    computation only runs on the worker thread, so nothing else may run computations
+    of its transformer while the batcher is open.
+
+    Arguments:
+        computation: The computation, compiled for the largest batch.
+        max_batch_size: The most requests run together. Defaults to the length of the
+            batch axis.
+        max_latency: Seconds the oldest queued request waits for others.
+    """
+
+    def __init__(self, computation, max_batch_size=None, max_latency=0.002):
+        computation_op = computation.computation_op
+        self.computation = computation
+        self.returns = computation_op.returns
+        self.parameter_positions = []
+        batch_axes = set()
+        for param in computation_op.parameters:
+            batch_axis = param.axes.batch_axis()
+            if batch_axis is None:
+                raise ValueError("Parameter {} does not have a batch axis".format(param))
+            batch_axes.add(batch_axis)
+            self.parameter_positions.append(param.axes.index(batch_axis))
+        if len(batch_axes) != 1:
+            raise ValueError("Parameters must share one batch axis, found {}".format(
+                sorted(axis.name for axis in batch_axes)))
+        batch_axis = batch_axes.pop()
+        if max_batch_size is None:
+            max_batch_size = batch_axis.length
+        if not 0 < max_batch_size <= batch_axis.length:
+            raise ValueError("max_batch_size must be between 1 and {}".format(
+                batch_axis.length))
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.batch_axis = batch_axis
+
+        # Results are structured the way Computation.__call__ structures them
+        if isinstance(self.returns, Op):
+            self.result_ops = [self.returns]
+        elif isinstance(self.returns, (collections.Sequence, OrderedSet, collections.Set)):
+            self.result_ops = list(self.returns)
+        else:
+            self.result_ops = []
+        self.result_positions = [op.axes.index(batch_axis)
+                                 if op.is_tensor_op and batch_axis in op.axes else None
+                                 for op in self.result_ops]
+
+        self.requests = queue.Queue()
+        # Held to check closed and queue a request, so none is queued after the sentinel
+        self.lock = threading.Lock()
+        self.closed = False
+        self.worker = threading.Thread(target=self.serve)
+        self.worker.daemon = True
+        self.worker.start()
+
+    def submit(self, *args):
+        """
+        Queue one sample.
+
+        Arguments:
+            *args: One sample of each parameter, without the batch axis.
+
+        Returns:
+            A Future for the results of the computation for this sample.
+        """
+        if len(args) != len(self.parameter_positions):
+            raise ValueError("Computation was expecting {} arguments, but was called with "
+                             "{}.".format(len(self.parameter_positions), len(args)))
+        future = Future()
+        with self.lock:
+            if self.closed:
+                raise ValueError("RequestBatcher is closed")
+            self.requests.put((args, future))
+        return future
+
+    def __call__(self, *args):
+        """
+        Run one sample and wait for its results.
+        """
+        return self.submit(*args).result()
+
+    def close(self):
+        """
+        Run the requests already queued and stop the worker thread.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.requests.put(None)
+        self.worker.join()
+
+    def serve(self):
+        stopping = False
+        while not stopping:
+            request = self.requests.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                try:
+                    request = self.requests.get(timeout=max(deadline - monotonic(), 0))
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self.run_batch(batch)
+
+    def run_batch(self, batch):
+        batch = [(args, future) for args, future in batch
+                 if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            inputs = [np.stack([args[index] for args, future in batch], axis=position)
+                      for index, position in enumerate(self.parameter_positions)]
+            results = self.computation(*inputs)
+            if isinstance(self.returns, Op):
+                results = [results]
+            elif isinstance(results, dict):
+                results = [results[op] for op in self.result_ops]
+            elif results is None:
+                results = []
+            for sample, (args, future) in enumerate(batch):
+                future.set_result(self.sample_results(results, sample))
+        except Exception as error:
+            for args, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+
+    def sample_results(self, results, sample):
+        """
+        Returns: The results of one sample, structured like the results of the
+            computation.
+        """
+        values = []
+        for result, position in zip(results, self.result_positions):
+            if result is None:
+                values.append(None)
+            elif position is None:
+                values.append(np.copy(result))
+            else:
+                values.append(np.take(result, sample, position))
+        if isinstance(self.returns, Op):
+            return values[0]
+        elif isinstance(self.returns, (collections.Sequence, OrderedSet)):
+            return tuple(values)
+        elif isinstance(self.returns, collections.Set):
+            return dict(zip(self.result_ops, values))
+        return None
@@ -0,0 +1,128 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from __future__ import division
+
+
+def axis_components(axis):
+    """
+    Yields the axes flattened into axis, or axis itself.
+    """
+    if axis.is_flattened:
+        for component in axis.axes:
+            for item in axis_components(component):
+                yield item
+    else:
+        yield axis
+
+
+def batch_components(axes):
+    """
+    Returns: The batch axes among axes, looking through flattened axes.
+    """
+    return [component for axis in axes for component in axis_components(axis)
+            if component.is_batch]
+
+
+def atomic_axes(axes, strides):
+    """
+    Yields (axis, stride) for every axis in axes, looking through flattened axes.
+
+    Args:
+        axes: The axes of a tensor description.
+        strides: Its nested full strides.
+    """
+    for axis, stride in zip(axes, strides):
+        if axis.is_flattened:
+            for item in atomic_axes(axis.axes, stride):
+                yield item
+        else:
+            yield axis, stride
+
+
+def batch_stride(base, batch_axis):
+    """
+    Returns: The byte stride of batch_axis in the tensor description base, or None if
+        base does not have batch_axis.
+    """
+    stride = None
+    for axis, axis_stride in atomic_axes(base.axes, base.full_strides):
+        if not axis.is_batch:
+            continue
+        if stride is not None or axis.length != batch_axis.length:
+            raise ValueError("Tensor {} does not have a single batch axis of length {}"
+                             .format(base.name, batch_axis.length))
+        stride = axis_stride
+    if stride is None:
+        return None
+    for axis, axis_stride in atomic_axes(base.axes, base.full_strides):
+        if axis_stride > stride and axis_stride % (stride * batch_axis.length) != 0:
+            raise ValueError("Tensor {} is not laid out densely around its batch axis"
+                             .format(base.name))
+    return stride
+
+
+def resize(x, stride, length, batch_size):
+    """
+    Returns: The byte stride or offset x in a tensor whose batch axis has byte stride
+        stride and length entries, once the tensor is laid out densely for batch_size
+        entries. x itself if stride is None.
+    """
+    if stride is None:
+        return x
+    outer = stride * length
+    return x // outer * stride * batch_size + x % outer
+
+
+def batch_view(tensor_description, base, batch_axis, batch_size):
+    """
+    Describe a view when batch_axis holds batch_size entries instead of its length.
+
+    The tensor it views is laid out densely for batch_size in the same memory, so
+    every axis outside the batch axis moves closer and the tensor ends early.
+
+    Args:
+        tensor_description: The view.
+        base: The tensor description of the viewed tensor.
+        batch_axis: The batch Axis the tensor was compiled for.
+        batch_size: Number of entries along batch_axis, at most its length.
+
+    Returns:
+        (shape, strides, offset) of the view, in bytes like the tensor description.
+    """
+    length = batch_axis.length
+    stride = batch_stride(base, batch_axis)
+
+    def digit(x):
+        return x % (stride * length) // stride
+
+    if stride is not None and digit(tensor_description.offset) != 0:
+        raise ValueError("View {} starts inside the batch axis".format(tensor_description.name))
+
+    shape = []
+    strides = []
+    for axis, axis_stride in zip(tensor_description.axes, tensor_description.strides):
+        batch = [component for component in axis_components(axis) if component.is_batch]
+        if any(component.length != length for component in batch):
+            raise ValueError("View {} slices the batch axis".format(tensor_description.name))
+        axis_length = axis.length
+        if batch:
+            axis_length = axis_length // length * batch_size
+        elif stride is not None and (axis_stride < 0 or digit(axis_stride) != 0):
+            raise ValueError("View {} steps through the batch axis"
+                             .format(tensor_description.name))
+        shape.append(axis_length)
+        strides.append(resize(axis_stride, stride, length, batch_size))
+    return tuple(shape), tuple(strides), resize(tensor_description.offset, stride, length,
+                                                batch_size)
@@ -22,6 +22,8 @@ void create_mkldnn_conv_fprop_kernel(mkldnn_engine_t engine, int src_dims,
                                      int* dst_sizes, int* strides, int* padding,
                                      mkldnn_memory_desc_t* input_src_md,
                                      mkldnn_memory_desc_t* input_weights_md,
+                                     mkldnn_memory_desc_t* input_residual_md,
+                                     int fuse_relu, float relu_slope,
                                      mkldnn_data_type_t data_type,
                                      mkldnn_opkernel_t opkernel) {
   // Create an optimized convolution kernel
@@ -49,8 +51,26 @@ void create_mkldnn_conv_fprop_kernel(mkldnn_engine_t engine, int src_dims,
       &mkldnn_memory_desc_dst_md, strides, padding, padding,
       mkldnn_padding_zero));
 
-  MKL_CHECK(mkldnn_primitive_desc_create(&opkernel->op_desc, &conv_desc, engine,
-                                         NULL));
+  // Fused post-ops: the residual is summed into dst, then the relu is applied
+  if (input_residual_md || fuse_relu) {
+    mkldnn_post_ops_t post_ops;
+    mkldnn_primitive_attr_t attr;
+    MKL_CHECK(mkldnn_post_ops_create(&post_ops));
+    if (input_residual_md)
+      MKL_CHECK(mkldnn_post_ops_append_sum(post_ops, 1.0));
+    if (fuse_relu)
+      MKL_CHECK(mkldnn_post_ops_append_eltwise(post_ops, 1.0, mkldnn_eltwise_relu,
+                                               relu_slope, 0.0));
+    MKL_CHECK(mkldnn_primitive_attr_create(&attr));
+    MKL_CHECK(mkldnn_primitive_attr_set_post_ops(attr, post_ops));
+    MKL_CHECK(mkldnn_primitive_desc_create_v2(&opkernel->op_desc, &conv_desc,
+                                              attr, engine, NULL));
+    MKL_CHECK(mkldnn_primitive_attr_destroy(attr));
+    MKL_CHECK(mkldnn_post_ops_destroy(post_ops));
+  } else {
+    MKL_CHECK(mkldnn_primitive_desc_create(&opkernel->op_desc, &conv_desc, engine,
+                                           NULL));
+  }
 
   const_mkldnn_primitive_desc_t kernel_src_pd =
       mkldnn_primitive_desc_query_pd(opkernel->op_desc, mkldnn_query_src_pd, 0);
@@ -93,10 +113,12 @@ void create_mkldnn_conv_fprop_kernel(mkldnn_engine_t engine, int src_dims,
                                &(opkernel->outputs[0]));
   // create_mkldnn_tensor(dst_dims, dst_sizes, data_type, mkldnn_chwn,
   //                     engine, &(opkernel->outputs[0]));
-  if (bias_sizes)
-    opkernel->num_inputs = 3;
-  else
-    opkernel->num_inputs = 2; 
+  int residual_index = bias_sizes ? 3 : 2;
+  if (input_residual_md) {
+    create_mkldnn_tensor_from_md(dst_dims, dst_sizes, input_residual_md, engine,
+                                 &(opkernel->inputs[residual_index]));
+  }
+  opkernel->num_inputs = input_residual_md ? residual_index + 1 : residual_index;
   opkernel->num_outputs = 1;
 
   // Reorder inputs
@@ -230,6 +252,19 @@ void create_mkldnn_conv_fprop_kernel(mkldnn_engine_t engine, int src_dims,
 
   const_mkldnn_primitive_t conv_dsts[] = {mkldnn_memory_prim_dst};
 
+  // The sum post-op accumulates into dst, which starts as a copy of the residual
+  opkernel->reorder_i[residual_index] = NULL;
+  if (input_residual_md) {
+    mkldnn_primitive_desc_t reorder_pd;
+    MKL_CHECK(mkldnn_reorder_primitive_desc_create(
+        &reorder_pd, opkernel->inputs[residual_index].desc, kernel_dst_pd));
+    mkldnn_primitive_at_t inputs[] = {
+        mkldnn_primitive_at(opkernel->inputs[residual_index].prim, 0)};
+    const_mkldnn_primitive_t outputs[] = {mkldnn_memory_prim_dst};
+    MKL_CHECK(mkldnn_primitive_create(&(opkernel->reorder_i[residual_index]),
+                                      reorder_pd, inputs, outputs));
+  }
+
   mkldnn_primitive_at_t conv_srcs[3];
   conv_srcs[0] = mkldnn_primitive_at(mkldnn_memory_prim_src, 0);
   conv_srcs[1] = mkldnn_primitive_at(mkldnn_memory_prim_weights, 0);
@@ -249,6 +284,8 @@ void create_mkldnn_conv_fprop_kernel(mkldnn_engine_t engine, int src_dims,
     if (opkernel->reorder_i[2])
        opkernel->net[opkernel->net_size++] = opkernel->reorder_i[2];
   }  
+  if (opkernel->reorder_i[residual_index])
+    opkernel->net[opkernel->net_size++] = opkernel->reorder_i[residual_index];
   opkernel->net[opkernel->net_size++] = opkernel->op_prim;
   if (opkernel->reorder_o[0])
     opkernel->net[opkernel->net_size++] = opkernel->reorder_o[0];
@@ -15,11 +15,13 @@
 
 from __future__ import division
 from __future__ import print_function
+import collections
 import ctypes as ct
 import os
 import sys
 import itertools as itt
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait
 
 
 class Mkldnn(object):
@@ -42,6 +44,10 @@ class Mkldnn(object):
         self.kernels = dict()        # MKL Op kernels
         self.op_layouts = dict()     # Layout objects owned by MKLDNN
         self.native_layouts = []     # Layout objects owned by transformer
+        self.kernel_ops = collections.OrderedDict()  # Ops that made kernels or layouts
+        self.batch_kernels = dict()  # MklBatchKernels for other batch sizes
+        self.kernel_threads = 1      # Threads for the numpy kernels
+        self.kernel_pool = None
         try:
             self.mkllib = ct.CDLL(engine_path)
             self.enabled = True
@@ -79,6 +85,12 @@ class Mkldnn(object):
             self.output_layout = self.mkllib.query_opkernel_layout
             self.output_layout.argtypes = [ct.c_void_p, ct.c_int]
             self.output_layout.restype = ct.c_void_p
+            self.compare_layouts = self.mkllib.compare_mkldnn_layouts
+            self.compare_layouts.argtypes = [ct.c_void_p, ct.c_void_p, ct.c_void_p]
+            self.compare_layouts.restype = ct.c_int
+            self.layout_size = self.mkllib.query_mkldnn_layout_size
+            self.layout_size.argtypes = [ct.c_void_p, ct.c_void_p]
+            self.layout_size.restype = ct.c_size_t
 
             self.set_input_tensor = self.mkllib.set_input_tensor_data_handle
             self.set_input_tensor.argtypes = \
@@ -126,7 +138,8 @@ class Mkldnn(object):
             self.conv_fprop_kernel.argtypes = \
                 [ct.c_void_p, ct.c_int, ct.c_int, ct.c_int, ct.c_int, ct.c_void_p,
                  ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_void_p,
-                 ct.c_void_p, ct.c_void_p, ct.c_int, ct.c_void_p]
+                 ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_int, ct.c_float,
+                 ct.c_int, ct.c_void_p]
             self.conv_bprop_kernel = \
                 self.mkllib.create_mkldnn_conv_bprop_data_kernel
             self.conv_bprop_kernel.argtypes = \
@@ -183,76 +196,175 @@ class Mkldnn(object):
             self.mkldnn_engine_initialized = True
 
     def close(self):
+        self.set_kernel_threads(1)
         if (self.mkldnn_engine_initialized):
             for op in self.kernels:
                 self.delete_opkernel(self.kernels[op])
+            for batch_kernels in self.batch_kernels.values():
+                for op in batch_kernels.kernels:
+                    self.delete_opkernel(batch_kernels.kernels[op])
             for layout in self.native_layouts:
                 self.delete_layout(layout)
             self.destroy_mkldnn_engine_fn(self.mkldnn_engine)
             self.mkldnn_engine_initialized = False
 
-    def fprop_batchnorm(self, name, inputs, outputs, gamma, bias, mean, variance, epsilon):
-        if (self.enabled and name in self.kernels):
-            weights = np.stack([gamma[:, 0], bias[:, 0]])
-            mean_ch = mean[:, 0]
-            self.set_input_tensor(self.kernels[name], inputs.ctypes.data, 0)
-            self.set_input_tensor(self.kernels[name], mean_ch.ctypes.data, 1)
-            self.set_input_tensor(self.kernels[name], variance.ctypes.data, 2)
-            self.set_input_tensor(self.kernels[name], weights.ctypes.data, 3)
-            self.set_output_tensor(self.kernels[name], outputs.ctypes.data, 0)
-            self.run_opkernel(self.kernels[name], self.mkldnn_verbose)
-        else:
-            # self.gamma * ((in_obj - xmean) * ng.reciprocal(ng.sqrt(xvar +
-            # self.eps))) + self.beta)
-            self.xhat = (inputs - mean) / (np.sqrt(variance + epsilon))[:, None]
-            self.batch_norm_output = gamma * self.xhat + bias
-            np.copyto(outputs, self.batch_norm_output)
-
-    def bprop_batchnorm(self, name, outputs, delta, inputs, gamma, bias, mean, variance, epsilon):
-        if (self.enabled and name in self.kernels):
-            weights = np.stack([gamma[:, 0], bias[:, 0]])
-            mean_ch = mean[:, 0]
-            self.set_input_tensor(self.kernels[name], inputs.ctypes.data, 0)
-            self.set_input_tensor(self.kernels[name], mean_ch.ctypes.data, 1)
-            self.set_input_tensor(self.kernels[name], variance.ctypes.data, 2)
-            self.set_input_tensor(self.kernels[name], delta.ctypes.data, 3)
-            self.set_input_tensor(self.kernels[name], weights.ctypes.data, 4)
-            self.set_output_tensor(self.kernels[name], outputs.ctypes.data, 0)
-            self.run_opkernel(self.kernels[name], self.mkldnn_verbose)
-        else:
-            # compute intermediate fprop op's outputs required for batchnorm bprop
-            # axis over which need to sum during bprop
-            axis = (1,)
-            red_args = {'axis': axis, 'keepdims': True}
-            gamma_scale = gamma / np.sqrt(variance + epsilon)[:, None]
-            xhat = (inputs - mean) / np.sqrt(variance + epsilon)[:, None]
-            m = np.prod([inputs.shape[ii] for ii in axis])
-            dgamma = np.sum(delta * xhat, **red_args)
-            dbeta = np.sum(delta, **red_args)
-            dx = gamma_scale * (delta - (xhat * dgamma + dbeta) / m)
-            np.copyto(outputs, dx)
-
-    def fprop_conv(self, name, conv_slices, I, F, B, O):
+    def set_kernel_threads(self, kernel_threads):
+        """
+        Split the numpy kernels, used where there is no MKL-DNN kernel, over kernel_threads
+        threads. Each thread computes its own part of the result, so results do not depend
+        on the number of threads.
+        """
+        if self.kernel_pool is not None:
+            self.kernel_pool.shutdown()
+            self.kernel_pool = None
+        self.kernel_threads = max(kernel_threads or 1, 1)
+        if self.kernel_threads > 1:
+            self.kernel_pool = ThreadPoolExecutor(self.kernel_threads - 1)
+
+    def run_blocks(self, function, length):
+        """
+        Call function(start, stop) on a block of range(length) for each kernel thread, the
+        first block in the calling thread. The numpy calls in function release the GIL.
+        """
+        num_blocks = min(self.kernel_threads, length)
+        if num_blocks <= 1:
+            function(0, length)
+            return
+        bounds = [length * block // num_blocks for block in range(num_blocks + 1)]
+        futures = [self.kernel_pool.submit(function, start, stop)
+                   for start, stop in zip(bounds[1:-1], bounds[2:])]
+        try:
+            function(bounds[0], bounds[1])
+        finally:
+            wait(futures)
+        for future in futures:
+            future.result()
+
+    def bind_kernel(self, kernel, inputs, outputs):
+        """
+        Point the data handles of a kernel at arrays that stay in place, so later runs
+        are a single run_opkernel call.
+
+        Arguments:
+            kernel: The kernel, from kernels or a batch size's kernels.
+            inputs: Arrays for the kernel inputs, in kernel order. None skips an input.
+            outputs: Arrays for the kernel outputs, in kernel order. None skips an output.
+
+        Returns:
+            The kernel handle to pass to run_opkernel.
+        """
+        kernel = ct.c_void_p(kernel)
+        for index, array in enumerate(inputs):
+            if array is not None:
+                self.set_input_tensor(kernel, array.ctypes.data, index)
+        for index, array in enumerate(outputs):
+            if array is not None:
+                self.set_output_tensor(kernel, array.ctypes.data, index)
+        return kernel
+
+    def fprop_batchnorm(self, inputs, outputs, gamma, bias, mean, variance, epsilon, stats):
+        """
+        numpy batchnorm, used when there is no MKL-DNN kernel. The result is computed
+        in outputs, so the only other storage is stats, which the executor allocates
+        once.
+
+        Arguments:
+            stats: Array of shape (1, C, 1) that receives the inverse standard deviation.
+        """
+        # self.gamma * ((in_obj - xmean) * ng.reciprocal(ng.sqrt(xvar +
+        # self.eps))) + self.beta)
+        def normalize(start, stop):
+            channels = slice(start, stop)
+            out = outputs[channels]
+            inv_std = stats[0, channels]
+            self.inverse_std(variance[channels], epsilon, inv_std)
+            np.subtract(inputs[channels], mean[channels], out=out)
+            out *= inv_std
+            out *= gamma[channels]
+            out += bias[channels]
+
+        self.run_blocks(normalize, inputs.shape[0])
+
+    def bprop_batchnorm(self, outputs, delta, inputs, gamma, mean, variance, epsilon, stats):
+        """
+        numpy batchnorm backprop, used when there is no MKL-DNN kernel. The normalized
+        input is rebuilt in outputs and the gradient is computed over it in place.
+
+        Arguments:
+            stats: Array of shape (3, C, 1) that receives the inverse standard deviation
+                and the gradients of gamma and beta.
+        """
+        # dx = gamma / std * (delta - (xhat * dgamma + dbeta) / m), reducing over axis 1
+        def backprop(start, stop):
+            channels = slice(start, stop)
+            inv_std, dgamma, dbeta = stats[:, channels]
+            self.inverse_std(variance[channels], epsilon, inv_std)
+            xhat = outputs[channels]
+            np.subtract(inputs[channels], mean[channels], out=xhat)
+            xhat *= inv_std
+            np.einsum('ij,ij->i', delta[channels], xhat, out=dgamma[:, 0])
+            np.sum(delta[channels], axis=1, keepdims=True, out=dbeta)
+            xhat *= dgamma
+            xhat += dbeta
+            xhat *= -1.0 / inputs.shape[1]
+            xhat += delta[channels]
+            xhat *= gamma[channels]
+            xhat *= inv_std
+
+        self.run_blocks(backprop, inputs.shape[0])
+
+    @staticmethod
+    def inverse_std(variance, epsilon, out):
+        np.add(variance[:, None], epsilon, out=out)
+        np.sqrt(out, out=out)
+        np.reciprocal(out, out=out)
+
+    def fprop_conv(self, name, conv_slices, I, F, B, O, R=None, relu_slope=None):
+        """
+        Convolution with the fused post-ops O = relu(conv(I, F) + B + R).
+
+        Arguments:
+            B: Bias along the output channels, or None.
+            R: Residual with the shape of O, or None.
+            relu_slope: Slope of the relu for negative values, or None for no relu.
+        """
         if (self.enabled and name in self.kernels):
+            post_op_args = [arg for arg in (B, R) if arg is not None]
             self.set_input_tensor(self.kernels[name], I.ctypes.data, 0)
             self.set_input_tensor(self.kernels[name], F.ctypes.data, 1)
-            if B is not None:
-                self.set_input_tensor(self.kernels[name], B.ctypes.data, 2)
+            for index, arg in enumerate(post_op_args, 2):
+                self.set_input_tensor(self.kernels[name], arg.ctypes.data, index)
             self.set_output_tensor(self.kernels[name], O.ctypes.data, 0)
             self.run_opkernel(self.kernels[name], self.mkldnn_verbose)
         else:
             mSlice, pSlice, qSlice, _, _, _ = conv_slices
             K, M, P, Q, N = O.shape
-
-            for (m, mS), (p, pS), (q, qS) in itt.product(enumerate(mSlice),
-                                                         enumerate(pSlice),
-                                                         enumerate(qSlice)):
-                sliceT, sliceD, _ = mS
-                sliceR, sliceH, _ = pS
-                sliceS, sliceW, _ = qS
-                slicedF = F[:, sliceT, sliceR, sliceS, :].reshape((-1, K))
-                slicedI = I[:, sliceD, sliceH, sliceW, :].reshape((-1, N))
-                O[:, m, p, q, :] = np.dot(slicedF.T, slicedI)
+            if B is not None:
+                B = B.reshape((K, 1, 1))
+            rows = list(itt.product(enumerate(mSlice), enumerate(pSlice)))
+
+            # Each thread computes whole output rows
+            def convolve(start, stop):
+                for (m, mS), (p, pS) in rows[start:stop]:
+                    sliceT, sliceD, _ = mS
+                    sliceR, sliceH, _ = pS
+                    for q, (sliceS, sliceW, _) in enumerate(qSlice):
+                        slicedF = F[:, sliceT, sliceR, sliceS, :].reshape((-1, K))
+                        slicedI = I[:, sliceD, sliceH, sliceW, :].reshape((-1, N))
+                        O[:, m, p, q, :] = np.dot(slicedF.T, slicedI)
+                    # post-ops on each output row while it is still in cache
+                    row = O[:, m, p]
+                    if B is not None:
+                        row += B
+                    if R is not None:
+                        row += R[:, m, p]
+                    if relu_slope == 0:
+                        np.maximum(row, 0, out=row)
+                    elif relu_slope is not None:
+                        # max(x, slope * x) is the relu for 0 <= slope <= 1
+                        np.maximum(row, relu_slope * row, out=row)
+
+            self.run_blocks(convolve, len(rows))
 
     def bprop_conv(self, name, conv_slices, E, F, gI):
         if (self.enabled and name in self.kernels):
@@ -264,16 +376,19 @@ class Mkldnn(object):
             _, _, _, mSlice, pSlice, qSlice = conv_slices
             F = np.transpose(F[:, ::-1, ::-1, ::-1, :], (4, 1, 2, 3, 0)).copy()
             K, M, P, Q, N = gI.shape
+            positions = list(itt.product(enumerate(mSlice), enumerate(pSlice),
+                                         enumerate(qSlice)))
 
-            for (m, mS), (p, pS), (q, qS) in itt.product(enumerate(mSlice),
-                                                         enumerate(pSlice),
-                                                         enumerate(qSlice)):
-                sliceT, sliceD, _ = mS
-                sliceR, sliceH, _ = pS
-                sliceS, sliceW, _ = qS
-                slicedF = F[:, sliceT, sliceR, sliceS, :].reshape((-1, K))
-                slicedI = E[:, sliceD, sliceH, sliceW, :].reshape((-1, N))
-                gI[:, m, p, q, :] = np.dot(slicedF.T, slicedI)
+            def convolve(start, stop):
+                for (m, mS), (p, pS), (q, qS) in positions[start:stop]:
+                    sliceT, sliceD, _ = mS
+                    sliceR, sliceH, _ = pS
+                    sliceS, sliceW, _ = qS
+                    slicedF = F[:, sliceT, sliceR, sliceS, :].reshape((-1, K))
+                    slicedI = E[:, sliceD, sliceH, sliceW, :].reshape((-1, N))
+                    gI[:, m, p, q, :] = np.dot(slicedF.T, slicedI)
+
+            self.run_blocks(convolve, len(positions))
 
     def fprop_pool(self, name, pool_slices, arrI, arrO):
         if (self.enabled and name in self.kernels):
@@ -286,23 +401,26 @@ class Mkldnn(object):
         else:
             kSlice, mSlice, pSlice, qSlice, op, arrA = pool_slices
             K, M, P, Q, N = arrO.shape
-            for (k, kS), (m, mS), (p, pS), (q, qS) in itt.product(enumerate(kSlice),
-                                                                  enumerate(mSlice),
-                                                                  enumerate(pSlice),
-                                                                  enumerate(qSlice)):
-                sliceC, _ = kS
-                sliceD, _ = mS
-                sliceH, _ = pS
-                sliceW, _ = qS
-
-                sliceI = arrI[sliceC, sliceD, sliceH, sliceW, :].reshape(-1, N)
-                if op == "max":
-                    arrA[k, m, p, q, :] = np.argmax(sliceI, axis=0)
-                    arrO[k, m, p, q, :] = np.max(sliceI, axis=0)
-                elif op == "avg":
-                    arrO[k, m, p, q, :] = np.mean(sliceI, axis=0)
-                elif op == "l2":
-                    arrO[k, m, p, q, :] = np.sqrt(np.sum(np.square(sliceI), axis=0))
+            positions = list(itt.product(enumerate(kSlice), enumerate(mSlice),
+                                         enumerate(pSlice), enumerate(qSlice)))
+
+            def pool(start, stop):
+                for (k, kS), (m, mS), (p, pS), (q, qS) in positions[start:stop]:
+                    sliceC, _ = kS
+                    sliceD, _ = mS
+                    sliceH, _ = pS
+                    sliceW, _ = qS
+
+                    sliceI = arrI[sliceC, sliceD, sliceH, sliceW, :].reshape(-1, N)
+                    if op == "max":
+                        arrA[k, m, p, q, :] = np.argmax(sliceI, axis=0)
+                        arrO[k, m, p, q, :] = np.max(sliceI, axis=0)
+                    elif op == "avg":
+                        arrO[k, m, p, q, :] = np.mean(sliceI, axis=0)
+                    elif op == "l2":
+                        arrO[k, m, p, q, :] = np.sqrt(np.sum(np.square(sliceI), axis=0))
+
+            self.run_blocks(pool, len(positions))
 
     def bprop_pool(self, name, pool_slices, arrE, arrD):
         if (self.enabled and name in self.kernels):
@@ -316,26 +434,40 @@ class Mkldnn(object):
             kSlice, mSlice, pSlice, qSlice, op, arrA = pool_slices
             arrD[:] = 0
             K, M, P, Q, N = arrE.shape
-            for (k, kS), (m, mS), (p, pS), (q, qS) in itt.product(enumerate(kSlice),
-                                                                  enumerate(mSlice),
-                                                                  enumerate(pSlice),
-                                                                  enumerate(qSlice)):
-                sliceC, clen = kS
-                sliceD, dlen = mS
-                sliceH, hlen = pS
-                sliceW, wlen = qS
-
-                patch_in = (sliceC, sliceD, sliceH, sliceW, slice(None))
-                patch_out = (k, m, p, q, slice(None))
-                sliceB = arrD[patch_in].reshape((-1, N))
-                if op == "max":
-                    max_n = arrA[patch_out]
-                    sliceB[max_n, list(range(N))] += arrE[patch_out]
-                elif op == "avg":
-                    sliceB += arrE[patch_out] * (1.0 / sliceB.shape[0])
+            if op not in ("max", "avg"):
+                raise NotImplementedError
+
+            # Windows overlap, so threads take separate samples, or separate output
+            # channels when their windows do not overlap
+            channels_apart = all(kS[0].stop <= next_kS[0].start
+                                 for kS, next_kS in zip(kSlice, kSlice[1:]))
+
+            def backprop(start, stop):
+                if channels_apart:
+                    channels, batch, num_samples = range(start, stop), slice(None), N
                 else:
-                    raise NotImplementedError
-                arrD[patch_in] = sliceB.reshape((clen, dlen, hlen, wlen, N))
+                    channels, batch, num_samples = range(K), slice(start, stop), stop - start
+                samples = list(range(num_samples))
+                for k, (m, mS), (p, pS), (q, qS) in itt.product(channels,
+                                                                enumerate(mSlice),
+                                                                enumerate(pSlice),
+                                                                enumerate(qSlice)):
+                    sliceC, clen = kSlice[k]
+                    sliceD, dlen = mS
+                    sliceH, hlen = pS
+                    sliceW, wlen = qS
+
+                    patch_in = (sliceC, sliceD, sliceH, sliceW, batch)
+                    patch_out = (k, m, p, q, batch)
+                    sliceB = arrD[patch_in].reshape((-1, num_samples))
+                    if op == "max":
+                        max_n = arrA[patch_out]
+                        sliceB[max_n, samples] += arrE[patch_out]
+                    else:
+                        sliceB += arrE[patch_out] * (1.0 / sliceB.shape[0])
+                    arrD[patch_in] = sliceB.reshape((clen, dlen, hlen, wlen, num_samples))
+
+            self.run_blocks(backprop, K if channels_apart else N)
 
     def innerproduct_fprop(self, name, x, y, bias, out):
         if (self.enabled and name in self.kernels):
@@ -375,8 +507,10 @@ class Mkldnn(object):
             self.set_output_tensor(self.kernels[name], out.ctypes.data, 0)
             self.run_opkernel(self.kernels[name], self.mkldnn_verbose)
         else:
-            np.add(inputs * np.greater(fpropSrc, 0), inputs * slope *
-                   np.less(fpropSrc, 0), out=out)
+            np.greater(fpropSrc, 0, out=out)
+            if slope:
+                out += slope * np.less(fpropSrc, 0)
+            out *= inputs
 
     def mkl_reorder(self, name, output, input):
         assert self.enabled
@@ -403,35 +537,54 @@ class Mkldnn(object):
             mSlice, pSlice, qSlice, _, _, _ = conv_slices
             K, M, P, Q, N = E.shape
             C, _, _, _, K = U.shape
-            U.fill(0.0)
 
-            for (m, mS), (p, pS), (q, qS) in itt.product(enumerate(mSlice),
-                                                         enumerate(pSlice),
-                                                         enumerate(qSlice)):
-                sliceT, sliceD, tlen = mS
-                sliceR, sliceH, rlen = pS
-                sliceS, sliceW, slen = qS
-                slicedI = I[:, sliceD, sliceH, sliceW, :].reshape((-1, N))
-                slicedE = E[:, m, p, q, :]
-                update = np.dot(slicedI, slicedE.T).reshape((C, tlen, rlen, slen, K))
-                U[:, sliceT, sliceR, sliceS, :] += update
+            # Each thread accumulates the filters of its own input channels
+            def update_filters(start, stop):
+                channels = slice(start, stop)
+                U[channels].fill(0.0)
+                for (m, mS), (p, pS), (q, qS) in itt.product(enumerate(mSlice),
+                                                             enumerate(pSlice),
+                                                             enumerate(qSlice)):
+                    sliceT, sliceD, tlen = mS
+                    sliceR, sliceH, rlen = pS
+                    sliceS, sliceW, slen = qS
+                    slicedI = I[channels, sliceD, sliceH, sliceW, :].reshape((-1, N))
+                    slicedE = E[:, m, p, q, :]
+                    update = np.dot(slicedI, slicedE.T).reshape((stop - start, tlen, rlen,
+                                                                 slen, K))
+                    U[channels, sliceT, sliceR, sliceS, :] += update
+
+            self.run_blocks(update_filters, C)
 
 
 def fprop_lut(lut, idx, axis, output):
     output[:] = lut.take(idx.astype(int), axis)
 
 
-def update_lut(error, idx, pad_idx, axis, dW):
+def update_lut(error, idx, pad_idx, axis, dW, run_blocks=None):
+    """
+    Arguments:
+        run_blocks: If given, Mkldnn.run_blocks, to split the words over the kernel threads.
+    """
     dW[:] = 0
     idx = idx.astype(int)
     unqidx, inv = np.unique(idx, return_inverse=True)
-    groups = [np.where(inv == i) for i in range(len(unqidx))]
-    for (wrd_id, group) in zip(unqidx, groups):
-        if wrd_id != pad_idx:
-            if axis == 0:
-                dW[wrd_id, :] = np.sum(error.take(group[0], axis=axis), axis=axis)
-            else:
-                dW[:, wrd_id] = np.sum(error.take(group[0], axis=axis), axis=axis)
+
+    # Each word updates its own row of dW
+    def update_words(start, stop):
+        for i in range(start, stop):
+            wrd_id = unqidx[i]
+            if wrd_id != pad_idx:
+                group = np.where(inv == i)
+                if axis == 0:
+                    dW[wrd_id, :] = np.sum(error.take(group[0], axis=axis), axis=axis)
+                else:
+                    dW[:, wrd_id] = np.sum(error.take(group[0], axis=axis), axis=axis)
+
+    if run_blocks is None:
+        update_words(0, len(unqidx))
+    else:
+        run_blocks(update_words, len(unqidx))
 
 
 class ConvLocals(object):
@@ -442,3 +595,13 @@ class ConvLocals(object):
         self.conv_slices = conv_slices
         self.pool_params = pool_params
         self.pool_slices = pool_slices
+
+    def resize_pool_argmax(self, name, batch_size):
+        """
+        Give the argmax kept by max pooling op name room for batch_size samples.
+        """
+        slices = self.pool_slices[name]
+        argmax = slices[5]
+        if argmax is not None and argmax.shape[-1] != batch_size:
+            argmax = np.empty(argmax.shape[:-1] + (batch_size,), dtype=argmax.dtype)
+            self.pool_slices[name] = slices[:5] + (argmax,)
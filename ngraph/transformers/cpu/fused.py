@@ -0,0 +1,117 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from __future__ import division
+
+import itertools as itt
+import numpy as np
+
+from ngraph.op_graph.op_graph import Op
+
+
+class FusedElementwiseOp(Op):
+    """
+    A chain of elementwise ops evaluated block by block.
+
+    This Op is internal to execution graph compilation; it is created by
+    ElementwiseFusionPass and has no graph args. Operands are referenced
+    through the input/output decls of its exop.
+
+    Arguments:
+        shape: The common shape of every operand.
+        steps: List of (ufunc name, destination, sources). Destinations and sources
+            are ('input', i), ('output', i) or ('scratch', i) references.
+        scratch_dtypes: dtype of each scratch buffer.
+        chunk_size: Target number of elements per block.
+
+    Parameters:
+        block_axis: The axis that is split into blocks.
+        block_length: Number of block_axis entries processed per block.
+    """
+
+    def __init__(self, shape, steps, scratch_dtypes, chunk_size, **kwargs):
+        super(FusedElementwiseOp, self).__init__(**kwargs)
+        self.shape = tuple(shape)
+        self.steps = steps
+        self.scratch_dtypes = scratch_dtypes
+        self.chunk_size = chunk_size
+        self.block_axis, self.block_length = block_layout(self.shape, chunk_size)
+
+    @property
+    def scratch_shape(self):
+        """
+
+        Returns: Shape of one scratch block.
+
+        """
+        return (self.block_length,) + self.shape[self.block_axis + 1:]
+
+
+def block_layout(shape, chunk_size):
+    """
+    Choose how to split a tensor into blocks of about chunk_size elements.
+
+    The outermost axis whose trailing sub-tensor fits in chunk_size is split; the
+    axes before it are iterated over one index at a time.
+
+    Args:
+        shape: Tensor shape.
+        chunk_size: Target number of elements per block.
+
+    Returns:
+        (block_axis, block_length)
+    """
+    trailing = 1
+    for axis in reversed(range(len(shape))):
+        if trailing * shape[axis] > chunk_size:
+            return axis, max(1, chunk_size // trailing)
+        trailing *= shape[axis]
+    return 0, shape[0]
+
+
+def elementwise_blocks(shape, block_axis, block_length):
+    """
+    Index tuples covering a tensor in blocks.
+
+    Args:
+        shape: Tensor shape.
+        block_axis: Axis split into blocks.
+        block_length: Length of a full block along block_axis.
+
+    Returns:
+        List of (tensor index, scratch index) pairs; the scratch index trims the
+        scratch buffers for the last, possibly partial, block.
+    """
+    blocks = []
+    outer = [range(length) for length in shape[:block_axis]]
+    extent = shape[block_axis]
+    for outer_index in itt.product(*outer):
+        for start in range(0, extent, block_length):
+            stop = min(start + block_length, extent)
+            blocks.append((outer_index + (slice(start, stop),), slice(0, stop - start)))
+    return blocks
+
+
+def elementwise_scratch(shape, dtypes):
+    """
+    Allocate the scratch blocks for a fused elementwise op.
+
+    Args:
+        shape: Shape of one block.
+        dtypes: dtype of each scratch buffer.
+
+    Returns:
+        List of arrays.
+    """
+    return [np.empty(shape, dtype=dtype) for dtype in dtypes]
@@ -330,6 +330,29 @@ mkldnn_memory_desc_t* query_opkernel_layout(mkldnn_opkernel_t opkernel,
   }
 }
 
+/** Return 1 if the two layouts place every element at the same offset
+*/
+int compare_mkldnn_layouts(mkldnn_engine_t engine, mkldnn_memory_desc_t *md1,
+                           mkldnn_memory_desc_t *md2) {
+  mkldnn_primitive_desc_t pd1, pd2;
+  MKL_CHECK(mkldnn_memory_primitive_desc_create(&pd1, md1, engine));
+  MKL_CHECK(mkldnn_memory_primitive_desc_create(&pd2, md2, engine));
+  int equal = mkldnn_memory_primitive_desc_equal(pd1, pd2);
+  MKL_CHECK(mkldnn_primitive_desc_destroy(pd1));
+  MKL_CHECK(mkldnn_primitive_desc_destroy(pd2));
+  return equal;
+}
+
+/** Return the bytes of memory a tensor in the layout needs, including padding
+*/
+size_t query_mkldnn_layout_size(mkldnn_engine_t engine, mkldnn_memory_desc_t *md) {
+  mkldnn_primitive_desc_t pd;
+  MKL_CHECK(mkldnn_memory_primitive_desc_create(&pd, md, engine));
+  size_t size = mkldnn_memory_primitive_desc_get_size(pd);
+  MKL_CHECK(mkldnn_primitive_desc_destroy(pd));
+  return size;
+}
+
 void create_mkldnn_reorder_kernel(mkldnn_engine_t engine, int ndims, int *dims,
                                   mkldnn_data_type_t data_type,
                                   mkldnn_memory_desc_t* input_md,
@@ -0,0 +1,65 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from __future__ import division
+
+import numpy as np
+
+from ngraph.op_graph.op_graph import ElementWiseOp
+
+
+storage_dtypes = {
+    'float16': np.dtype(np.float16),
+    'int8': np.dtype(np.int8),
+}
+
+
+class DequantizeOp(ElementWiseOp):
+    """
+    Expands a reduced-precision tensor to float32.
+
+    Arguments:
+        x: The stored tensor, float16 or int8.
+        scale: Multiplier that maps stored values back to their original range.
+    """
+
+    def __init__(self, x, scale, **kwargs):
+        super(DequantizeOp, self).__init__(args=(x,), axes=x.axes, **kwargs)
+        self.scale = scale
+
+    def copy_with_new_args(self, args):
+        return type(self)(args[0], self.scale)
+
+
+def quantize(value, storage_dtype):
+    """
+    Convert a float tensor to reduced-precision storage.
+
+    int8 storage is symmetric with a single per-tensor scale, so zero is exact and
+    the largest magnitude maps to 127.
+
+    Args:
+        value: The float tensor.
+        storage_dtype: 'float16' or 'int8'.
+
+    Returns:
+        (stored value, scale), where stored value * scale approximates value.
+    """
+    dtype = storage_dtypes[storage_dtype]
+    if dtype == np.int8:
+        max_abs = float(np.max(np.abs(value))) if value.size > 0 else 0.0
+        scale = max_abs / 127.0 if max_abs > 0 else 1.0
+        stored = np.clip(np.rint(value / scale), -127, 127).astype(dtype)
+        return stored, scale
+    return value.astype(dtype), 1.0
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # ----------------------------------------------------------------------------
 from ngraph.op_graph.op_graph import UnaryElementWiseOp, ElementWiseOp
+from ngraph.op_graph.convolution import ConvolutionOp
 
 
 class ReluOp(UnaryElementWiseOp):
@@ -34,7 +35,7 @@ class BpropReluOp(ElementWiseOp):
     Maintains index and conv_params through forwarding of the original relu.
 
     Arguments:
-        fprop: The original relu.
+        fprop: The original relu, or the convolution it is fused into.
     """
     def __init__(self, delta, inputs, fprop, **kwargs):
         super(BpropReluOp, self).__init__(args=(delta, inputs), axes=delta.axes, **kwargs)
@@ -42,3 +43,8 @@ class BpropReluOp(ElementWiseOp):
 
     def copy_with_new_args(self, args):
         return type(self)(args[0], args[1], self.fprop)
+
+    @property
+    def slope(self):
+        fprop = self.fprop.forwarded
+        return fprop.relu_slope if isinstance(fprop, ConvolutionOp) else fprop.slope
@@ -0,0 +1,186 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+
+
+class ScanLocals(object):
+    def __init__(self, scan_nodes, **kwargs):
+        super(ScanLocals, self).__init__(**kwargs)
+        self.scan_nodes = scan_nodes
+
+
+class ScanRunner(object):
+    """
+    Runs the compiled bodies of a ScanOp.
+
+    The step body is compiled once as its own computation, so its size does not grow
+    with the number of steps. Each step copies a slice of every sequence and the current
+    states into the body's inputs, runs the body, and copies its results back out. The
+    state entering every step is kept for the backward body. The bodies run while the
+    computation holding the scan is running, so they keep temporary pools of their own.
+
+    Run at a smaller batch size, the bodies are laid out for it too, and the arrays the
+    runner copies through are their views for that size, kept for each batch size.
+
+    Arguments:
+        transformer: The CPUTransformer.
+        scan: The ScanOp.
+    """
+
+    def __init__(self, transformer, scan):
+        self.transformer = transformer
+        self.scan = scan
+        with transformer.private_temporaries():
+            self.forward = transformer.computation(scan.body_returns, *scan.body_parameters)
+        self.steps = list(range(scan.recurrent_axis.length))
+        if scan.backward:
+            self.steps.reverse()
+        self.backward = None
+        self.backward_ops = None
+        self.gradients = None
+        self.batch_size = self.forward.batch_size
+        self.batch_arrays = dict()
+        self.bind_arrays()
+
+    def parameter(self, computation, op):
+        tensor_decl = computation.computation_decl.get_tensor_decl(op=op.tensor)
+        return self.transformer.device_tensor_view(tensor_decl.root_tensor_view_decl).tensor
+
+    def result(self, computation, op):
+        return self.transformer.device_to_host(computation, op)
+
+    def body_arrays(self):
+        """
+        Returns: The arrays of the bodies, for their current batch size, by attribute.
+        """
+        scan = self.scan
+        state_inputs = [self.parameter(self.forward, op) for op in scan.state_placeholders]
+        arrays = dict(
+            sequence_inputs=[self.parameter(self.forward, op)
+                             for op in scan.sequence_placeholders],
+            state_inputs=state_inputs,
+            output=self.result(self.forward, scan.output),
+            new_states=[self.result(self.forward, op) for op in scan.new_states],
+            history=[np.empty((len(self.steps),) + state.shape, dtype=state.dtype)
+                     for state in state_inputs])
+        if self.backward is not None:
+            bprop = self.backward_ops
+            arrays.update(
+                backward_sequence_inputs=[self.parameter(self.backward, op)
+                                          for op in scan.sequence_placeholders],
+                backward_state_inputs=[self.parameter(self.backward, op)
+                                       for op in scan.state_placeholders],
+                output_delta=self.parameter(self.backward, bprop.output_delta),
+                state_deltas=[self.parameter(self.backward, op) for op in bprop.state_deltas],
+                backward_results=[self.result(self.backward, op) for op in bprop.gradients])
+        return arrays
+
+    def bind_arrays(self):
+        """
+        Point the runner at the body arrays for its batch size, made the first time the
+        batch size is used.
+        """
+        arrays = self.batch_arrays.get(self.batch_size)
+        if arrays is None:
+            arrays = self.body_arrays()
+            self.batch_arrays[self.batch_size] = arrays
+        for name, value in arrays.items():
+            setattr(self, name, value)
+
+    def set_batch_size(self, batch_size):
+        """
+        Run the bodies for batch_size entries along the batch axis.
+        """
+        if batch_size is None or batch_size == self.batch_size:
+            return
+        for body in (self.forward, self.backward):
+            if body is not None and body.batch_axis is not None:
+                body.set_batch_size(batch_size)
+        self.batch_size = batch_size
+        self.bind_arrays()
+
+    def compile_backward(self, bprop):
+        """
+        Compile the backward body of bprop, a ScanBpropOp for this scan.
+        """
+        if self.backward is not None:
+            return
+        with self.transformer.private_temporaries():
+            self.backward = self.transformer.computation(bprop.body_returns,
+                                                         *bprop.body_parameters)
+        self.backward_ops = bprop
+        if self.backward.batch_axis is not None:
+            self.backward.set_batch_size(self.batch_size)
+        # the arrays kept so far lack the backward body's
+        self.batch_arrays = dict()
+        self.bind_arrays()
+
+    def sequence_steps(self, sequences):
+        return [np.moveaxis(sequence, pos, 0)
+                for sequence, pos in zip(sequences, self.scan.sequence_positions)]
+
+    def fprop(self, batch_size, out, *args):
+        self.set_batch_size(batch_size)
+        scan = self.scan
+        sequences = self.sequence_steps(args[:scan.n_sequences])
+        out_steps = np.moveaxis(out, scan.pos, 0)
+        for state_input, init_state in zip(self.state_inputs,
+                                           args[scan.n_sequences:
+                                                scan.n_sequences + scan.n_states]):
+            state_input[()] = init_state
+
+        for step in self.steps:
+            for sequence_input, sequence in zip(self.sequence_inputs, sequences):
+                sequence_input[()] = sequence[step]
+            for history, state_input in zip(self.history, self.state_inputs):
+                history[step] = state_input
+            self.forward.executor()
+            out_steps[step] = self.output
+            for state_input, new_state in zip(self.state_inputs, self.new_states):
+                state_input[()] = new_state
+
+    def bprop(self, batch_size, delta, *sequences):
+        self.set_batch_size(batch_size)
+        scan = self.scan
+        delta_steps = np.moveaxis(delta, scan.pos, 0)
+        sequence_steps = self.sequence_steps(sequences)
+        n_inputs = scan.n_sequences + scan.n_states
+        gradients = [np.empty_like(sequence) for sequence in sequences] + \
+            [np.zeros_like(result) for result in self.backward_results[scan.n_sequences:]]
+        gradient_steps = self.sequence_steps(gradients[:scan.n_sequences])
+        for state_delta in self.state_deltas:
+            state_delta[()] = 0
+
+        for step in reversed(self.steps):
+            for sequence_input, sequence in zip(self.backward_sequence_inputs, sequence_steps):
+                sequence_input[()] = sequence[step]
+            for state_input, history in zip(self.backward_state_inputs, self.history):
+                state_input[()] = history[step]
+            self.output_delta[()] = delta_steps[step]
+            self.backward.executor()
+
+            results = self.backward_results
+            for gradient, result in zip(gradient_steps, results[:scan.n_sequences]):
+                gradient[step] = result
+            for state_delta, result in zip(self.state_deltas,
+                                           results[scan.n_sequences:n_inputs]):
+                state_delta[()] = result
+            for gradient, result in zip(gradients[n_inputs:], results[n_inputs:]):
+                gradient += result
+
+        for gradient, state_delta in zip(gradients[scan.n_sequences:n_inputs],
+                                         self.state_deltas):
+            gradient[()] = state_delta
+        self.gradients = gradients
@@ -0,0 +1,59 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class StreamLocals(object):
+    """
+    Runs the streams of a computation split by StreamScheduling, the first in the calling
+    thread and the others on a pool of threads. Exops waited for by other streams set an
+    event once they have run.
+
+    Arguments:
+        num_events: The number of events between the streams.
+    """
+
+    def __init__(self, num_events=0, **kwargs):
+        super(StreamLocals, self).__init__(**kwargs)
+        self.events = [threading.Event() for _ in range(num_events)]
+        self.stream_pool = None
+
+    def run_streams(self, *streams):
+        if self.stream_pool is None:
+            self.stream_pool = ThreadPoolExecutor(len(streams) - 1)
+        for event in self.events:
+            event.clear()
+        futures = [self.stream_pool.submit(self.run_stream, stream) for stream in streams[1:]]
+        try:
+            self.run_stream(streams[0])
+        finally:
+            wait(futures)
+        for future in futures:
+            future.result()
+
+    def run_stream(self, stream):
+        try:
+            stream()
+        except BaseException:
+            # Let the other streams run to the end instead of waiting forever
+            for event in self.events:
+                event.set()
+            raise
+
+    def close_streams(self):
+        if self.stream_pool is not None:
+            self.stream_pool.shutdown()
+            self.stream_pool = None
@@ -16,6 +16,7 @@
 from __future__ import division
 from __future__ import print_function
 
+from contextlib import contextmanager
 from functools import wraps
 from operator import itemgetter
 # These are indirectly used by the generated code
@@ -38,20 +39,31 @@ from ngraph.op_graph.pooling import PoolingOp, BpropPoolOp
 from ngraph.op_graph.lookuptable import LookupTableOp, update_lut
 from ngraph.op_graph.ctc import CTCOp
 from ngraph.op_graph.debug import PrintOp
+from ngraph.op_graph.scan import ScanOp, ScanBpropOp, ScanGradOp
 from ngraph.transformers.cpu.batchnorm import BatchnormOp, BpropBatchnormOp
 from ngraph.transformers.cpu.relu import ReluOp, BpropReluOp
+from ngraph.transformers.cpu.batch import batch_components, batch_stride, batch_view
+from ngraph.transformers.cpu.fused import FusedElementwiseOp
+from ngraph.transformers.cpu.quantize import DequantizeOp
+from ngraph.transformers.cpu.scan import ScanRunner
 from ngraph.transformers.passes.passes import RequiredTensorShaping, \
     CPUTensorShaping, SimplePrune
 from ngraph.transformers.passes.cpulayout import CPUTensorLayout
+from ngraph.transformers.passes.convfusion import ConvolutionFusion
 from ngraph.transformers.passes.cpufusion import CPUFusion
+from ngraph.transformers.passes.freeze import InferenceFreeze
 from ngraph.transformers.passes.mkldnnpasses import MklCreateOpDescriptors, \
-    MklAddLayoutConversions, MklReorderOp
+    MklAddLayoutConversions, MklReorderOp, create_batch_kernels
 from ngraph.transformers.passes.layout import AddLayoutConversions
 from ngraph.transformers.passes.expass import SSAConversion, IndexElision, \
-    CopyElimination, DeadCodeEliminationPass
+    CopyElimination, DeadCodeEliminationPass, InPlaceUpdate
 from ngraph.transformers.passes.memlayout import MemLayoutPass
 from ngraph.transformers.passes.memoptimize import MemOptimizePass
 from ngraph.transformers.passes.liveness import LivenessPass
+from ngraph.transformers.passes.elementwisefusion import ElementwiseFusionPass
+from ngraph.transformers.passes.reducedprecision import ReducedPrecisionWeights
+from ngraph.transformers.passes.rematerialization import Rematerialization
+from ngraph.transformers.passes.streams import StreamScheduling
 
 from ngraph.transformers.base import make_transformer_factory, \
     set_transformer_factory
@@ -65,7 +77,7 @@ from ngraph.op_graph.comm_nodes import CPUQueueSendOp, CPUQueueRecvOp, \
     CPUQueueScatterRecvOp, CPUQueueAllReduceOp, CPUQueueBroadcastSendOp, \
     CPUQueueBroadcastRecvOp
 
-from ngraph.util.trace_events import is_tracing_enabled
+from ngraph.util.trace_events import is_tracing_enabled, ExOpProfiler
 
 
 def align_ndarray(element_count, alignment, dtype):
@@ -167,12 +179,133 @@ class CPUPoolEngine(object):
 
 
 class CPUDeviceComputation(DeviceComputation):
+    """
+    A computation compiled for the CPU.
+
+    A computation whose parameters have a batch axis N may be called with fewer than
+    N entries along it. Memory is planned once for N; every tensor view is then laid
+    out densely for the call's batch size in the same memory, so kernels only touch
+    the entries passed in and results have the call's batch size. Sizes taken from
+    the batch axis, such as the divisor of a mean over it, follow the batch size.
+    MKL-DNN kernels are made again for each batch size, and scans run their bodies
+    at the call's batch size.
+    """
+
     def __init__(self, transformer, computation_op, **kwargs):
         super(CPUDeviceComputation, self).__init__(transformer, computation_op, **kwargs)
         self.pool_params = dict()
         self.pool_slices = dict()
         self.conv_params = dict()
         self.conv_slices = dict()
+        self.scan_nodes = []
+        self.shares_temporaries = transformer.shared_temporaries and \
+            transformer.private_temporaries_depth == 0
+        self.tensor_views = []
+        self.kernel_names = []
+        self.batch_axis = None
+        batch_axes = set(param.axes.batch_axis() for param in computation_op.parameters)
+        batch_axes.discard(None)
+        if len(batch_axes) == 1:
+            self.batch_axis = batch_axes.pop()
+        self.batch_size = self.batch_axis.length if self.batch_axis is not None else None
+        self.batch_view_code = dict()
+        self.batch_kernels = dict()
+
+    def __call__(self, *args, **kwargs):
+        args = self.unpack_args_or_feed_dict(args, kwargs)
+        self.set_batch_size(self.call_batch_size(args))
+        return super(CPUDeviceComputation, self).__call__(*args)
+
+    def call_batch_size(self, args):
+        """
+        Returns: The batch size of the arguments args.
+        """
+        if self.batch_axis is None:
+            return None
+        sizes = set()
+        for param, arg in zip(self.computation_op.parameters, args):
+            if self.batch_axis in param.axes and np.ndim(arg) == len(param.axes):
+                sizes.add(np.shape(arg)[param.axes.index(self.batch_axis)])
+        if not sizes:
+            return self.batch_size
+        if len(sizes) > 1:
+            raise ValueError("Arguments have different batch sizes {}".format(sorted(sizes)))
+        batch_size = sizes.pop()
+        if not 0 < batch_size <= self.batch_axis.length:
+            raise ValueError("Batch size {} is not between 1 and {}, the batch size "
+                             "computation {} was compiled for".format(
+                                 batch_size, self.batch_axis.length,
+                                 self.computation_op.name))
+        return batch_size
+
+    def set_batch_size(self, batch_size):
+        """
+        Lay out the tensor views of this computation for batch_size entries along the
+        batch axis.
+        """
+        if batch_size == self.batch_size:
+            return
+        views = self.batch_views(batch_size)
+        kernels = self.mkldnn_kernels(batch_size)
+        self.transformer.globals.execute(views)
+        for tensor_view in self.tensor_views:
+            tensor_view.reset()
+        self.executor.set_batch_size(batch_size)
+        if self.kernel_names:
+            self.executor.kernels = kernels
+            self.executor.bind_kernels()
+        self.batch_size = batch_size
+
+    def batch_views(self, batch_size):
+        """
+        Returns: Code that binds the tensor views of this computation for batch_size.
+        """
+        code = self.batch_view_code.get(batch_size)
+        if code is not None:
+            return code
+        parameters = set(self.computation_decl.get_tensor_decl(op=param.tensor)
+                         for param in self.computation_op.parameters)
+        views = CPUCodeGenerator(self.transformer)
+        for tensor_view in self.tensor_views:
+            tensor_decl = tensor_view.device_tensor.tensor_decl
+            base = tensor_decl.tensor_description_base
+            in_batch = batch_stride(base, self.batch_axis) is not None
+            if not in_batch and not batch_components(tensor_view.tensor_description.axes):
+                continue
+            if in_batch and tensor_decl.is_persistent and tensor_decl not in parameters and \
+                    not (tensor_decl.is_constant and is_uniform(tensor_decl.initial_value)):
+                raise ValueError("Tensor {} keeps values along the batch axis between "
+                                 "calls".format(tensor_decl.name))
+            tensor_view.codegen_view(views, *batch_view(tensor_view.tensor_description, base,
+                                                        self.batch_axis, batch_size))
+        filename = '<{} batch {}>'.format(self.computation_op.name, batch_size)
+        code = compile(views.take_code(), filename, 'exec')
+        self.batch_view_code[batch_size] = code
+        return code
+
+    def mkldnn_kernels(self, batch_size):
+        """
+        Returns: The MKL-DNN kernels of this computation for batch_size, made the first
+            time the batch size is used.
+        """
+        mkldnn = self.transformer.mkldnn
+        if not self.kernel_names or batch_size == self.batch_axis.length:
+            return mkldnn.kernels
+        kernels = self.batch_kernels.get(batch_size)
+        if kernels is None:
+            kernels = create_batch_kernels(mkldnn, self.kernel_names, batch_size)
+            self.batch_kernels[batch_size] = kernels
+        return kernels
+
+
+def is_uniform(value):
+    """
+    Returns: True if value is a constant with every element equal.
+    """
+    if value is None:
+        return False
+    value = np.asarray(value)
+    return value.size == 0 or bool(np.all(value == value.flat[0]))
 
 
 class CPUDeviceTensor(DeviceTensor):
@@ -208,10 +341,9 @@ class CPUDeviceTensor(DeviceTensor):
         return self.name
 
     def codegen(self):
-        start = self.buffer_pool_offset // 4
-        end = start + self.size // 4
-        pool_name = self.device_computation.computation_op.name
-        pool_name += '_persistent_pool' if self.is_persistent else '_temporary_pool'
+        start = self.buffer_pool_offset
+        end = start + self.size
+        pool_name = self.transformer.pool_name(self.device_computation, self.tensor_decl)
         dtype = self.element_type.dtype
         self.transformer.exop_codegen_tensor.append("\n# tensor size={}, offset={}",
                                                     self.size,
@@ -284,18 +416,31 @@ class CPUDeviceTensorView(DeviceTensorView):
         return self.name
 
     def codegen(self):
-        self.transformer.exop_codegen_tensor_view.append("""\n{ref} = np.ndarray(
+        self.device_tensor.device_computation.tensor_views.append(self)
+        self.codegen_view(self.transformer.exop_codegen_tensor_view,
+                          self.tensor_description.shape,
+                          self.tensor_description.strides,
+                          self.tensor_description.offset)
+
+    def codegen_view(self, code, shape, strides, offset):
+        code.append("""\n{ref} = np.ndarray(
     shape={shape},
     dtype=np.{dtype},
     buffer={buffer},
     offset={offset},
     strides={strides})""",
-                                                         ref=self.ref_str,
-                                                         shape=self.tensor_description.shape,
-                                                         dtype=self.tensor_description.dtype,
-                                                         buffer=self.device_buffer.ref_str,
-                                                         offset=self.tensor_description.offset,
-                                                         strides=self.tensor_description.strides)
+                    ref=self.ref_str,
+                    shape=shape,
+                    dtype=self.tensor_description.dtype,
+                    buffer=self.device_buffer.ref_str,
+                    offset=offset,
+                    strides=strides)
+
+    def reset(self):
+        """
+        Forget the cached array, after the pool it views has been replaced.
+        """
+        self.__tensor = None
 
     def get(self, tensor):
         if tensor is None:
@@ -427,12 +572,19 @@ class CPUCodeGenerator(PyGen):
     def broadcast_recv_nodes(self):
         return self.transformer.device_computation.broadcast_recv_nodes
 
+    def scan_node_id(self, scan):
+        scan_nodes = self.transformer.device_computation.scan_nodes
+        runner = self.transformer.scan_runners[scan]
+        if runner not in scan_nodes:
+            scan_nodes.append(runner)
+        return scan_nodes.index(runner)
+
     @generic_method(Op)
     def allocate_op(self, op, *args):
         pass
 
     @allocate_op.on_type(ConvolutionOp)
-    def allocate_op(self, op, outputs, inputs, filters, bias=None):
+    def allocate_op(self, op, outputs, inputs, filters, *post_op_args):
         self.conv_params[op.safe_name] = op.conv_params
         self.conv_slices[op.safe_name] = \
             CPUConvEngine.get_slices(inputs, filters, outputs, op.conv_params)
@@ -448,6 +600,78 @@ class CPUCodeGenerator(PyGen):
     def allocate_op(self, op, arrO, arrI):
         self.pool_params[op.safe_name] = op.pool_params
         self.pool_slices[op.safe_name] = CPUPoolEngine.get_slices(arrI, arrO, op.pool_params)
+        self.transformer.exop_codegen_batch.append("self.resize_pool_argmax('{}', batch_size)",
+                                                   op.safe_name)
+
+    @allocate_op.on_type(BatchnormOp)
+    def allocate_op(self, op, output, inputs, gamma, bias, epsilon, mean, variance):
+        if not self.has_mkldnn_kernel(op):
+            self.append("self.{}_stats = np.empty((1, {}.shape[0], 1), dtype={}.dtype)",
+                        op.safe_name, variance, output)
+
+    @allocate_op.on_type(BpropBatchnormOp)
+    def allocate_op(self, op, output, delta, inputs, gamma, bias, mean, variance):
+        if not self.has_mkldnn_kernel(op):
+            self.append("self.{}_stats = np.empty((3, {}.shape[0], 1), dtype={}.dtype)",
+                        op.safe_name, variance, output)
+
+    @allocate_op.on_type(FusedElementwiseOp)
+    def allocate_op(self, op, *args):
+        self.append("self.{}_scratch = elementwise_scratch({}, {})",
+                    op.safe_name, op.scratch_shape, op.scratch_dtypes)
+        self.append("self.{}_blocks = elementwise_blocks({}, {}, {})",
+                    op.safe_name, op.shape, op.block_axis, op.block_length)
+        # Blocks and scratch follow the shape of the views for the current batch size
+        out = self.name(self.exop.output_decls[0])
+        self.transformer.exop_codegen_batch.append(
+            "self.{}_scratch = elementwise_scratch(({},) + {}.shape[{}:], {})",
+            op.safe_name, op.block_length, out, op.block_axis + 1, op.scratch_dtypes)
+        self.transformer.exop_codegen_batch.append(
+            "self.{}_blocks = elementwise_blocks({}.shape, {}, {})",
+            op.safe_name, out, op.block_axis, op.block_length)
+
+    def has_mkldnn_kernel(self, op):
+        mkldnn = self.transformer.mkldnn
+        return mkldnn.enabled and op.safe_name in mkldnn.kernels
+
+    def bind_mkldnn_kernel(self, op, inputs, outputs):
+        """
+        Generate a run of op's MKL-DNN kernel with its tensors bound once, when the
+        executor is created. The pools do not move after load, so binding per run is
+        wasted ctypes traffic.
+
+        Arguments:
+            op: The op.
+            inputs: Kernel inputs in kernel order, None for an unused position.
+            outputs: Kernel outputs in kernel order, None for an unused position.
+
+        Returns:
+            True if the run was generated, False if op has no MKL-DNN kernel.
+        """
+        if not self.has_mkldnn_kernel(op):
+            return False
+        self.transformer.kernel_names.append(op.safe_name)
+        self.transformer.exop_codegen_bind.append(
+            "self.{}_kernel = mkldnn.bind_kernel(self.kernels['{}'], [{}], [{}])",
+            op.safe_name, op.safe_name,
+            ", ".join(str(self.name(arg)) for arg in inputs),
+            ", ".join(str(self.name(arg)) for arg in outputs))
+        self.append("mkldnn.run_opkernel(self.{}_kernel, mkldnn.mkldnn_verbose)", op.safe_name)
+        return True
+
+    def generate_mkldnn_batchnorm(self, op, inputs, outputs, gamma, bias):
+        """
+        bind_mkldnn_kernel for batchnorm kernels, which also read gamma and beta stacked
+        in one array. The array is bound as the last input and refilled before each run.
+        """
+        if not self.has_mkldnn_kernel(op):
+            return False
+        weights = "self.{}_weights".format(op.safe_name)
+        self.transformer.exop_codegen_bind.append(
+            "{} = np.empty((2, {}.shape[0]), dtype={}.dtype)", weights, gamma, gamma)
+        self.append("{}[0] = {}[:, 0]", weights, gamma)
+        self.append("{}[1] = {}[:, 0]", weights, bias)
+        return self.bind_mkldnn_kernel(op, inputs + [weights], outputs)
 
     def generate_op_pre(self, op):
         # exop = self.exop
@@ -459,7 +683,7 @@ class CPUCodeGenerator(PyGen):
         #     output_decl_name = 'a_'+output_decl.tensor.tensor_name
         #     self.append("#    output_decl {}", val_name)
         if is_tracing_enabled():
-            self.append("self.__profiler_start__.append(monotonic())")
+            self.append("profile_start[{}, profile_slot] = monotonic()", self.exop_id)
 
     def generate_op_post(self, op):
         # exop = self.exop
@@ -473,7 +697,7 @@ class CPUCodeGenerator(PyGen):
         #     self.append("print('   output_decl {} = {{}}'.format({}))", \
         #            output_decl_name, output_decl_name)
         if is_tracing_enabled():
-            self.append("self.__profiler_stop__.append(monotonic())")
+            self.append("profile_stop[{}, profile_slot] = monotonic()", self.exop_id)
 
     @generic_method(Op)
     def generate_op(self, op, *args):
@@ -506,6 +730,8 @@ class CPUCodeGenerator(PyGen):
 
     @generate_op.on_type(Add)
     def generate_op(self, op, out, x, y):
+        if self.bind_mkldnn_kernel(op, [x, y], [out]):
+            return
         self.append("mkldnn.elementwise_add('{}', I_array1={}, I_array2={}, O_array={})",
                     op.safe_name, x, y, out)
 
@@ -518,37 +744,60 @@ class CPUCodeGenerator(PyGen):
         self.append("np.ndarray.argmin({}, axis={}, out={})", x, self.np_reduction_axis(op), out)
 
     @generate_op.on_type(ConvolutionOp)
-    def generate_op(self, op, outputs, inputs, filters, bias=None):
-        self.append("mkldnn.fprop_conv('{}', self.conv_slices['{}'], I={}, F={}, B={}, O={})",
-                    op.safe_name, op.safe_name, inputs, filters, bias, outputs)
+    def generate_op(self, op, outputs, inputs, filters, *post_op_args):
+        if self.bind_mkldnn_kernel(op, [inputs, filters] + list(post_op_args), [outputs]):
+            return
+        bias, residual = op.post_op_args(post_op_args)
+        self.append("mkldnn.fprop_conv('{}', self.conv_slices['{}'], I={}, F={}, B={}, O={}, "
+                    "R={}, relu_slope={})", op.safe_name, op.safe_name, inputs, filters, bias,
+                    outputs, residual, op.relu_slope)
 
     @generate_op.on_type(bprop_conv)
     def generate_op(self, op, outputs, delta, filters):
+        if self.bind_mkldnn_kernel(op, [delta, filters], [outputs]):
+            return
         self.append("mkldnn.bprop_conv('{}', self.conv_slices['{}'], E={}, F={}, gI={})",
                     op.safe_name, op.fprop.forwarded.safe_name, delta, filters, outputs)
 
     @generate_op.on_type(update_conv)
     def generate_op(self, op, outputs, delta, inputs):
+        if self.bind_mkldnn_kernel(op, [delta, inputs], [outputs]):
+            return
         self.append("mkldnn.update_conv('{}', self.conv_slices['{}'], I={}, E={}, U={})",
                     op.safe_name, op.fprop.forwarded.safe_name, inputs, delta, outputs)
 
     @generate_op.on_type(DeconvolutionOp)
     def generate_op(self, op, outputs, inputs, filters):
+        if self.bind_mkldnn_kernel(op, [inputs, filters], [outputs]):
+            return
         self.append("mkldnn.bprop_conv('{}', self.conv_slices['{}'], E={}, F={}, gI={})",
                     op.safe_name, op.safe_name, inputs, filters, outputs)
 
     @generate_op.on_type(DeconvDerivOp)
     def generate_op(self, op, outputs, delta, filters):
+        if self.bind_mkldnn_kernel(op, [delta, filters], [outputs]):
+            return
         self.append("mkldnn.fprop_conv('{}', self.conv_slices['{}'], I={}, F={}, B={},  O={})",
                     op.safe_name, op.fprop.forwarded.safe_name, delta, filters, None, outputs)
 
     @generate_op.on_type(PoolingOp)
     def generate_op(self, op, outputs, inputs):
+        argmax = None
+        if op.pool_params['op'] == 'max':
+            argmax = "self.pool_slices['{}'][5]".format(op.safe_name)
+        if self.bind_mkldnn_kernel(op, [inputs], [outputs, argmax]):
+            return
         self.append("mkldnn.fprop_pool('{}', self.pool_slices['{}'], arrI={}, arrO={})",
                     op.safe_name, op.safe_name, inputs, outputs)
 
     @generate_op.on_type(BpropPoolOp)
     def generate_op(self, op, outputs, delta):
+        fprop = op.fprop.forwarded
+        argmax = None
+        if fprop.pool_params['op'] == 'max':
+            argmax = "self.pool_slices['{}'][5]".format(fprop.safe_name)
+        if self.bind_mkldnn_kernel(op, [delta, argmax], [outputs]):
+            return
         self.append("mkldnn.bprop_pool('{}', self.pool_slices['{}'], arrE={}, arrD={})",
                     op.safe_name, op.fprop.forwarded.safe_name, delta, outputs)
 
@@ -560,7 +809,8 @@ class CPUCodeGenerator(PyGen):
     @generate_op.on_type(update_lut)
     def generatea_op(self, op, outputs, delta, idx):
         if op.update:
-            self.append("update_lut(error={}, idx={}, pad_idx={}, axis={}, dW={})",
+            self.append("update_lut(error={}, idx={}, pad_idx={}, axis={}, dW={}, "
+                        "run_blocks=mkldnn.run_blocks)",
                         delta, idx, op.pad_idx, op.lut_axis, outputs)
 
     @generate_op.on_type(CTCOp)
@@ -584,9 +834,18 @@ class CPUCodeGenerator(PyGen):
     @generate_op.on_type(ContiguousOp)
     def generate_op(self, op, out, x):
         # self.append("{}[()] = {}", out, x)
+        if self.bind_mkldnn_kernel(op, [x], [out]):
+            return
         self.append("mkldnn.mkl_contiguous('{}', {}, {})",
                     op.safe_name, out, x)
 
+    @generate_op.on_type(DequantizeOp)
+    def generate_op(self, op, out, x):
+        if op.scale == 1.0:
+            self.append("{}[()] = {}", out, x)
+        else:
+            self.append("np.multiply({}, {}, out={})", x, op.scale, out)
+
     @generate_op.on_type(Divide)
     def generate_op(self, op, out, x, y):
         self.append("np.divide({}, {}, out={})", x, y, out)
@@ -601,29 +860,41 @@ class CPUCodeGenerator(PyGen):
 
     @generate_op.on_type(DotLowDimension)
     def generate_op(self, op, out, x, y, bias=None):
+        if self.bind_mkldnn_kernel(op, [x, y, bias], [out]):
+            return
         self.append("mkldnn.innerproduct_fprop('{}', {}, {}, {}, out={})",
                     op.safe_name, x, y, bias, out)
 
     @generate_op.on_type(BatchnormOp)
     def generate_op(self, op, output, inputs, gamma, bias, epsilon, mean, variance):
-        self.append("mkldnn.fprop_batchnorm('{}', inputs={}, outputs={}, gamma={},\
-                    bias={}, mean={}, variance={}, epsilon={})", op.safe_name, inputs,
-                    output, gamma, bias, mean, variance, epsilon)
+        if self.generate_mkldnn_batchnorm(op, [inputs, "{}[:, 0]".format(self.name(mean)),
+                                               variance], [output], gamma, bias):
+            return
+        self.append("mkldnn.fprop_batchnorm(inputs={}, outputs={}, gamma={}, bias={}, mean={}, "
+                    "variance={}, epsilon={}, stats=self.{}_stats)", inputs, output, gamma,
+                    bias, mean, variance, epsilon, op.safe_name)
 
     @generate_op.on_type(BpropBatchnormOp)
     def generate_op(self, op, output, delta, inputs, gamma, bias, mean, variance):
-        self.append("mkldnn.bprop_batchnorm('{}', outputs={}, delta={}, inputs={}, \
-                    gamma={}, bias={}, mean={}, variance={}, epsilon={})", op.safe_name, output,
-                    delta, inputs, gamma, bias, mean, variance, op.fprop.eps)
+        if self.generate_mkldnn_batchnorm(op, [inputs, "{}[:, 0]".format(self.name(mean)),
+                                               variance, delta], [output], gamma, bias):
+            return
+        self.append("mkldnn.bprop_batchnorm(outputs={}, delta={}, inputs={}, gamma={}, mean={}, "
+                    "variance={}, epsilon={}, stats=self.{}_stats)", output, delta, inputs,
+                    gamma, mean, variance, op.fprop.eps, op.safe_name)
 
     @generate_op.on_type(ReluOp)
     def generate_op(self, op, outputs, inputs):
+        if self.bind_mkldnn_kernel(op, [inputs], [outputs]):
+            return
         self.append("mkldnn.fprop_relu('{}', {}, {}, {})", op.safe_name, inputs, outputs, op.slope)
 
     @generate_op.on_type(BpropReluOp)
     def generate_op(self, op, outputs, delta, inputs):
+        if self.bind_mkldnn_kernel(op, [inputs, delta], [outputs]):
+            return
         self.append("mkldnn.bprop_relu('{}', {}, {}, {}, {})",
-                    op.safe_name, delta, outputs, inputs, op.fprop.slope)
+                    op.safe_name, delta, outputs, inputs, op.slope)
 
     @generate_op.on_type(Equal)
     def generate_op(self, op, out, x, y):
@@ -637,6 +908,41 @@ class CPUCodeGenerator(PyGen):
     def generate_op(self, op, out, x):
         self.append("{}.fill({})", x, op.scalar)
 
+    @generate_op.on_type(FusedElementwiseOp)
+    def generate_op(self, op, out, *args):
+        def block(ref):
+            kind, pos = ref
+            if kind == 'input':
+                return "{}[index]".format(self.name(args[pos]))
+            elif kind == 'output':
+                return "{}[index]".format(self.name(self.exop.output_decls[pos]))
+            return "scratch[{}][scratch_index]".format(pos)
+
+        self.append("scratch = self.{}_scratch", op.safe_name)
+        self.append("for index, scratch_index in self.{}_blocks:", op.safe_name)
+        with indenting(self):
+            for ufunc, out_ref, arg_refs in op.steps:
+                self.append("np.{}({}, out={})",
+                            ufunc, ", ".join(block(ref) for ref in arg_refs), block(out_ref))
+
+    @generate_op.on_type(ScanOp)
+    def generate_op(self, op, out, *args):
+        inputs = args[:op.n_sequences + op.n_states]
+        self.append("self.scan_nodes[{}].fprop(self.batch_size, {}{})", self.scan_node_id(op),
+                    out,
+                    "".join(", " + self.name(arg) for arg in inputs))
+
+    @generate_op.on_type(ScanBpropOp)
+    def generate_op(self, op, out, delta, scan, *sequences):
+        self.append("self.scan_nodes[{}].bprop(self.batch_size, {}{})",
+                    self.scan_node_id(op.scan), delta,
+                    "".join(", " + self.name(sequence) for sequence in sequences))
+
+    @generate_op.on_type(ScanGradOp)
+    def generate_op(self, op, out, bprop):
+        self.append("{}[()] = self.scan_nodes[{}].gradients[{}]",
+                    out, self.scan_node_id(op.args[0].scan), op.index)
+
     @generate_op.on_type(Greater)
     def generate_op(self, op, out, x, y):
         self.append("np.greater({}, {}, out={})", x, y, out)
@@ -675,6 +981,8 @@ class CPUCodeGenerator(PyGen):
 
     @generate_op.on_type(MklReorderOp)
     def generate_op(self, op, output, input):
+        if self.bind_mkldnn_kernel(op, [input], [output]):
+            return
         self.append("mkldnn.mkl_reorder('{}', {}, {})", op.safe_name, output, input)
 
     @generate_op.on_type(Multiply)
@@ -748,7 +1056,12 @@ class CPUCodeGenerator(PyGen):
 
     @generate_op.on_type(TensorSizeOp)
     def generate_op(self, op, out, x):
-        self.append("{}.fill({})", out, op.reduction_axes.size)
+        batch_axis = self.transformer.device_computation.batch_axis
+        if batch_axis is not None and batch_axis in batch_components(op.reduction_axes):
+            self.append("{}.fill({} * self.batch_size)",
+                        out, op.reduction_axes.size // batch_axis.length)
+        else:
+            self.append("{}.fill({})", out, op.reduction_axes.size)
 
     @generate_op.on_type(CPUQueueSendOp)
     def generate_op(self, op, out, arg):
@@ -814,6 +1127,28 @@ class CPUTransformer(ExecutionGraphTransformer):
     Given a list of ops you want to compute the results of, this transformer
     will compile the graph required to compute those results and exposes an
     evaluate method to execute the compiled graph.
+
+    Arguments:
+        weight_storage: If 'float16' or 'int8', constant dot and convolution weights are
+            stored at that precision and expanded to float32 when used.
+        frozen_values: A dict from variables to numpy values. If given, computations are
+            compiled for inference with the variables frozen at these values: their updates
+            are pruned, batchnorms are folded into the weights before them and constant
+            expressions are computed once. See InferenceFreeze.
+        shared_temporaries: If True, all computations use one temporary arena, sized for
+            the largest, since computations on a transformer run one at a time. Results
+            are kept in a pool of their own computation. Set to False if computations
+            may run while another one is running, for example from several threads.
+        memory_budget: If given, the peak bytes of temporaries that computations aim for, by
+            recomputing activations in the backward pass instead of keeping them. Values
+            marked by checkpoint are kept and values computed from them are recomputed even
+            without a budget. See Rematerialization.
+        exop_threads: If more than 1, computations run exops that do not depend on each
+            other concurrently on up to this many threads, with the same results as running
+            them one at a time. See StreamScheduling.
+        kernel_threads: If more than 1, the numpy convolution, pooling, batchnorm and lookup
+            table update kernels, used where there is no MKL-DNN kernel, split their work
+            over this many threads.
     """
 
     transformer_name = "cpu"
@@ -827,7 +1162,8 @@ class CPUTransformer(ExecutionGraphTransformer):
     except ImportError:
         use_mlsl = False
 
-    def __init__(self, **kwargs):
+    def __init__(self, weight_storage=None, frozen_values=None, shared_temporaries=True,
+                 memory_budget=None, exop_threads=None, kernel_threads=None, **kwargs):
         super(CPUTransformer, self).__init__(**kwargs)
         self.device_computation = None
         self.conv_engine = CPUConvEngine()
@@ -837,6 +1173,7 @@ class CPUTransformer(ExecutionGraphTransformer):
         self.code = CPUCodeGenerator(self)
         self.globals = PyModule(prefix="op")
         self.initialize_module(self.globals)
+        self.mkldnn.set_kernel_threads(kernel_threads)
         self.n_computations = 0
         self.use_pinned_mem = False
         self.rng_seed = None
@@ -845,8 +1182,19 @@ class CPUTransformer(ExecutionGraphTransformer):
         self.exop_codegen_tensor = CPUCodeGenerator(self)
         self.exop_codegen_tensor_view = CPUCodeGenerator(self)
         self.exop_codegen = CPUCodeGenerator(self)
+        self.exop_codegen_bind = CPUCodeGenerator(self)
+        self.exop_codegen_batch = CPUCodeGenerator(self)
+        self.kernel_names = []
         self.exop_codegen_define_length = 0
         self.prefix = ''
+        self.scan_runners = dict()
+        self.shared_temporaries = shared_temporaries
+        self.private_temporaries_depth = 0
+        self.temporary_arena_size = 0
+        # Tensor code and computations in the arena, to rebuild when it grows
+        self.arena_computations = []
+        self.stream_schedule = None
+        self.stream_code = dict()
 
         # from ngraph.transformers.passes.exnviz import ExVizPass
         # from ngraph.transformers.passes.verify import VerifyPass
@@ -854,10 +1202,16 @@ class CPUTransformer(ExecutionGraphTransformer):
         # from ngraph.transformers.passes.dumpgraphpass import DumpGraphPass
 
         self.graph_passes = []
+        if frozen_values is not None:
+            self.graph_passes.append(InferenceFreeze(frozen_values))
+        self.graph_passes.append(ConvolutionFusion())
         if self.mkldnn.enabled:
             self.graph_passes.append(CPUFusion())
             self.byte_alignment = 64
+        if weight_storage is not None:
+            self.graph_passes.append(ReducedPrecisionWeights(weight_storage))
         self.graph_passes += [
+            Rematerialization(memory_budget),
             # ExVizPass(view=True, filename="initial"),
             CPUTensorLayout(),
             SimplePrune(),
@@ -874,6 +1228,8 @@ class CPUTransformer(ExecutionGraphTransformer):
 
         self.graph_passes += [
             SSAConversion(),
+            InPlaceUpdate(),
+            ElementwiseFusionPass(mkldnn=self.mkldnn),
             # DCE here eliminates return values. Need to figure out why.
             # DeadCodeEliminationPass(),
             LivenessPass(),
@@ -881,28 +1237,87 @@ class CPUTransformer(ExecutionGraphTransformer):
             CopyElimination(),
             IndexElision(),
             LivenessPass(),
-            MemLayoutPass()
+            MemLayoutPass(separate_outputs=shared_temporaries)
         ]
+        if exop_threads is not None and exop_threads > 1:
+            self.graph_passes.append(StreamScheduling(exop_threads,
+                                                      separate_outputs=shared_temporaries))
         # from ngraph.transformers.passes.dumpgraphpass import DumpGraphPass
         # self.graph_passes += [DumpGraphPass()]
 
         # from ngraph.transformers.passes.visualizemem import VisualizeMemPass
         # self.graph_passes += [VisualizeMemPass()]
 
+    def add_computation(self, computation_op):
+        # Scan bodies are separate computations, compiled before the computation
+        # that runs them
+        for op in Op.ordered_ops([computation_op]):
+            if isinstance(op, ScanOp) and op not in self.scan_runners:
+                self.scan_runners[op] = ScanRunner(self, op)
+            elif isinstance(op, ScanBpropOp):
+                self.scan_runners[op.scan].compile_backward(op)
+        return super(CPUTransformer, self).add_computation(computation_op)
+
+    @contextmanager
+    def private_temporaries(self):
+        """
+        Computations added in this context get their own temporary pool instead of the
+        shared arena. Scan bodies use this, since they run inside another computation.
+        """
+        self.private_temporaries_depth += 1
+        try:
+            yield
+        finally:
+            self.private_temporaries_depth -= 1
+
+    def pool_name(self, device_computation, tensor_decl):
+        """
+        Returns: The name of the pool that holds tensor_decl.
+        """
+        name = device_computation.computation_op.name
+        if tensor_decl.is_persistent:
+            return name + '_persistent_pool'
+        if self.shared_temporaries and tensor_decl.is_output:
+            return name + '_output_pool'
+        if device_computation.shares_temporaries:
+            return 'temporary_arena'
+        return name + '_temporary_pool'
+
+    def grow_temporary_arena(self, size):
+        """
+        Make the shared temporary arena at least size bytes, moving the temporaries of
+        computations already loaded into the new arena.
+        """
+        if size <= self.temporary_arena_size and 'temporary_arena' in self.globals:
+            return
+        self.temporary_arena_size = max(size, self.temporary_arena_size)
+        self.globals.execute("temporary_arena = align_ndarray({}, {}, np.dtype('uint8'))".format(
+            self.temporary_arena_size, self.byte_alignment))
+        if not self.arena_computations:
+            return
+        for tensor_code, device_computation in self.arena_computations:
+            self.globals.execute(tensor_code)
+            if device_computation.batch_axis is not None and \
+                    device_computation.batch_size != device_computation.batch_axis.length:
+                self.globals.execute(device_computation.batch_views(
+                    device_computation.batch_size))
+        for device_tensor_view in self.device_tensor_views.values():
+            device_tensor_view.reset()
+        for tensor_code, device_computation in self.arena_computations:
+            device_computation.executor.bind_kernels()
+
     def finish_allocate_computation(self, computation):
         self.exop_codegen.endl(2)
 
     def start_define_computation(self, computation_decl):
-        self.exop_codegen.append("class {}(HetrLocals, ConvLocals):",
+        self.exop_codegen.append("class {}(HetrLocals, ConvLocals, ScanLocals, StreamLocals):",
                                  computation_decl.computation_op.name)
         with indenting(self.exop_codegen):
-            self.exop_codegen.append("def __init__(self, **kwargs):")
+            self.exop_codegen.append("def __init__(self, profiler=None, **kwargs):")
             with indenting(self.exop_codegen):
-                if is_tracing_enabled():
-                    self.exop_codegen.append("""
-self.__profiler_start__ = list()
-self.__profiler_stop__  = list()
-""")
+                self.exop_codegen.append("self.profiler = profiler")
+                self.exop_codegen.append("self.batch_size = {}",
+                                         computation_decl.device_computation.batch_size)
                 self.exop_codegen.append('super({}, self).__init__(**kwargs)',
                                          computation_decl.computation_op.name)
                 for exop in computation_decl.exop_block:
@@ -910,61 +1325,147 @@ self.__profiler_stop__  = list()
                     # TODO better way to deal with multiple values
                     self.exop_codegen.exop = exop
                     self.exop_codegen.allocate_op(exop.op, output_decl, *exop.input_decls)
+                self.exop_codegen.append("self.kernels = mkldnn.kernels")
+                self.exop_codegen.append("self.bind_kernels()")
 
             self.exop_codegen.endl()
 
-        self.exop_codegen.indent(1)
-        self.exop_codegen.append("def __call__(self):")
-        self.exop_codegen.indent(1)
+        # Profiling keeps the exops in order; the code of scheduled exops goes to streams
+        self.stream_schedule = None
+        if not is_tracing_enabled():
+            self.stream_schedule = computation_decl.stream_schedule
+        if self.stream_schedule is not None:
+            self.exop_codegen.indent(2)
+        else:
+            self.exop_codegen.indent(1)
+            self.exop_codegen.append("def __call__(self):")
+            self.exop_codegen.indent(1)
+        if is_tracing_enabled():
+            self.exop_codegen.append("""profile_slot = self.profiler.next_slot()
+profile_start = self.profiler.start
+profile_stop = self.profiler.stop""")
         self.codegen_define_length = self.exop_codegen.code_length
+        self.exop_codegen.exop_id = 0
+        self.profile_labels = []
 
     def generate_exop(self, exop):
         value = exop.output_decls[0] if len(exop.output_decls) > 0 else None
         # TODO better way to deal with multiple values
         self.exop_codegen.exop = exop
+        self.exop_codegen.exop_id = len(self.profile_labels)
+        self.profile_labels.append(exop.op.__class__.__name__)
+        code_length = self.exop_codegen.code_length
         self.exop_codegen.generate_op_pre(exop.op)
         self.exop_codegen.generate_op(exop.op, value, *exop.input_decls)
         self.exop_codegen.generate_op_post(exop.op)
+        if self.stream_schedule is not None:
+            self.stream_code[exop] = self.exop_codegen.take_code(code_length)
+
+    def generate_streams(self, stream_schedule):
+        """
+        Generate __call__ to run the streams of stream_schedule, and a method for each
+        stream running the code of its exops, waiting for and setting their events.
+        """
+        self.exop_codegen.append("def __call__(self):")
+        with indenting(self.exop_codegen):
+            self.exop_codegen.append("self.run_streams({})", ', '.join(
+                'self.stream_{}'.format(index) for index in range(len(stream_schedule.streams))))
+        for index, stream in enumerate(stream_schedule.streams):
+            self.exop_codegen.endl()
+            self.exop_codegen.append("def stream_{}(self):", index)
+            with indenting(self.exop_codegen):
+                code_length = self.exop_codegen.code_length
+                for exop in stream:
+                    for event in stream_schedule.waits.get(exop, []):
+                        self.exop_codegen.append("self.events[{}].wait()", event)
+                    code = self.stream_code.pop(exop)
+                    if code:
+                        # The code was generated at the indentation of the stream
+                        self.exop_codegen.indent(-2)
+                        self.exop_codegen.append("{}", code)
+                        self.exop_codegen.indent(2)
+                    if exop in stream_schedule.events:
+                        self.exop_codegen.append("self.events[{}].set()",
+                                                 stream_schedule.events[exop])
+                if code_length == self.exop_codegen.code_length:
+                    self.exop_codegen.append('pass')
 
     def finish_define_computation(self, computation_decl):
-        if self.codegen_define_length == self.exop_codegen.code_length:
-            self.exop_codegen.append('pass')
-        self.exop_codegen.indent(-2)
+        if self.stream_schedule is not None:
+            self.exop_codegen.indent(-1)
+            self.generate_streams(self.stream_schedule)
+        else:
+            if self.codegen_define_length == self.exop_codegen.code_length:
+                self.exop_codegen.append('pass')
+            self.exop_codegen.indent(-1)
+
+        # MKL-DNN kernels read and write the pools directly, and the pools do not move
+        self.exop_codegen.endl()
+        self.exop_codegen.append("def bind_kernels(self):")
+        with indenting(self.exop_codegen):
+            bind_code = self.exop_codegen_bind.take_code()
+            self.exop_codegen.append("{}", bind_code if bind_code else 'pass')
+        computation_decl.device_computation.kernel_names = self.kernel_names
+        self.kernel_names = []
+
+        self.exop_codegen.endl()
+        self.exop_codegen.append("def set_batch_size(self, batch_size):")
+        with indenting(self.exop_codegen):
+            self.exop_codegen.append("self.batch_size = batch_size")
+            batch_code = self.exop_codegen_batch.take_code()
+            if batch_code:
+                self.exop_codegen.append("{}", batch_code)
+        self.exop_codegen.indent(-1)
 
     def finish_load_computation(self, computation_decl):
         device_computation = computation_decl.device_computation
         byte_alignment = computation_decl.execution_graph.execution_state \
             .transformer.byte_alignment
-        self.exop_codegen_pools.append(
-            "{}_temporary_pool = align_ndarray({}, {}, np.dtype('{}'))",
-            computation_decl.computation_op.name, computation_decl.temporary_max_allocated,
-            byte_alignment,
-            'float32')
+        # Pools are raw bytes; each tensor is carved out and viewed as its own dtype
+        if device_computation.shares_temporaries:
+            self.grow_temporary_arena(computation_decl.temporary_max_allocated)
+        else:
+            self.exop_codegen_pools.append(
+                "{}_temporary_pool = align_ndarray({}, {}, np.dtype('{}'))",
+                computation_decl.computation_op.name, computation_decl.temporary_max_allocated,
+                byte_alignment,
+                'uint8')
+        if self.shared_temporaries:
+            self.exop_codegen_pools.append(
+                "{}_output_pool = align_ndarray({}, {}, np.dtype('{}'))",
+                computation_decl.computation_op.name, computation_decl.output_max_allocated,
+                byte_alignment,
+                'uint8')
         self.exop_codegen_pools.append(
             "{}_persistent_pool = align_ndarray({}, {}, np.dtype('{}'))",
             computation_decl.computation_op.name, computation_decl.persistent_max_allocated,
             byte_alignment,
-            'float32')
+            'uint8')
 
         code = '#---------------------------------------------\n'
         code += '# memory pool\n'
         code += '#---------------------------------------------\n'
         code += self.exop_codegen_pools.take_code()
-        code += '\n\n#---------------------------------------------\n'
-        code += '# tensor\n'
-        code += '#---------------------------------------------\n'
-        code += self.exop_codegen_tensor.take_code()
-        code += '\n\n#---------------------------------------------\n'
-        code += '# tensor view\n'
-        code += '#---------------------------------------------\n'
-        code += self.exop_codegen_tensor_view.take_code()
+        tensor_code = '\n\n#---------------------------------------------\n'
+        tensor_code += '# tensor\n'
+        tensor_code += '#---------------------------------------------\n'
+        tensor_code += self.exop_codegen_tensor.take_code()
+        tensor_code += '\n\n#---------------------------------------------\n'
+        tensor_code += '# tensor view\n'
+        tensor_code += '#---------------------------------------------\n'
+        tensor_code += self.exop_codegen_tensor_view.take_code()
+        code += tensor_code
         code += '\n\n#---------------------------------------------\n'
         code += '# code\n'
         code += '#---------------------------------------------\n'
         code += self.exop_codegen.take_code()
         self.globals.compile(code)
         cls = self.globals[computation_decl.computation_op.name]
-        executor = cls(conv_params=device_computation.conv_params,
+        profiler = None
+        if is_tracing_enabled():
+            profiler = ExOpProfiler(self.profile_labels)
+        executor = cls(profiler=profiler,
+                       conv_params=device_computation.conv_params,
                        pool_params=device_computation.pool_params,
                        conv_slices=device_computation.conv_slices,
                        pool_slices=device_computation.pool_slices,
@@ -976,7 +1477,12 @@ self.__profiler_stop__  = list()
                        gather_recv_nodes=device_computation.gather_recv_nodes,
                        allreduce_nodes=device_computation.allreduce_nodes,
                        broadcast_send_nodes=device_computation.broadcast_send_nodes,
-                       broadcast_recv_nodes=device_computation.broadcast_recv_nodes)
+                       broadcast_recv_nodes=device_computation.broadcast_recv_nodes,
+                       scan_nodes=device_computation.scan_nodes,
+                       num_events=len(self.stream_schedule.events)
+                       if self.stream_schedule is not None else 0)
+        if device_computation.shares_temporaries:
+            self.arena_computations.append((tensor_code, device_computation))
         return executor
 
     def make_device_tensor(self, computation, tensor_decl):
@@ -1011,6 +1517,9 @@ from ngraph.transformers.cpu.cpuengine import Mkldnn
 from ngraph.transformers.cpu.cpuengine import ConvLocals
 from ngraph.transformers.cpu.hetr import HetrLocals
 from ngraph.transformers.cpu.ctc import ctc_cpu
+from ngraph.transformers.cpu.fused import elementwise_blocks, elementwise_scratch
+from ngraph.transformers.cpu.scan import ScanLocals
+from ngraph.transformers.cpu.streams import StreamLocals
 from ngraph.transformers.cputransform import align_ndarray
         """)
 
@@ -1041,6 +1550,9 @@ from ngraph.transformers.cputransform import align_ndarray
         pass
 
     def close(self):
+        for device_computation in self.device_computations.values():
+            if device_computation.executor is not None:
+                device_computation.executor.close_streams()
         if self.code is not None:
             try:
                 if self.globals.get('mkldnn', None) is not None:
@@ -402,10 +402,11 @@ class ExOp(ExecutionGraphElt):
     def output_decls(self):
         return self.__output_decls
 
-    def add_input_decl(self, source_output_decl):
+    def add_input_decl(self, source_output_decl, tensor_description=None):
         input_decl = InputDecl(exop=self,
                                pos=len(self.__input_decls),
-                               source_output_decl=source_output_decl)
+                               source_output_decl=source_output_decl,
+                               tensor_description=tensor_description)
         self.__input_decls.append(input_decl)
         return input_decl
 
@@ -1133,7 +1134,9 @@ class ComputationDecl(ExecutionGraphElt):
         self.returns = ExOp(computation_decl=self, op=ReturnOp())
         self.exop_block.add_exop(self.returns, None)
         self.temporary_max_allocated = None
+        self.output_max_allocated = None
         self.persistent_max_allocated = None
+        self.stream_schedule = None
 
         # Get the exops we need values for, so that if they are computed at compile-time we still
         # have a view to their value.
@@ -1199,7 +1202,7 @@ class ExecutionState(object):
 
         tensor_decl = self.__tensors_decls.get(tensor_description_base.op, None)
         if tensor_decl is None:
-            tensor_decl = TensorDecl(op,
+            tensor_decl = TensorDecl(tensor_description_base.op,
                                      element_type=etype(tensor_description_base.dtype),
                                      size=tensor_description_base.tensor_size,
                                      is_persistent=tensor_description_base.is_persistent,
@@ -1238,7 +1241,7 @@ class ExecutionGraph(object):
                 "Tensor description base {} has no Op".format(tensor_description_base))
         tensor_decl = self.tensor_decls.get(tensor_description_base.op, None)
         if tensor_decl is None:
-            tensor_decl = TensorDecl(op,
+            tensor_decl = TensorDecl(tensor_description_base.op,
                                      element_type=etype(tensor_description_base.dtype),
                                      size=tensor_description_base.tensor_size,
                                      is_persistent=tensor_description_base.is_persistent,
@@ -36,20 +36,25 @@ class DeviceComputation(BaseDeviceComputation):
     def __init__(self, transformer, computation_op, **kwargs):
         super(DeviceComputation, self).__init__(transformer, computation_op, **kwargs)
 
-    def generate_profile(self, profiler_start, profiler_stop):
-        tracker = TraceEventTracker(self.computation_op.name)
-        start = iter(profiler_start)
-        stop = iter(profiler_stop)
-        for exop in self.computation_decl.exop_block:
-            start_time = next(start) * 1e6
-            duration = (next(stop) * 1e6) - start_time
-            args = {}
-            count = 0
-            for input_decl in exop.input_decls:
-                args["input{}".format(count)] = input_decl.source_output_decl.exop.name
-                count += 1
-            args['name'] = exop.name
-            tracker.add_operation("ExOp", exop.op.short_name, 0, 0, start_time, duration, args)
+    def generate_profile(self, filename=None):
+        profiler = self.profiler
+        if profiler is None:
+            raise ValueError("Computation {} was not compiled with profiling"
+                             .format(self.name))
+        tracker = TraceEventTracker(filename or self.computation_op.name)
+        exops = list(self.computation_decl.exop_block)
+        for slot in profiler.window:
+            for exop_id, exop in enumerate(exops):
+                start_time = profiler.start[exop_id, slot] * 1e6
+                duration = profiler.stop[exop_id, slot] * 1e6 - start_time
+                args = {}
+                count = 0
+                for input_decl in exop.input_decls:
+                    args["input{}".format(count)] = input_decl.source_output_decl.exop.name
+                    count += 1
+                args['name'] = exop.name
+                tracker.add_operation("ExOp", exop.op.short_name, 0, 0, start_time, duration,
+                                      args)
         tracker.serialize_to_file()
 
 
@@ -392,13 +397,15 @@ class ExecutionGraphTransformer(Transformer):
         device_tensor_view = self.device_tensor_views.get(tensor_view_decl, None)
         if device_tensor_view is None:
             tensor_decl = tensor_view_decl.tensor_decl
+            # Only a new tensor is initialized, not each new view of it
+            is_new_tensor = tensor_decl not in self.device_tensors
             device_tensor = self.device_tensor_from_tensor_decl(tensor_decl)
             device_tensor_view = device_tensor.device_tensor_view(tensor_view_decl)
             self.device_tensor_views[tensor_view_decl] = device_tensor_view
             device_tensor_view.codegen()
-            if tensor_decl.initial_value is not None \
-                    or tensor_decl.is_persistent \
-                    or tensor_decl.is_input:
+            if is_new_tensor and (tensor_decl.initial_value is not None or
+                                  tensor_decl.is_persistent or
+                                  tensor_decl.is_input):
                 init_device_tensor_view = self.device_tensor_view(
                     tensor_decl.root_tensor_view_decl)
                 if tensor_decl.initial_value is not None:
@@ -425,7 +432,8 @@ class ExecutionGraphTransformer(Transformer):
         computation_decl = device_computation.computation_decl
         if isinstance(op, AssignableTensorOp):
             tensor_decl = computation_decl.get_tensor_decl(op=op)
-            device_tensor = self.device_tensor_view(tensor_decl.root_tensor_view_decl)
+            device_tensor = self.device_tensor_view(
+                tensor_decl.get_tensor_view(op.tensor_description()))
         else:
             tensor_view = computation_decl.op_returns[op.tensor].tensor_view_decl
             device_tensor = self.device_tensor_view(tensor_view)
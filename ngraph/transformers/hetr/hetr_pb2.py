@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='ngraph/transformers/hetr/hetr.proto',
   package='',
   syntax='proto3',
-  serialized_pb=_b('\n#ngraph/transformers/hetr/hetr.proto\x1a\x1fngraph/op_graph/serde/ops.proto\"F\n\x05Value\x12\x19\n\x06scalar\x18\x01 \x01(\x0b\x32\x07.ScalarH\x00\x12\x19\n\x06tensor\x18\x02 \x01(\x0b\x32\x07.TensorH\x00\x42\x07\n\x05value\"(\n\x0c\x42uildRequest\x12\x18\n\x10transformer_type\x18\x01 \x01(\t\"\x1c\n\nBuildReply\x12\x0e\n\x06status\x18\x01 \x01(\x08\"b\n\x12\x43omputationRequest\x12\x1b\n\x08subgraph\x18\x01 \x01(\x0b\x32\t.GraphDef\x12\x14\n\x07returns\x18\x02 \x03(\x0b\x32\x03.Op\x12\x19\n\x0cplaceholders\x18\x03 \x03(\x0b\x32\x03.Op\"#\n\x10\x43omputationReply\x12\x0f\n\x07\x63omp_id\x18\x01 \x01(\x05\";\n\x10\x46\x65\x65\x64InputRequest\x12\x0f\n\x07\x63omp_id\x18\x01 \x01(\x05\x12\x16\n\x06values\x18\x02 \x03(\x0b\x32\x06.Value\" \n\x0e\x46\x65\x65\x64InputReply\x12\x0e\n\x06status\x18\x01 \x01(\x08\"$\n\x11GetResultsRequest\x12\x0f\n\x07\x63omp_id\x18\x01 \x01(\x05\":\n\x0fGetResultsReply\x12\x0e\n\x06status\x18\x01 \x01(\x08\x12\x17\n\x07results\x18\x02 \x03(\x0b\x32\x06.Value2\xda\x01\n\x04Hetr\x12\x30\n\x10\x42uildTransformer\x12\r.BuildRequest\x1a\x0b.BuildReply\"\x00\x12\x37\n\x0b\x43omputation\x12\x13.ComputationRequest\x1a\x11.ComputationReply\"\x00\x12\x31\n\tFeedInput\x12\x11.FeedInputRequest\x1a\x0f.FeedInputReply\"\x00\x12\x34\n\nGetResults\x12\x12.GetResultsRequest\x1a\x10.GetResultsReply\"\x00\x62\x06proto3')
+  serialized_pb=_b('\n#ngraph/transformers/hetr/hetr.proto\x1a\x1fngraph/op_graph/serde/ops.proto\"F\n\x05Value\x12\x19\n\x06scalar\x18\x01 \x01(\x0b\x32\x07.ScalarH\x00\x12\x19\n\x06tensor\x18\x02 \x01(\x0b\x32\x07.TensorH\x00\x42\x07\n\x05value\"B\n\nValueChunk\x12\x0f\n\x07\x63omp_id\x18\x01 \x01(\x05\x12\x15\n\x05value\x18\x02 \x01(\x0b\x32\x06.Value\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\"(\n\x0c\x42uildRequest\x12\x18\n\x10transformer_type\x18\x01 \x01(\t\"\x1c\n\nBuildReply\x12\x0e\n\x06status\x18\x01 \x01(\x08\"b\n\x12\x43omputationRequest\x12\x1b\n\x08subgraph\x18\x01 \x01(\x0b\x32\t.GraphDef\x12\x14\n\x07returns\x18\x02 \x03(\x0b\x32\x03.Op\x12\x19\n\x0cplaceholders\x18\x03 \x03(\x0b\x32\x03.Op\"#\n\x10\x43omputationReply\x12\x0f\n\x07\x63omp_id\x18\x01 \x01(\x05\";\n\x10\x46\x65\x65\x64InputRequest\x12\x0f\n\x07\x63omp_id\x18\x01 \x01(\x05\x12\x16\n\x06values\x18\x02 \x03(\x0b\x32\x06.Value\" \n\x0e\x46\x65\x65\x64InputReply\x12\x0e\n\x06status\x18\x01 \x01(\x08\"$\n\x11GetResultsRequest\x12\x0f\n\x07\x63omp_id\x18\x01 \x01(\x05\":\n\x0fGetResultsReply\x12\x0e\n\x06status\x18\x01 \x01(\x08\x12\x17\n\x07results\x18\x02 \x03(\x0b\x32\x06.Value\"5\n\nRunRequest\x12\x0f\n\x07\x63omp_id\x18\x01 \x01(\x05\x12\x16\n\x06values\x18\x02 \x03(\x0b\x32\x06.Value\"3\n\x08RunReply\x12\x0e\n\x06status\x18\x01 \x01(\x08\x12\x17\n\x07results\x18\x02 \x03(\x0b\x32\x06.Value2\x96\x03\n\x04Hetr\x12\x30\n\x10\x42uildTransformer\x12\r.BuildRequest\x1a\x0b.BuildReply\"\x00\x12\x37\n\x0b\x43omputation\x12\x13.ComputationRequest\x1a\x11.ComputationReply\"\x00\x12\x31\n\tFeedInput\x12\x11.FeedInputRequest\x1a\x0f.FeedInputReply\"\x00\x12\x34\n\nGetResults\x12\x12.GetResultsRequest\x1a\x10.GetResultsReply\"\x00\x12\x33\n\x0f\x46\x65\x65\x64InputStream\x12\x0b.ValueChunk\x1a\x0f.FeedInputReply\"\x00(\x01\x12\x37\n\x10GetResultsStream\x12\x12.GetResultsRequest\x1a\x0b.ValueChunk\"\x00\x30\x01\x12\x1f\n\x03Run\x12\x0b.RunRequest\x1a\t.RunReply\"\x00\x12+\n\tRunStream\x12\x0b.ValueChunk\x1a\x0b.ValueChunk\"\x00(\x01\x30\x01\x62\x06proto3')
   ,
   dependencies=[ngraph_dot_op__graph_dot_serde_dot_ops__pb2.DESCRIPTOR,])
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
@@ -69,6 +69,51 @@ _VALUE = _descriptor.Descriptor(
 )
 
 
+_VALUECHUNK = _descriptor.Descriptor(
+  name='ValueChunk',
+  full_name='ValueChunk',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='comp_id', full_name='ValueChunk.comp_id', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='value', full_name='ValueChunk.value', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='data', full_name='ValueChunk.data', index=2,
+      number=3, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=144,
+  serialized_end=210,
+)
+
+
 _BUILDREQUEST = _descriptor.Descriptor(
   name='BuildRequest',
   full_name='BuildRequest',
@@ -95,8 +140,8 @@ _BUILDREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=144,
-  serialized_end=184,
+  serialized_start=212,
+  serialized_end=252,
 )
 
 
@@ -126,8 +171,8 @@ _BUILDREPLY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=186,
-  serialized_end=214,
+  serialized_start=254,
+  serialized_end=282,
 )
 
 
@@ -171,8 +216,8 @@ _COMPUTATIONREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=216,
-  serialized_end=314,
+  serialized_start=284,
+  serialized_end=382,
 )
 
 
@@ -202,8 +247,8 @@ _COMPUTATIONREPLY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=316,
-  serialized_end=351,
+  serialized_start=384,
+  serialized_end=419,
 )
 
 
@@ -240,8 +285,8 @@ _FEEDINPUTREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=353,
-  serialized_end=412,
+  serialized_start=421,
+  serialized_end=480,
 )
 
 
@@ -271,8 +316,8 @@ _FEEDINPUTREPLY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=414,
-  serialized_end=446,
+  serialized_start=482,
+  serialized_end=514,
 )
 
 
@@ -302,8 +347,8 @@ _GETRESULTSREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=448,
-  serialized_end=484,
+  serialized_start=516,
+  serialized_end=552,
 )
 
 
@@ -340,8 +385,84 @@ _GETRESULTSREPLY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=486,
-  serialized_end=544,
+  serialized_start=554,
+  serialized_end=612,
+)
+
+
+_RUNREQUEST = _descriptor.Descriptor(
+  name='RunRequest',
+  full_name='RunRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='comp_id', full_name='RunRequest.comp_id', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='values', full_name='RunRequest.values', index=1,
+      number=2, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=614,
+  serialized_end=667,
+)
+
+
+_RUNREPLY = _descriptor.Descriptor(
+  name='RunReply',
+  full_name='RunReply',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='status', full_name='RunReply.status', index=0,
+      number=1, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+    _descriptor.FieldDescriptor(
+      name='results', full_name='RunReply.results', index=1,
+      number=2, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      options=None),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=669,
+  serialized_end=720,
 )
 
 _VALUE.fields_by_name['scalar'].message_type = ngraph_dot_op__graph_dot_serde_dot_ops__pb2._SCALAR
@@ -352,12 +473,16 @@ _VALUE.fields_by_name['scalar'].containing_oneof = _VALUE.oneofs_by_name['value'
 _VALUE.oneofs_by_name['value'].fields.append(
   _VALUE.fields_by_name['tensor'])
 _VALUE.fields_by_name['tensor'].containing_oneof = _VALUE.oneofs_by_name['value']
+_VALUECHUNK.fields_by_name['value'].message_type = _VALUE
 _COMPUTATIONREQUEST.fields_by_name['subgraph'].message_type = ngraph_dot_op__graph_dot_serde_dot_ops__pb2._GRAPHDEF
 _COMPUTATIONREQUEST.fields_by_name['returns'].message_type = ngraph_dot_op__graph_dot_serde_dot_ops__pb2._OP
 _COMPUTATIONREQUEST.fields_by_name['placeholders'].message_type = ngraph_dot_op__graph_dot_serde_dot_ops__pb2._OP
 _FEEDINPUTREQUEST.fields_by_name['values'].message_type = _VALUE
 _GETRESULTSREPLY.fields_by_name['results'].message_type = _VALUE
+_RUNREQUEST.fields_by_name['values'].message_type = _VALUE
+_RUNREPLY.fields_by_name['results'].message_type = _VALUE
 DESCRIPTOR.message_types_by_name['Value'] = _VALUE
+DESCRIPTOR.message_types_by_name['ValueChunk'] = _VALUECHUNK
 DESCRIPTOR.message_types_by_name['BuildRequest'] = _BUILDREQUEST
 DESCRIPTOR.message_types_by_name['BuildReply'] = _BUILDREPLY
 DESCRIPTOR.message_types_by_name['ComputationRequest'] = _COMPUTATIONREQUEST
@@ -366,6 +491,8 @@ DESCRIPTOR.message_types_by_name['FeedInputRequest'] = _FEEDINPUTREQUEST
 DESCRIPTOR.message_types_by_name['FeedInputReply'] = _FEEDINPUTREPLY
 DESCRIPTOR.message_types_by_name['GetResultsRequest'] = _GETRESULTSREQUEST
 DESCRIPTOR.message_types_by_name['GetResultsReply'] = _GETRESULTSREPLY
+DESCRIPTOR.message_types_by_name['RunRequest'] = _RUNREQUEST
+DESCRIPTOR.message_types_by_name['RunReply'] = _RUNREPLY
 
 Value = _reflection.GeneratedProtocolMessageType('Value', (_message.Message,), dict(
   DESCRIPTOR = _VALUE,
@@ -374,6 +501,13 @@ Value = _reflection.GeneratedProtocolMessageType('Value', (_message.Message,), d
   ))
 _sym_db.RegisterMessage(Value)
 
+ValueChunk = _reflection.GeneratedProtocolMessageType('ValueChunk', (_message.Message,), dict(
+  DESCRIPTOR = _VALUECHUNK,
+  __module__ = 'ngraph.transformers.hetr.hetr_pb2'
+  # @@protoc_insertion_point(class_scope:ValueChunk)
+  ))
+_sym_db.RegisterMessage(ValueChunk)
+
 BuildRequest = _reflection.GeneratedProtocolMessageType('BuildRequest', (_message.Message,), dict(
   DESCRIPTOR = _BUILDREQUEST,
   __module__ = 'ngraph.transformers.hetr.hetr_pb2'
@@ -430,6 +564,20 @@ GetResultsReply = _reflection.GeneratedProtocolMessageType('GetResultsReply', (_
   ))
 _sym_db.RegisterMessage(GetResultsReply)
 
+RunRequest = _reflection.GeneratedProtocolMessageType('RunRequest', (_message.Message,), dict(
+  DESCRIPTOR = _RUNREQUEST,
+  __module__ = 'ngraph.transformers.hetr.hetr_pb2'
+  # @@protoc_insertion_point(class_scope:RunRequest)
+  ))
+_sym_db.RegisterMessage(RunRequest)
+
+RunReply = _reflection.GeneratedProtocolMessageType('RunReply', (_message.Message,), dict(
+  DESCRIPTOR = _RUNREPLY,
+  __module__ = 'ngraph.transformers.hetr.hetr_pb2'
+  # @@protoc_insertion_point(class_scope:RunReply)
+  ))
+_sym_db.RegisterMessage(RunReply)
+
 
 try:
   # THESE ELEMENTS WILL BE DEPRECATED.
@@ -469,6 +617,26 @@ try:
           request_serializer=GetResultsRequest.SerializeToString,
           response_deserializer=GetResultsReply.FromString,
           )
+      self.FeedInputStream = channel.stream_unary(
+          '/Hetr/FeedInputStream',
+          request_serializer=ValueChunk.SerializeToString,
+          response_deserializer=FeedInputReply.FromString,
+          )
+      self.GetResultsStream = channel.unary_stream(
+          '/Hetr/GetResultsStream',
+          request_serializer=GetResultsRequest.SerializeToString,
+          response_deserializer=ValueChunk.FromString,
+          )
+      self.Run = channel.unary_unary(
+          '/Hetr/Run',
+          request_serializer=RunRequest.SerializeToString,
+          response_deserializer=RunReply.FromString,
+          )
+      self.RunStream = channel.stream_stream(
+          '/Hetr/RunStream',
+          request_serializer=ValueChunk.SerializeToString,
+          response_deserializer=ValueChunk.FromString,
+          )
 
 
   class HetrServicer(object):
@@ -493,6 +661,26 @@ try:
       context.set_details('Method not implemented!')
       raise NotImplementedError('Method not implemented!')
 
+    def FeedInputStream(self, request_iterator, context):
+      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+      context.set_details('Method not implemented!')
+      raise NotImplementedError('Method not implemented!')
+
+    def GetResultsStream(self, request, context):
+      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+      context.set_details('Method not implemented!')
+      raise NotImplementedError('Method not implemented!')
+
+    def Run(self, request, context):
+      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+      context.set_details('Method not implemented!')
+      raise NotImplementedError('Method not implemented!')
+
+    def RunStream(self, request_iterator, context):
+      context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+      context.set_details('Method not implemented!')
+      raise NotImplementedError('Method not implemented!')
+
 
   def add_HetrServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -516,6 +704,26 @@ try:
             request_deserializer=GetResultsRequest.FromString,
             response_serializer=GetResultsReply.SerializeToString,
         ),
+        'FeedInputStream': grpc.stream_unary_rpc_method_handler(
+            servicer.FeedInputStream,
+            request_deserializer=ValueChunk.FromString,
+            response_serializer=FeedInputReply.SerializeToString,
+        ),
+        'GetResultsStream': grpc.unary_stream_rpc_method_handler(
+            servicer.GetResultsStream,
+            request_deserializer=GetResultsRequest.FromString,
+            response_serializer=ValueChunk.SerializeToString,
+        ),
+        'Run': grpc.unary_unary_rpc_method_handler(
+            servicer.Run,
+            request_deserializer=RunRequest.FromString,
+            response_serializer=RunReply.SerializeToString,
+        ),
+        'RunStream': grpc.stream_stream_rpc_method_handler(
+            servicer.RunStream,
+            request_deserializer=ValueChunk.FromString,
+            response_serializer=ValueChunk.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         'Hetr', rpc_method_handlers)
@@ -536,6 +744,14 @@ try:
       context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
     def GetResults(self, request, context):
       context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+    def FeedInputStream(self, request_iterator, context):
+      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+    def GetResultsStream(self, request, context):
+      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+    def Run(self, request, context):
+      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
+    def RunStream(self, request_iterator, context):
+      context.code(beta_interfaces.StatusCode.UNIMPLEMENTED)
 
 
   class BetaHetrStub(object):
@@ -556,6 +772,16 @@ try:
     def GetResults(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
       raise NotImplementedError()
     GetResults.future = None
+    def FeedInputStream(self, request_iterator, timeout, metadata=None, with_call=False, protocol_options=None):
+      raise NotImplementedError()
+    FeedInputStream.future = None
+    def GetResultsStream(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+      raise NotImplementedError()
+    def Run(self, request, timeout, metadata=None, with_call=False, protocol_options=None):
+      raise NotImplementedError()
+    Run.future = None
+    def RunStream(self, request_iterator, timeout, metadata=None, with_call=False, protocol_options=None):
+      raise NotImplementedError()
 
 
   def beta_create_Hetr_server(servicer, pool=None, pool_size=None, default_timeout=None, maximum_timeout=None):
@@ -568,19 +794,31 @@ try:
       ('Hetr', 'BuildTransformer'): BuildRequest.FromString,
       ('Hetr', 'Computation'): ComputationRequest.FromString,
       ('Hetr', 'FeedInput'): FeedInputRequest.FromString,
+      ('Hetr', 'FeedInputStream'): ValueChunk.FromString,
       ('Hetr', 'GetResults'): GetResultsRequest.FromString,
+      ('Hetr', 'GetResultsStream'): GetResultsRequest.FromString,
+      ('Hetr', 'Run'): RunRequest.FromString,
+      ('Hetr', 'RunStream'): ValueChunk.FromString,
     }
     response_serializers = {
       ('Hetr', 'BuildTransformer'): BuildReply.SerializeToString,
       ('Hetr', 'Computation'): ComputationReply.SerializeToString,
       ('Hetr', 'FeedInput'): FeedInputReply.SerializeToString,
+      ('Hetr', 'FeedInputStream'): FeedInputReply.SerializeToString,
       ('Hetr', 'GetResults'): GetResultsReply.SerializeToString,
+      ('Hetr', 'GetResultsStream'): ValueChunk.SerializeToString,
+      ('Hetr', 'Run'): RunReply.SerializeToString,
+      ('Hetr', 'RunStream'): ValueChunk.SerializeToString,
     }
     method_implementations = {
       ('Hetr', 'BuildTransformer'): face_utilities.unary_unary_inline(servicer.BuildTransformer),
       ('Hetr', 'Computation'): face_utilities.unary_unary_inline(servicer.Computation),
       ('Hetr', 'FeedInput'): face_utilities.unary_unary_inline(servicer.FeedInput),
+      ('Hetr', 'FeedInputStream'): face_utilities.stream_unary_inline(servicer.FeedInputStream),
       ('Hetr', 'GetResults'): face_utilities.unary_unary_inline(servicer.GetResults),
+      ('Hetr', 'GetResultsStream'): face_utilities.unary_stream_inline(servicer.GetResultsStream),
+      ('Hetr', 'Run'): face_utilities.unary_unary_inline(servicer.Run),
+      ('Hetr', 'RunStream'): face_utilities.stream_stream_inline(servicer.RunStream),
     }
     server_options = beta_implementations.server_options(request_deserializers=request_deserializers, response_serializers=response_serializers, thread_pool=pool, thread_pool_size=pool_size, default_timeout=default_timeout, maximum_timeout=maximum_timeout)
     return beta_implementations.server(method_implementations, options=server_options)
@@ -596,19 +834,31 @@ try:
       ('Hetr', 'BuildTransformer'): BuildRequest.SerializeToString,
       ('Hetr', 'Computation'): ComputationRequest.SerializeToString,
       ('Hetr', 'FeedInput'): FeedInputRequest.SerializeToString,
+      ('Hetr', 'FeedInputStream'): ValueChunk.SerializeToString,
       ('Hetr', 'GetResults'): GetResultsRequest.SerializeToString,
+      ('Hetr', 'GetResultsStream'): GetResultsRequest.SerializeToString,
+      ('Hetr', 'Run'): RunRequest.SerializeToString,
+      ('Hetr', 'RunStream'): ValueChunk.SerializeToString,
     }
     response_deserializers = {
       ('Hetr', 'BuildTransformer'): BuildReply.FromString,
       ('Hetr', 'Computation'): ComputationReply.FromString,
       ('Hetr', 'FeedInput'): FeedInputReply.FromString,
+      ('Hetr', 'FeedInputStream'): FeedInputReply.FromString,
       ('Hetr', 'GetResults'): GetResultsReply.FromString,
+      ('Hetr', 'GetResultsStream'): ValueChunk.FromString,
+      ('Hetr', 'Run'): RunReply.FromString,
+      ('Hetr', 'RunStream'): ValueChunk.FromString,
     }
     cardinalities = {
       'BuildTransformer': cardinality.Cardinality.UNARY_UNARY,
       'Computation': cardinality.Cardinality.UNARY_UNARY,
       'FeedInput': cardinality.Cardinality.UNARY_UNARY,
+      'FeedInputStream': cardinality.Cardinality.STREAM_UNARY,
       'GetResults': cardinality.Cardinality.UNARY_UNARY,
+      'GetResultsStream': cardinality.Cardinality.UNARY_STREAM,
+      'Run': cardinality.Cardinality.UNARY_UNARY,
+      'RunStream': cardinality.Cardinality.STREAM_STREAM,
     }
     stub_options = beta_implementations.stub_options(host=host, metadata_transformer=metadata_transformer, request_serializers=request_serializers, response_deserializers=response_deserializers, thread_pool=pool, thread_pool_size=pool_size)
     return beta_implementations.dynamic_stub(channel, 'Hetr', cardinalities, options=stub_options)
@@ -32,6 +32,26 @@ class HetrStub(object):
         request_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.GetResultsRequest.SerializeToString,
         response_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.GetResultsReply.FromString,
         )
+    self.FeedInputStream = channel.stream_unary(
+        '/Hetr/FeedInputStream',
+        request_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.ValueChunk.SerializeToString,
+        response_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.FeedInputReply.FromString,
+        )
+    self.GetResultsStream = channel.unary_stream(
+        '/Hetr/GetResultsStream',
+        request_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.GetResultsRequest.SerializeToString,
+        response_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.ValueChunk.FromString,
+        )
+    self.Run = channel.unary_unary(
+        '/Hetr/Run',
+        request_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.RunRequest.SerializeToString,
+        response_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.RunReply.FromString,
+        )
+    self.RunStream = channel.stream_stream(
+        '/Hetr/RunStream',
+        request_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.ValueChunk.SerializeToString,
+        response_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.ValueChunk.FromString,
+        )
 
 
 class HetrServicer(object):
@@ -56,6 +76,26 @@ class HetrServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def FeedInputStream(self, request_iterator, context):
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def GetResultsStream(self, request, context):
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def Run(self, request, context):
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def RunStream(self, request_iterator, context):
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_HetrServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -79,6 +119,26 @@ def add_HetrServicer_to_server(servicer, server):
           request_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.GetResultsRequest.FromString,
           response_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.GetResultsReply.SerializeToString,
       ),
+      'FeedInputStream': grpc.stream_unary_rpc_method_handler(
+          servicer.FeedInputStream,
+          request_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.ValueChunk.FromString,
+          response_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.FeedInputReply.SerializeToString,
+      ),
+      'GetResultsStream': grpc.unary_stream_rpc_method_handler(
+          servicer.GetResultsStream,
+          request_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.GetResultsRequest.FromString,
+          response_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.ValueChunk.SerializeToString,
+      ),
+      'Run': grpc.unary_unary_rpc_method_handler(
+          servicer.Run,
+          request_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.RunRequest.FromString,
+          response_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.RunReply.SerializeToString,
+      ),
+      'RunStream': grpc.stream_stream_rpc_method_handler(
+          servicer.RunStream,
+          request_deserializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.ValueChunk.FromString,
+          response_serializer=ngraph_dot_transformers_dot_hetr_dot_hetr__pb2.ValueChunk.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'Hetr', rpc_method_handlers)
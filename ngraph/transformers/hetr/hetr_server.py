@@ -3,12 +3,10 @@ import argparse
 import time
 import socket
 import grpc
-import hetr_pb2
-import hetr_pb2_grpc
-from mpi4py import MPI
-from ngraph.op_graph.op_graph import Op
-from ngraph.op_graph.serde.serde import protobuf_to_op, pb_to_tensor, _deserialize_graph,\
-    tensor_to_protobuf, assign_scalar, protobuf_scalar_to_python, is_scalar_type
+from ngraph.op_graph.serde.serde import _deserialize_graph
+from ngraph.transformers.hetr import hetr_pb2, hetr_pb2_grpc
+from ngraph.transformers.hetr.hetr_streaming import ValueAssembler, value_chunks,\
+    values_to_protobuf, protobuf_to_values
 from ngraph.transformers.hetrtransform import build_transformer
 
 
@@ -46,23 +44,9 @@ class HetrServer(hetr_pb2_grpc.HetrServicer):
         try:
             comp_id = self.new_comp_id()
             subgraph = _deserialize_graph(request.subgraph)
-            returns = []
-            placeholders = []
-            for pb_op in request.returns:
-                returns.append(protobuf_to_op(pb_op))
-            for pb_op in request.placeholders:
-                placeholders.append(protobuf_to_op(pb_op))
-            return_list = []
-            placeholder_list = []
-            ops = Op.ordered_ops(subgraph)
-            for r in returns:
-                for op in ops:
-                    if op.uuid == r.uuid:
-                        return_list.append(op)
-            for p in placeholders:
-                for op in ops:
-                    if op.uuid == p.uuid:
-                        placeholder_list.append(op)
+            ops_by_uuid = {op.uuid.bytes: op for op in subgraph}
+            return_list = [ops_by_uuid[pb_op.uuid.uuid] for pb_op in request.returns]
+            placeholder_list = [ops_by_uuid[pb_op.uuid.uuid] for pb_op in request.placeholders]
             computation = self.transformer.computation(return_list, *placeholder_list)
 
             self.computations[comp_id] = computation
@@ -75,13 +59,23 @@ class HetrServer(hetr_pb2_grpc.HetrServicer):
             return hetr_pb2.FeedInputReply(status=False)
 
         try:
-            values = []
-            for v in request.values:
-                if v.HasField('scalar'):
-                    values.append(protobuf_scalar_to_python(v.scalar))
-                else:
-                    values.append(pb_to_tensor(v.tensor))
-            computation = self.computations[request.comp_id]
+            return self.run_computation(request.comp_id, protobuf_to_values(request.values))
+        except:
+            return hetr_pb2.FeedInputReply(status=False)
+
+    def FeedInputStream(self, request_iterator, context):
+        try:
+            assembler = ValueAssembler()
+            values = assembler.assemble(request_iterator)
+            if assembler.comp_id is None or assembler.comp_id >= len(self.computations):
+                return hetr_pb2.FeedInputReply(status=False)
+            return self.run_computation(assembler.comp_id, values)
+        except:
+            return hetr_pb2.FeedInputReply(status=False)
+
+    def run_computation(self, comp_id, values):
+        try:
+            computation = self.computations[comp_id]
 
             if self.transformer.transformer_name == "gpu":
                 import pycuda.driver as drv
@@ -93,7 +87,7 @@ class HetrServer(hetr_pb2_grpc.HetrServicer):
             else:
                 outputs = computation(*values)
 
-            self.results[request.comp_id] = outputs
+            self.results[comp_id] = outputs
 
             return hetr_pb2.FeedInputReply(status=True)
         except:
@@ -104,18 +98,55 @@ class HetrServer(hetr_pb2_grpc.HetrServicer):
             return hetr_pb2.GetResultsReply(status=False)
 
         try:
-            pb_results = []
-            for r in self.results[request.comp_id]:
-                pb_val = hetr_pb2.Value()
-                if is_scalar_type(r):
-                    assign_scalar(pb_val.scalar, r)
-                else:
-                    pb_val.tensor.CopyFrom(tensor_to_protobuf(r))
-                pb_results.append(pb_val)
-            return hetr_pb2.GetResultsReply(status=True, results=pb_results)
+            return hetr_pb2.GetResultsReply(status=True,
+                                            results=values_to_protobuf(
+                                                self.results[request.comp_id]))
         except:
             return hetr_pb2.GetResultsReply(status=False)
 
+    def Run(self, request, context):
+        """
+        Feeds the inputs to a computation, runs it and returns its results.
+        """
+        if request.comp_id >= len(self.computations):
+            return hetr_pb2.RunReply(status=False)
+
+        try:
+            values = protobuf_to_values(request.values)
+            if not self.run_computation(request.comp_id, values).status:
+                return hetr_pb2.RunReply(status=False)
+            return hetr_pb2.RunReply(status=True,
+                                     results=values_to_protobuf(self.results[request.comp_id]))
+        except:
+            return hetr_pb2.RunReply(status=False)
+
+    def RunStream(self, request_iterator, context):
+        """
+        Run with inputs and results streamed in chunks.
+        """
+        assembler = ValueAssembler()
+        try:
+            values = assembler.assemble(request_iterator)
+            comp_id = assembler.comp_id
+            status = comp_id is not None and comp_id < len(self.computations) and \
+                self.run_computation(comp_id, values).status
+        except:
+            status = False
+        if not status:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details("Running computation {} failed".format(assembler.comp_id))
+            return
+        for chunk in value_chunks(self.results[comp_id], comp_id):
+            yield chunk
+
+    def GetResultsStream(self, request, context):
+        if request.comp_id not in self.results:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("No results for computation {}".format(request.comp_id))
+            return
+        for chunk in value_chunks(self.results[request.comp_id], request.comp_id):
+            yield chunk
+
 
 def is_port_open(port):
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -131,6 +162,7 @@ def serve():
     parser = argparse.ArgumentParser()
     parser.add_argument("-p", "--ports", nargs='+', default=['51051'])
     args = parser.parse_args()
+    from mpi4py import MPI
     comm = MPI.COMM_WORLD
 
     options = [('grpc.max_receive_message_length', -1)]
@@ -0,0 +1,119 @@
+import numpy as np
+
+from ngraph.transformers.hetr import hetr_pb2
+from ngraph.op_graph.serde.serde import dtype_to_protobuf, pb_to_dtype, is_scalar_type,\
+    assign_scalar, protobuf_scalar_to_python, tensor_to_protobuf, pb_to_tensor
+
+
+# bytes of tensor data per chunk, well below the default gRPC message size limit
+CHUNK_SIZE = 1 << 20
+
+
+def values_to_protobuf(values):
+    """
+    Returns a Value message for each of values, which are scalars or numpy tensors.
+    """
+    pb_values = []
+    for value in values:
+        pb_value = hetr_pb2.Value()
+        if is_scalar_type(value):
+            assign_scalar(pb_value.scalar, value)
+        else:
+            pb_value.tensor.CopyFrom(tensor_to_protobuf(value))
+        pb_values.append(pb_value)
+    return pb_values
+
+
+def protobuf_to_values(pb_values):
+    """
+    Returns the values of Value messages.
+    """
+    return [protobuf_scalar_to_python(pb_value.scalar) if pb_value.HasField('scalar')
+            else pb_to_tensor(pb_value.tensor)
+            for pb_value in pb_values]
+
+
+def tensor_bytes(tensor):
+    """
+    Returns a flat uint8 view of the bytes of tensor, copying it only if it
+    is not contiguous.
+    """
+    return np.ascontiguousarray(tensor).reshape(-1).view(np.uint8)
+
+
+def value_chunks(values, comp_id=0, chunk_size=CHUNK_SIZE):
+    """
+    Yields ValueChunk messages streaming values, which are scalars or numpy
+    tensors. Tensor data is sliced from a view of the tensor and sent in
+    chunks of at most chunk_size bytes. The first chunk only names the
+    computation, so that no values still make a stream.
+    """
+    yield hetr_pb2.ValueChunk(comp_id=comp_id)
+    for value in values:
+        chunk = hetr_pb2.ValueChunk(comp_id=comp_id)
+        if is_scalar_type(value):
+            assign_scalar(chunk.value.scalar, value)
+            yield chunk
+            continue
+
+        chunk.value.tensor.info.dtype = dtype_to_protobuf(value.dtype)
+        chunk.value.tensor.info.shape.extend(value.shape)
+        data = tensor_bytes(value)
+        chunk.data = data[:chunk_size].tobytes()
+        yield chunk
+        for start in range(chunk_size, len(data), chunk_size):
+            yield hetr_pb2.ValueChunk(comp_id=comp_id,
+                                      data=data[start:start + chunk_size].tobytes())
+
+
+class ValueAssembler(object):
+    """
+    Rebuilds the values streamed by value_chunks, copying the data of each
+    tensor into place as its chunks arrive.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.comp_id = None
+        self.data = None
+        self.offset = 0
+
+    def add(self, chunk):
+        if self.comp_id is None:
+            self.comp_id = chunk.comp_id
+        if chunk.HasField('value'):
+            self.check_complete()
+            if chunk.value.HasField('scalar'):
+                self.values.append(protobuf_scalar_to_python(chunk.value.scalar))
+                self.data = None
+                return
+            info = chunk.value.tensor.info
+            tensor = np.empty(tuple(info.shape), dtype=pb_to_dtype(info.dtype))
+            self.values.append(tensor)
+            self.data = tensor_bytes(tensor)
+            self.offset = 0
+        elif self.data is None:
+            if chunk.data:
+                raise ValueError("Tensor data was streamed without its info")
+            return
+        end = self.offset + len(chunk.data)
+        if end > len(self.data):
+            raise ValueError("More data was streamed than the tensor holds")
+        self.data[self.offset:end] = np.frombuffer(chunk.data, dtype=np.uint8)
+        self.offset = end
+
+    def check_complete(self):
+        if self.data is not None and self.offset != len(self.data):
+            raise ValueError("Tensor was streamed {} of {} bytes".format(
+                self.offset, len(self.data)))
+
+    def assemble(self, chunks):
+        """
+        Returns the values streamed in chunks.
+        """
+        for chunk in chunks:
+            self.add(chunk)
+        self.check_complete()
+        # zero-dimensional tensors are returned as numpy scalars, like pb_to_tensor
+        return [value[()] if isinstance(value, np.ndarray) and value.ndim == 0 else value
+                for value in self.values]
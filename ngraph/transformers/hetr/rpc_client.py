@@ -1,11 +1,13 @@
 import grpc
+import numpy as np
 from six import iteritems
 
 from . import hetr_pb2
 from . import hetr_pb2_grpc
-from ngraph.op_graph.serde.serde import op_to_protobuf, tensor_to_protobuf, _serialize_graph,\
-    pb_to_tensor, is_scalar_type, assign_scalar, protobuf_scalar_to_python
+from ngraph.op_graph.serde.serde import op_to_protobuf, _serialize_graph
 from ngraph.transformers.hetr.hetr_utils import update_comm_deps
+from ngraph.transformers.hetr.hetr_streaming import CHUNK_SIZE, ValueAssembler, value_chunks,\
+    values_to_protobuf, protobuf_to_values
 
 
 _TIMEOUT_SECONDS = 600
@@ -18,40 +20,43 @@ def is_channel_ready(channel):
 
 
 class RPCComputationClient(object):
-    def __init__(self, comp_id, stub):
+    """
+    Runs a computation on a hetr server.
+
+    Arguments:
+        comp_id: The id of the computation on the server.
+        stub: The HetrStub of the server.
+        stream: Stream inputs and results in chunks, for tensors too large to send in
+            one message.
+    """
+
+    def __init__(self, comp_id, stub, stream=False):
         self.comp_id = comp_id
         self.RPC = stub
+        self.stream = stream
 
     def feed_input(self, values):
-        pb_values = []
-        for v in values:
-            pb_val = hetr_pb2.Value()
-            if is_scalar_type(v):
-                assign_scalar(pb_val.scalar, v)
-            else:
-                pb_val.tensor.CopyFrom(tensor_to_protobuf(v))
-            pb_values.append(pb_val)
-        self.feed_input_response_future = self.RPC.FeedInput.future(
-            hetr_pb2.FeedInputRequest(
-                comp_id=self.comp_id,
-                values=pb_values),
-            _TIMEOUT_SECONDS)
+        # the computation runs while the caller feeds other computations; get_results
+        # waits for its results
+        if self.stream:
+            self.run_responses = self.RPC.RunStream(value_chunks(values, self.comp_id),
+                                                    _TIMEOUT_SECONDS)
+        else:
+            self.run_response_future = self.RPC.Run.future(
+                hetr_pb2.RunRequest(comp_id=self.comp_id, values=values_to_protobuf(values)),
+                _TIMEOUT_SECONDS)
 
     def get_results(self):
-        response = self.feed_input_response_future.result()
-        if not response.status:
-            raise RuntimeError("RPC feed_input request failed!")
-        response = self.RPC.GetResults(
-            hetr_pb2.GetResultsRequest(comp_id=self.comp_id),
-            _TIMEOUT_SECONDS)
-        if not response.status:
-            raise RuntimeError("RPC get_results request failed!")
-        return_list = []
-        for r in response.results:
-            if r.HasField('scalar'):
-                return_list.append(protobuf_scalar_to_python(r.scalar))
-            else:
-                return_list.append(pb_to_tensor(r.tensor))
+        if self.stream:
+            try:
+                return_list = ValueAssembler().assemble(self.run_responses)
+            except grpc.RpcError:
+                raise RuntimeError("RPC run request failed!")
+        else:
+            response = self.run_response_future.result()
+            if not response.status:
+                raise RuntimeError("RPC run request failed!")
+            return_list = protobuf_to_values(response.results)
         return_dict = {op: return_list[mypos]
                        for (op, mypos) in iteritems(self.returns)}
         return return_dict
@@ -65,7 +70,8 @@ class RPCTransformerClient(object):
         self.computation_builds = dict()
         self.comp_id_ctr = 0
 
-        options = [('grpc.max_send_message_length', -1)]
+        options = [('grpc.max_send_message_length', -1),
+                   ('grpc.max_receive_message_length', -1)]
         channel = grpc.insecure_channel('localhost:' + port, options=options)
         if not is_channel_ready(channel):
             raise RuntimeError("gRPC channel is not ready...")
@@ -97,7 +103,10 @@ class RPCTransformerClient(object):
                 placeholders=pb_placeholders),
             _TIMEOUT_SECONDS)
         if response.comp_id >= 0:
-            rpcComputationClient = RPCComputationClient(response.comp_id, self.RPC)
+            tensor_bytes = sum(op.axes.size * np.dtype(op.dtype).itemsize
+                               for op in returns + list(placeholders) if op.is_tensor_op)
+            rpcComputationClient = RPCComputationClient(response.comp_id, self.RPC,
+                                                        stream=tensor_bytes > CHUNK_SIZE)
             return rpcComputationClient
         else:
             raise RuntimeError("RPC computation request failed!")
@@ -0,0 +1,219 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from collections import defaultdict
+
+from ngraph.op_graph.op_graph import Add, AssignableTensorOp, BroadcastOp, Greater, Less, \
+    MapRolesOp, Maximum, Minimum, Multiply, TensorValueOp
+from ngraph.op_graph.convolution import ConvolutionOp, ConvDerivOp, bprop_conv, update_conv
+from ngraph.transformers.cpu.relu import BpropReluOp
+from ngraph.transformers.passes.passes import GraphPass
+
+
+class ConvolutionFusion(GraphPass):
+    """
+    Fuses the bias, residual add and relu that follow a convolution into the
+    convolution, as post-ops that its kernel applies while the output is in cache.
+
+    A convolution is followed, through its MapRolesOp and single-user ops, by
+    - an add of a bias broadcast along the output channels,
+    - an add of a residual with the axes of the output,
+    - a relu, max(x, 0) + slope * min(0, x), with a constant 0 <= slope <= 1,
+    in this order, each optional. The backward pass of the relu only needs the sign of
+    x, which the relu output has too, so its sign tests read the fused output and the
+    pre-activation is never stored. The bprop_conv and update_conv of the convolution
+    are moved to the fused convolution.
+    """
+
+    def do_pass(self, **kwargs):
+        self.ops = []
+        self.run_pass(self.ops.append, **kwargs)
+
+        self.users = defaultdict(list)
+        self.conv_derivs = defaultdict(list)
+        for op in self.ops:
+            for arg in self.op_args(op):
+                self.users[arg].append(op)
+            if isinstance(op, ConvDerivOp):
+                self.conv_derivs[op.fprop.forwarded].append(op)
+
+        self.plan = dict()
+        self.absorbed = set()
+        for op in self.ops:
+            if isinstance(op, ConvolutionOp):
+                self.fuse(op)
+
+        self.run_pass(self.apply_op, **kwargs)
+
+    def apply_op(self, op):
+        replacement = self.plan.pop(op, None)
+        if replacement is not None:
+            self.replace_op(op, replacement)
+
+    def constant_value(self, op):
+        """
+        Returns: The value of a scalar constant op, seen through broadcasts, or None.
+        """
+        while isinstance(op, BroadcastOp):
+            op = self.op_arg(op, 0)
+        if not isinstance(op, (TensorValueOp, AssignableTensorOp)) or not op.is_scalar:
+            return None
+        tensor = op.tensor
+        if not tensor.is_constant or tensor.const is None:
+            return None
+        return tensor.const
+
+    def single_user(self, op, op_type):
+        """
+        Returns: The only user of op if it has type op_type and the axes of op and is not
+            already fused into another convolution, or None.
+        """
+        users = self.users[op]
+        if len(users) != 1 or type(users[0]) is not op_type or users[0].axes != op.axes or \
+                users[0] in self.absorbed:
+            return None
+        return users[0]
+
+    def planned(self, op):
+        """
+        Returns: The replacement of op, if it has one.
+        """
+        return self.plan.get(op, op)
+
+    def other_arg(self, op, arg):
+        """
+        Returns: The argument of the binary op op that is not arg, or None if both are.
+        """
+        x, y = self.op_args(op)
+        if x is y:
+            return None
+        return y if x is arg else x
+
+    def fuse(self, conv):
+        if conv.has_bias or conv.has_residual or conv.relu_slope is not None:
+            return
+        map_roles = self.single_user(conv, MapRolesOp)
+        if map_roles is None:
+            return
+        value = map_roles
+
+        absorbed = []
+        bias = None
+        add = self.single_user(value, Add)
+        if add is not None:
+            arg = self.other_arg(add, value)
+            if isinstance(arg, BroadcastOp):
+                arg = self.op_arg(arg, 0)
+                if len(arg.axes) == 1 and arg.axes[0] == value.axes[0]:
+                    bias, value = arg, add
+                    absorbed.append(add)
+
+        residual = None
+        add = self.single_user(value, Add)
+        if add is not None:
+            arg = self.other_arg(add, value)
+            if arg is not None and not isinstance(arg, BroadcastOp) and arg.axes == value.axes:
+                residual = MapRolesOp(self.planned(arg), map_roles.axes_map.invert())
+                if residual.axes == conv.axes:
+                    value = add
+                    absorbed.append(add)
+                else:
+                    residual = None
+
+        relu_slope, sign_tests = None, []
+        relu = self.relu(value)
+        if relu is not None:
+            relu_slope, sign_tests, relu_ops = relu
+            value = relu_ops[-1]
+            absorbed.extend(relu_ops)
+
+        if value is map_roles:
+            return
+        self.absorbed.update(absorbed)
+        inputs, filters = (self.planned(arg) for arg in self.op_args(conv))
+        fused = ConvolutionOp(conv.conv_params, inputs, filters, bias, residual, relu_slope,
+                              axes=conv.axes)
+        output = MapRolesOp(fused, map_roles.axes_map)
+        self.plan[value] = output
+        relu_bprop = self.relu_bprop(sign_tests)
+        if relu_bprop is not None:
+            delta, relu_bprop = relu_bprop
+            self.plan[relu_bprop] = BpropReluOp(self.planned(delta), output, fused)
+        else:
+            for test in sign_tests:
+                self.plan[test] = type(test)(output, self.op_arg(test, 1))
+        for deriv in self.conv_derivs[conv]:
+            delta, arg = (self.planned(arg) for arg in self.op_args(deriv))
+            if isinstance(deriv, bprop_conv):
+                self.plan[deriv] = bprop_conv(delta, inputs, arg, fused)
+            elif isinstance(deriv, update_conv):
+                self.plan[deriv] = update_conv(delta, arg, filters, fused)
+
+    def relu(self, x):
+        """
+        Returns: The slope, the sign tests of x against 0 and the ops of the relu of x,
+            its output last, or None if the users of x are not a relu and its sign tests.
+        """
+        maximum = minimum = None
+        sign_tests = []
+        for user in self.users[x]:
+            zero = self.other_arg(user, x) if len(self.op_args(user)) == 2 else None
+            if zero is None or self.constant_value(zero) != 0:
+                return None
+            if isinstance(user, (Greater, Less)) and self.op_arg(user, 0) is x:
+                sign_tests.append(user)
+            elif type(user) is Maximum and maximum is None:
+                maximum = user
+            elif type(user) is Minimum and minimum is None:
+                minimum = user
+            else:
+                return None
+        if maximum is None or minimum is None:
+            return None
+
+        multiply = self.single_user(minimum, Multiply)
+        if multiply is None:
+            return None
+        slope = self.other_arg(multiply, minimum)
+        slope = None if slope is None else self.constant_value(slope)
+        if slope is None or not 0 <= slope <= 1:
+            return None
+        output = self.single_user(multiply, Add)
+        if output is None or self.single_user(maximum, Add) is not output:
+            return None
+        return float(slope), sign_tests, [maximum, minimum, multiply, output]
+
+    def relu_bprop(self, sign_tests):
+        """
+        Returns: The delta and the output of the relu backward pass
+            delta * greater(x, 0) + delta * slope * less(x, 0), from its sign tests, or None
+            if the sign tests are used otherwise.
+        """
+        if sorted(type(test).__name__ for test in sign_tests) != ['Greater', 'Less']:
+            return None
+        greater, less = sorted(sign_tests, key=lambda test: type(test).__name__)
+        multiply_greater = self.single_user(greater, Multiply)
+        multiply_less = self.single_user(less, Multiply)
+        if multiply_greater is None or multiply_less is None:
+            return None
+        delta = self.other_arg(multiply_greater, greater)
+        slope_delta = self.other_arg(multiply_less, less)
+        if type(slope_delta) is not Multiply or delta not in self.op_args(slope_delta) or \
+                self.single_user(slope_delta, Multiply) is not multiply_less:
+            return None
+        output = self.single_user(multiply_greater, Add)
+        if output is None or self.single_user(multiply_less, Add) is not output or \
+                delta.axes != output.axes:
+            return None
+        return delta, output
@@ -35,7 +35,7 @@ class CPUTensorLayout(PeepholeGraphPass):
         pass
 
     @visit.on_type(ConvolutionOp)
-    def visit(self, op, inputs, filters, bias=None):
+    def visit(self, op, inputs, filters, *post_op_args):
         """
         Convolution implementation requires contiguous layout.
         """
@@ -50,7 +50,7 @@ class CPUTensorLayout(PeepholeGraphPass):
             replace = True
 
         if replace:
-            self.replace_op(op, ConvolutionOp(op.conv_params, inputs, filters, bias, axes=op.axes))
+            self.replace_op(op, op.copy_with_new_args((inputs, filters) + post_op_args))
 
     @visit.on_type(update_conv)
     def visit(self, op, delta, inputs):
@@ -0,0 +1,244 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+
+from ngraph.op_graph.op_graph import AbsoluteOp, Add, CosOp, Divide, Equal, ExpOp, \
+    FloorDivide, Greater, GreaterEqual, IndexOp, Less, LessEqual, LogOp, Maximum, Minimum, Mod, \
+    Multiply, NegativeOp, NotEqual, Power, ReadOp, ReciprocalOp, SignOp, SinOp, SqrtOp, \
+    SquareOp, Subtract, TanhOp
+from ngraph.transformers.cpu.fused import FusedElementwiseOp
+from ngraph.transformers.exop import ExOp
+from ngraph.transformers.passes.passes import GraphPass
+
+
+elementwise_ufuncs = {
+    AbsoluteOp: 'abs',
+    CosOp: 'cos',
+    ExpOp: 'exp',
+    LogOp: 'log',
+    NegativeOp: 'negative',
+    ReciprocalOp: 'reciprocal',
+    SignOp: 'sign',
+    SinOp: 'sin',
+    SqrtOp: 'sqrt',
+    SquareOp: 'square',
+    TanhOp: 'tanh',
+    Add: 'add',
+    Subtract: 'subtract',
+    Multiply: 'multiply',
+    Divide: 'divide',
+    Maximum: 'maximum',
+    Minimum: 'minimum',
+    Power: 'power',
+    Equal: 'equal',
+    NotEqual: 'not_equal',
+    Greater: 'greater',
+    GreaterEqual: 'greater_equal',
+    Less: 'less',
+    LessEqual: 'less_equal',
+    FloorDivide: 'floor_divide',
+    Mod: 'mod',
+}
+
+
+def view_layout(tensor_view_decl):
+    tensor_description = tensor_view_decl.tensor_description
+    return (tensor_view_decl.tensor_decl, tuple(tensor_description.shape),
+            tuple(tensor_description.strides), tensor_description.offset)
+
+
+class ElementwiseFusionPass(GraphPass):
+    """
+    Replace runs of consecutive elementwise exops with one FusedElementwiseOp.
+
+    Each exop in a run must have the same shape as the others and consume a value
+    computed earlier in the run. Values only used inside the run are kept in
+    small scratch blocks instead of full temporary tensors, so the run reads and
+    writes memory once per block rather than once per op.
+
+    Arguments:
+        mkldnn: The Mkldnn engine; exops with MKL kernels are left alone.
+        chunk_size: Target number of elements per block.
+    """
+
+    def __init__(self, mkldnn=None, chunk_size=16384, **kwargs):
+        super(ElementwiseFusionPass, self).__init__(**kwargs)
+        self.mkldnn = mkldnn
+        self.chunk_size = chunk_size
+
+    def do_pass(self, computation_decl, **kwargs):
+        self.computation_decl = computation_decl
+        self.exop_block = computation_decl.exop_block
+
+        group = []
+        for exop in list(self.exop_block):
+            if group and self.shape(exop) is None and self.is_independent(exop, group):
+                continue
+            if group and self.extends_group(group, exop):
+                group.append(exop)
+                continue
+            self.fuse_group(group)
+            group = [exop] if self.shape(exop) is not None else []
+        self.fuse_group(group)
+
+    def is_independent(self, exop, group):
+        """
+        Checks for an exop that can run before the group without changing results.
+
+        The fused exop replaces the last exop of the group, so exops between group
+        members are effectively moved ahead of it. That is only safe for exops that
+        do not read group values and do not write state the group might read.
+
+        """
+        if isinstance(exop.op, ReadOp):
+            return True
+        if exop.has_side_effects or exop.write_args:
+            return False
+        if not isinstance(exop.op, IndexOp):
+            # IndexOps only make views, possibly of persistent tensors
+            for output_decl in exop.output_decls:
+                if output_decl.tensor_decl.is_persistent:
+                    return False
+        return all(input_decl.source_output_decl.exop not in group
+                   for input_decl in exop.input_decls)
+
+    def shape(self, exop):
+        """
+        The common shape of a fusible exop.
+
+        Args:
+            exop: The exop.
+
+        Returns:
+            The shape, or None if the exop cannot be fused.
+
+        """
+        op = exop.op
+        if type(op) not in elementwise_ufuncs:
+            return None
+        if self.mkldnn is not None and self.mkldnn.enabled and op.safe_name in self.mkldnn.kernels:
+            return None
+        if len(exop.output_decls) != 1 or exop.write_args:
+            return None
+        shape = tuple(exop.output_decls[0].tensor_view_decl.tensor_description.shape)
+        if len(shape) == 0 or 0 in shape:
+            return None
+        for input_decl in exop.input_decls:
+            if tuple(input_decl.tensor_view_decl.tensor_description.shape) != shape:
+                return None
+        return shape
+
+    def extends_group(self, group, exop):
+        """
+        Checks whether exop can be appended to the group.
+
+        The exop must consume a value of the group, through a view with the same layout
+        as the one the value was written with.
+
+        """
+        if self.shape(exop) != self.shape(group[0]):
+            return False
+        consumes_group = False
+        for input_decl in exop.input_decls:
+            output_decl = input_decl.source_output_decl
+            if output_decl.exop in group:
+                if view_layout(input_decl.tensor_view_decl) != \
+                        view_layout(output_decl.tensor_view_decl):
+                    return False
+                consumes_group = True
+        return consumes_group
+
+    def is_live_out(self, output_decl, group):
+        tensor_decl = output_decl.tensor_decl
+        if tensor_decl.is_output or tensor_decl.is_persistent or tensor_decl.is_input:
+            return True
+        return any(input_decl.exop not in group for input_decl in output_decl.user_input_decls)
+
+    def fuse_group(self, group):
+        if len(group) < 2:
+            return
+
+        last_use = dict()
+        for i, exop in enumerate(group):
+            for input_decl in exop.input_decls:
+                last_use[input_decl.source_output_decl] = i
+
+        input_decls = []
+        input_positions = dict()
+        output_decls = []
+        scratch_dtypes = []
+        free_scratch = []
+        refs = dict()
+        steps = []
+        for i, exop in enumerate(group):
+            args = []
+            for input_decl in exop.input_decls:
+                output_decl = input_decl.source_output_decl
+                if output_decl.exop in group:
+                    ref = refs[output_decl]
+                    args.append(ref)
+                    if ref[0] == 'scratch' and last_use[output_decl] == i \
+                            and ref not in free_scratch:
+                        # Dead after this step; elementwise ufuncs may write in place
+                        free_scratch.append(ref)
+                    continue
+                pos = input_positions.get(input_decl.tensor_view_decl)
+                if pos is None:
+                    pos = len(input_decls)
+                    input_positions[input_decl.tensor_view_decl] = pos
+                    input_decls.append(input_decl)
+                args.append(('input', pos))
+
+            output_decl = exop.output_decls[0]
+            if self.is_live_out(output_decl, group):
+                ref = ('output', len(output_decls))
+                output_decls.append(output_decl)
+            else:
+                dtype = np.dtype(output_decl.tensor_decl.element_type.dtype).name
+                ref = next((free for free in free_scratch if scratch_dtypes[free[1]] == dtype),
+                           None)
+                if ref is None:
+                    ref = ('scratch', len(scratch_dtypes))
+                    scratch_dtypes.append(dtype)
+                else:
+                    free_scratch.remove(ref)
+            refs[output_decl] = ref
+            steps.append((elementwise_ufuncs[type(exop.op)], ref, args))
+
+        fused_op = FusedElementwiseOp(shape=self.shape(group[0]),
+                                      steps=steps,
+                                      scratch_dtypes=scratch_dtypes,
+                                      chunk_size=self.chunk_size)
+        fused_exop = ExOp(computation_decl=self.computation_decl,
+                          create_value=False,
+                          op=fused_op)
+        for input_decl in input_decls:
+            fused_exop.add_input_decl(input_decl.source_output_decl,
+                                      input_decl.tensor_description)
+        for output_decl in output_decls:
+            fused_exop.take_output_decl(output_decl)
+            fused_exop.output_decls.append(output_decl)
+
+        # The fused exop takes the place of the last exop in the group, after any
+        # exops that supply its inputs.
+        for exop in group:
+            after_exop = exop.prev_exop
+            self.exop_block.remove_exop(exop)
+            for op in exop.ref_ops:
+                fused_exop.add_ref_op(op)
+            if exop in self.exop_block.root_set:
+                self.exop_block.root_set.remove(exop)
+                self.exop_block.root_set.add(fused_exop)
+        self.exop_block.add_exop(fused_exop, after_exop)
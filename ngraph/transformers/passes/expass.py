@@ -128,8 +128,13 @@ class SSAConversion(SequentialExOpPass):
             op=exop.op.value_tensor).source_tensor)
         current_output_decl = current_exop.output_decls[0]
         current_output_decl.tensor_decl.merge_flags(exop.output_decls[0].tensor_decl)
-        for input_decl in set(exop.output_decls[0].user_input_decls):
-            input_decl.source_output_decl = current_output_decl
+        if exop.op.value_tensor.storage is not None:
+            # A section of a flat tensor is a view of the flat tensor's current value
+            exop.output_decls[0].tensor_decl = current_output_decl.tensor_decl
+            current_exop.take_output_decl(exop.output_decls[0])
+        else:
+            for input_decl in set(exop.output_decls[0].user_input_decls):
+                input_decl.source_output_decl = current_output_decl
         self.exop_block.remove_exop(exop)
 
     @visit_exop.on_type(AssignOp)
@@ -196,6 +201,87 @@ class IndexElision(SequentialExOpPass):
         self.exop_block.remove_exop(exop)
 
 
+class InPlaceUpdate(SequentialExOpPass):
+    """
+    Write partial updates of temporary tensors in place.
+
+    SSAConversion turns an update of part of a tensor into a copy of the whole tensor
+    followed by a write of the part. When everything that reads the previous value runs
+    before the update, the copy is unnecessary and the part can be written into the
+    previous value's storage. Accumulating the gradients of the steps of a sequence
+    otherwise copies the whole sequence once per step.
+    """
+
+    def do_pass(self, computation_decl, **kwargs):
+        self.positions = {exop: pos for pos, exop in enumerate(computation_decl.exop_block)}
+        super(InPlaceUpdate, self).do_pass(computation_decl, **kwargs)
+
+    @exop_method(dispatch_base_type=Op)
+    def visit_exop(self, exop, *args):
+        pass
+
+    @visit_exop.on_type(WriteOp)
+    def visit_exop(self, exop, *args):
+        if len(args) != 2 or len(exop.write_args) != 2 or len(exop.output_decls) != 1:
+            return
+        output_decl = exop.output_decls[0]
+        if exop.write_args[0].tensor_description is not output_decl.tensor_description:
+            return
+        current = args[0].source_output_decl
+        tensor_decl = current.tensor_decl
+        if tensor_decl is output_decl.tensor_decl or tensor_decl.is_persistent \
+                or tensor_decl.is_input or tensor_decl.is_output or tensor_decl.is_constant:
+            return
+        if isinstance(current.exop.op, IndexOp) or \
+                current.tensor_view_decl is not tensor_decl.root_tensor_view_decl:
+            return
+        readers = self.readers(current) - {exop}
+        if not readers <= self.ancestors(exop, readers):
+            return
+
+        # The previous value stays an argument, after the update, so the update is
+        # ordered after its readers and liveness sees the tensor updated in place.
+        update_description = exop.write_args[1].tensor_description
+        for write_arg in exop.write_args:
+            write_arg.source_output_decl = None
+        del exop.write_args[:]
+        exop.input_decls.reverse()
+        for pos, input_decl in enumerate(exop.input_decls):
+            input_decl.pos = pos
+        output_decl.tensor_decl = tensor_decl
+        exop.add_write_arg(output_decl, update_description)
+
+    def readers(self, output_decl):
+        """
+        Returns: The exops reading output_decl directly or through views.
+        """
+        readers = set()
+        for input_decl in output_decl.user_input_decls:
+            reader = input_decl.exop
+            if isinstance(reader.op, IndexOp):
+                for view_decl in reader.output_decls:
+                    readers.update(self.readers(view_decl))
+            else:
+                readers.add(reader)
+        return readers
+
+    def ancestors(self, exop, targets):
+        """
+        Returns: The exops exop depends on, searched back to the earliest of targets.
+        """
+        earliest = min(self.positions.get(target, -1) for target in targets) \
+            if targets else len(self.positions)
+        ancestors = set()
+        frontier = [exop]
+        while frontier:
+            for input_decl in frontier.pop().input_decls:
+                source = input_decl.source_output_decl.exop
+                if source not in ancestors and self.positions.get(source, -1) >= earliest:
+                    ancestors.add(source)
+                    frontier.append(source)
+        return ancestors
+
+
 class CopyElimination(SequentialExOpPass):
     @exop_method(dispatch_base_type=Op)
     def visit_exop(self, exop, *args):
@@ -48,6 +48,9 @@ class FlexPropagateEntryPass(PeepholeGraphPass):
 
 
 class FlexStackOpPass(PeepholeGraphPass):
+    # adds control dependencies
+    keeps_graph_snapshot = False
+
     def __init__(self, transformer, **kwargs):
         super(FlexStackOpPass, self).__init__(**kwargs)
         self.transformer = transformer
@@ -0,0 +1,368 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from collections import defaultdict, namedtuple
+
+import numpy as np
+
+from ngraph.op_graph.axes import FlattenedAxis, make_axes
+from ngraph.op_graph.op_graph import Add, AssignableTensorOp, AssignOp, AxesCastOp, \
+    BroadcastOp, ContiguousOp, Divide, DotOp, ExpandDims, Flatten, Multiply, NegativeOp, \
+    ReorderAxes, Subtract, TensorValueOp, Transpose, Unflatten, broadcast, constant
+from ngraph.op_graph.convolution import ConvolutionOp
+from ngraph.transformers.passes.elementwisefusion import elementwise_ufuncs
+from ngraph.transformers.passes.passes import GraphPass
+
+
+# A constant value that is broadcast along the axes of the op that are not in axes.
+# computed is False if the value is already held by a constant of the graph.
+Folded = namedtuple('Folded', ['value', 'axes', 'computed'])
+
+# The value of an op is scale * source + shift along a chain of single-user ops.
+# steps are the arithmetic ops of the chain, and source_axes maps the axes of the
+# op to the axes of source they follow.
+Affine = namedtuple('Affine', ['source', 'scale', 'shift', 'steps', 'source_axes'])
+
+layout_ops = (AxesCastOp, BroadcastOp, ContiguousOp, ExpandDims, Flatten, ReorderAxes,
+              Transpose, Unflatten)
+
+affine_ops = (Add, Subtract, Multiply, Divide, NegativeOp)
+
+
+def aligned(value, axes, to_axes):
+    """
+    Returns: value, with axes axes, transposed and reshaped to broadcast against to_axes.
+    """
+    value = np.asarray(value)
+    if not axes:
+        return value
+    positions = {axis: position for position, axis in enumerate(axes)}
+    order = [positions[axis] for axis in to_axes if axis in positions]
+    shape = [axis.length if axis in positions else 1 for axis in to_axes]
+    return value.transpose(order).reshape(shape)
+
+
+def combine(ufunc, x, y):
+    """
+    Returns: The axes and value of ufunc applied to the Folded-like pairs x and y.
+    """
+    axes = tuple(x[1]) + tuple(axis for axis in y[1] if axis not in x[1])
+    return ufunc(aligned(x[0], x[1], axes), aligned(y[0], y[1], axes)), axes
+
+
+def is_uniform(value, scalar):
+    return bool(np.all(np.asarray(value) == scalar))
+
+
+class InferenceFreeze(GraphPass):
+    """
+    Compile computations for inference with variables frozen at given values.
+
+    - Assignments to frozen variables, such as moving average and optimizer updates,
+      are pruned.
+    - A chain of single-user ops that adds, subtracts, multiplies or divides by
+      constants, with layout ops in between, is an affine function of the op it
+      starts from. A batchnorm in inference mode is such a chain. When the chain
+      starts from a convolution or dot with constant weights and its scale only
+      varies along their output channels, the scale is folded into the weights and
+      the chain becomes one add. Other chains with more than two such ops become a
+      multiply and an add.
+    - The remaining ops computed only from constants are replaced by constants.
+
+    Arguments:
+        values: A dict from variables to the numpy values they are frozen at.
+    """
+
+    def __init__(self, values, **kwargs):
+        super(InferenceFreeze, self).__init__(**kwargs)
+        self.values = {variable.tensor: value for variable, value in values.items()}
+
+    def do_pass(self, **kwargs):
+        self.ops = []
+        self.run_pass(self.ops.append, **kwargs)
+
+        self.users = defaultdict(list)
+        for op in self.ops:
+            for arg in self.op_args(op):
+                self.users[arg].append(op)
+
+        self.folded = dict()
+        for op in self.ops:
+            # in execution order, so that folding does not recurse through the graph
+            self.folded_value(op)
+        self.affine = dict()
+        self.plan = dict()
+        self.prune_assignments()
+        self.fold_affine_chains()
+        self.fold_constants()
+
+        self.run_pass(self.apply_op, **kwargs)
+
+    def apply_op(self, op):
+        replacement = self.plan.pop(op, None)
+        if replacement is not None:
+            self.replace_op(op, replacement)
+
+    def is_frozen(self, op):
+        return isinstance(op, (TensorValueOp, AssignableTensorOp)) and op.tensor in self.values
+
+    def prune_assignments(self):
+        for op in self.ops:
+            if isinstance(op, AssignOp):
+                tensor, value = self.op_args(op)
+                if self.is_frozen(tensor):
+                    self.plan[op] = value
+                    self.users[tensor].remove(op)
+                    self.users[value].remove(op)
+
+    def folded_value(self, op):
+        """
+        Returns: The Folded value of op, or None if op is not computed from constants.
+        """
+        if op not in self.folded:
+            self.folded[op] = self.fold(op)
+        return self.folded[op]
+
+    def fold(self, op):
+        if isinstance(op, (TensorValueOp, AssignableTensorOp)):
+            tensor = op.tensor
+            if tensor in self.values:
+                value = np.asarray(self.values[tensor], dtype=tensor.dtype)
+                return Folded(value.reshape(tensor.axes.lengths), tuple(tensor.axes), True)
+            if not tensor.is_constant or tensor.const is None:
+                return None
+            value = np.asarray(tensor.const)
+            if value.ndim == 0:
+                return Folded(value, (), False)
+            return Folded(value.reshape(tensor.axes.lengths), tuple(tensor.axes), False)
+
+        args = self.op_args(op)
+        if not args:
+            return None
+        folded_args = [self.folded_value(arg) for arg in args]
+        if any(folded_arg is None for folded_arg in folded_args):
+            return None
+
+        if isinstance(op, layout_ops):
+            value, axes = self.layout_value(op, args[0], folded_args[0].value,
+                                            folded_args[0].axes)
+            if axes is None:
+                return None
+            return Folded(value, axes, folded_args[0].computed)
+
+        ufunc = elementwise_ufuncs.get(type(op))
+        if ufunc is None:
+            return None
+        ufunc = getattr(np, ufunc)
+        if len(folded_args) == 1:
+            return Folded(ufunc(folded_args[0].value), folded_args[0].axes, True)
+        value, axes = combine(ufunc, folded_args[0], folded_args[1])
+        return Folded(value, axes, True)
+
+    def layout_value(self, op, arg, value, axes):
+        """
+        Returns: The value and axes of a constant with axes axes of arg after the
+            layout op op, or None for the axes if they can not be followed.
+        """
+        if isinstance(op, AxesCastOp):
+            positions = {axis: position for position, axis in enumerate(arg.axes)}
+            return value, tuple(op.axes[positions[axis]] for axis in axes)
+        if isinstance(op, Unflatten):
+            unflattened = []
+            for axis in axes:
+                if axis in op.axes:
+                    unflattened.append(axis)
+                elif isinstance(axis, FlattenedAxis):
+                    unflattened.extend(axis.axes)
+                else:
+                    return value, None
+            return value.reshape([axis.length for axis in unflattened]), tuple(unflattened)
+        if all(axis in op.axes for axis in axes):
+            return value, axes
+        return value, None
+
+    def constant_op(self, value, axes, op):
+        """
+        Returns: A constant with the Folded value and axes, broadcast to the axes of op.
+        """
+        value = np.asarray(value, dtype=op.dtype)
+        if axes:
+            const = constant(value, axes=make_axes(axes), dtype=op.dtype)
+        else:
+            const = constant(value, dtype=op.dtype)
+        return broadcast(const, op.axes)
+
+    def affine_step(self, op):
+        """
+        Returns: The Affine value of op, or None if op does not continue a chain.
+        """
+        if not isinstance(op, layout_ops + affine_ops):
+            return None
+        args = self.op_args(op)
+        x, const = self.chain_arg(op), None
+        if len(args) == 2:
+            const = self.folded_value(args[1] if x is args[0] else args[0])
+            if const is None:
+                return None
+        if self.folded_value(x) is not None or len(self.users[x]) != 1:
+            return None
+
+        state = self.affine.get(x)
+        if state is None:
+            state = Affine(x, (1.0, ()), (0.0, ()), (), {axis: axis for axis in x.axes})
+
+        if isinstance(op, layout_ops):
+            scale = self.layout_value(op, x, *state.scale)
+            shift = self.layout_value(op, x, *state.shift)
+            if scale[1] is None or shift[1] is None:
+                return None
+            source_axes = state.source_axes
+            if isinstance(op, AxesCastOp):
+                source_axes = {to_axis: source_axes.get(from_axis)
+                               for from_axis, to_axis in zip(x.axes, op.axes)}
+            return state._replace(scale=scale, shift=shift, source_axes=source_axes)
+
+        scale, shift = state.scale, state.shift
+        if isinstance(op, Add):
+            shift = combine(np.add, shift, const)
+        elif isinstance(op, Subtract) and x is args[0]:
+            shift = combine(np.subtract, shift, const)
+        elif isinstance(op, Subtract):
+            scale = (np.negative(scale[0]), scale[1])
+            shift = combine(np.subtract, const, shift)
+        elif isinstance(op, Multiply):
+            scale = combine(np.multiply, scale, const)
+            shift = combine(np.multiply, shift, const)
+        elif isinstance(op, Divide) and x is args[0]:
+            scale = combine(np.divide, scale, const)
+            shift = combine(np.divide, shift, const)
+        elif isinstance(op, NegativeOp):
+            scale = (np.negative(scale[0]), scale[1])
+            shift = (np.negative(shift[0]), shift[1])
+        else:
+            return None
+        return state._replace(scale=scale, shift=shift, steps=state.steps + (op,))
+
+    def fold_affine_chains(self):
+        last = dict()
+        for op in self.ops:
+            if op in self.plan:
+                continue
+            state = self.affine_step(op)
+            if state is not None:
+                self.affine[op] = state
+                last[state.source] = op
+
+        for source, op in last.items():
+            steps = self.affine[op].steps
+            if steps:
+                self.fold_chain(steps[-1])
+
+    def chain_arg(self, op):
+        """
+        Returns: The arg of op on its affine chain.
+        """
+        args = self.op_args(op)
+        return args[0] if len(args) == 1 or self.folded_value(args[1]) is not None \
+            else args[1]
+
+    def fold_chain(self, last_step):
+        """
+        Replace the chain ending with the arithmetic op last_step.
+        """
+        state = self.affine[last_step]
+        x = self.chain_arg(last_step)
+        if x.axes != last_step.axes:
+            return
+        has_scale = not is_uniform(state.scale[0], 1)
+        has_shift = not is_uniform(state.shift[0], 0)
+
+        scaled_source = self.scaled_source(state) if has_scale else None
+        if scaled_source is not None:
+            self.plan[state.source] = scaled_source
+            has_scale = False
+        elif len(state.steps) <= has_scale + has_shift:
+            return
+
+        for step in state.steps[:-1]:
+            self.plan[step] = self.chain_arg(step)
+        value = x
+        if has_scale:
+            value = Multiply(value, self.constant_op(state.scale[0], state.scale[1],
+                                                     last_step))
+        if has_shift:
+            value = Add(value, self.constant_op(state.shift[0], state.shift[1], last_step))
+        self.plan[last_step] = value
+
+    def scaled_source(self, state):
+        """
+        Returns: A copy of the source of the chain with the scale of state folded into
+            its constant weights, or None if the scale can not be folded.
+        """
+        source = state.source
+        scale, scale_axes = state.scale
+        source_axes = tuple(state.source_axes.get(axis) for axis in scale_axes)
+        if None in source_axes:
+            return None
+
+        if isinstance(source, ConvolutionOp):
+            args = self.op_args(source)
+            if len(args) != 2 or set(source_axes) - {source.axes[0]}:
+                return None
+            inputs, filters = args
+            # the output channels of a convolution follow the last axis of its filters
+            filter_axes = tuple(filters.axes[-1] for axis in source_axes)
+            weights = self.scaled_weights(filters, scale, filter_axes)
+            if weights is None:
+                return None
+            return source.copy_with_new_args((inputs, weights))
+
+        if isinstance(source, DotOp) and source.bias is None:
+            x, y = self.op_args(source)
+            if self.folded_value(x) is not None and \
+                    not set(source_axes) - set(source.x_out_axes):
+                x = self.scaled_weights(x, scale, source_axes)
+            elif self.folded_value(y) is not None and \
+                    not set(source_axes) - set(source.y_out_axes):
+                y = self.scaled_weights(y, scale, source_axes)
+            else:
+                return None
+            if x is None or y is None:
+                return None
+            return DotOp(x, y)
+        return None
+
+    def scaled_weights(self, weights, scale, scale_axes):
+        """
+        Returns: A constant with the value of weights times scale, or None if weights
+            is not constant.
+        """
+        folded = self.folded_value(weights)
+        if folded is None:
+            return None
+        value = aligned(folded.value, folded.axes, weights.axes) * \
+            aligned(scale, scale_axes, weights.axes)
+        value = np.broadcast_to(value, weights.axes.lengths)
+        return constant(value.astype(weights.dtype), axes=weights.axes, dtype=weights.dtype)
+
+    def fold_constants(self):
+        for op in self.ops:
+            if op in self.plan or not hasattr(op, 'axes'):
+                continue
+            folded = self.folded_value(op)
+            if folded is None or not folded.computed:
+                continue
+            users = [user for user in self.users[op] if user not in self.plan]
+            if any(self.folded_value(user) is None for user in users):
+                self.plan[op] = self.constant_op(folded.value, folded.axes, op)
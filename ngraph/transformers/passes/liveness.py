@@ -53,7 +53,8 @@ class LivenessPass(GraphPass):
                     free_tensor_decls.append(tensor_decl)
             live_list.insert(0, list(currently_live))
             for output_decl in output_tensor_decls:
-                if output_decl in currently_live:
+                # A tensor updated in place was allocated by an earlier exop
+                if output_decl in currently_live and output_decl not in input_tensor_decls:
                     new_tensor_decls.append(output_decl)
                     currently_live.remove(output_decl)
             free_list.insert(0, free_tensor_decls)
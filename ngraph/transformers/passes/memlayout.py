@@ -23,6 +23,19 @@ from ngraph.transformers.passes.passes import GraphPass
 
 
 class MemLayoutPass(GraphPass):
+    """
+    Assign pool offsets to all tensors of a computation.
+
+    Arguments:
+        separate_outputs: If True, the results of the computation get their own pool, sized
+            by computation_decl.output_max_allocated, so the temporary pool can be reused
+            by other computations without overwriting results that were returned.
+    """
+
+    def __init__(self, separate_outputs=False, **kwargs):
+        super(MemLayoutPass, self).__init__(**kwargs)
+        self.separate_outputs = separate_outputs
+
     def do_pass(self, computation_decl, **kwargs):
         self.exop_block = computation_decl.exop_block
         self.byte_alignment = computation_decl.execution_graph.execution_state \
@@ -38,7 +51,8 @@ class MemLayoutPass(GraphPass):
 
         # Layout temporary memory
         # self.layout_memory_middle_out()
-        computation_decl.temporary_max_allocated = self.layout_memory_best_fit()
+        computation_decl.temporary_max_allocated, computation_decl.output_max_allocated = \
+            self.layout_memory_best_fit()
 
         # Layout persistent memory
         pmm = MemoryManager(self.byte_alignment)
@@ -60,10 +74,13 @@ class MemLayoutPass(GraphPass):
 
     def layout_memory_best_fit(self):
         mm = MemoryManager(self.byte_alignment)
+        output_mm = MemoryManager(self.byte_alignment)
         for i, node in enumerate(self.exop_block):
             for new in node.liveness_new_list:
                 if new.buffer_pool_offset is not None:
                     raise RuntimeError('Error: {} - {} Already allocated'.format(i, new))
+                elif self.separate_outputs and new.is_output:
+                    new.buffer_pool_offset = output_mm.allocate(new.size)
                 else:
                     new.buffer_pool_offset = mm.allocate(new.size)
 
@@ -74,7 +91,7 @@ class MemLayoutPass(GraphPass):
                         free.tensor_description_base.name))
                 else:
                     mm.free(free.buffer_pool_offset)
-        return mm.max_allocated()
+        return mm.max_allocated(), output_mm.max_allocated()
 
     def layout_memory_first_fit(self):
         mm = MemoryManager(self.byte_alignment)
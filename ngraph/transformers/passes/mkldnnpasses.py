@@ -20,7 +20,9 @@ from ngraph.op_graph.op_graph import Op, MapRolesOp, TensorOp, ComputationOp, \
 from ngraph.op_graph.pooling import PoolingOp, BpropPoolOp
 from ngraph.transformers.cpu.batchnorm import BatchnormOp, BpropBatchnormOp
 from ngraph.op_graph.axes import Axes, FlattenedAxis
+from ngraph.transformers.cpu.batch import atomic_axes, axis_components, batch_stride, resize
 from ngraph.transformers.cpu.relu import ReluOp, BpropReluOp
+from ngraph.transformers.passes.elementwisefusion import elementwise_ufuncs
 from ngraph.transformers.passes.passes import PeepholeGraphPass
 from ngraph.util.generics import generic_method
 
@@ -31,6 +33,14 @@ from operator import itemgetter
 from orderedset import OrderedSet
 
 
+# Ops with MKL-DNN kernels, which read their arguments in any MKL-DNN layout
+MKL_KERNEL_OPS = (BatchnormOp, BpropBatchnormOp, ConvolutionOp, bprop_conv, update_conv,
+                  ReluOp, BpropReluOp, PoolingOp, BpropPoolOp, DotLowDimension)
+
+# Ops that pass the MKL-DNN layout of their argument on to their users
+MKL_LAYOUT_OPS = (ContiguousOp, MapRolesOp, ReorderAxes, Flatten, Unflatten)
+
+
 class MklReorderOp(TensorOp):
     '''
     Converts op value tensor from MKL layouts to "native" layout
@@ -73,11 +83,39 @@ def get_axes_mkl_order(axes, order):
         return [axes[index] for index in order]
 
 
-def get_size_mkl_order(axes, order):
-    return [a.length for a in get_axes_mkl_order(axes, order)]
+def get_axis_length(mkldnn, axis):
+    """
+    Returns: The length of axis, where batch axes hold mkldnn.batch_size entries when
+        kernels are made for a batch size other than the compiled one.
+    """
+    batch_size = getattr(mkldnn, 'batch_size', None)
+    if batch_size is None:
+        return axis.length
+    return int(np.prod([batch_size if component.is_batch else component.length
+                        for component in axis_components(axis)]))
+
+
+def get_batch_strides(mkldnn, td, strides):
+    """
+    Returns: The byte strides strides of td, once the tensor it views is laid out densely
+        for mkldnn.batch_size entries along its batch axis.
+    """
+    batch_size = getattr(mkldnn, 'batch_size', None)
+    if batch_size is None:
+        return strides
+    base = td.base
+    for axis, _ in atomic_axes(base.axes, base.full_strides):
+        if axis.is_batch:
+            stride = batch_stride(base, axis)
+            return [resize(x, stride, axis.length, batch_size) for x in strides]
+    return strides
+
+
+def get_size_mkl_order(mkldnn, axes, order):
+    return [get_axis_length(mkldnn, a) for a in get_axes_mkl_order(axes, order)]
 
 
-def get_strides_mkl_order(td, order):
+def get_strides_mkl_order(mkldnn, td, order):
     strides_list = []
     flattend_axis_flag = False
     for axis in td.axes:
@@ -90,9 +128,10 @@ def get_strides_mkl_order(td, order):
                     strides_list.append(stride_val)
             else:
                 strides_list.append(each_stride)
-        return [strides_list[index] for index in order]
     else:
-        return [td.strides[index] for index in order]
+        strides_list = td.strides
+    strides_list = get_batch_strides(mkldnn, td, strides_list)
+    return [strides_list[index] for index in order]
 
 
 def get_native_layout(mkldnn, td, order, use_formats=True):
@@ -104,10 +143,10 @@ def get_native_layout(mkldnn, td, order, use_formats=True):
     :return: MKL layout object
     '''
     op_axes = td.axes
-    mkl_shape = get_size_mkl_order(op_axes, order)
+    mkl_shape = get_size_mkl_order(mkldnn, op_axes, order)
     data_type = mkldnn.datatype[td.dtype.type]
     elem_size = td.dtype.itemsize
-    mkl_strides = [stride // elem_size for stride in get_strides_mkl_order(td, order)]
+    mkl_strides = [stride // elem_size for stride in get_strides_mkl_order(mkldnn, td, order)]
     # TODO(jbobba) - Handle views for tensors that are not fully materialized
     mkl_axes = [axis for axis in get_axes_mkl_order(op_axes, order)]
     memory_format = mkldnn.memory_format['blocked']
@@ -168,7 +207,7 @@ def get_rotated_layout(mkldnn, in_layout, from_axes, to_axes):
 
 def get_mkl_op_shape_and_layout(mkldnn, op, mkl_order, use_formats=True):
     op_axes_mkl = [op.axes[idx] for idx in mkl_order]
-    mkl_shape = [a.length for a in op_axes_mkl]
+    mkl_shape = [get_axis_length(mkldnn, a) for a in op_axes_mkl]
     if op.name in mkldnn.op_layouts:
         in_layout, in_axes = mkldnn.op_layouts[op.name]
         # Check if we need to rotate axes in the MKL layout object
@@ -205,21 +244,111 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
     4) Create MKL-DNN op kernel
     5) Remember output MKL-layout and MKL-visible axes for use by ops downstream
 
+    Elementwise ops whose arguments all have the same MKL-DNN layout can compute on
+    the MKL-DNN buffers directly, passing the layout on. Each such op is given the
+    layout when, looking at the users of its arguments and result across the whole
+    graph, that needs fewer reorder bytes than converting the arguments.
+
+    Arguments:
+        mkldnn: The Mkldnn engine.
+        propagate_layouts: Pass MKL-DNN layouts through elementwise ops.
     """
 
-    def __init__(self, mkldnn, **kwargs):
+    def __init__(self, mkldnn, propagate_layouts=True, **kwargs):
         super(MklCreateOpDescriptors, self).__init__(**kwargs)
         assert mkldnn.enabled
         self.mkldnn = mkldnn
+        self.propagate_layouts = propagate_layouts
+        self.users = collections.defaultdict(list)
+        self.reads_mkl_layout = dict()
+
+    def do_pass(self, **kwargs):
+        if self.propagate_layouts:
+            self.find_mkl_layout_users(**kwargs)
+        super(MklCreateOpDescriptors, self).do_pass(**kwargs)
+
+    def process_op(self, op):
+        args = self.op_args(op)
+        self.visit(op, *args)
+        # remembered so the kernels can be made again for other batch sizes
+        if (op.name in self.mkldnn.kernels or op.name in self.mkldnn.op_layouts) and \
+                op.name not in self.mkldnn.kernel_ops:
+            self.mkldnn.kernel_ops[op.name] = (op, args)
+
+    def find_mkl_layout_users(self, **kwargs):
+        """
+        Finds the users of each op, and the ops expected to read an argument in an
+        MKL-DNN layout without a reorder: ops with MKL-DNN kernels, and layout
+        passing ops whose own users all do.
+        """
+        ops = []
+        self.users = collections.defaultdict(list)
+
+        def add_users(op):
+            ops.append(op)
+            for arg in OrderedSet(self.op_args(op)):
+                self.users[arg].append(op)
+
+        self.run_pass(add_users, **kwargs)
+
+        # users come after the ops they use
+        self.reads_mkl_layout = dict()
+        for op in reversed(ops):
+            if isinstance(op, MKL_KERNEL_OPS):
+                reads_mkl_layout = True
+            elif isinstance(op, MKL_LAYOUT_OPS) or type(op) in elementwise_ufuncs:
+                # ops without users are returned, and returned values are reordered
+                users = self.users[op]
+                reads_mkl_layout = bool(users) and all(self.reads_mkl_layout.get(user, False)
+                                                       for user in users)
+            else:
+                reads_mkl_layout = False
+            self.reads_mkl_layout[op] = reads_mkl_layout
 
     def set_mkl_layout_data(self, op, mkl_axes):
         mkl_layout = self.mkldnn.output_layout(self.mkldnn.kernels[op.name], 0)
         if mkl_layout:
             self.mkldnn.op_layouts[op.name] = (mkl_layout, mkl_axes)
 
+    def propagate_layout(self, op, args):
+        """
+        Gives an elementwise op the MKL-DNN layout shared by all its arguments, if that
+        saves reorder bytes.
+
+        The op then computes on the MKL-DNN buffers, so they must hold exactly the
+        elements of tensors with the same dense strides.
+        """
+        if not self.propagate_layouts or not args:
+            return
+        if any(arg.name not in self.mkldnn.op_layouts for arg in args):
+            return
+        (mkl_layout, mkl_axes) = self.mkldnn.op_layouts[args[0].name]
+        td = op.tensor_description()
+        if not td.c_contiguous or \
+                self.mkldnn.layout_size(self.mkldnn.mkldnn_engine, mkl_layout) != td.tensor_size:
+            return
+        for arg in args:
+            (arg_layout, arg_axes) = self.mkldnn.op_layouts[arg.name]
+            arg_td = arg.tensor_description()
+            if arg_axes != mkl_axes or arg_td.shape != td.shape or \
+                    arg_td.strides != td.strides or arg_td.dtype != td.dtype or \
+                    not self.mkldnn.compare_layouts(self.mkldnn.mkldnn_engine,
+                                                    mkl_layout, arg_layout):
+                return
+
+        # An argument is reordered once for all its users that need it, so only
+        # reorders of arguments with no other such user are saved.
+        saved = sum(arg.tensor_description().tensor_size for arg in OrderedSet(args)
+                    if all(self.reads_mkl_layout.get(user, False)
+                           for user in self.users[arg] if user is not op))
+        added = 0 if self.reads_mkl_layout.get(op, False) else td.tensor_size
+        if saved > added:
+            self.mkldnn.op_layouts[op.name] = (mkl_layout, mkl_axes)
+
     @generic_method(dispatch_base_type=Op)
     def visit(self, op, *args):
-        pass
+        if type(op) in elementwise_ufuncs:
+            self.propagate_layout(op, args)
 
     @visit.on_type(BatchnormOp)
     def visit(self, op, inputs, gamma, bias, epsilon, mean, variance):
@@ -237,14 +366,14 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             return
         mkl_order = [4, 0, 2, 3]
         data_type = self.mkldnn.datatype[op.dtype.type]
-        inputs_shape = get_size_mkl_order(inputs.axes, mkl_order)
+        inputs_shape = get_size_mkl_order(self.mkldnn, inputs.axes, mkl_order)
         mean_size = mean.axes.lengths[0]
         mean_dims = 1
         gamma_shape = gamma.axes.lengths[0]
         bias_shape = bias.axes.lengths[0]
         variance_size = variance.axes.lengths[0]
         variance_dims = 1
-        outputs_shape = get_size_mkl_order(op.axes, mkl_order)
+        outputs_shape = get_size_mkl_order(self.mkldnn, op.axes, mkl_order)
 
         # weights is 2 dimensional, 1-st dimension contains gamma parameter, 2-nd
         # dimension contains beta parameter.
@@ -296,7 +425,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
                 if (len(unflatten(Flatten_axis).axes.lengths) != 4):
                     return
                 else:
-                    outputs_shape = get_size_mkl_order(op.axes, [4, 0, 2, 3])
+                    outputs_shape = get_size_mkl_order(self.mkldnn, op.axes, [4, 0, 2, 3])
                     axis_len_5d = True
             else:
                 return
@@ -306,7 +435,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         mean_size = mean.axes.lengths[0]
         variance_size = variance.axes.lengths[0]
 
-        delta_shape = get_size_mkl_order(delta.axes, [4, 0, 2, 3])
+        delta_shape = get_size_mkl_order(self.mkldnn, delta.axes, [4, 0, 2, 3])
 
         # weights is 2 dimensional, 1-st dimension contains gamma parameter, 2-nd
         # dimension contains beta parameter.
@@ -362,7 +491,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         dbg_print_kernel(self.mkldnn, op, op_id)
 
     @visit.on_type(ConvolutionOp)
-    def visit(self, op, input, filter, bias=None):
+    def visit(self, op, input, filter, *post_op_args):
 
         # Only 2D convolution supported in MKLDNN for now
         if (input.axes.find_by_name('__NG_DEPTH').size != 1):
@@ -376,8 +505,12 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         (input_shape, input_layout) = get_mkl_op_shape_and_layout(self.mkldnn, input, [4, 0, 2, 3])
         (filter_shape, filter_layout) = get_mkl_op_shape_and_layout(
             self.mkldnn, filter, [4, 0, 2, 3])
-        bias_shape = get_size_mkl_order(bias.axes, [0]) if bias else None
-        output_shape = get_size_mkl_order(op.axes, [4, 0, 2, 3])
+        bias, residual = op.post_op_args(post_op_args)
+        bias_shape = get_size_mkl_order(self.mkldnn, bias.axes, [0]) if bias else None
+        # the residual is summed into the output by a post-op
+        residual_layout = get_mkl_op_shape_and_layout(
+            self.mkldnn, residual, [4, 0, 2, 3])[1] if residual else None
+        output_shape = get_size_mkl_order(self.mkldnn, op.axes, [4, 0, 2, 3])
         out_axes = get_axes_mkl_order(op.axes, [4, 0, 2, 3])
         pad_d, pad_h, pad_w = itemgetter(
             *('pad_' + s for s in ('d', 'h', 'w')))(op.conv_params)
@@ -402,6 +535,9 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             get_ctypes_arg(pad),
             input_layout,
             filter_layout,
+            residual_layout,
+            op.relu_slope is not None,
+            op.relu_slope or 0.0,
             data_type,
             self.mkldnn.kernels[
                 op.name])
@@ -423,7 +559,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         (input_shape, input_layout) = get_mkl_op_shape_and_layout(self.mkldnn, input, [4, 0, 2, 3])
         (filter_shape, filter_layout) = get_mkl_op_shape_and_layout(
             self.mkldnn, filter, [4, 0, 2, 3])
-        output_shape = get_size_mkl_order(op.axes, [4, 0, 2, 3])
+        output_shape = get_size_mkl_order(self.mkldnn, op.axes, [4, 0, 2, 3])
         out_axes = get_axes_mkl_order(op.axes, [4, 0, 2, 3])
         pad_d, pad_h, pad_w = itemgetter(
             *('pad_' + s for s in ('d', 'h', 'w')))(op.conv_params)
@@ -513,7 +649,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
             (input_shape, input_layout) = get_mkl_op_shape_and_layout(self.mkldnn, input, [1, 0])
             out_axes = get_axes_mkl_order(op.axes, [1, 0])
 
-        input_size = np.prod(input.axes.lengths)
+        input_size = np.prod([get_axis_length(self.mkldnn, axis) for axis in input.axes])
         op_id = len(self.mkldnn.kernels)
         self.mkldnn.kernels[op.name] = self.mkldnn.create_empty_kernel(op_id)
         self.mkldnn.relu_fprop_kernel(
@@ -547,12 +683,12 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
                 self.mkldnn, fprop_src, [1, 0], True)
             out_axes = get_axes_mkl_order(op.axes, [1, 0])
 
-        input_size = np.prod(delta.axes.lengths)
+        input_size = np.prod([get_axis_length(self.mkldnn, axis) for axis in delta.axes])
         op_id = len(self.mkldnn.kernels)
         self.mkldnn.kernels[op.name] = self.mkldnn.create_empty_kernel(op_id)
         self.mkldnn.relu_bprop_kernel(
             self.mkldnn.mkldnn_engine,
-            input_size, op.fprop.forwarded.slope,
+            input_size, op.slope,
             fprop_src_layout, delta_layout,
             data_type,
             self.mkldnn.kernels[op.name])
@@ -578,7 +714,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         # Assumes (C, D, H, W, N) for pooling axes
         (input_shape, input_layout) = get_mkl_op_shape_and_layout(
             self.mkldnn, input, [4, 0, 2, 3], True)
-        output_shape = get_size_mkl_order(op.axes, [4, 0, 2, 3])
+        output_shape = get_size_mkl_order(self.mkldnn, op.axes, [4, 0, 2, 3])
         out_axes = get_axes_mkl_order(op.axes, [4, 0, 2, 3])
         kernel = [op.pool_params['R'], op.pool_params['S']]
         pad_d, pad_h, pad_w = itemgetter(*('pad_' + s for s in ('d', 'h', 'w')))(op.pool_params)
@@ -620,7 +756,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
         # Assumes (C, D, H, W, N) for pooling axes
         (input_shape, input_layout) = get_mkl_op_shape_and_layout(
             self.mkldnn, input, [4, 0, 2, 3], True)
-        output_shape = get_size_mkl_order(op.axes, [4, 0, 2, 3])
+        output_shape = get_size_mkl_order(self.mkldnn, op.axes, [4, 0, 2, 3])
         out_axes = get_axes_mkl_order(op.axes, [4, 0, 2, 3])
         kernel = [op.pool_params['R'], op.pool_params['S']]
         pad_d, pad_h, pad_w = itemgetter(*('pad_' + s for s in ('d', 'h', 'w')))(op.pool_params)
@@ -658,7 +794,7 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
 
         (x_shape, x_layout) = get_mkl_op_shape_and_layout(self.mkldnn, x, [0, 1])
         (y_shape, y_layout) = get_mkl_op_shape_and_layout(self.mkldnn, y, [1, 0])
-        o_shape = get_size_mkl_order(op.axes, [1, 0])
+        o_shape = get_size_mkl_order(self.mkldnn, op.axes, [1, 0])
         bias_shape = [o_shape[1]] if bias else None
 
         bias_layout = None
@@ -680,7 +816,8 @@ class MklCreateOpDescriptors(PeepholeGraphPass):
 
     @visit.on_type(Add)
     def visit(self, op, x, y):
-        # Disable for now since we are seeing perf slowdowns
+        # MKL-DNN add kernel disabled for now since we are seeing perf slowdowns
+        self.propagate_layout(op, (x, y))
         return
 
         # Sanity check for tensor shapes
@@ -768,6 +905,8 @@ class MklAddLayoutConversions(PeepholeGraphPass):
     Adds layout conversion nodes when an MKLDNN tensor is utilized by a
     non-MKL op
     """
+    # adds control dependencies
+    keeps_graph_snapshot = False
 
     def __init__(self, mkldnn, layoutpass, **kwargs):
         super(MklAddLayoutConversions, self).__init__(**kwargs)
@@ -775,8 +914,8 @@ class MklAddLayoutConversions(PeepholeGraphPass):
         self.layoutpass = layoutpass
         self.reorder_ops = dict()   # Maps op.name to reorder op
 
-    def init_mkldnn_reorder(self, op):
-        (mkl_layout, mkl_axes) = op.in_layout
+    def init_mkldnn_reorder(self, op, in_layout=None):
+        (mkl_layout, mkl_axes) = in_layout or op.in_layout
         check_flatten = False
         mkl_flattend_axis = False
         # check if any one of axis in mkl_axes is Flattend
@@ -796,9 +935,9 @@ class MklAddLayoutConversions(PeepholeGraphPass):
         (out_layout, _) = get_mkl_layout(self.mkldnn, op, mkl_axes_order, True)
         ndims = len(mkl_axes)
         if check_flatten:
-            dims = get_size_mkl_order(unflatten(op).axes, mkl_axes_order)
+            dims = get_size_mkl_order(self.mkldnn, unflatten(op).axes, mkl_axes_order)
         else:
-            dims = get_size_mkl_order(op.axes, mkl_axes_order)
+            dims = get_size_mkl_order(self.mkldnn, op.axes, mkl_axes_order)
         op_id = len(self.mkldnn.kernels)
         self.mkldnn.kernels[op.name] = self.mkldnn.create_empty_kernel(op_id)
         self.mkldnn.reorder_kernel(
@@ -809,6 +948,7 @@ class MklAddLayoutConversions(PeepholeGraphPass):
             self.mkldnn.kernels[op.name]
         )
         dbg_print_kernel(self.mkldnn, op, op_id)
+        self.mkldnn.kernel_ops[op.name] = (op, op.args)
 
     def get_reorder_op(self, op):
         if op.name in self.reorder_ops:
@@ -895,3 +1035,104 @@ class MklAddLayoutConversions(PeepholeGraphPass):
             if orig_op.name in self.mkldnn.op_layouts:
                 reorder_op = self.get_reorder_op(orig_op)
                 self.replace_op(orig_op, reorder_op)
+
+
+class MklBatchKernels(object):
+    """
+    The MKL-DNN kernels of a compiled graph, made again for a batch size other than the
+    length of the batch axis.
+
+    The ops that made kernels or layouts are visited again in their compiled order, with
+    batch axes holding batch_size entries. The kernels and layouts are kept here; all else
+    is the engine's.
+
+    Arguments:
+        mkldnn: The Mkldnn engine the graph was compiled with.
+        batch_size: Number of entries along the batch axis.
+    """
+
+    def __init__(self, mkldnn, batch_size):
+        self.mkldnn = mkldnn
+        self.batch_size = batch_size
+        self.kernels = dict()
+        self.op_layouts = dict()
+
+    def __getattr__(self, name):
+        return getattr(self.mkldnn, name)
+
+    def create(self, names):
+        """
+        Makes the kernels named names, and those of the ops they read layouts or
+        kernels from.
+
+        Raises:
+            ValueError: MKL-DNN lays an op out differently at this batch size.
+        """
+        kernel_ops = self.mkldnn.kernel_ops
+        needed = set()
+        pending = [name for name in names if name in kernel_ops]
+        while pending:
+            name = pending.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            op, args = kernel_ops[name]
+            reads = [arg.name for arg in args]
+            if isinstance(op, (BpropBatchnormOp, BpropPoolOp)):
+                reads.append(op.fprop.forwarded.name)
+            pending.extend(read for read in reads if read in kernel_ops)
+
+        create_descriptors = MklCreateBatchDescriptors(self)
+        add_conversions = MklAddLayoutConversions(self, None)
+        for name, (op, args) in kernel_ops.items():
+            if name not in needed or name in self.kernels or name in self.op_layouts:
+                continue
+            if isinstance(op, MklReorderOp):
+                add_conversions.init_mkldnn_reorder(op, self.op_layouts[args[0].name])
+            else:
+                create_descriptors.visit(op, *args)
+            self.check_layout(op)
+        return self.kernels
+
+    def check_layout(self, op):
+        compiled = (op.name in self.mkldnn.kernels, op.name in self.mkldnn.op_layouts)
+        if (op.name in self.kernels, op.name in self.op_layouts) != compiled or \
+                op.name in self.op_layouts and \
+                self.layout_size(self.mkldnn_engine, self.op_layouts[op.name][0]) > \
+                self.layout_size(self.mkldnn_engine, self.mkldnn.op_layouts[op.name][0]):
+            raise ValueError("MKL-DNN lays out {} differently for batch size {}"
+                             .format(op.name, self.batch_size))
+
+
+class MklCreateBatchDescriptors(MklCreateOpDescriptors):
+    """
+    Makes op kernels for MklBatchKernels, giving elementwise ops the MKL-DNN layouts
+    they were compiled with.
+    """
+
+    def propagate_layout(self, op, args):
+        if op.name not in self.mkldnn.mkldnn.op_layouts or not args or \
+                any(arg.name not in self.mkldnn.op_layouts for arg in args):
+            return
+        (mkl_layout, mkl_axes) = self.mkldnn.op_layouts[args[0].name]
+        if any(not self.mkldnn.compare_layouts(self.mkldnn.mkldnn_engine, mkl_layout,
+                                               self.mkldnn.op_layouts[arg.name][0])
+               for arg in args):
+            return
+        self.mkldnn.op_layouts[op.name] = (mkl_layout, mkl_axes)
+
+
+def create_batch_kernels(mkldnn, names, batch_size):
+    """
+    Returns: The MKL-DNN kernels named names, made for batch_size entries along the batch
+        axis, and cached in mkldnn for later calls.
+
+    Raises:
+        ValueError: MKL-DNN lays an op out differently at this batch size.
+    """
+    batch_kernels = mkldnn.batch_kernels.get(batch_size)
+    if batch_kernels is None:
+        batch_kernels = MklBatchKernels(mkldnn, batch_size)
+    kernels = batch_kernels.create(names)
+    mkldnn.batch_kernels[batch_size] = batch_kernels
+    return kernels
@@ -132,6 +132,10 @@ class OpGraphOpAccessor(OpAccessor):
     """
     Provides access to some op properties when they may have been modified during passes.
     """
+    def __init__(self, **kwargs):
+        super(OpGraphOpAccessor, self).__init__(**kwargs)
+        self.graph = None
+
     def op_arg(self, op, n):
         """
         Returns the nth argument of an op-graph Op op as an op-graph Op.
@@ -193,23 +197,36 @@ class OpGraphOpAccessor(OpAccessor):
 
         return None
 
-    def run_pass(self, process_op, ops, **kwargs):
+    def run_pass(self, process_op, ops, graph=None, **kwargs):
+        """
+        Args:
+            graph: A GraphSnapshot of ops, kept up to date with the replacements
+                instead of sorting the ops again after every batch.
+        """
         assert isinstance(ops, Iterable), "Ops passed into do_pass must be an iterable"
+        self.graph = graph
         has_work = True
         while has_work:
             self.begin_batch()
 
             # pass through the ops in an execution order collecting things to do
-            ops = Op.ordered_ops(op.forwarded for op in ops)
+            if graph is not None:
+                ops = graph.ordered_ops()
+            else:
+                ops = Op.ordered_ops(op.forwarded for op in ops)
             for op in ops:
                 op.update_forwards()
                 process_op(op)
 
             has_work = self.end_batch()
             ops = list(op.forwarded for op in ops)
+        self.graph = None
 
     def perform_replace_op(self, op, replacement):
-        op.forwarded.replace_self(replacement.forwarded)
+        op = op.forwarded
+        op.replace_self(replacement.forwarded)
+        if self.graph is not None:
+            self.graph.replace(op, replacement)
 
 
 op_graph_op_accessor = OpGraphOpAccessor()
@@ -30,7 +30,17 @@ from ngraph.util.generics import generic_method
 
 
 class GraphPass(with_metaclass(abc.ABCMeta, DelegateOpAccessor)):
-    def wrapped_do_pass(self, **kwargs):
+    # True if the pass only changes the op graph through replace_op, so that a
+    # GraphSnapshot of the graph can follow its changes.
+    keeps_graph_snapshot = False
+
+    def wrapped_do_pass(self, graph=None, **kwargs):
+        if graph is not None:
+            if self.keeps_graph_snapshot:
+                graph.refresh()
+                kwargs['graph'] = graph
+            else:
+                graph.stale = True
         self.begin_pass(**kwargs)
         self.do_pass(**kwargs)
         self.end_pass(**kwargs)
@@ -336,7 +346,7 @@ class PeepholeGraphPass(GraphBuildingPass):
     TODO: currently it has same exact implementation as GraphBuildingPass,
     consider removing it in future.
     """
-    pass
+    keeps_graph_snapshot = True
 
 
 class RequiredTensorShaping(PeepholeGraphPass):
@@ -0,0 +1,91 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+
+from ngraph.op_graph.op_graph import DotOp, Op, TensorValueOp, constant
+from ngraph.op_graph.convolution import ConvolutionOp
+from ngraph.transformers.cpu.quantize import DequantizeOp, quantize, storage_dtypes
+from ngraph.transformers.passes.passes import PeepholeGraphPass
+from ngraph.util.generics import generic_method
+
+
+class ReducedPrecisionWeights(PeepholeGraphPass):
+    """
+    Store constant weights of dots and convolutions in float16 or int8.
+
+    The stored tensor replaces the float32 constant in the persistent pool and is
+    expanded into a temporary float32 tensor right before use. Only constants are
+    converted; variables may be updated by other computations.
+
+    Arguments:
+        storage_dtype: 'float16' or 'int8'.
+        min_elements: Smaller constants are left in float32.
+    """
+
+    def __init__(self, storage_dtype, min_elements=256, **kwargs):
+        super(ReducedPrecisionWeights, self).__init__(**kwargs)
+        if storage_dtype not in storage_dtypes:
+            raise ValueError("Unsupported weight storage {}, expected one of {}".format(
+                storage_dtype, sorted(storage_dtypes)))
+        self.storage_dtype = storage_dtype
+        self.min_elements = min_elements
+        self.stored_constants = dict()
+
+    def reduced_weight(self, value_op):
+        """
+        Returns: A DequantizeOp of the stored copy of value_op, or None if value_op is
+            not a constant worth converting.
+
+        """
+        if not isinstance(value_op, TensorValueOp):
+            return None
+        tensor = value_op.value_tensor
+        if not tensor.is_constant or tensor.const is None:
+            return None
+        value = np.asarray(tensor.const)
+        if value.dtype != np.float32 or value.size < self.min_elements:
+            return None
+
+        stored = self.stored_constants.get(tensor)
+        if stored is None:
+            stored_value, scale = quantize(value, self.storage_dtype)
+            stored_tensor = constant(stored_value, axes=tensor.axes,
+                                     dtype=storage_dtypes[self.storage_dtype])
+            stored = self.stored_constants[tensor] = (stored_tensor, scale)
+        stored_tensor, scale = stored
+        return DequantizeOp(stored_tensor, scale)
+
+    @generic_method(dispatch_base_type=Op)
+    def visit(self, op, *args):
+        pass
+
+    @visit.on_type(DotOp)
+    def visit(self, op, x, y):
+        reduced_x = self.reduced_weight(x)
+        reduced_y = self.reduced_weight(y)
+        if reduced_x is None and reduced_y is None:
+            return
+        if reduced_x is not None:
+            x = reduced_x
+        if reduced_y is not None:
+            y = reduced_y
+        self.replace_op(op, DotOp(x, y, bias=op.bias))
+
+    @visit.on_type(ConvolutionOp)
+    def visit(self, op, inputs, filters, *post_op_args):
+        reduced_filters = self.reduced_weight(filters)
+        if reduced_filters is None:
+            return
+        self.replace_op(op, op.copy_with_new_args((inputs, reduced_filters) + post_op_args))
@@ -0,0 +1,399 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+
+from ngraph.op_graph.op_graph import AxesCastOp, BroadcastOp, ContiguousOp, DotOp, \
+    ElementWiseOp, Flatten, IndexOp, ReductionOp, ReorderAxes, TensorOp, TensorSliceOp, \
+    Transpose, Unflatten
+from ngraph.op_graph.convolution import ConvolutionOp
+from ngraph.op_graph.pooling import PoolingOp
+from ngraph.transformers.passes.passes import GraphPass
+
+# Ops whose value only depends on their arguments, and that copy_with_new_args can copy
+recomputable_ops = (ElementWiseOp, ReductionOp, DotOp, ContiguousOp, ConvolutionOp, PoolingOp,
+                    AxesCastOp, BroadcastOp, Flatten, ReorderAxes, TensorSliceOp, Transpose,
+                    Unflatten)
+
+
+def flops(op):
+    """
+    Returns: An estimate of the floating point operations of op.
+    """
+    if isinstance(op, IndexOp) or not isinstance(op, TensorOp):
+        return 0
+    size = op.axes.size
+    if isinstance(op, DotOp):
+        return 2 * size * op.reduction_axes.size
+    elif isinstance(op, ConvolutionOp):
+        filters = op.args[1]
+        return 2 * size * filters.axes.size // op.axes[0].length
+    elif isinstance(op, (ReductionOp, PoolingOp)):
+        return op.args[0].axes.size
+    return size
+
+
+class Value(object):
+    """
+    An exop, or a recomputation of an exop, in the schedule of Rematerialization.
+
+    Arguments:
+        op: The op that computes the value. For a recomputation, the op copied.
+        inputs: The Values of the arguments of op.
+        exop: The exop, None for a recomputation until it is added.
+
+    Attributes:
+        size: The bytes of temporary storage of the value, 0 for views and values that
+            are not temporary.
+        root: The value with the storage, for a view the root of its argument.
+        original: The value of the exop that this value recomputes, itself for an exop.
+        keep: If True, the value is not recomputed.
+    """
+
+    def __init__(self, op, inputs, exop=None):
+        self.op = op
+        self.inputs = inputs
+        self.exop = exop
+        self.size = 0
+        self.root = self
+        self.original = self
+        self.keep = True
+        self.is_output = False
+        self.position = None
+        self.uses = []
+
+    @property
+    def is_view(self):
+        return self.root is not self
+
+    def recomputation(self, inputs):
+        value = Value(self.op, inputs)
+        value.size = self.size
+        value.root = inputs[0].root if self.is_view else value
+        value.original = self.original
+        value.keep = self.keep
+        return value
+
+
+class Rematerialization(GraphPass):
+    """
+    Drops values that wait a long time for a use, typically forward activations waiting for
+    the backward pass, and recomputes them just before that use.
+
+    The exops are a schedule, in which a temporary is live from its exop to its last use.
+    A temporary that is idle across the peak of live memory can be freed after the use
+    before the idle stretch, if its op only depends on its arguments. A copy of the op,
+    made by copy_with_new_args, computes the value again before the use after the idle
+    stretch. Its arguments are recomputed in turn if they are not live there anymore, back
+    to values that are kept. The copies compute the same values from the same values, so
+    the gradients are unchanged.
+
+    The values of ops marked by checkpoint are kept. If there are checkpoints, all other
+    values that are idle across the peak are recomputed, from the checkpoints. With a
+    memory budget, the values that free the most memory per recomputed flop are recomputed
+    while that lowers the peak, until the peak is within the budget.
+
+    Arguments:
+        memory_budget: If not None, the peak bytes of temporaries to aim for.
+
+    Attributes:
+        peak_before: Estimated peak bytes of temporaries of the last computation, before.
+        peak_after: Estimated peak bytes of temporaries of the last computation, after.
+        flops: Estimated flops of the last computation, before.
+        recompute_flops: Estimated flops added to the last computation.
+        recomputed: The number of ops added to the last computation.
+    """
+
+    def __init__(self, memory_budget=None, **kwargs):
+        super(Rematerialization, self).__init__(**kwargs)
+        self.memory_budget = memory_budget
+        self.peak_before = self.peak_after = 0
+        self.flops = self.recompute_flops = self.recomputed = 0
+
+    def do_pass(self, computation_decl, **kwargs):
+        self.computation_decl = computation_decl
+        self.exop_block = computation_decl.exop_block
+        self.peak_before = self.peak_after = 0
+        self.flops = self.recompute_flops = self.recomputed = 0
+
+        has_checkpoints = any(op.metadata.get('checkpoint')
+                              for exop in self.exop_block for op in exop.ref_ops)
+        if not has_checkpoints and self.memory_budget is None:
+            return
+        if not self.make_schedule():
+            return
+        self.flops = sum(flops(value.op) for value in self.schedule)
+
+        profile = self.profile()
+        if len(profile) == 0:
+            return
+        self.peak_before = int(profile.max())
+        if has_checkpoints:
+            peak = self.schedule[int(np.argmax(profile))]
+            for value in reversed(list(self.schedule)):
+                gap = self.idle_gap(value, peak.position)
+                if gap is not None:
+                    self.recompute(value, gap[1], peak.position)
+        if self.memory_budget is not None:
+            self.reduce_peak()
+        self.peak_after = int(self.profile().max())
+
+        self.add_recomputations()
+
+    def make_schedule(self):
+        """
+        Makes the Values of the exops.
+
+        Returns:
+            False if the exops can not be rematerialized.
+        """
+        values = dict()
+        outputs = self.computation_decl.values
+        self.schedule = []
+        self.copies = dict()
+        for exop in self.exop_block:
+            sources = [input_decl.source_output_decl.exop for input_decl in exop.input_decls]
+            if any(source not in values for source in sources):
+                return False
+            value = Value(exop.op, [values[source] for source in sources], exop)
+            if isinstance(exop.op, IndexOp) and len(value.inputs) == 1:
+                value.root = value.inputs[0].root
+            for output_decl in exop.output_decls:
+                tensor_decl = output_decl.tensor_decl
+                if not (value.is_view or tensor_decl.is_persistent or tensor_decl.is_constant or
+                        tensor_decl.is_input or tensor_decl.is_compile_only):
+                    value.size += tensor_decl.size
+                value.is_output |= tensor_decl.is_output
+            value.is_output |= exop in outputs
+            # derivatives of a convolution mark it as having side effects to keep it, and
+            # it is kept, recomputations are copies
+            value.keep = not isinstance(exop.op, recomputable_ops) or \
+                exop.op.has_side_effects and not isinstance(exop.op, ConvolutionOp) or \
+                len(exop.output_decls) != 1 or value.is_output or \
+                value.size == 0 and not value.is_view
+            if any(op.metadata.get('checkpoint') for op in exop.ref_ops):
+                value.root.keep = True
+            values[exop] = value
+            self.copies[value] = [value]
+            self.schedule.append(value)
+        self.update_uses()
+        return True
+
+    def update_uses(self):
+        """
+        Numbers the schedule and finds the positions where each root is used.
+        """
+        for position, value in enumerate(self.schedule):
+            value.position = position
+            value.uses = []
+        for value in self.schedule:
+            if value.is_view:
+                continue
+            for arg in value.inputs:
+                arg.root.uses.append(value.position)
+
+    def live_range(self, value):
+        if value.is_output:
+            return value.position, len(self.schedule) - 1
+        return value.position, max([value.position] + value.uses)
+
+    def profile(self):
+        """
+        Returns: The bytes of live temporaries at each position of the schedule.
+        """
+        changes = np.zeros(len(self.schedule) + 1, dtype=np.int64)
+        for value in self.schedule:
+            if value.size > 0:
+                start, end = self.live_range(value)
+                changes[start] += value.size
+                changes[end + 1] -= value.size
+        return np.cumsum(changes[:-1])
+
+    @staticmethod
+    def peak_key(profile):
+        """
+        Returns: The peak of profile and the number of positions at the peak.
+        """
+        peak = profile.max()
+        return peak, int(np.count_nonzero(profile == peak))
+
+    @staticmethod
+    def views_recomputable(arg):
+        """
+        Returns: True if the views from arg to its root can be copied.
+        """
+        while arg.is_view:
+            if not isinstance(arg.op, recomputable_ops):
+                return False
+            arg = arg.inputs[0]
+        return True
+
+    def idle_gap(self, value, position):
+        """
+        Returns: The positions of the uses of value before and after position, if value
+            can be recomputed and is live but not used at position, else None.
+        """
+        if value.is_view or value.keep or value.position >= position:
+            return None
+        uses = sorted(set(value.uses))
+        if not uses or uses[-1] <= position or position in uses:
+            return None
+        before = max([value.position] + [use for use in uses if use < position])
+        after = min(use for use in uses if use > position)
+        for user in self.schedule[after:]:
+            if not user.is_view and not all(self.views_recomputable(arg)
+                                            for arg in user.inputs if arg.root is value):
+                return None
+        return before, after
+
+    def plan(self, value, after, position, recompute_larger=False):
+        """
+        Plans a recomputation of value at after, when the peak is at position. Arguments
+        that are not live at after are recomputed too, unless they are kept, have a copy
+        after position, which is used instead, or are larger than value and
+        recompute_larger is False.
+
+        Returns:
+            The values to recompute, arguments first, and a dict from the roots of the
+            other arguments to the copies that they are read from.
+        """
+        order, sources = [], dict()
+
+        def visit(root):
+            for arg in root.inputs:
+                source = arg.root
+                if source in sources or source in order:
+                    continue
+                copy = max((copy for copy in self.copies[source.original]
+                            if copy.position < after), key=lambda copy: copy.position)
+                if copy is not source and not self.views_recomputable(arg):
+                    copy = source
+                if self.live_range(copy)[1] >= after or copy.keep or \
+                        copy.position > position or \
+                        copy.size > value.size and not recompute_larger or \
+                        not self.views_recomputable(arg):
+                    sources[source] = copy
+                else:
+                    visit(source)
+            order.append(root)
+
+        visit(value)
+        return order, sources
+
+    def recompute(self, value, after, position, recompute_larger=False):
+        """
+        Recomputes value at after for the uses from after on, when the peak is at position.
+        """
+        order, copies = self.plan(value, after, position, recompute_larger)
+        added = []
+        views = dict()
+
+        def copy_arg(arg):
+            copy = copies.get(arg.root, arg.root)
+            if copy is arg.root:
+                return arg
+            if not arg.is_view:
+                return copy
+            if (arg, copy) not in views:
+                views[arg, copy] = arg.recomputation([copy_arg(arg.inputs[0])])
+                added.append(views[arg, copy])
+            return views[arg, copy]
+
+        for root in order:
+            copy = root.recomputation([copy_arg(arg) for arg in root.inputs])
+            copy.keep = False
+            added.append(copy)
+            copies[root] = copy
+            self.copies[root.original].append(copy)
+        for user in self.schedule[after:]:
+            if not user.is_view:
+                user.inputs = [copy_arg(arg) if arg.root is value else arg
+                               for arg in user.inputs]
+        self.schedule[after:after] = added
+        self.update_uses()
+
+    def estimate(self, profile, value, gap, position, recompute_larger):
+        """
+        Returns: The peak_key of the profile after recomputing value in gap, when the
+            peak is at position, and the flops of the recomputation.
+        """
+        before, after = gap
+        order, sources = self.plan(value, after, position, recompute_larger)
+        profile = profile.copy()
+        profile[before + 1:after] -= value.size
+        for copy in set(sources.values()):
+            end = self.live_range(copy)[1]
+            if end < after:
+                profile[end + 1:after + 1] += copy.size
+        # at most, all the recomputations are live with what is live at after
+        added = profile[after] + sum(root.size for root in order)
+        return self.peak_key(np.append(profile, added)), sum(flops(root.op) for root in order)
+
+    def reduce_peak(self):
+        """
+        Recomputes values while that lowers the peak, or the number of positions at the
+        peak, until the peak is within the budget.
+        """
+        while True:
+            profile = self.profile()
+            position = int(np.argmax(profile))
+            if profile[position] <= self.memory_budget:
+                return
+            peak_key = self.peak_key(profile)
+            candidates = []
+            for value in self.schedule:
+                gap = self.idle_gap(value, position)
+                if gap is None:
+                    continue
+                for recompute_larger in (False, True):
+                    estimate, cost = self.estimate(profile, value, gap, position,
+                                                   recompute_larger)
+                    if estimate < peak_key:
+                        candidates.append((value.size / (1.0 + cost), value, gap,
+                                           recompute_larger))
+            if not candidates:
+                return
+            _, value, gap, recompute_larger = max(candidates,
+                                                  key=lambda candidate: candidate[0])
+            # the estimate can be off, keep the schedule if the recomputation does not help
+            schedule = [(scheduled, scheduled.inputs) for scheduled in self.schedule]
+            copies = dict((original, list(copies)) for original, copies in self.copies.items())
+            self.recompute(value, gap[1], position, recompute_larger)
+            if not self.peak_key(self.profile()) < peak_key:
+                self.schedule = [scheduled for scheduled, _ in schedule]
+                for scheduled, inputs in schedule:
+                    scheduled.inputs = inputs
+                self.copies = copies
+                self.update_uses()
+                return
+
+    def add_recomputations(self):
+        """
+        Adds the exops of the recomputations and connects their users.
+        """
+        after_exop = self.exop_block
+        for value in self.schedule:
+            if value.exop is None:
+                op = value.op.copy_with_new_args([arg.op for arg in value.inputs])
+                op.metadata.update(value.op.metadata)
+                self.exop_block.add_ops([op], after_exop=after_exop)
+                value.op = op
+                value.exop = self.computation_decl.get_exop(op)
+                self.recompute_flops += flops(op)
+                self.recomputed += 1
+            else:
+                for input_decl, arg in zip(value.exop.input_decls, value.inputs):
+                    if input_decl.source_output_decl.exop is not arg.exop:
+                        input_decl.source_output_decl = arg.exop.output_decls[0]
+            after_exop = value.exop
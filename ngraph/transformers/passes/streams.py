@@ -0,0 +1,315 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import collections
+
+import numpy as np
+
+from ngraph.op_graph.comm_nodes import CommunicationOp
+from ngraph.op_graph.ctc import CTCOp
+from ngraph.op_graph.debug import PrintOp
+from ngraph.op_graph.op_graph import AssignOp, RngOp
+from ngraph.op_graph.pooling import BpropPoolOp, PoolingOp
+from ngraph.op_graph.scan import ScanBpropOp, ScanGradOp, ScanOp
+from ngraph.transformers.cpu.fused import FusedElementwiseOp
+from ngraph.transformers.passes.memlayout import MemoryManager
+from ngraph.transformers.passes.passes import GraphPass
+from ngraph.transformers.passes.rematerialization import flops
+
+# Estimated cost, in flops, of running an exop, and of handing a result to another stream
+EXOP_COST = 1 << 12
+SYNC_COST = 1 << 16
+
+
+def exop_cost(op):
+    """
+    Returns: An estimate of the floating point operations of op.
+    """
+    if isinstance(op, FusedElementwiseOp):
+        return int(np.prod(op.shape)) * len(op.steps)
+    return flops(op)
+
+
+def written_args(op):
+    """
+    Returns: The positions of the arguments that the code of op writes.
+    """
+    if isinstance(op, AssignOp):
+        return (0,)
+    elif isinstance(op, CTCOp):
+        return (4,)
+    return ()
+
+
+def hidden_state(op):
+    """
+    Returns: (key, writes) for the state outside the memory pools that the code of op
+        uses, which must be used in the order of the exops.
+    """
+    if isinstance(op, PoolingOp):
+        return [(('pooling', op.safe_name), True)]
+    elif isinstance(op, BpropPoolOp):
+        return [(('pooling', op.fprop.forwarded.safe_name), False)]
+    elif isinstance(op, RngOp):
+        return [('random', True)]
+    elif isinstance(op, (ScanOp, ScanBpropOp, ScanGradOp)):
+        return [('scan', True)]
+    elif isinstance(op, (CommunicationOp, PrintOp)):
+        return [('io', True)]
+    return []
+
+
+class StreamSchedule(object):
+    """
+    The exops of a computation split over streams that run concurrently.
+
+    Attributes:
+        streams: Lists of exops, each in the order of the exop block. The first stream runs
+            in the thread calling the computation.
+        events: A dict from the exops that exops of other streams wait for to the number of
+            the event set once they have run.
+        waits: A dict from exops to the numbers of the events they wait for before running.
+    """
+
+    def __init__(self, streams, events, waits):
+        self.streams = streams
+        self.events = events
+        self.waits = waits
+
+
+class StreamScheduling(GraphPass):
+    """
+    Splits the exops of a computation over streams, for the CPU transformer to run on a pool
+    of threads, and sets computation_decl.stream_schedule.
+
+    An exop follows every earlier exop that writes a tensor it reads, or that reads or writes
+    a tensor it writes, so it sees the same values as in the exop block and results are
+    unchanged. State kept outside the pools, such as the random generator and max pooling
+    indices, is used in the order of the exop block. Exops go to the stream where, by their
+    flops, they would finish first, counting a cost for waiting on another stream. The
+    computation stays on one stream if no split gains.
+
+    The memory layout reuses the memory of temporaries once they are dead in the exop block,
+    which would order exops that use the same memory at different times. Temporaries are
+    laid out again, reusing memory only once every exop using it is known to have run, so
+    the pool may grow. A last check orders exops by the memory they use.
+
+    Arguments:
+        num_streams: The most streams to use.
+        separate_outputs: As for MemLayoutPass, whether results have a pool of their own.
+    """
+
+    def __init__(self, num_streams, separate_outputs=False, **kwargs):
+        super(StreamScheduling, self).__init__(**kwargs)
+        self.num_streams = num_streams
+        self.separate_outputs = separate_outputs
+
+    def do_pass(self, computation_decl, **kwargs):
+        exops = list(computation_decl.exop_block)
+        computation_decl.stream_schedule = None
+        if self.num_streams < 2 or len(exops) < 2:
+            return
+        predecessors = self.dependencies(exops)
+        stream_numbers = self.assign_streams(exops, predecessors)
+        if len(set(stream_numbers)) < 2:
+            return
+        _, happens_before = self.synchronize(exops, predecessors, stream_numbers)
+        byte_alignment = computation_decl.execution_graph.execution_state \
+            .transformer.byte_alignment
+        computation_decl.temporary_max_allocated = self.layout_temporaries(
+            exops, happens_before, byte_alignment)
+        predecessors = self.dependencies(exops, self.overlaps(exops))
+        computation_decl.stream_schedule, _ = self.synchronize(exops, predecessors,
+                                                               stream_numbers)
+
+    def is_temporary(self, tensor_decl):
+        return not tensor_decl.is_persistent and \
+            not (self.separate_outputs and tensor_decl.is_output)
+
+    def pool_range(self, tensor_decl):
+        """
+        Returns: The pool holding tensor_decl, and its start and end in the pool.
+        """
+        if tensor_decl.buffer_pool_offset is None:
+            return tensor_decl, 0, 1
+        if tensor_decl.is_persistent:
+            pool = 'persistent'
+        elif self.is_temporary(tensor_decl):
+            pool = 'temporary'
+        else:
+            pool = 'output'
+        start = tensor_decl.buffer_pool_offset
+        return pool, start, start + tensor_decl.size
+
+    def accesses(self, exop):
+        """
+        Returns: (resource, writes) for each tensor decl and hidden state exop uses.
+        """
+        written = written_args(exop.op)
+        result = [(input_decl.tensor_decl, index in written)
+                  for index, input_decl in enumerate(exop.input_decls)]
+        result += [(input_decl.tensor_decl, True) for input_decl in exop.write_args]
+        result += [(output_decl.tensor_decl, True) for output_decl in exop.output_decls]
+        result = [(tensor_decl, writes) for tensor_decl, writes in result
+                  if not tensor_decl.is_compile_only]
+        return result + hidden_state(exop.op)
+
+    def overlaps(self, exops):
+        """
+        Returns: A dict from each tensor decl used by exops to the tensor decls whose memory
+            overlaps its memory, itself included.
+        """
+        pools = collections.defaultdict(set)
+        for exop in exops:
+            for resource, _ in self.accesses(exop):
+                if not isinstance(resource, (str, tuple)):
+                    pool, start, end = self.pool_range(resource)
+                    pools[pool].add((start, end, resource))
+        result = dict()
+        for ranges in pools.values():
+            # Sweep over the ranges by start, keeping those not ended yet
+            open_ranges = []
+            for start, end, tensor_decl in sorted(ranges, key=lambda r: (r[0], r[1])):
+                open_ranges = [r for r in open_ranges if r[1] > start]
+                result[tensor_decl] = [tensor_decl]
+                for other in open_ranges:
+                    result[tensor_decl].append(other[2])
+                    result[other[2]].append(tensor_decl)
+                open_ranges.append((start, end, tensor_decl))
+        return result
+
+    def dependencies(self, exops, overlaps=None):
+        """
+        Arguments:
+            exops: The exops.
+            overlaps: As returned by overlaps, to order exops by memory instead of by
+                tensor.
+
+        Returns: For each exop, the positions of the earlier exops it must follow.
+        """
+        overlaps = overlaps or dict()
+        last_write = dict()
+        reads = collections.defaultdict(list)
+        predecessors = []
+        for position, exop in enumerate(exops):
+            accesses = self.accesses(exop)
+            exop_predecessors = set()
+            for resource, writes in accesses:
+                for other in overlaps.get(resource, [resource]):
+                    if other in last_write:
+                        exop_predecessors.add(last_write[other])
+                    if writes:
+                        exop_predecessors.update(reads[other])
+            for resource, writes in accesses:
+                if writes:
+                    last_write[resource] = position
+                    reads[resource] = []
+                else:
+                    reads[resource].append(position)
+            exop_predecessors.discard(position)
+            predecessors.append(sorted(exop_predecessors))
+        return predecessors
+
+    def assign_streams(self, exops, predecessors):
+        """
+        Returns: The number of the stream of each exop, by list scheduling on the flops.
+        """
+        stream_numbers = []
+        finish = []
+        stream_finish = [0] * self.num_streams
+        for exop, exop_predecessors in zip(exops, predecessors):
+            cost = EXOP_COST + exop_cost(exop.op)
+            best = None
+            for stream in range(self.num_streams):
+                start = stream_finish[stream]
+                for predecessor in exop_predecessors:
+                    ready = finish[predecessor]
+                    if stream_numbers[predecessor] != stream:
+                        ready += SYNC_COST
+                    start = max(start, ready)
+                if best is None or start < best[0]:
+                    best = (start, stream)
+            start, stream = best
+            stream_numbers.append(stream)
+            finish.append(start + cost)
+            stream_finish[stream] = start + cost
+        return stream_numbers
+
+    def synchronize(self, exops, predecessors, stream_numbers):
+        """
+        Returns: A StreamSchedule with the events for the dependencies between streams,
+            leaving out waits that earlier waits already cover, and a function telling
+            whether an exop, by position, has run once another starts.
+        """
+        streams = [[] for _ in range(self.num_streams)]
+        positions = []
+        for exop, stream in zip(exops, stream_numbers):
+            positions.append(len(streams[stream]))
+            streams[stream].append(exop)
+
+        # For each exop, the last position of each stream known to have run before it ends
+        clocks = []
+        stream_clocks = [[-1] * self.num_streams for _ in range(self.num_streams)]
+        events = dict()
+        waits = dict()
+        for index, exop in enumerate(exops):
+            stream = stream_numbers[index]
+            clock = list(stream_clocks[stream])
+            for predecessor in reversed(predecessors[index]):
+                other = stream_numbers[predecessor]
+                if clock[other] >= positions[predecessor]:
+                    continue
+                if exops[predecessor] not in events:
+                    events[exops[predecessor]] = len(events)
+                waits.setdefault(exop, []).append(events[exops[predecessor]])
+                clock = [max(known, other_known)
+                         for known, other_known in zip(clock, clocks[predecessor])]
+            clock[stream] = positions[index]
+            clocks.append(clock)
+            stream_clocks[stream] = clock
+
+        def happens_before(earlier, later):
+            return earlier < later and \
+                clocks[later][stream_numbers[earlier]] >= positions[earlier]
+
+        schedule = StreamSchedule([stream for stream in streams if stream], events, waits)
+        return schedule, happens_before
+
+    def layout_temporaries(self, exops, happens_before, byte_alignment):
+        """
+        Lay out the temporaries of exops again, freeing their memory once every exop using
+        them has run before the exop allocating.
+
+        Returns: The size of the temporary pool.
+        """
+        uses = collections.defaultdict(list)
+        for position, exop in enumerate(exops):
+            for resource, _ in self.accesses(exop):
+                if not isinstance(resource, (str, tuple)):
+                    uses[resource].append(position)
+        mm = MemoryManager(byte_alignment)
+        allocated = []
+        for position, exop in enumerate(exops):
+            live = []
+            for tensor_decl in allocated:
+                if all(happens_before(use, position) for use in uses[tensor_decl]):
+                    mm.free(tensor_decl.buffer_pool_offset)
+                else:
+                    live.append(tensor_decl)
+            allocated = live
+            for tensor_decl in exop.liveness_new_list:
+                if self.is_temporary(tensor_decl):
+                    tensor_decl.buffer_pool_offset = mm.allocate(tensor_decl.size)
+                    allocated.append(tensor_decl)
+        return mm.max_allocated()
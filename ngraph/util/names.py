@@ -19,14 +19,29 @@ from contextlib import contextmanager
 from ngraph.util.threadstate import get_thread_state
 
 
+class _DefaultGraphLabelType(object):
+    """
+    The graph_label_type of a NameableValue that was not given one: its name.
+
+    As a non-data descriptor it is hidden by a graph_label_type set on the
+    instance, and it leaves default names to be made when first needed.
+    """
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return obj.name
+
+
 class NameableValue(object):
     """
     An object that can be named.
 
     Arguments:
         graph_label_type: A label that should be used when drawing the graph.  Defaults to
-            the class name.
-        name (str): The name of the object.
+            the name.
+        name (str): The name of the object. Defaults to a unique name made from the class
+            name when the name is first used.
         **kwargs: Parameters for related classes.
 
     Attributes:
@@ -35,19 +50,22 @@ class NameableValue(object):
     """
     __counter = 0
     __all_names = WeakValueDictionary()
+    graph_label_type = _DefaultGraphLabelType()
 
     def __init__(self, name=None, graph_label_type=None, docstring=None, **kwargs):
         super(NameableValue, self).__init__(**kwargs)
 
-        if name is None:
-            name = type(self).__name__
         if isinstance(name, NameableValue):
             raise ValueError("name must be a string")
-        self.name = name
+        if name is None:
+            # Most objects are never looked up by name, so the unique name is
+            # only made if it is used.
+            self.__name = None
+        else:
+            self.name = name
 
-        if graph_label_type is None:
-            graph_label_type = self.name
-        self.graph_label_type = graph_label_type
+        if graph_label_type is not None:
+            self.graph_label_type = graph_label_type
         self.__doc__ = docstring
 
     @staticmethod
@@ -72,6 +90,8 @@ class NameableValue(object):
     @property
     def name(self):
         """The name."""
+        if self.__name is None:
+            self.name = type(self).__name__
         return self.__name
 
     @name.setter
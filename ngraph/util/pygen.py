@@ -188,9 +188,17 @@ class PyGen(object):
         """
         return ''.join(self.__code)
 
-    def take_code(self):
-        result = self.code
-        self.__code = []
+    def take_code(self, start=0):
+        """
+        Remove generated code and return it.
+
+        Arguments:
+            start: The code length from which to take the code. Defaults to all the code.
+
+        Returns: The removed code.
+        """
+        result = ''.join(self.__code[start:])
+        del self.__code[start:]
         return result
 
     @property
@@ -13,12 +13,126 @@
 # limitations under the License.
 # ----------------------------------------------------------------------------
 
+import collections
 import json
 import os
 
+import numpy as np
+
+
+# Read once; code generation consults this for every exop.
+_tracing_enabled = os.environ.get('TRACING') == '1'
+
 
 def is_tracing_enabled():
-    return ('TRACING' in os.environ and os.environ['TRACING'] == '1')
+    return _tracing_enabled
+
+
+def set_tracing_enabled(enabled):
+    """
+    Enable or disable profiling for computations compiled after this call.
+
+    Arguments:
+        enabled (bool): True to instrument generated code with timers.
+    """
+    global _tracing_enabled
+    _tracing_enabled = bool(enabled)
+
+
+class ExOpProfiler(object):
+    """
+    Fixed-size ring buffers of exop timings for one computation.
+
+    Generated code writes start/stop timestamps directly into row ``exop_id`` at the column
+    returned by next_slot(), so recording a sample does not allocate.  Once the ring wraps the
+    oldest column is folded into a running total, which keeps count and total exact while
+    percentiles are computed over the samples still in the window.
+
+    Arguments:
+        labels: Sequence with the op type name of each exop, indexed by exop id.
+        capacity (int): Number of calls retained per exop.
+
+    Attributes:
+        start: (len(labels), capacity) array of start times in seconds.
+        stop: (len(labels), capacity) array of stop times in seconds.
+        calls (int): Total number of recorded calls.
+    """
+
+    def __init__(self, labels, capacity=1024):
+        if capacity < 1:
+            raise ValueError("Profiler capacity must be positive, got {}".format(capacity))
+        self.labels = list(labels)
+        self.capacity = capacity
+        self.start = np.zeros((len(self.labels), capacity), dtype=np.float64)
+        self.stop = np.zeros((len(self.labels), capacity), dtype=np.float64)
+        self.evicted_total = np.zeros(len(self.labels), dtype=np.float64)
+        self.calls = 0
+
+    def next_slot(self):
+        """
+        Reserve the column for the next call.
+
+        Returns:
+            Column index into start and stop.
+        """
+        slot = self.calls % self.capacity
+        if self.calls >= self.capacity:
+            self.evicted_total += self.stop[:, slot] - self.start[:, slot]
+        self.calls += 1
+        return slot
+
+    def reset(self):
+        """Discard all recorded samples."""
+        self.evicted_total.fill(0)
+        self.calls = 0
+
+    @property
+    def window(self):
+        """
+        Returns: Column indices of retained samples, oldest first.
+        """
+        if self.calls <= self.capacity:
+            return np.arange(self.calls)
+        first = self.calls % self.capacity
+        return np.roll(np.arange(self.capacity), -first)
+
+    def durations(self):
+        """
+        Returns: (len(labels), n) array of retained durations in seconds, oldest first.
+        """
+        window = self.window
+        return self.stop[:, window] - self.start[:, window]
+
+    def summary(self):
+        """
+        Aggregate retained timings by op type.
+
+        Returns:
+            OrderedDict from op type name to a dict with count, total, mean, p50 and p99,
+            in seconds, ordered by decreasing total time.
+        """
+        durations = self.durations()
+        totals = durations.sum(axis=1) + self.evicted_total
+        rows = collections.defaultdict(list)
+        for exop_id, label in enumerate(self.labels):
+            rows[label].append(exop_id)
+
+        stats = []
+        for label, exop_ids in rows.items():
+            samples = durations[exop_ids].ravel()
+            count = self.calls * len(exop_ids)
+            total = float(totals[exop_ids].sum())
+            if samples.size > 0:
+                p50, p99 = np.percentile(samples, [50, 99])
+            else:
+                p50, p99 = 0.0, 0.0
+            stats.append((label, dict(count=count,
+                                      total=total,
+                                      mean=total / count if count else 0.0,
+                                      p50=float(p50),
+                                      p99=float(p99))))
+        stats.sort(key=lambda item: item[1]['total'], reverse=True)
+        return collections.OrderedDict(stats)
 
 
 class TraceEventTracker(object):
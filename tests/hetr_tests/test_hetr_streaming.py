@@ -0,0 +1,107 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import socket
+from concurrent import futures
+
+import numpy as np
+import pytest
+
+import ngraph as ng
+
+grpc = pytest.importorskip('grpc')
+
+from ngraph.transformers.hetr import hetr_pb2_grpc  # noqa
+from ngraph.transformers.hetr.hetr_server import HetrServer  # noqa
+from ngraph.transformers.hetr.hetr_streaming import ValueAssembler, value_chunks  # noqa
+from ngraph.transformers.hetr.rpc_client import RPCTransformerClient  # noqa
+
+
+@pytest.fixture
+def hetr_server():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('localhost', 0))
+    port = str(sock.getsockname()[1])
+    sock.close()
+
+    # default gRPC message size limits on both ends
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    hetr_pb2_grpc.add_HetrServicer_to_server(HetrServer(None, server), server)
+    server.add_insecure_port('localhost:' + port)
+    server.start()
+    yield port
+    server.stop(0)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 20])
+def test_value_chunks_round_trip(chunk_size):
+    values = [np.arange(60, dtype=np.float32).reshape(3, 4, 5),
+              np.arange(24, dtype=np.int64).reshape(4, 6).T,
+              2.5, None,
+              np.array(3.0),
+              np.zeros((0, 3), dtype=np.float64)]
+    chunks = list(value_chunks(values, comp_id=3, chunk_size=chunk_size))
+    assert all(len(chunk.data) <= chunk_size for chunk in chunks)
+
+    assembler = ValueAssembler()
+    result = assembler.assemble(chunks)
+    assert assembler.comp_id == 3
+    assert len(result) == len(values)
+    for value, expected in zip(result, values):
+        if isinstance(expected, np.ndarray):
+            assert value.dtype == expected.dtype
+            np.testing.assert_array_equal(value, expected)
+        else:
+            assert value == expected
+
+
+def test_value_assembler_rejects_truncated_tensor():
+    chunks = list(value_chunks([np.ones(100, dtype=np.float32)], chunk_size=64))
+    with pytest.raises(ValueError):
+        ValueAssembler().assemble(chunks[:-1])
+
+
+def test_stream_tensors_larger_than_message_limit(hetr_server):
+    # 24 MB each way, six times the default 4 MB gRPC limit
+    C = ng.make_axis(length=2000, name='C')
+    N = ng.make_axis(length=3000, name='N')
+    x = ng.placeholder([C, N])
+    y = x * 2
+
+    client = RPCTransformerClient('cpu0', hetr_server)
+    computation = client.computation([y], [x])
+    computation.returns = {y: 0}
+    assert computation.stream
+
+    x_value = np.random.uniform(-1, 1, (2000, 3000)).astype(np.float32)
+    computation.feed_input([x_value])
+    np.testing.assert_array_equal(computation.get_results()[y], x_value * 2)
+
+
+def test_run_small_computation_in_one_message(hetr_server):
+    C = ng.make_axis(length=4, name='C')
+    N = ng.make_axis(length=2, name='N')
+    x = ng.placeholder([C, N])
+    w = ng.variable([C], initial_value=np.arange(4))
+    y = ng.sum(w * x, out_axes=[N])
+
+    client = RPCTransformerClient('cpu0', hetr_server)
+    computation = client.computation([y], [x])
+    computation.returns = {y: 0}
+    assert not computation.stream
+
+    for scale in range(3):
+        x_value = np.full((4, 2), scale, dtype=np.float32)
+        computation.feed_input([x_value])
+        np.testing.assert_array_equal(computation.get_results()[y], np.full(2, 6 * scale))
@@ -0,0 +1,140 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends import neon
+
+
+def dense_training(batch_size, w_value):
+    N = ng.make_axis(length=batch_size, name='N')
+    C = ng.make_axis(length=5, name='C')
+    H = ng.make_axis(length=4, name='H')
+    x = ng.placeholder([C, N])
+    t = ng.placeholder([H, N])
+    w = ng.variable([H, C], initial_value=w_value)
+    y = ng.tanh(ng.dot(w, x)) * 2 + 1
+    cost = ng.mean(ng.squared_L2(y - t, out_axes=[N]), out_axes=())
+    return [y, cost, ng.deriv(cost, w) * 1], x, t
+
+
+def conv_training(batch_size, batch_norm=False):
+    np.random.seed(0)
+    C = ng.make_axis(length=3, name='C')
+    D = ng.make_axis(length=1, name='D')
+    H = ng.make_axis(length=8, name='H')
+    W = ng.make_axis(length=8, name='W')
+    N = ng.make_axis(length=batch_size, name='N')
+    Y = ng.make_axis(length=2, name='Y')
+    x = ng.placeholder([C, D, H, W, N])
+    t = ng.placeholder([Y, N])
+    layers = neon.Sequential([
+        neon.Convolution((3, 3, 4), neon.UniformInit(-0.5, 0.5), activation=neon.Rectlin(),
+                         batch_norm=batch_norm),
+        neon.Pool2D(2, strides=2),
+        neon.Affine(weight_init=neon.UniformInit(-0.5, 0.5), activation=neon.Tanh(),
+                    axes=[Y]),
+    ])
+    y = layers(x)
+    cost = ng.mean(ng.squared_L2(y - t, out_axes=[N]), out_axes=())
+    weights = list(cost.variables())
+    return [y, cost] + [ng.deriv(cost, weight) * 1 for weight in weights], x, t
+
+
+def run(batch_size, graph, *args):
+    results, x, t = graph(batch_size)
+    transformer = ngt.make_transformer()
+    computation = transformer.computation(results, x, t)
+    values = [np.copy(value) for value in computation(*args)]
+    transformer.close()
+    return values
+
+
+@pytest.mark.parametrize('graph', ['dense', 'conv'])
+def test_smaller_batches_match_compiled_batch(graph):
+    if graph == 'dense':
+        w_value = np.random.uniform(-1, 1, (4, 5)).astype(np.float32)
+
+        def make(batch_size):
+            return dense_training(batch_size, w_value)
+        x_value = np.random.uniform(-1, 1, (5, 8)).astype(np.float32)
+    else:
+        make = conv_training
+        x_value = np.random.uniform(-1, 1, (3, 1, 8, 8, 8)).astype(np.float32)
+    t_value = np.random.uniform(-1, 1, (make(8)[0][0].axes.lengths)).astype(np.float32)
+
+    results, x, t = make(8)
+    transformer = ngt.make_transformer()
+    computation = transformer.computation(results, x, t)
+    for batch_size in (3, 1, 8, 3):
+        x_batch = x_value[..., :batch_size]
+        t_batch = t_value[..., :batch_size]
+        values = [np.copy(value) for value in computation(x_batch, t_batch)]
+        expected = run(batch_size, make, x_batch, t_batch)
+        assert values[0].shape[-1] == batch_size
+        for value, expected_value in zip(values, expected):
+            np.testing.assert_allclose(value, expected_value, rtol=1e-5, atol=1e-5)
+    transformer.close()
+
+
+def test_mkldnn_kernels_follow_batch_size():
+    def make(batch_size):
+        return conv_training(batch_size, batch_norm=True)
+    x_value = np.random.uniform(-1, 1, (3, 1, 8, 8, 8)).astype(np.float32)
+    t_value = np.random.uniform(-1, 1, (2, 8)).astype(np.float32)
+
+    results, x, t = make(8)
+    transformer = ngt.make_transformer()
+    if not transformer.mkldnn.enabled:
+        transformer.close()
+        pytest.skip("MKL-DNN is not available")
+    computation = transformer.computation(results, x, t)
+    for batch_size in (1, 8, 1):
+        x_batch = x_value[..., :batch_size]
+        t_batch = t_value[..., :batch_size]
+        values = [np.copy(value) for value in computation(x_batch, t_batch)]
+        expected = run(batch_size, make, x_batch, t_batch)
+        for value, expected_value in zip(values, expected):
+            np.testing.assert_allclose(value, expected_value, rtol=1e-5, atol=1e-5)
+    assert computation.kernel_names
+    assert set(computation.batch_kernels) == {1}
+    transformer.close()
+
+
+def test_batch_size_larger_than_compiled():
+    w_value = np.ones((4, 5), dtype=np.float32)
+    results, x, t = dense_training(8, w_value)
+    transformer = ngt.make_transformer()
+    computation = transformer.computation(results, x, t)
+    with pytest.raises(ValueError):
+        computation(np.ones((5, 9)), np.ones((4, 9)))
+    transformer.close()
+
+
+def test_batch_state_needs_full_batch():
+    N = ng.make_axis(length=4, name='N')
+    C = ng.make_axis(length=3, name='C')
+    x = ng.placeholder([C, N])
+    total = ng.variable([C, N], initial_value=0)
+    update = ng.sequential([ng.assign(total, total + x), total])
+
+    transformer = ngt.make_transformer()
+    computation = transformer.computation(update, x)
+    np.testing.assert_array_equal(computation(np.ones((3, 4))), np.ones((3, 4)))
+    with pytest.raises(ValueError):
+        computation(np.ones((3, 2)))
+    transformer.close()
@@ -0,0 +1,90 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from contextlib import closing
+
+import numpy as np
+import pytest
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import ConstantInit, Convolution, Rectlin, XavierInit
+from ngraph.op_graph.convolution import ConvolutionOp
+from ngraph.transformers.cpu.relu import BpropReluOp
+from ngraph.transformers.passes.convfusion import ConvolutionFusion
+
+
+def image_placeholder():
+    return ng.placeholder([ng.make_axis(length=3, name='C'), ng.make_axis(length=1, name='D'),
+                           ng.make_axis(length=8, name='H'), ng.make_axis(length=8, name='W'),
+                           ng.make_axis(length=4, name='N')])
+
+
+def conv(activation=None):
+    return Convolution((3, 3, 3), XavierInit(), bias_init=ConstantInit(0.1), padding=1,
+                       activation=activation)
+
+
+def run(outputs, x, x_value, fuse):
+    with closing(ngt.make_transformer()) as transformer:
+        if not fuse:
+            transformer.graph_passes = [graph_pass for graph_pass in transformer.graph_passes
+                                        if not isinstance(graph_pass, ConvolutionFusion)]
+        computation = transformer.computation(outputs, x)
+        return computation(x_value), [exop.op for exop in computation.computation_decl.exop_block]
+
+
+def post_ops(ops):
+    return [(op.has_bias, op.has_residual, op.relu_slope)
+            for op in ops if isinstance(op, ConvolutionOp)]
+
+
+def assert_fusion_equivalent(outputs, x):
+    x_value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    expected, unfused = run(outputs, x, x_value, False)
+    results, fused = run(outputs, x, x_value, True)
+    for result, value in zip(results, expected):
+        np.testing.assert_allclose(result, value, rtol=1e-6, atol=1e-6)
+    assert all(post_op == (False, False, None) for post_op in post_ops(unfused))
+    return fused
+
+
+@pytest.mark.parametrize("slope", [0, 0.1])
+def test_residual_block_fused(slope):
+    x = image_placeholder()
+    output = Rectlin(slope=slope)(conv()(conv(Rectlin(slope=slope))(x)) + x)
+
+    fused = assert_fusion_equivalent(output, x)
+    assert post_ops(fused) == [(True, False, slope), (True, True, slope)]
+
+
+def test_residual_block_gradients():
+    x = image_placeholder()
+    output = Rectlin()(conv()(conv(Rectlin())(x)) + x)
+    loss = ng.sum(output * output, out_axes=())
+    grads = [ng.deriv(loss, variable) for variable in loss.variables()] + [ng.deriv(loss, x)]
+
+    fused = assert_fusion_equivalent([output] + grads, x)
+    assert post_ops(fused) == [(True, False, 0.0), (True, True, 0.0)]
+    # the backward pass of each relu reads the fused output
+    assert sum(isinstance(op, BpropReluOp) for op in fused) == 2
+
+
+def test_shared_preactivation_not_fused():
+    x = image_placeholder()
+    preactivation = conv()(x)
+    outputs = [Rectlin()(preactivation), preactivation]
+
+    fused = assert_fusion_equivalent(outputs, x)
+    assert post_ops(fused) == [(True, False, None)]
@@ -0,0 +1,69 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.transformers.cpu.batchnorm import BatchnormOp, BpropBatchnormOp
+
+
+def batchnorm_layer(x, delta, gamma_np, beta_np, eps):
+    gamma = ng.variable(x.axes[:1], initial_value=gamma_np)
+    beta = ng.variable(x.axes[:1], initial_value=beta_np)
+    mean = ng.mean(x, out_axes=x.axes[:1])
+    variance = ng.variance(x, out_axes=x.axes[:1])
+    fprop = BatchnormOp(x, ng.broadcast(gamma, x.axes), ng.broadcast(beta, x.axes), eps,
+                        ng.broadcast(mean, x.axes), variance)
+    return fprop, BpropBatchnormOp(delta, x, fprop)
+
+
+def batchnorm_reference(x, delta, gamma, beta, eps):
+    mean = x.mean(axis=1, keepdims=True)
+    inv_std = 1.0 / np.sqrt(x.var(axis=1, keepdims=True) + eps)
+    xhat = (x - mean) * inv_std
+    dgamma = np.sum(delta * xhat, axis=1, keepdims=True)
+    dbeta = np.sum(delta, axis=1, keepdims=True)
+    dx = gamma * inv_std * (delta - (xhat * dgamma + dbeta) / x.shape[1])
+    return gamma * xhat + beta, dx
+
+
+def test_batchnorm_fallback_layers():
+    # Two layers in one transformer, each with its own statistics
+    C = ng.make_axis(length=3, name='C')
+    D = ng.make_axis(length=5, name='D')
+    N = ng.make_axis(length=16, name='N')
+    eps = 1e-3
+    layers = []
+    for axis in (C, D):
+        x = ng.placeholder([axis, N])
+        delta = ng.placeholder([axis, N])
+        gamma = np.random.uniform(0.5, 2, axis.length).astype(np.float32)
+        beta = np.random.uniform(-1, 1, axis.length).astype(np.float32)
+        layers.append((x, delta, gamma, beta, batchnorm_layer(x, delta, gamma, beta, eps)))
+
+    transformer = ngt.make_transformer()
+    results = [op for _, _, _, _, ops in layers for op in ops]
+    placeholders = [op for x, delta, _, _, _ in layers for op in (x, delta)]
+    computation = transformer.computation(results, *placeholders)
+    values = [np.random.uniform(-2, 2, op.axes.lengths).astype(np.float32)
+              for op in placeholders]
+    for _ in range(2):
+        outputs = computation(*values)
+        for index, (_, _, gamma, beta, _) in enumerate(layers):
+            x_np, delta_np = values[2 * index:2 * index + 2]
+            expected = batchnorm_reference(x_np, delta_np, gamma[:, None], beta[:, None], eps)
+            for output, expected_output in zip(outputs[2 * index:2 * index + 2], expected):
+                np.testing.assert_allclose(output, expected_output, rtol=1e-4, atol=1e-5)
+    transformer.close()
@@ -0,0 +1,75 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+import ngraph as ng
+from ngraph.testing import ExecutorFactory
+from ngraph.transformers.cpu.fused import FusedElementwiseOp, block_layout, \
+    elementwise_blocks
+
+
+def fused_exops(computation):
+    return [exop for exop in computation.computation_decl.exop_block
+            if isinstance(exop.op, FusedElementwiseOp)]
+
+
+@pytest.mark.parametrize('shape, chunk_size', [
+    ((10, 7), 16),
+    ((3, 5, 4), 6),
+    ((100,), 1000),
+])
+def test_elementwise_blocks_cover_tensor(shape, chunk_size):
+    block_axis, block_length = block_layout(shape, chunk_size)
+    counts = np.zeros(shape)
+    for index, scratch_index in elementwise_blocks(shape, block_axis, block_length):
+        assert counts[index].size <= chunk_size
+        assert counts[index].shape[0] == scratch_index.stop - scratch_index.start
+        counts[index] += 1
+    np.testing.assert_array_equal(counts, 1)
+
+
+def test_fused_chain():
+    C = ng.make_axis(length=300, name='C')
+    N = ng.make_axis(length=70, name='N')
+    x = ng.placeholder([C, N])
+    y = ng.placeholder([C, N])
+    z = ng.placeholder([C, N])
+    result = ng.tanh(ng.exp(x * y + z) - 1.0) / 2
+
+    x_np, y_np, z_np = (np.random.uniform(-1, 1, (300, 70)).astype(np.float32)
+                        for _ in range(3))
+    with ExecutorFactory() as ex:
+        computation = ex.executor(result, x, y, z)
+        assert len(fused_exops(computation)) == 1
+        np.testing.assert_allclose(computation(x_np, y_np, z_np),
+                                   np.tanh(np.exp(x_np * y_np + z_np) - 1.0) / 2,
+                                   rtol=1e-6)
+
+
+def test_fused_intermediate_result():
+    C = ng.make_axis(length=50, name='C')
+    x = ng.placeholder([C])
+    intermediate = ng.exp(-x)
+    result = ng.reciprocal(intermediate + 1.0)
+
+    x_np = np.random.uniform(-3, 3, 50).astype(np.float32)
+    with ExecutorFactory() as ex:
+        computation = ex.executor([result, intermediate], x)
+        exop, = fused_exops(computation)
+        assert len(exop.output_decls) == 2
+        result_val, intermediate_val = computation(x_np)
+        np.testing.assert_allclose(intermediate_val, np.exp(-x_np), rtol=1e-6)
+        np.testing.assert_allclose(result_val, 1.0 / (np.exp(-x_np) + 1.0), rtol=1e-6)
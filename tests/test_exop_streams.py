@@ -0,0 +1,114 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from contextlib import closing
+
+import numpy as np
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import BiRNN, ConstantInit, Convolution, GaussianInit, Pool2D, \
+    Rectlin, Tanh, XavierInit
+
+
+def run(outputs, x, x_value, num_steps=3, **kwargs):
+    """
+    Returns: The values of outputs for each step, with the random generator seeded the same,
+        and the schedule of the computation.
+    """
+    np.random.seed(0)
+    factory = ngt.make_transformer_factory('cpu', **kwargs)
+    with closing(factory()) as transformer:
+        computation = transformer.add_computation(ng.computation(outputs, x))
+        results = [[np.copy(value) for value in computation(x_value)]
+                   for _ in range(num_steps)]
+        computation_decl = transformer.device_computations[computation.computation_op]\
+            .computation_decl
+        return results, computation_decl.stream_schedule
+
+
+def assert_streams_exact(outputs, x, **kwargs):
+    """
+    Returns: The schedule of the computation on four threads, after checking that its
+        results, including updates over several steps, are those of one thread.
+    """
+    x_value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    expected, schedule = run(outputs, x, x_value, **kwargs)
+    assert schedule is None
+    results, schedule = run(outputs, x, x_value, exop_threads=4, **kwargs)
+    for step_results, step_expected in zip(results, expected):
+        for result, value in zip(step_results, step_expected):
+            np.testing.assert_array_equal(result, value)
+    assert schedule is not None and len(schedule.streams) > 1
+    return schedule
+
+
+def training_outputs(output, learning_rate=0.01):
+    loss = ng.sum(output * output, out_axes=())
+    variables = sorted(loss.variables(), key=lambda variable: variable.name)
+    updates = [ng.assign(variable, variable - learning_rate * ng.deriv(loss, variable))
+               for variable in variables]
+    return [loss, ng.doall(updates)]
+
+
+def test_independent_branches():
+    x = ng.placeholder([ng.make_axis(length=32, name='F'), ng.make_axis(length=16, name='N')])
+    branches = []
+    for _ in range(4):
+        w = ng.variable([ng.make_axis(length=32, name='H'), x.axes[0]],
+                        initial_value=np.random.uniform(-0.1, 0.1, (32, 32)))
+        branches.append(ng.tanh(ng.dot(w, x)))
+    output = branches[0] * branches[1] + branches[2] - branches[3]
+    schedule = assert_streams_exact(training_outputs(output) + branches, x)
+    assert len(schedule.waits) > 0
+
+
+def test_shared_temporaries_off():
+    x = ng.placeholder([ng.make_axis(length=32, name='F'), ng.make_axis(length=16, name='N')])
+    output = ng.dot(ng.variable([ng.make_axis(length=32, name='H'), x.axes[0]],
+                                initial_value=np.ones((32, 32))), x)
+    assert_streams_exact([ng.tanh(output), ng.sigmoid(output), ng.exp(-output)], x,
+                         shared_temporaries=False)
+
+
+def test_random_branches():
+    # Large enough for the branches to be worth running on streams of their own
+    x = ng.placeholder([ng.make_axis(length=512, name='F'), ng.make_axis(length=256, name='N')])
+    noises = [ng.uniform(x) * x for _ in range(3)] + [ng.normal(x) + x]
+    assert_streams_exact([ng.tanh(noise) for noise in noises], x)
+
+
+def test_inception_module():
+    x = ng.placeholder([ng.make_axis(length=4, name='C'), ng.make_axis(length=1, name='D'),
+                        ng.make_axis(length=8, name='H'), ng.make_axis(length=8, name='W'),
+                        ng.make_axis(length=4, name='N')])
+
+    def conv(size, output):
+        return Convolution((size, size, 4), XavierInit(), bias_init=ConstantInit(0.1),
+                           padding=size // 2, activation=Rectlin())(output)
+
+    # Branches summed instead of concatenated, which keeps the axes the same
+    pooled = Pool2D(3, strides=1, padding=1)(x)
+    output = conv(1, x) + conv(3, conv(1, x)) + conv(5, conv(1, x)) + conv(1, pooled)
+    assert_streams_exact(training_outputs(output), x)
+
+
+def test_birnn():
+    x = ng.placeholder([ng.make_axis(length=8, name='F'), ng.make_axis(length=6, name='REC'),
+                        ng.make_axis(length=4, name='N')])
+    output = BiRNN(8, init=GaussianInit(var=0.1), activation=Tanh(), return_sequence=False,
+                   sum_out=True)(x)
+    loss = ng.sum(output * output, out_axes=())
+    variables = sorted(loss.variables(), key=lambda variable: variable.name)
+    assert_streams_exact([loss] + [ng.deriv(loss, variable) for variable in variables], x)
@@ -13,7 +13,8 @@
 # limitations under the License.
 # ----------------------------------------------------------------------------
 import ngraph as ng
-from ngraph.op_graph.op_graph import as_op
+from ngraph.op_graph.op_graph import Op, as_op
+from ngraph.op_graph.snapshot import GraphSnapshot
 from ngraph.transformers.passes.passes import SimplePrune
 from orderedset import OrderedSet
 
@@ -36,3 +37,45 @@ def test_simpleprune_graph_pass():
     base_op, simple_graph = get_simple_graph()
     SimplePrune().do_pass(ops=[simple_graph])
     assert simple_graph.forwarded is base_op
+
+
+def assert_snapshot_matches(graph):
+    ordered = graph.ordered_ops()
+    assert set(ordered) == set(Op.ordered_ops(graph.roots))
+    positions = {op: position for position, op in enumerate(ordered)}
+    for op in ordered:
+        for dep in op.all_deps:
+            assert positions[dep.forwarded] < positions[op]
+
+
+def test_graph_snapshot_follows_simpleprune():
+    x = ng.placeholder(())
+    y = ng.variable((), initial_value=2.0)
+    # -(-3) and 4 * 1 are folded, leaving the constants they were built from unused
+    f = (x + ng.negative(ng.negative(ng.constant(3.0)))) * (y * ng.constant(4.0) *
+                                                            ng.constant(1.0))
+    graph = GraphSnapshot([f])
+    SimplePrune().wrapped_do_pass(ops=[f], graph=graph)
+    assert not graph.stale
+    assert_snapshot_matches(graph)
+
+
+def test_graph_snapshot_replaces_root():
+    base_op, simple_graph = get_simple_graph()
+    graph = GraphSnapshot([simple_graph])
+    SimplePrune().wrapped_do_pass(ops=[simple_graph], graph=graph)
+    assert graph.roots == [base_op]
+    assert graph.ordered_ops() == [base_op]
+
+
+def test_graph_snapshot_rebuilt_after_other_passes():
+    base_op, simple_graph = get_simple_graph()
+    graph = GraphSnapshot([simple_graph])
+    SimplePrune.keeps_graph_snapshot = False
+    try:
+        SimplePrune().wrapped_do_pass(ops=[simple_graph], graph=graph)
+    finally:
+        del SimplePrune.keeps_graph_snapshot
+    assert graph.stale
+    assert graph.ordered_ops() == [base_op]
+    assert not graph.stale
@@ -0,0 +1,122 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from contextlib import closing
+
+import numpy as np
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import Affine, Convolution, Layer, Rectlin, Sequential, XavierInit
+from ngraph.op_graph.op_graph import WriteOp
+from ngraph.transformers.cpu.fused import FusedElementwiseOp
+from ngraph.transformers.passes.elementwisefusion import elementwise_ufuncs
+
+
+def random_values(output):
+    """
+    Gives the variables of output random values, as if trained.
+    """
+    values = dict()
+    for op in ng.Op.ordered_ops([output]):
+        tensor = op.tensor
+        if tensor.is_persistent and not tensor.is_constant and not tensor.is_placeholder:
+            values[tensor] = np.random.uniform(0.5, 1.5, tensor.axes.lengths).astype(np.float32)
+            tensor.initial_value = values[tensor]
+    return values
+
+
+def ufuncs(computation):
+    """
+    Returns: The names of the elementwise functions computed by computation.
+    """
+    names = []
+    for exop in computation.computation_decl.exop_block:
+        if isinstance(exop.op, FusedElementwiseOp):
+            names.extend(step[0] for step in exop.op.steps)
+        elif type(exop.op) in elementwise_ufuncs:
+            names.append(elementwise_ufuncs[type(exop.op)])
+    return names
+
+
+def run(output, x, x_value, frozen_values=None):
+    factory = ngt.make_transformer_factory('cpu', frozen_values=frozen_values)
+    with closing(factory()) as transformer:
+        computation = transformer.computation(output, x)
+        return computation(x_value), computation
+
+
+def image_placeholder():
+    return ng.placeholder([ng.make_axis(length=3, name='C'), ng.make_axis(length=1, name='D'),
+                           ng.make_axis(length=8, name='H'), ng.make_axis(length=8, name='W'),
+                           ng.make_axis(length=4, name='N')])
+
+
+def test_batchnorm_folded_into_convolution():
+    x = image_placeholder()
+    with Layer.inference_mode_on():
+        output = Convolution((3, 3, 5), XavierInit(), batch_norm=True)(x)
+    values = random_values(output)
+    x_value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+
+    expected, _ = run(output, x, x_value)
+    result, computation = run(output, x, x_value, values)
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+    # the bias and the batchnorm are one add
+    assert ufuncs(computation) == ['add']
+
+
+def test_batchnorm_folded_into_dot():
+    x = image_placeholder()
+    with Layer.inference_mode_on():
+        output = Sequential([Affine(nout=6, weight_init=XavierInit(), activation=Rectlin(),
+                                    batch_norm=True)])(x)
+    values = random_values(output)
+    x_value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+
+    expected, unfrozen = run(output, x, x_value)
+    result, computation = run(output, x, x_value, values)
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+    assert 'sqrt' in ufuncs(unfrozen)
+    assert 'sqrt' not in ufuncs(computation)
+    assert ufuncs(computation).count('add') == 2
+
+
+def test_assignments_to_frozen_variables_pruned():
+    x = image_placeholder()
+    output = Convolution((3, 3, 5), XavierInit(), batch_norm=True)(x)
+    values = random_values(output)
+    x_value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+
+    expected, unfrozen = run(output, x, x_value)
+    result, computation = run(output, x, x_value, values)
+    np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5)
+    assert any(isinstance(exop.op, WriteOp) for exop in unfrozen.computation_decl.exop_block)
+    assert not any(isinstance(exop.op, WriteOp)
+                   for exop in computation.computation_decl.exop_block)
+
+
+def test_constant_expressions_folded():
+    F = ng.make_axis(length=5, name='F')
+    N = ng.make_axis(length=3, name='N')
+    x = ng.placeholder([F, N])
+    w = ng.variable([F], initial_value=np.arange(5))
+    output = ng.exp(x) * ng.sqrt(w + 1) - ng.square(w)
+    x_value = np.random.uniform(-1, 1, (5, 3)).astype(np.float32)
+    w_value = np.arange(5, 10).astype(np.float32)
+
+    result, computation = run(output, x, x_value, {w: w_value})
+    expected = np.exp(x_value) * np.sqrt(w_value + 1)[:, None] - np.square(w_value)[:, None]
+    np.testing.assert_allclose(result, expected, rtol=1e-5)
+    assert sorted(ufuncs(computation)) == ['exp', 'multiply', 'subtract']
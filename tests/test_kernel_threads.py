@@ -0,0 +1,89 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from contextlib import closing
+
+import numpy as np
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import ConstantInit, Convolution, GaussianInit, LookupTable, \
+    Pool2D, Rectlin, XavierInit
+from ngraph.transformers.cpu.batchnorm import BatchnormOp, BpropBatchnormOp
+
+
+def run(outputs, placeholders, values, kernel_threads):
+    factory = ngt.make_transformer_factory('cpu', kernel_threads=kernel_threads)
+    with closing(factory()) as transformer:
+        computation = transformer.computation(outputs, *placeholders)
+        return [np.copy(value) for value in computation(*values)]
+
+
+def assert_kernel_threads_match(outputs, placeholders, values):
+    expected = run(outputs, placeholders, values, None)
+    for kernel_threads in (2, 3):
+        results = run(outputs, placeholders, values, kernel_threads)
+        for result, value in zip(results, expected):
+            np.testing.assert_allclose(result, value, rtol=1e-6, atol=1e-7)
+
+
+def gradients(output, *args):
+    loss = ng.sum(output * output, out_axes=())
+    variables = sorted(loss.variables(), key=lambda variable: variable.name)
+    return [loss] + [ng.deriv(loss, arg) for arg in list(args) + variables]
+
+
+def image_placeholder():
+    return ng.placeholder([ng.make_axis(length=4, name='C'), ng.make_axis(length=1, name='D'),
+                           ng.make_axis(length=9, name='H'), ng.make_axis(length=9, name='W'),
+                           ng.make_axis(length=5, name='N')])
+
+
+def test_convolution_pooling():
+    x = image_placeholder()
+    output = Convolution((3, 3, 6), XavierInit(), bias_init=ConstantInit(0.1), padding=1,
+                         activation=Rectlin())(x)
+    # Overlapping windows
+    output = Pool2D(3, strides=1, padding=1)(output)
+    output = Convolution((3, 3, 4), XavierInit(), strides=2, activation=Rectlin())(output)
+    output = Pool2D(2, strides=1, op='avg')(output)
+    value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    assert_kernel_threads_match(gradients(output, x), [x], [value])
+
+
+def test_channel_pooling():
+    # Windows overlapping across channels, which split over samples
+    x = image_placeholder()
+    output = Pool2D((2, 1, 2, 2), strides=1)(x)
+    value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    assert_kernel_threads_match(gradients(output, x), [x], [value])
+
+
+def test_batchnorm():
+    x = ng.placeholder([ng.make_axis(length=7, name='C'), ng.make_axis(length=16, name='N')])
+    delta = ng.placeholder(x.axes)
+    gamma = ng.variable(x.axes[:1], initial_value=np.random.uniform(0.5, 2, 7))
+    beta = ng.variable(x.axes[:1], initial_value=np.random.uniform(-1, 1, 7))
+    fprop = BatchnormOp(x, ng.broadcast(gamma, x.axes), ng.broadcast(beta, x.axes), 1e-3,
+                        ng.broadcast(ng.mean(x, out_axes=x.axes[:1]), x.axes),
+                        ng.variance(x, out_axes=x.axes[:1]))
+    values = [np.random.uniform(-2, 2, x.axes.lengths).astype(np.float32) for _ in range(2)]
+    assert_kernel_threads_match([fprop, BpropBatchnormOp(delta, x, fprop)], [x, delta], values)
+
+
+def test_lookup_table():
+    x = ng.placeholder([ng.make_axis(length=6, name='REC'), ng.make_axis(length=4, name='N')])
+    output = LookupTable(10, 3, GaussianInit(), pad_idx=0)(x)
+    value = np.random.randint(0, 10, x.axes.lengths)
+    assert_kernel_threads_match(gradients(output), [x], [value])
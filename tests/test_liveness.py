@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ----------------------------------------------------------------------------
+import numpy as np
 import pytest
 
 import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.op_graph.op_graph import WriteOp
 from ngraph.transformers.passes.memlayout import MemoryManager
 from ngraph.testing import ExecutorFactory
 
@@ -230,3 +233,58 @@ def test_memory_manager_memory_align():
 # test_memory_manager_bad_free()
 # test_memory_manager_align()
 # test_memory_manager_memory_align()
+
+
+def test_slice_gradients_update_in_place():
+    T = ng.make_axis(length=6, name='T')
+    N = ng.make_axis(length=4, name='N')
+    x = ng.placeholder([T, N])
+    cost = ng.sum(ng.slice_along_axis(x, T, 0) * 1.0, out_axes=())
+    for t in range(1, 6):
+        cost = cost + ng.sum(ng.slice_along_axis(x, T, t) * float(t + 1), out_axes=())
+    grad = ng.deriv(cost, x) * 2
+
+    with ExecutorFactory() as ex:
+        computation = ex.executor(grad, x)
+        grad_val = computation(np.random.uniform(-1, 1, (6, 4)).astype(np.float32))
+        write_args = [len(exop.write_args) for exop in computation.computation_decl.exop_block
+                      if isinstance(exop.op, WriteOp)]
+
+    np.testing.assert_array_equal(grad_val, np.tile(np.arange(2, 13, 2)[:, np.newaxis], (1, 4)))
+    # Only the first update copies the tensor
+    assert write_args.count(2) <= 1
+
+
+@pytest.mark.parametrize('shared_temporaries', [True, False])
+def test_shared_temporary_arena(shared_temporaries):
+    C = ng.make_axis(length=4, name='C')
+    D = ng.make_axis(length=300, name='D')
+    x = ng.placeholder([C])
+    y = ng.placeholder([D])
+    small = ng.sum(ng.exp(x) * 2, out_axes=())
+    # Added second with more temporaries, so a shared arena has to grow
+    large = ng.exp(ng.tanh(y) * 3) + ng.exp(y)
+
+    factory = ngt.make_transformer_factory('cpu', shared_temporaries=shared_temporaries)
+    transformer = factory()
+    small_computation = transformer.computation(small, x)
+    large_computation = transformer.computation(large, y)
+
+    x_np = np.arange(4, dtype=np.float32) / 4
+    y_np = np.linspace(-1, 1, 300).astype(np.float32)
+    small_val = small_computation(x_np)
+    large_val = large_computation(y_np)
+    # Results are not overwritten by running another computation
+    np.testing.assert_allclose(small_val, np.sum(np.exp(x_np) * 2), rtol=1e-5)
+    np.testing.assert_allclose(small_computation(x_np), np.sum(np.exp(x_np) * 2), rtol=1e-5)
+    np.testing.assert_allclose(large_val, np.exp(np.tanh(y_np) * 3) + np.exp(y_np), rtol=1e-5)
+
+    decls = [computation.computation_decl
+             for computation in (small_computation, large_computation)]
+    assert 0 < decls[0].temporary_max_allocated < decls[1].temporary_max_allocated
+    if shared_temporaries:
+        assert transformer.temporary_arena_size == \
+            max(decl.temporary_max_allocated for decl in decls)
+    else:
+        assert transformer.temporary_arena_size == 0
+    transformer.close()
@@ -0,0 +1,165 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import collections
+
+import numpy as np
+
+import ngraph as ng
+from ngraph.transformers.passes.mkldnnpasses import MklCreateOpDescriptors, create_batch_kernels
+
+
+class LayoutEngine(object):
+    """
+    Stands in for the Mkldnn engine when only layouts are looked at. A layout is
+    the number of bytes it needs.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.mkldnn_engine = None
+        self.mkldnn_verbose = False
+        self.datatype = {np.float32: 'float32'}
+        self.memory_format = dict(blocked=0, chwn=1, nchw=2, nc=3)
+        self.kernels = dict()
+        self.op_layouts = dict()
+        self.native_layouts = []
+        self.kernel_ops = collections.OrderedDict()
+        self.batch_kernels = dict()
+
+    def create_layout_md(self, engine, ndims, shape, strides, data_type, memory_format):
+        return 4 * int(np.prod(shape[:ndims]))
+
+    def create_empty_kernel(self, op_id):
+        return dict(op_id=op_id)
+
+    def conv_fprop_kernel(self, engine, input_ndims, filter_ndims, bias_ndims, output_ndims,
+                          input_shape, filter_shape, bias_shape, output_shape, stride, pad,
+                          input_layout, filter_layout, residual_layout, relu, relu_slope,
+                          data_type, kernel):
+        kernel['output_layout'] = 4 * int(np.prod(output_shape[:output_ndims]))
+
+    def output_layout(self, kernel, index):
+        return kernel['output_layout']
+
+    def compare_layouts(self, engine, layout1, layout2):
+        return layout1 == layout2
+
+    def layout_size(self, engine, layout):
+        return layout
+
+
+def make_mkl_args(mkldnn, op):
+    """
+    Gives the arguments of op an MKL layout.
+    """
+    for arg in op.args:
+        mkldnn.op_layouts[arg.name] = (arg.tensor_description().tensor_size, list(arg.axes))
+
+
+def axes():
+    return [ng.make_axis(length=8, name='C'), ng.make_axis(length=4, name='N')]
+
+
+def test_propagate_when_reorders_are_saved():
+    mkldnn = LayoutEngine()
+    x = ng.placeholder(axes())
+    y = ng.placeholder(x.axes)
+    z = x + y
+    w = z * z
+    make_mkl_args(mkldnn, z)
+
+    MklCreateOpDescriptors(mkldnn=mkldnn).do_pass(ops=[w])
+    # z saves reordering both x and y, for one reorder of its own
+    assert z.name in mkldnn.op_layouts
+    # w would save one reorder of z, for one of its own
+    assert w.name not in mkldnn.op_layouts
+
+
+def test_no_propagation_when_argument_is_reordered_anyway():
+    mkldnn = LayoutEngine()
+    x = ng.placeholder(axes())
+    y = ng.placeholder(x.axes)
+    z = x + y
+    total = ng.sum(z.args[0], out_axes=())
+    make_mkl_args(mkldnn, z)
+
+    MklCreateOpDescriptors(mkldnn=mkldnn).do_pass(ops=[z, total])
+    assert z.name not in mkldnn.op_layouts
+
+
+def test_no_propagation_between_layouts():
+    mkldnn = LayoutEngine()
+    x = ng.placeholder(axes())
+    y = ng.placeholder(x.axes)
+    z = x + y
+    w = z * z
+    make_mkl_args(mkldnn, z)
+    layout, mkl_axes = mkldnn.op_layouts[z.args[1].name]
+    mkldnn.op_layouts[z.args[1].name] = (layout + 1, mkl_axes)
+
+    MklCreateOpDescriptors(mkldnn=mkldnn).do_pass(ops=[w])
+    assert z.name not in mkldnn.op_layouts
+
+
+def test_no_propagation_when_disabled():
+    mkldnn = LayoutEngine()
+    x = ng.placeholder(axes())
+    y = ng.placeholder(x.axes)
+    z = x + y
+    make_mkl_args(mkldnn, z)
+
+    MklCreateOpDescriptors(mkldnn=mkldnn, propagate_layouts=False).do_pass(ops=[z * z])
+    assert z.name not in mkldnn.op_layouts
+
+
+def convolution():
+    """
+    Returns: A convolution over a batch of 2, and its output axes.
+    """
+    C, D, H, W, N = (ng.make_axis(length=length, name=name) for length, name in
+                     ((3, 'C'), (1, '__NG_DEPTH'), (8, 'H'), (8, 'W'), (2, 'N')))
+    x = ng.placeholder([C, D, H, W, N])
+    filters = ng.placeholder([C, D, ng.make_axis(length=3, name='R'),
+                              ng.make_axis(length=3, name='S'), ng.make_axis(length=4, name='K')])
+    params = dict(pad_d=0, pad_h=1, pad_w=1, str_d=1, str_h=1, str_w=1,
+                  dil_d=1, dil_h=1, dil_w=1)
+    output_axes = ng.make_axes([ng.make_axis(length=4, name='C'), D, H, W, N])
+    return ng.convolution(params, x, filters, axes=output_axes), output_axes
+
+
+def test_kernel_records_output_layout():
+    conv, output_axes = convolution()
+    mkldnn = LayoutEngine()
+
+    MklCreateOpDescriptors(mkldnn=mkldnn).do_pass(ops=[conv])
+    assert conv.name in mkldnn.kernels
+    layout, mkl_axes = mkldnn.op_layouts[conv.name]
+    assert layout == conv.tensor_description().tensor_size
+    assert mkl_axes == [output_axes[index] for index in (4, 0, 2, 3)]
+
+
+def test_batch_kernels_follow_batch_size():
+    conv, output_axes = convolution()
+    mkldnn = LayoutEngine()
+    MklCreateOpDescriptors(mkldnn=mkldnn).do_pass(ops=[conv])
+
+    kernels = create_batch_kernels(mkldnn, [conv.name], 1)
+    assert kernels[conv.name] is not mkldnn.kernels[conv.name]
+    layout, mkl_axes = mkldnn.batch_kernels[1].op_layouts[conv.name]
+    assert layout == conv.tensor_description().tensor_size // 2
+    assert mkl_axes == [output_axes[index] for index in (4, 0, 2, 3)]
+    # the kernels compiled for the whole batch are left alone
+    assert mkldnn.op_layouts[conv.name][0] == conv.tensor_description().tensor_size
+    assert create_batch_kernels(mkldnn, [conv.name], 1) is kernels
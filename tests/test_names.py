@@ -1,4 +1,4 @@
-from ngraph.util.names import ScopedNameableValue, name_scope
+from ngraph.util.names import NameableValue, ScopedNameableValue, name_scope
 
 
 def test_nested_namescope():
@@ -36,3 +36,20 @@ def test_scope_reuse():
     assert val1.name == "scope/val1"
     assert val2.name == "scope/val2"
     assert val3.name != "scope/val3"
+
+
+def test_default_names_made_when_used():
+    with name_scope("lazy"):
+        vals = [ScopedNameableValue() for _ in range(3)]
+
+    names = [val.name for val in vals]
+    assert len(set(names)) == 3
+    assert all(name.startswith("lazy/ScopedNameableValue") for name in names)
+    assert vals[0].name == names[0]
+    assert vals[0].graph_label_type == names[0]
+    assert NameableValue.get_object_by_name(names[1]) is vals[1]
+
+
+def test_graph_label_type():
+    val = NameableValue(graph_label_type="label")
+    assert val.graph_label_type == "label"
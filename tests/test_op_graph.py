@@ -43,6 +43,23 @@ def test_one():
     assert one_0 is one_1
 
 
+def test_uuid_made_once(N):
+    x = ng.variable([N])
+    y = x + x
+    assert y.uuid == y.uuid
+    assert y.uuid != x.uuid
+    assert y.axes.uuid == y.axes.uuid
+
+
+def test_elementwise_broadcasts_to_common_axes(N):
+    M = ng.make_axis(length=2)
+    x = ng.variable([N, M])
+    y = ng.variable([M, N])
+    assert [arg.tensor for arg in (x + x).args] == [x, x]
+    assert (x + y).axes == y.axes
+    assert (x + ng.variable([M])).axes == x.axes
+
+
 def test_pad_invalid_paddings_length(N):
     """
     pad should raise an exception if the paddings length is not the same as the
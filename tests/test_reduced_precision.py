@@ -0,0 +1,69 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.transformers.cpu.quantize import DequantizeOp, quantize
+
+
+@pytest.mark.parametrize('storage_dtype, rtol', [('float16', 1e-3), ('int8', 1e-2)])
+def test_quantize_round_trip(storage_dtype, rtol):
+    value = np.random.uniform(-2, 2, (30, 40)).astype(np.float32)
+    stored, scale = quantize(value, storage_dtype)
+    assert stored.dtype == np.dtype(storage_dtype)
+    np.testing.assert_allclose(stored * scale, value, atol=rtol * 2)
+
+
+def test_odd_sized_narrow_tensor():
+    C = ng.make_axis(length=3, name='C')
+    x = ng.placeholder([C], dtype=np.float16)
+    y = ng.placeholder([C], dtype=np.float16)
+
+    transformer = ngt.make_transformer()
+    computation = transformer.computation([x + y, x * 2], x, y)
+    x_np = np.array([1, 2, 3], dtype=np.float16)
+    y_np = np.array([4, 5, 6], dtype=np.float16)
+    total, doubled = computation(x_np, y_np)
+    transformer.close()
+    np.testing.assert_array_equal(total, x_np + y_np)
+    np.testing.assert_array_equal(doubled, x_np * 2)
+
+
+@pytest.mark.parametrize('storage_dtype, rtol', [('float16', 1e-3), ('int8', 5e-2)])
+def test_reduced_precision_weights(storage_dtype, rtol):
+    F = ng.make_axis(length=64, name='F')
+    H = ng.make_axis(length=32, name='H')
+    N = ng.make_axis(length=8, name='N')
+    w_np = np.random.uniform(-1, 1, (32, 64)).astype(np.float32)
+    x_np = np.random.uniform(-1, 1, (64, 8)).astype(np.float32)
+    x = ng.placeholder([F, N])
+    result = ng.dot(ng.constant(w_np, [H, F]), x)
+
+    factory = ngt.make_transformer_factory('cpu', weight_storage=storage_dtype)
+    transformer = factory()
+    computation = transformer.computation(result, x)
+    result_val = computation(x_np)
+
+    stored_dtypes = set()
+    for exop in computation.computation_decl.exop_block:
+        if isinstance(exop.op, DequantizeOp):
+            stored_dtypes.add(exop.input_decls[0].tensor_decl.element_type.dtype)
+    transformer.close()
+
+    assert stored_dtypes == {np.dtype(storage_dtype)}
+    expected = w_np.dot(x_np)
+    np.testing.assert_allclose(result_val, expected, atol=rtol * np.abs(expected).max())
@@ -0,0 +1,116 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+from contextlib import closing
+
+import numpy as np
+
+import ngraph as ng
+import ngraph.transformers as ngt
+from ngraph.frontends.neon import Affine, ConstantInit, Convolution, GaussianInit, Rectlin, \
+    Recurrent, Tanh, XavierInit
+from ngraph.transformers.passes.rematerialization import Rematerialization
+
+
+def mlp(x, num_layers, checkpoint_every=None):
+    for layer in range(num_layers):
+        x = Affine(nout=32, weight_init=GaussianInit(var=0.1), bias_init=GaussianInit(),
+                   activation=Rectlin())(x)
+        if checkpoint_every is not None and layer % checkpoint_every == checkpoint_every - 1:
+            x = ng.checkpoint(x)
+    return x
+
+
+def gradients(output, x):
+    loss = ng.sum(output * output, out_axes=())
+    variables = sorted(loss.variables(), key=lambda variable: variable.name)
+    return [loss] + [ng.deriv(loss, variable) for variable in variables]
+
+
+def run(outputs, x, x_value, rematerialize, **kwargs):
+    """
+    Returns: The values of outputs, the peak temporary memory and the Rematerialization pass.
+    """
+    factory = ngt.make_transformer_factory('cpu', **kwargs)
+    with closing(factory()) as transformer:
+        remat, = [graph_pass for graph_pass in transformer.graph_passes
+                  if isinstance(graph_pass, Rematerialization)]
+        if not rematerialize:
+            transformer.graph_passes.remove(remat)
+        computation = transformer.computation(outputs, x)
+        return computation(x_value), transformer.temporary_arena_size, remat
+
+
+def assert_rematerialization_exact(outputs, x, **kwargs):
+    """
+    Returns: The peak temporary memory with and without rematerialization, and the
+        Rematerialization pass.
+    """
+    x_value = np.random.uniform(-1, 1, x.axes.lengths).astype(np.float32)
+    expected, peak, _ = run(outputs, x, x_value, False, **kwargs)
+    results, remat_peak, remat = run(outputs, x, x_value, True, **kwargs)
+    for result, value in zip(results, expected):
+        np.testing.assert_array_equal(result, value)
+    assert remat.recomputed > 0
+    assert 0 < remat.recompute_flops < remat.flops
+    assert remat.peak_after < remat.peak_before
+    return remat_peak, peak, remat
+
+
+def features_placeholder():
+    return ng.placeholder([ng.make_axis(length=32, name='F'), ng.make_axis(length=16, name='N')])
+
+
+def test_checkpoints():
+    x = features_placeholder()
+    remat_peak, peak, _ = assert_rematerialization_exact(
+        gradients(mlp(x, 8, checkpoint_every=3), x), x)
+    assert remat_peak < peak
+
+
+def test_memory_budget():
+    x = features_placeholder()
+    outputs = gradients(mlp(x, 8), x)
+    remat_peak, peak, remat = assert_rematerialization_exact(outputs, x, memory_budget=0)
+    assert remat_peak < peak
+
+    # a budget above the peak keeps all activations
+    _, _, remat = run(outputs, x, np.zeros(x.axes.lengths), True,
+                      memory_budget=remat.peak_before)
+    assert remat.recomputed == 0
+
+
+def test_no_budget_no_checkpoints():
+    x = features_placeholder()
+    _, _, remat = run(gradients(mlp(x, 4), x), x, np.zeros(x.axes.lengths), True)
+    assert remat.recomputed == 0
+
+
+def test_convolutions():
+    x = ng.placeholder([ng.make_axis(length=3, name='C'), ng.make_axis(length=1, name='D'),
+                        ng.make_axis(length=8, name='H'), ng.make_axis(length=8, name='W'),
+                        ng.make_axis(length=4, name='N')])
+    output = x
+    for _ in range(4):
+        output = Convolution((3, 3, 3), XavierInit(), bias_init=ConstantInit(0.1), padding=1,
+                             activation=Rectlin())(output)
+    assert_rematerialization_exact(gradients(output, x), x, memory_budget=0)
+
+
+def test_unrolled_recurrent():
+    x = ng.placeholder([ng.make_axis(length=8, name='F'), ng.make_axis(length=16, name='REC'),
+                        ng.make_axis(length=64, name='N')])
+    output = Recurrent(16, init=GaussianInit(var=0.1), activation=Tanh(),
+                       return_sequence=False)(x)
+    assert_rematerialization_exact(gradients(output, x), x, memory_budget=0)
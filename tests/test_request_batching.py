@@ -0,0 +1,100 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import ngraph as ng
+import ngraph.transformers as ngt
+
+
+@pytest.fixture
+def affine():
+    N = ng.make_axis(length=4, name='N')
+    C = ng.make_axis(length=3, name='C')
+    H = ng.make_axis(length=2, name='H')
+    w_value = np.random.uniform(-1, 1, (2, 3)).astype(np.float32)
+    x = ng.placeholder([C, N])
+    y = ng.dot(ng.constant(w_value, [H, C]), x)
+    transformer = ngt.make_transformer()
+    computation = transformer.computation([y, ng.sum(y, out_axes=[N])], x)
+    yield computation, w_value
+    transformer.close()
+
+
+def test_concurrent_requests_are_batched(affine):
+    computation, w_value = affine
+    samples = np.random.uniform(-1, 1, (10, 3)).astype(np.float32)
+    results = [None] * len(samples)
+    batcher = ngt.RequestBatcher(computation, max_latency=0.05)
+    batch_sizes = []
+    run = batcher.computation
+    batcher.computation = lambda x: batch_sizes.append(x.shape[1]) or run(x)
+
+    def request(index):
+        results[index] = batcher(samples[index])
+
+    threads = [threading.Thread(target=request, args=(index,))
+               for index in range(len(samples))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert sum(batch_sizes) == len(samples)
+    assert max(batch_sizes) <= 4
+    assert len(batch_sizes) < len(samples)
+    for sample, (y, total) in zip(samples, results):
+        np.testing.assert_allclose(y, w_value.dot(sample), rtol=1e-5)
+        np.testing.assert_allclose(total, w_value.dot(sample).sum(), rtol=1e-5)
+
+
+def test_errors_reach_callers(affine):
+    computation, w_value = affine
+    batcher = ngt.RequestBatcher(computation, max_batch_size=2)
+    future = batcher.submit(np.ones((5,)))
+    with pytest.raises(ValueError):
+        future.result()
+    np.testing.assert_allclose(batcher(np.ones((3,)))[0], w_value.sum(axis=1), rtol=1e-5)
+    batcher.close()
+    with pytest.raises(ValueError):
+        batcher.submit(np.ones((3,)))
+
+
+def test_request_racing_close_is_served(affine):
+    computation, w_value = affine
+    batcher = ngt.RequestBatcher(computation)
+    put = batcher.requests.put
+    putting = threading.Event()
+
+    def late_put(request):
+        # the request is queued after close has had time to queue its sentinel
+        if request is not None:
+            putting.set()
+            time.sleep(0.2)
+        put(request)
+
+    batcher.requests.put = late_put
+    futures = []
+    thread = threading.Thread(target=lambda: futures.append(batcher.submit(np.ones((3,)))))
+    thread.start()
+    putting.wait()
+    batcher.close()
+    thread.join()
+    np.testing.assert_allclose(futures[0].result(timeout=5)[0], w_value.sum(axis=1),
+                               rtol=1e-5)
@@ -0,0 +1,113 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+import ngraph as ng
+from ngraph.testing import ExecutorFactory
+
+
+@pytest.fixture
+def rnn_axes():
+    return (ng.make_axis(length=4, name='H'), ng.make_axis(length=4, name='H2'),
+            ng.make_axis(length=5, name='REC'), ng.make_axis(length=3, name='N'))
+
+
+@pytest.mark.parametrize('backward', [False, True])
+def test_scan_running_sum(rnn_axes, backward):
+    H, _, REC, N = rnn_axes
+    x = ng.placeholder([H, REC, N])
+
+    def step(xs, states):
+        total = states[0] + xs[0]
+        return total * 2, [total]
+
+    result = ng.scan(step, [x], [ng.constant(0, [H, N])], REC, backward=backward, pos=1)
+    x_np = np.random.uniform(-1, 1, (4, 5, 3)).astype(np.float32)
+    with ExecutorFactory() as ex:
+        result_val = ex.executor(result, x)(x_np)
+
+    if backward:
+        expected = np.cumsum(x_np[:, ::-1], axis=1)[:, ::-1] * 2
+    else:
+        expected = np.cumsum(x_np, axis=1) * 2
+    np.testing.assert_allclose(result_val, expected, rtol=1e-5)
+
+
+def rnn_graph(rnn_axes):
+    """
+    Returns: x, h_init, W and a tanh RNN over x both as a scan and unrolled.
+    """
+    H, H2, REC, N = rnn_axes
+    x = ng.placeholder([H, REC, N])
+    h_init = ng.placeholder([H, N])
+    W = ng.variable([H2, H], initial_value=np.random.uniform(-0.5, 0.5, (4, 4)))
+
+    def step(xs, states):
+        h = ng.tanh(ng.cast_axes(ng.dot(W, states[0]), [H, N]) + xs[0])
+        return h, [h]
+
+    result = ng.scan(step, [x], [h_init], REC, pos=1)
+    h = h_init
+    h_list = []
+    for i in range(REC.length):
+        h = step([ng.slice_along_axis(x, REC, i)], [h])[0]
+        h_list.append(h)
+    unrolled = ng.stack(h_list, REC, pos=1)
+    return x, h_init, W, [result, unrolled]
+
+
+def gradient_computation(ex, output, x, h_init, W):
+    cost = ng.sum(output * output, out_axes=())
+    return ex.executor([output] + [ng.deriv(cost, wrt) for wrt in (x, h_init, W)], x, h_init)
+
+
+def test_scan_gradients(rnn_axes):
+    x, h_init, W, outputs = rnn_graph(rnn_axes)
+    x_np = np.random.uniform(-1, 1, (4, 5, 3)).astype(np.float32)
+    h_np = np.random.uniform(-1, 1, (4, 3)).astype(np.float32)
+    with ExecutorFactory() as ex:
+        values = [gradient_computation(ex, output, x, h_init, W)(x_np, h_np)
+                  for output in outputs]
+    for scan_val, unrolled_val in zip(*values):
+        np.testing.assert_allclose(scan_val, unrolled_val, rtol=1e-5, atol=1e-6)
+
+
+def test_scan_smaller_batches(rnn_axes):
+    x, h_init, W, outputs = rnn_graph(rnn_axes)
+    x_np = np.random.uniform(-1, 1, (4, 5, 3)).astype(np.float32)
+    h_np = np.random.uniform(-1, 1, (4, 3)).astype(np.float32)
+    with ExecutorFactory() as ex:
+        computations = [gradient_computation(ex, output, x, h_init, W) for output in outputs]
+        for batch_size in (2, 1, 3, 2):
+            args = x_np[..., :batch_size], h_np[..., :batch_size]
+            values = [[np.copy(value) for value in computation(*args)]
+                      for computation in computations]
+            assert values[0][0].shape[-1] == batch_size
+            for scan_val, unrolled_val in zip(*values):
+                np.testing.assert_allclose(scan_val, unrolled_val, rtol=1e-5, atol=1e-6)
+
+
+def test_scan_rejects_outer_placeholder(rnn_axes):
+    H, _, REC, N = rnn_axes
+    x = ng.placeholder([H, REC, N])
+    y = ng.placeholder([H, N])
+
+    def step(xs, states):
+        h = states[0] + xs[0] + y
+        return h, [h]
+
+    with pytest.raises(ValueError):
+        ng.scan(step, [x], [ng.constant(0, [H, N])], REC)
@@ -16,10 +16,12 @@ import os
 from copy import deepcopy
 
 import numpy as np
+import pytest
 import ngraph as ng
-from ngraph.op_graph.op_graph import Op
+from ngraph.op_graph.op_graph import Op, TensorOp
 import ngraph.op_graph.serde.serde as ser
 from ngraph.op_graph.serde.serde_pass import SerializationPass
+from ngraph.testing import ExecutorFactory
 from ngraph.testing.hetr_utils import create_send_recv_graph
 
 
@@ -166,6 +168,59 @@ def test_op_handle_selection():
     assert_object_equality(simple_graph, py_graph[0])
 
 
+class OutsideOpGraphOp(TensorOp):
+    """ An op defined outside of the ngraph.op_graph modules. """
+    pass
+
+
+def test_op_class_registry():
+    assert ser.get_op_classes() is ser.get_op_classes()
+    assert ser.get_ngraph_op_cls('AbsoluteOp') is ng.op_graph.op_graph.AbsoluteOp
+
+    base_op, _ = get_simple_graph()
+    outside_op = OutsideOpGraphOp(args=(base_op,), axes=base_op.axes)
+    py_op, = ser.deserialize_graph(ser.serialize_graph([outside_op], only_return_handle_ops=True))
+    assert type(py_op) is OutsideOpGraphOp
+    assert_object_equality(outside_op, py_op)
+
+    with pytest.raises(ValueError):
+        ser.get_ngraph_op_cls('NotAnOp')
+
+
+def test_graph_archive(tmpdir):
+    C = ng.make_axis(name='C', length=1000)
+    large_value = np.arange(C.length, dtype=np.float32)
+    small_value = np.ones(4, dtype=np.float32)
+    large = ng.constant(large_value, [C])
+    small = ng.constant(small_value, [ng.make_axis(name='D', length=4)])
+    graph = ng.sum(large, out_axes=()) + ng.sum(small, out_axes=())
+
+    fname = str(tmpdir.join('graph.ngraph'))
+    ser.serialize_graph_to_file([graph], fname, only_return_handle_ops=True,
+                                payload_threshold=large_value.nbytes)
+    py_graph, = ser.deserialize_graph_from_file(fname)
+    assert_object_equality(graph, py_graph)
+
+    py_ops = {op.uuid: op for op in Op.all_op_references([py_graph])}
+    py_large, py_small = py_ops[large.uuid], py_ops[small.uuid]
+    np.testing.assert_array_equal(py_large.const, large_value)
+    np.testing.assert_array_equal(py_small.const, small_value)
+    # Large tensors are read-only views of the archive, written once for both attributes
+    assert not py_large.const.flags.writeable
+    assert np.may_share_memory(py_large.const, py_large.initial_value)
+    assert py_small.const.flags.writeable
+
+    with ExecutorFactory() as ex:
+        assert ex.executor(py_graph)() == large_value.sum() + small_value.sum()
+
+    # Archived tensor data is not in the protobuf graph
+    with open(fname, 'rb') as f:
+        _, graph_size = ser.ARCHIVE_HEADER.unpack(f.read(ser.ARCHIVE_HEADER.size))
+        graph_msg = f.read(graph_size)
+    with pytest.raises(ValueError):
+        ser.deserialize_graph(graph_msg)
+
+
 def test_ser_pass():
     _, graph = get_simple_graph()
     ser_pass = SerializationPass('mypass_token')
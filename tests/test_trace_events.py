@@ -0,0 +1,96 @@
+# ----------------------------------------------------------------------------
+# Copyright 2017 Nervana Systems Inc.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------------------------------------------------------
+import numpy as np
+import pytest
+
+import ngraph as ng
+from ngraph.testing import ExecutorFactory
+from ngraph.util.trace_events import ExOpProfiler, is_tracing_enabled, set_tracing_enabled
+
+
+@pytest.fixture
+def tracing():
+    enabled = is_tracing_enabled()
+    set_tracing_enabled(True)
+    yield
+    set_tracing_enabled(enabled)
+
+
+@pytest.fixture
+def no_tracing():
+    enabled = is_tracing_enabled()
+    set_tracing_enabled(False)
+    yield
+    set_tracing_enabled(enabled)
+
+
+def record(profiler, durations):
+    slot = profiler.next_slot()
+    profiler.start[:, slot] = 0.0
+    profiler.stop[:, slot] = durations
+
+
+def test_profiler_ring_buffer_keeps_totals():
+    profiler = ExOpProfiler(['Add', 'Multiply', 'Add'], capacity=4)
+    for i in range(10):
+        record(profiler, [1.0, 2.0, float(i)])
+
+    assert profiler.calls == 10
+    assert profiler.durations().shape == (3, 4)
+    np.testing.assert_equal(profiler.durations()[2], [6.0, 7.0, 8.0, 9.0])
+
+    summary = profiler.summary()
+    assert list(summary.keys()) == ['Add', 'Multiply']
+    assert summary['Add']['count'] == 20
+    assert summary['Add']['total'] == 10.0 + sum(range(10))
+    assert summary['Multiply']['mean'] == 2.0
+    assert summary['Multiply']['p99'] == 2.0
+
+
+def test_profiler_reset():
+    profiler = ExOpProfiler(['Add'], capacity=2)
+    for _ in range(3):
+        record(profiler, [1.0])
+    profiler.reset()
+    assert profiler.calls == 0
+    assert profiler.summary()['Add'] == dict(count=0, total=0.0, mean=0.0, p50=0.0, p99=0.0)
+
+
+def test_profile_summary(tracing):
+    x = ng.placeholder(())
+    y = ng.exp(x) * x
+
+    with ExecutorFactory() as ex:
+        comp = ex.executor(y, x)
+        for i in range(5):
+            comp(float(i))
+
+        summary = comp.profile_summary()
+        assert comp.profiler.calls == 5
+        assert 'ExpOp' in summary
+        assert 'Multiply' in summary
+        for stats in summary.values():
+            assert stats['count'] % 5 == 0
+            assert stats['total'] >= 0
+
+
+def test_profile_summary_disabled(no_tracing):
+    x = ng.placeholder(())
+    with ExecutorFactory() as ex:
+        comp = ex.executor(x + 1, x)
+        comp(1.0)
+        assert comp.profiler is None
+        with pytest.raises(ValueError):
+            comp.profile_summary()
@@ -105,6 +105,28 @@ def test_concatenate():
         ng.testing.assert_allclose(j_val, j_np)
 
 
+@pytest.config.flex_disabled
+def test_flat_storage():
+    with ExecutorFactory() as ex:
+        A = ng.make_axis(name='A', length=3)
+        B = ng.make_axis(name='B', length=4)
+        x_np = np.arange(12.).reshape(A.length, B.length)
+        y_np = np.arange(4.)
+        x = ng.variable([A, B], initial_value=x_np).named('x')
+        y = ng.variable([B], initial_value=y_np).named('y')
+        flat = ng.flat_storage([x, y])
+        double = ex.executor(ng.sequential([ng.assign(flat, flat + flat), x + y]))
+        ng.testing.assert_allclose(double(), 2 * (x_np + y_np))
+        ng.testing.assert_allclose(double(), 4 * (x_np + y_np))
+
+        # sections keep their values in computations added later
+        values = ex.executor([x, y, flat])
+        x_val, y_val, flat_val = values()
+        ng.testing.assert_allclose(x_val, 4 * x_np)
+        ng.testing.assert_allclose(y_val, 4 * y_np)
+        ng.testing.assert_allclose(flat_val, 4 * np.concatenate([x_np.ravel(), y_np]))
+
+
 @pytest.config.cpu_enabled_only(reason="Only CPU supports dynamic graph changes")
 def test_specific_slice_deriv():
     #